@@ -50,6 +50,7 @@ COMMANDS = {
         ("check-dancedb", "Check DanceDB: duplicates and venues without coordinates"),
         ("ensure-venue-coordinates", "Ensure all venues have coordinates"),
         ("merge-duplicate-venues", "Merge duplicate venues (close + similar names)"),
+        ("sync-mirror", "Update the local SQLite mirror of DanceDB (--full to reload)"),
     ],
     "SYNC (FULL WORKFLOWS)": [
         ("sync-danslogen", "bygdegardarna → folketshus → scrape → match → ensure-venues → upload"),
@@ -60,9 +61,19 @@ COMMANDS = {
         ("sync-all", "Sync all sources in sequence"),
         ("scrape-all", "Scrape all data sources at once"),
     ],
+    "PLANS (run any command with --plan to collect edits)": [
+        ("approve-plan", "Approve edits in a plan file"),
+        ("apply-plan", "Apply approved edits from a plan file"),
+    ],
+    "LOCAL": [
+        ("serve-local", "Serve a local stand-in for DanceDB (offline tests and benchmarks)"),
+    ],
 }
 
 
+GLOBAL_FLAGS = ("--no-cache", "--refresh", "--plan", "--no-mirror")
+
+
 def print_commands():
     print("DanceDB CLI Commands\n")
     for category, commands in COMMANDS.items():
@@ -77,10 +88,19 @@ def main():
 
     parser = argparse.ArgumentParser(description="DanceDB CLI")
     parser.add_argument("-l", "--list", action="store_true", help="List available commands")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the on-disk SPARQL result cache")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached SPARQL results and store fresh ones")
+    parser.add_argument("--plan", action="store_true", help="Write intended DanceDB edits to a plan file instead of writing them")
+    parser.add_argument("--no-mirror", action="store_true", help="Read DanceDB through SPARQL instead of the local SQLite mirror")
     parser.add_argument("command", nargs="?", default=None)
 
     args, unknown = parser.parse_known_args()
 
+    from src.utils.sparql import configure_cache
+    configure_cache(enabled=not args.no_cache, refresh=args.refresh)
+    from src.models.dancedb.mirror import configure_mirror
+    configure_mirror(enabled=not args.no_mirror)
+
     if args.list:
         print_commands()
         return
@@ -98,23 +118,46 @@ def main():
         print_commands()
         return
 
-    sub = parser.add_subparsers(dest="command")
-    
+    # Separate parser for the subcommand, the "command" positional above would swallow its arguments
+    command_parser = argparse.ArgumentParser(description="DanceDB CLI")
+    sub = command_parser.add_subparsers(dest="command")
+
     from src.cli.danslogen import add_danslogen_subparsers
     from src.cli.cogwork import add_cogwork_subparsers
     from src.cli.onbeat import add_onbeat_subparsers
     from src.cli.sync import add_sync_subparsers
+    from src.cli.plan import add_plan_subparsers
+    from src.cli.local import add_local_subparsers
     
     handlers = {}
     handlers.update(add_danslogen_subparsers(sub))
     handlers.update(add_cogwork_subparsers(sub))
     handlers.update(add_onbeat_subparsers(sub))
     handlers.update(add_sync_subparsers(sub))
+    handlers.update(add_plan_subparsers(sub))
+    handlers.update(add_local_subparsers(sub))
+
+    # Global flags may appear after the subcommand
+    plan_mode = args.plan
+    args = command_parser.parse_args([arg for arg in sys.argv[1:] if arg not in GLOBAL_FLAGS])
 
-    args = parser.parse_args()
+    if args.command not in handlers:
+        return
+    if not plan_mode:
+        handlers[args.command](args)
+        return
 
-    if args.command in handlers:
+    from src.models.dancedb.plan import finish_plan, start_plan
+    start_plan(args.command)
+    try:
         handlers[args.command](args)
+    finally:
+        plan_file = finish_plan()
+        if plan_file:
+            print(f"\nPlan saved to {plan_file}")
+            print(f"Review with: cli.py approve-plan {plan_file}")
+        else:
+            print("\nNothing to plan.")
 
 
 if __name__ == "__main__":
@@ -10,6 +10,8 @@ user_agent = "DanceDB/1.0 (User:So9q)"
 WIKIBASE_URL = "https://dance.wikibase.cloud"
 MEDIAWIKI_API_URL = "https://dance.wikibase.cloud/w/api.php"
 SPARQL_ENDPOINT_URL = "https://dance.wikibase.cloud/query/sparql"
+# URL of a local stand-in server (cli.py serve-local) to use instead of the URLs above, e.g. "http://127.0.0.1:8181"
+LOCAL_WIKIBASE_URL = ""
 
 PROJECT_ROOT = Path(__file__).parent.resolve()
 
@@ -30,6 +32,11 @@ folketshus_unmatched_dir: Path = folketshus_dir / "unmatched"
 folketshus_enriched_dir: Path = folketshus_dir / "enriched"
 bygdegardarna_enriched_dir: Path = bygdegardarna_dir / "enriched"
 static_dir: Path = data_dir / "static"
+sparql_cache_dir: Path = data_dir / "cache" / "sparql"
+session_file: Path = data_dir / "cache" / "session.json"
+mirror_db_path: Path = data_dir / "cache" / "dancedb.sqlite"
+events_snapshot_file: Path = data_dir / "cache" / "events_snapshot.json"
+plans_dir: Path = data_dir / "plans"
 
 CET = timezone(timedelta(hours=1))
 
@@ -43,6 +50,65 @@ FUZZY_THRESHOLD_ARTIST_ONBEAT = 90
 
 COORD_MATCH_THRESHOLD_KM = 0.1
 
+# Local venue geodb (see src/utils/geodb.py): SQLite memory map and page cache per connection
+GEODB_MMAP_BYTES = 256 * 1024 * 1024
+GEODB_CACHE_KIB = 64 * 1024
+# Resolve venue names against geodb instead of loading the latest JSON snapshots into memory
+VENUE_RESOLVER_GEODB = True
+
+# SPARQL result cache (enabled by the CLI, disable with --no-cache)
+SPARQL_CACHE_TTL_SECONDS = 6 * 3600
+SPARQL_CACHE_TTL_WIKIDATA_SECONDS = 24 * 3600
+# Rows per page for keyset paginated bulk queries
+SPARQL_PAGE_SIZE = 1000
+# Result format of paginated bulk queries: "tsv" is streamed row by row, "json" is parsed as one document
+SPARQL_RESULT_FORMAT = "tsv"
+SPARQL_TIMEOUT_SECONDS = 300
+API_READ_TIMEOUT_SECONDS = 60
+
+# HTTP request policy for SPARQL and API reads (see src/utils/http.py)
+HTTP_TIMEOUT_SECONDS = 60
+HTTP_MAX_ATTEMPTS = 5
+HTTP_BACKOFF_BASE_SECONDS = 2
+HTTP_BACKOFF_MAX_SECONDS = 120
+# Failed attempts in a row before requests to a host fail fast, and for how long
+HTTP_CIRCUIT_FAILURES = 5
+HTTP_CIRCUIT_RESET_SECONDS = 300
+HTTP_MAX_CONCURRENCY_PER_HOST = 4
+
+# Batched DanceDB writes (see src/models/dancedb/writer.py)
+WRITE_MAX_WORKERS = 4
+WRITE_MAXLAG = 5
+WRITE_MAX_ATTEMPTS = 5
+WRITE_RETRY_AFTER_SECONDS = 5
+WRITE_TIMEOUT_SECONDS = 60
+# Items with queued claim additions before DancedbClient.coalesced_edits() flushes early
+EDIT_FLUSH_ITEMS = 50
+# Max age of the stored DanceDB login session before logging in again
+SESSION_MAX_AGE_SECONDS = 12 * 3600
+
+# wbgetentities hydration (see DancedbClient.get_entities)
+ENTITY_BATCH_SIZE = 50
+ENTITY_FETCH_WORKERS = 4
+ENTITY_CACHE_SIZE = 5000
+
+# Local SQLite mirror of DanceDB (see src/models/dancedb/mirror.py, disable with --no-mirror)
+# Seconds between recentchanges checks within one process
+MIRROR_SYNC_INTERVAL_SECONDS = 60
+# Reload everything when the last sync is older than recentchanges reaches back ($wgRCMaxAge is 90 days)
+MIRROR_RC_MAX_AGE_DAYS = 30
+
+# Existing events fetched for deduplication: days before and after today
+EVENTS_WINDOW_DAYS_BEFORE = 1
+EVENTS_WINDOW_DAYS = 183
+# Incremental event fetches re-read edits this long before the last snapshot (query service lag)
+EVENTS_INCREMENTAL_OVERLAP_SECONDS = 3600
+# Fetch the whole window again (dropping deleted events) when the snapshot is older than this
+EVENTS_FULL_REFRESH_DAYS = 7
+
+# Reference datasets loaded in parallel at the start of sync runs (see src/models/dancedb/reference.py)
+REFERENCE_FETCH_WORKERS = 4
+
 FUZZY_REMOVE_TERMS_BYGDEGARDARNA = ["folkets park", "folkets hus", "förening", "gård", "lösa", "arp", "hult"]
 FUZZY_REMOVE_TERMS_DANSLOGEN = ["folkets park", "folkets hus", "förening", "gård", "lösa", "arp", "hult"]
 FUZZY_REMOVE_TERMS_FOLKETSHUS = ["folkets park", "folkets hus", "förening", "gård", "lösa", "arp", "hult"]
@@ -74,6 +140,8 @@ SHIP_COORDINATES = {
     "tallink": {"lat": 59.35260329949055, "lng": 18.117075933870833},
 }
 
+DANCE_ITEM_NAMESPACE = 120
+
 DANCE_PROP_INSTANCE_OF = "P1"
 DANCE_PROP_VENUE = "P5"
 DANCE_PROP_START = "P32"
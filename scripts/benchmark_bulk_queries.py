@@ -0,0 +1,113 @@
+"""Compare the flat OPTIONAL bulk queries with the grouped ones.
+
+Runs each query once against the DanceDB query service, bypassing the SPARQL
+cache and pagination, and prints rows returned, distinct items, response size
+and wall time.
+
+Usage: python -m scripts.benchmark_bulk_queries
+"""
+import json
+import time
+
+from wikibaseintegrator import wbi_helpers
+
+import config
+from src.models.dancedb.client import ALL_VENUES_QUERY, ARTISTS_QUERY, DUPLICATE_CHECK_FILTER, VENUES_QUERY, VENUES_WITH_EXTERNAL_IDS_QUERY, wbi_config
+from src.models.dancedb.ensure_events import EVENTS_QUERY
+from src.utils.sparql import KEYSET_FILTER
+
+PREFIXES = """
+PREFIX dd: <https://dance.wikibase.cloud/entity/>
+PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+"""
+
+# The queries as they were before they were rewritten around GROUP BY
+FLAT_QUERIES = {
+    "artists": PREFIXES + """
+SELECT ?item ?label ?altLabel ?p3 ?p46 WHERE {
+    ?item ddt:P1 dd:Q225 .
+    OPTIONAL { ?item rdfs:label ?label FILTER(LANG(?label) = "sv") }
+    OPTIONAL { ?item skos:altLabel ?altLabel FILTER(LANG(?altLabel) = "sv") }
+    OPTIONAL { ?item ddt:P3 ?p3 }
+    OPTIONAL { ?item ddt:P46 ?p46 }
+}
+""",
+    "venues": PREFIXES + """
+SELECT ?item ?label ?altLabel ?p4 WHERE {
+    ?item ddt:P1 dd:Q20 .
+    OPTIONAL { ?item rdfs:label ?label FILTER(LANG(?label) = "sv") }
+    OPTIONAL { ?item skos:altLabel ?altLabel FILTER(LANG(?altLabel) = "sv") }
+    OPTIONAL { ?item ddt:P4 ?p4 }
+    FILTER (""" + DUPLICATE_CHECK_FILTER + """)
+}
+""",
+    "venues_with_external_ids": PREFIXES + """
+SELECT ?item ?label ?p4 ?p3 ?p42 ?p44 ?p46 ?p12 WHERE {
+    ?item ddt:P1 dd:Q20 .
+    ?item ddt:P4 ?p4 .
+    OPTIONAL { ?item rdfs:label ?label FILTER(LANG(?label) = "sv") }
+    OPTIONAL { ?item ddt:P3 ?p3 }
+    OPTIONAL { ?item ddt:P42 ?p42 }
+    OPTIONAL { ?item ddt:P44 ?p44 }
+    OPTIONAL { ?item ddt:P46 ?p46 }
+    OPTIONAL { ?item ddt:P12 ?p12 }
+    FILTER (""" + DUPLICATE_CHECK_FILTER + """)
+}
+""",
+    "all_venues": PREFIXES + """
+SELECT ?item ?itemLabel (GROUP_CONCAT(?svAlias; SEPARATOR = "|") AS ?aliasStr) ?geo WHERE {
+    ?item ddt:P1 dd:Q20 .
+    OPTIONAL { ?item rdfs:label ?svLabel FILTER(LANG(?svLabel) = "sv") }
+    OPTIONAL { ?item skos:altLabel ?svAlias FILTER(LANG(?svAlias) = "sv") }
+    OPTIONAL { ?item ddt:P4 ?geo }
+    BIND(COALESCE(?svLabel, "") AS ?itemLabel)
+}
+GROUP BY ?item ?itemLabel ?geo
+""",
+    "events": PREFIXES + f"""
+SELECT ?event ?eventLabel ?start ?end ?venue ?venueLabel WHERE {{
+    ?event ddt:{config.DANCE_PROP_INSTANCE_OF} dd:{config.DANCE_INSTANCE_EVENT} .
+    OPTIONAL {{ ?event ddt:{config.DANCE_PROP_START} ?start . }}
+    OPTIONAL {{ ?event ddt:{config.DANCE_PROP_END} ?end . }}
+    OPTIONAL {{ ?event rdfs:label ?svLabel FILTER(LANG(?svLabel)="sv") }}
+    OPTIONAL {{ ?event rdfs:label ?enLabel FILTER(LANG(?enLabel)="en") }}
+    BIND(COALESCE(?svLabel, ?enLabel, STR(?event)) AS ?eventLabel)
+    OPTIONAL {{ ?event ddt:{config.DANCE_PROP_VENUE} ?venue }}
+    OPTIONAL {{ ?venue rdfs:label ?svVenueLabel FILTER(LANG(?svVenueLabel)="sv") }}
+    BIND(COALESCE(?svVenueLabel, "") AS ?venueLabel)
+}}
+""",
+}
+
+GROUPED_QUERIES = {
+    "artists": ARTISTS_QUERY,
+    "venues": VENUES_QUERY,
+    "venues_with_external_ids": VENUES_WITH_EXTERNAL_IDS_QUERY,
+    "all_venues": ALL_VENUES_QUERY,
+    "events": EVENTS_QUERY,
+}
+
+
+def run(query: str, key_var: str) -> tuple[int, int, int, float]:
+    """Return (rows, distinct keys, response bytes, seconds) for one query."""
+    start = time.perf_counter()
+    results = wbi_helpers.execute_sparql_query(query=query.replace(KEYSET_FILTER, ""), endpoint=wbi_config["SPARQL_ENDPOINT_URL"])
+    elapsed = time.perf_counter() - start
+    bindings = results["results"]["bindings"]
+    keys = {b[key_var]["value"] for b in bindings}
+    return len(bindings), len(keys), len(json.dumps(results)), elapsed
+
+
+def main() -> None:
+    print(f"{'query':<26} {'variant':<8} {'rows':>7} {'items':>7} {'bytes':>10} {'seconds':>8}")
+    for name, flat_query in FLAT_QUERIES.items():
+        key_var = "event" if name == "events" else "item"
+        for variant, query in (("flat", flat_query), ("grouped", GROUPED_QUERIES[name])):
+            rows, items, size, elapsed = run(query, key_var)
+            print(f"{name:<26} {variant:<8} {rows:>7} {items:>7} {size:>10} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
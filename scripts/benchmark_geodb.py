@@ -0,0 +1,70 @@
+"""Measure geodb.find_nearby() latency against the number of venues.
+
+Fills a temporary geodb with venues spread uniformly over Sweden (default
+10 000, 100 000 and 1 000 000) and times lookups around random points, both
+through find_nearby() (R-tree prefilter) and through the plain lat/lng range
+scan over the venues table it replaced.
+
+Usage: python -m scripts.benchmark_geodb [venues ...]
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import config
+from src.utils import geodb
+
+LAT_RANGE = (55.3, 69.0)
+LNG_RANGE = (11.0, 24.1)
+LOOKUPS = 200
+THRESHOLD_KM = 1.0
+
+SCAN_QUERY = """
+    SELECT id, name, source, lat, lng, external_id, qid, address, city, phone, email, permalink
+    FROM venues
+    WHERE lat BETWEEN ? AND ? AND lng BETWEEN ? AND ?
+"""
+
+
+def fill(venues: int) -> None:
+    rng = random.Random(venues)
+    conn = geodb.init_db()
+    with conn:
+        conn.executemany(
+            "INSERT INTO venues (name, source, lat, lng, external_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            ((f"Venue {i}", "benchmark", rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE), str(i), "2026-01-01") for i in range(venues)),
+        )
+    conn.close()
+
+
+def scan(lat: float, lng: float) -> list:
+    return geodb.get_connection().execute(SCAN_QUERY, geodb._bbox_from_point(lat, lng, THRESHOLD_KM)).fetchall()
+
+
+def timed(lookup, points: list[tuple[float, float]]) -> float:
+    """Mean milliseconds per lookup."""
+    started = time.perf_counter()
+    for lat, lng in points:
+        lookup(lat, lng)
+    return (time.perf_counter() - started) / len(points) * 1000
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    rng = random.Random(0)
+    points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(LOOKUPS)]
+    print(f"{'venues':>10} {'rtree ms':>10} {'scan ms':>10}")
+    for venues in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            config.data_dir = Path(tmp)
+            fill(venues)
+            rtree_ms = timed(lambda lat, lng: geodb.find_nearby(lat, lng, threshold_km=THRESHOLD_KM), points)
+            scan_ms = timed(scan, points)
+            geodb.close_connections()
+        print(f"{venues:>10} {rtree_ms:>10.3f} {scan_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
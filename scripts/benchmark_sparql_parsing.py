@@ -0,0 +1,82 @@
+"""Compare decoding SPARQL JSON with streaming TSV for the events query.
+
+Builds a synthetic result of the events query (default 200 000 rows) in both
+formats and decodes each into event dicts the way fetch_events_from_dancedb()
+does: the JSON document with json.loads() as execute_sparql_query() does, the
+TSV lines with the streaming reader. Prints response size, wall time and the
+peak memory traced while decoding (which includes the decoded events).
+
+Usage: python -m scripts.benchmark_sparql_parsing [rows]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from typing import Callable, Iterator
+
+from src.models.dancedb.ensure_events import event_from_binding
+from src.utils.sparql_tsv import XSD, iter_lines, read_tsv, write_tsv
+
+ENTITY = "https://dance.wikibase.cloud/entity/"
+VARIABLES = ["event", "eventLabel", "start", "end", "venue", "venueLabel", "venueAliasStr"]
+CHUNK_SIZE = 64 * 1024
+
+
+def _bindings(rows: int) -> Iterator[dict]:
+    for i in range(rows):
+        start = f"2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}T20:00:00Z"
+        binding = {
+            "event": {"type": "uri", "value": f"{ENTITY}Q{100000 + i}"},
+            "eventLabel": {"type": "literal", "value": f"Dans till Orkester {i % 500} på Folkets park", "xml:lang": "sv"},
+            "start": {"type": "literal", "value": start, "datatype": XSD + "dateTime"},
+            "end": {"type": "literal", "value": start.replace("T20", "T23"), "datatype": XSD + "dateTime"},
+        }
+        if i % 10:
+            binding["venue"] = {"type": "uri", "value": f"{ENTITY}Q{i % 2000 + 1}"}
+            binding["venueLabel"] = {"type": "literal", "value": f"Folkets park {i % 2000}", "xml:lang": "sv"}
+            binding["venueAliasStr"] = {"type": "literal", "value": f"Parken {i % 2000}|Dansbanan {i % 2000}"}
+        yield binding
+
+
+def _chunks(data: bytes) -> Iterator[bytes]:
+    for i in range(0, len(data), CHUNK_SIZE):
+        yield data[i:i + CHUNK_SIZE]
+
+
+def decode_json(data: bytes) -> list[dict]:
+    bindings = json.loads(b"".join(_chunks(data)))["results"]["bindings"]
+    return [event_from_binding(b) for b in bindings]
+
+
+def decode_tsv(data: bytes) -> list[dict]:
+    _, bindings = read_tsv(iter_lines(_chunks(data)))
+    return [event_from_binding(b) for b in bindings]
+
+
+def measure(name: str, decode: Callable[[bytes], list[dict]], data: bytes) -> list[dict]:
+    """Time one decode, then trace the peak memory of a second one (tracing slows it down)."""
+    started = time.perf_counter()
+    events = decode(data)
+    elapsed = time.perf_counter() - started
+    del events
+    tracemalloc.start()
+    events = decode(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<5} {len(data) / 1e6:8.1f} MB {elapsed:8.2f} s  peak {peak / 1e6:8.1f} MB  {len(events)} events")
+    return events
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    json_data = json.dumps({"head": {"vars": VARIABLES}, "results": {"bindings": list(_bindings(rows))}}).encode()
+    tsv_data = "".join(f"{line}\n" for line in write_tsv(VARIABLES, _bindings(rows))).encode()
+
+    print(f"Decoding {rows} event rows")
+    from_json = measure("json", decode_json, json_data)
+    from_tsv = measure("tsv", decode_tsv, tsv_data)
+    assert from_json == from_tsv, "JSON and TSV decoding differ"
+
+
+if __name__ == "__main__":
+    main()
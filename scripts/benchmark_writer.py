@@ -0,0 +1,47 @@
+"""Measure BatchWriter throughput against the local stand-in server.
+
+Starts src.models.dancedb.local_server with a simulated per-request latency
+and writes the same set of new items with increasing worker counts, then
+repeats the largest run with a share of the writes answered with maxlag.
+
+Usage: python -m scripts.benchmark_writer [edits] [latency seconds]
+"""
+import sys
+import time
+
+from wikibaseintegrator.wbi_config import config as wbi_config
+from wikibaseintegrator.wbi_login import Login
+
+from src.models.dancedb.edits import band_edit
+from src.models.dancedb.local_server import start_server
+from src.models.dancedb.writer import BatchWriter
+
+
+def run(server_url: str, edits: int, workers: int) -> tuple[float, BatchWriter]:
+    wbi_config["MEDIAWIKI_API_URL"] = f"{server_url}/w/api.php"
+    writer = BatchWriter(Login(user="Benchmark@local", password="local"), max_workers=workers, max_attempts=50)
+    for i in range(edits):
+        writer.submit(band_edit(f"Benchmark band {i}", spelplan_id=str(i)))
+    start = time.perf_counter()
+    results = writer.run()
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if not r.ok]
+    if failed:
+        print(f"  {len(failed)} edits failed, first error: {failed[0].error}")
+    return elapsed, writer
+
+
+def main() -> None:
+    edits = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    print(f"{edits} edits, {latency * 1000:.0f}ms simulated latency per request\n")
+    print(f"{'workers':>7} {'maxlag':>7} {'seconds':>8} {'edits/s':>8} {'throttled':>9} {'final':>6}")
+    for workers, maxlag_ratio in ((1, 0.0), (2, 0.0), (4, 0.0), (8, 0.0), (8, 0.1)):
+        server = start_server(latency=latency, maxlag_ratio=maxlag_ratio, retry_after=1)
+        elapsed, writer = run(server.url, edits, workers)
+        server.shutdown()
+        print(f"{workers:>7} {maxlag_ratio:>7.0%} {elapsed:>8.2f} {edits / elapsed:>8.1f} {writer.throttle_events:>9} {writer.concurrency:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,39 @@
+"""Find DanceDB items sharing a Swedish label and offer to merge them.
+
+Clashes are found by grouping the label index (src/models/dancedb/labels.py)
+by normalized label, so labels that only differ in case or whitespace are
+reported together and no SPARQL self-join over all labels is needed.
+
+Usage: python -m scripts.fix_clashing_sv_labels
+"""
 import logging
-from collections import defaultdict
 
 from wikibaseintegrator import wbi_helpers
-from wikibaseintegrator.wbi_config import config as wbi_config
-from wikibaseintegrator.wbi_helpers import execute_sparql_query
-from wikibaseintegrator.wbi_login import Login
 
-import config
+from src.models.dancedb.client import get_client
+from src.models.dancedb.labels import LabelIndex
 
-# ---- Setup logging ----
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# ---- Configure your Wikibase instance ----
-wbi_config["MEDIAWIKI_API_URL"] = "https://dance.wikibase.cloud/w/api.php"
-wbi_config["SPARQL_ENDPOINT_URL"] = "https://dance.wikibase.cloud/query/sparql"
-wbi_config["WIKIBASE_URL"] = "https://dance.wikibase.cloud"
-
-# ---- Login for write operations ----
-login_instance = Login(user=config.username, password=config.password)
-
-# ---- SPARQL query to find Swedish label clashes ----
-sparql_query = """
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-
-SELECT ?item ?itemLabel WHERE {
-  ?item rdfs:label ?itemLabel .
-  FILTER(LANG(?itemLabel) = "sv") .
-
-  # Find other items with the same label
-  ?otherItem rdfs:label ?itemLabel .
-  FILTER(LANG(?itemLabel) = "sv") .
-  FILTER(?otherItem != ?item)
-}
-ORDER BY ?itemLabel ?item
-"""
-
-# ---- Run SPARQL query ----
-results = execute_sparql_query(query=sparql_query, endpoint=wbi_config["SPARQL_ENDPOINT_URL"])
-
-# ---- Group clashing items by label ----
-clashes = defaultdict(list)
-for result in results["results"]["bindings"]:
-    item_url = result["item"]["value"]
-    qid = item_url.rsplit("/", 1)[-1]
-    label = result["itemLabel"]["value"]
-    clashes[label].append(qid)
-
-# ---- Merge clashing items ----
-for label, qids in clashes.items():
-    if not qids:
-        continue  # nothing to merge
 
-    logger.info(f"Label '{label}' has clashing items: {qids}")
-    response = input("Continue with merge? (y/n)")
-    if response != "n":
+def main() -> None:
+    clashes = LabelIndex().load().clashes()
+    logger.info(f"Found {len(clashes)} clashing Swedish labels")
+    login = get_client().login
+    for label, qids in sorted(clashes.items()):
+        logger.info(f"Label '{label}' has clashing items: {qids}")
+        response = input("Continue with merge? (y/n)")
+        if response == "n":
+            continue
         try:
-            to_id = wbi_helpers.merge_items_and_create_redirect(
-                qids=qids, login=login_instance, is_bot=True, ignore_conflicts=["description"], tags="wikibaseintegrator"
+            wbi_helpers.merge_items_and_create_redirect(
+                qids=qids, login=login, is_bot=True, ignore_conflicts=["description"], tags="wikibaseintegrator"
             )
             logger.info("Merged qids, see recent changes in the wikibase for an overview")
-            # Suppose merge returned 'merged_to' as the surviving QID
-
         except Exception as e:
             logger.error(f"Error merging {qids}: {e}")
+
+
+if __name__ == "__main__":
+    main()
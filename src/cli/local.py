@@ -0,0 +1,38 @@
+"""Local stand-in server CLI commands."""
+from pathlib import Path
+
+
+def add_local_subparsers(sub) -> dict:
+    """Add local server subparsers and return command handlers."""
+    handlers = {}
+
+    p = sub.add_parser("serve-local", help="Serve a local stand-in for the DanceDB API and SPARQL endpoint")
+    p.add_argument("-s", "--snapshot", default=None, help="Seed items from a wbgetentities style JSON snapshot")
+    p.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    p.add_argument("-p", "--port", type=int, default=8181, help="Port to listen on (default: 8181)")
+    p.add_argument("--latency", type=float, default=0.0, help="Seconds to delay every request")
+    p.add_argument("--maxlag-ratio", type=float, default=0.0, help="Fraction of writes answered with a maxlag error")
+    p.add_argument("--seed", type=int, default=0, help="Random seed for simulated maxlag errors")
+    handlers["serve-local"] = _serve_local
+
+    return handlers
+
+
+def _serve_local(args) -> None:
+    from src.models.dancedb.local_server import start_server
+
+    server = start_server(
+        snapshot=Path(args.snapshot) if args.snapshot else None,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        maxlag_ratio=args.maxlag_ratio,
+        seed=args.seed,
+    )
+    print(f"Local Wikibase running at {server.url} ({len(server.wikibase.store.entities)} items)")
+    print(f'Set LOCAL_WIKIBASE_URL = "{server.url}" in config.py to use it. Press Ctrl+C to stop.')
+    try:
+        server.serve_thread.join()
+    except KeyboardInterrupt:
+        print("\nStopping...")
+        server.shutdown()
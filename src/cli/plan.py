@@ -0,0 +1,30 @@
+"""Plan file CLI commands."""
+from pathlib import Path
+
+
+def add_plan_subparsers(sub) -> dict:
+    """Add plan subparsers and return command handlers."""
+    handlers = {}
+
+    p = sub.add_parser("approve-plan", help="Approve edits in a plan file")
+    p.add_argument("plan_file", help="Plan file written by a command run with --plan")
+    p.add_argument("--all", action="store_true", help="Approve all edits without prompting")
+    handlers["approve-plan"] = _approve_plan
+
+    p = sub.add_parser("apply-plan", help="Apply approved edits from a plan file")
+    p.add_argument("plan_file", help="Approved plan file")
+    p.add_argument("-w", "--workers", type=int, default=None, help="Max concurrent writes (default: config.WRITE_MAX_WORKERS)")
+    handlers["apply-plan"] = _apply_plan
+
+    return handlers
+
+
+def _approve_plan(args) -> None:
+    from src.models.dancedb.plan import approve_plan
+    approve_plan(Path(args.plan_file), approve_all=args.all)
+
+
+def _apply_plan(args) -> None:
+    import config
+    from src.models.dancedb.plan import apply_plan
+    apply_plan(Path(args.plan_file), max_workers=args.workers or config.WRITE_MAX_WORKERS)
@@ -48,11 +48,14 @@ def add_sync_subparsers(sub) -> dict:
     
     p = sub.add_parser("scrape-dancedb-events", help="Fetch existing events from DanceDB")
     p.add_argument("-d", "--date", default=None, help="Date for output (YYYY-MM-DD, default: today)")
+    p.add_argument("--all", action="store_true", help="Fetch all events instead of the deduplication window around today")
+    p.add_argument("--full", action="store_true", help="Fetch the whole window instead of updating the last snapshot")
     handlers["scrape-dancedb-events"] = _scrape_dancedb_events
     
     p = sub.add_parser("match-bygdegardarna-venues", help="Match bygdegardarna venues to DanceDB")
     p.add_argument("-d", "--date", default=None, help="Date for input files (YYYY-MM-DD, default: today)")
     p.add_argument("--skip-prompts", action="store_true", help="Skip interactive prompts, auto-match fuzzy >=85")
+    p.add_argument("--coordinates", action="store_true", help="Offer nearby DanceDB venues to confirm for venues unmatched by name")
     handlers["match-bygdegardarna-venues"] = _match_bygdegardarna_venues
 
     p = sub.add_parser("find-duplicate-venues", help="Find venues within 100m of each other")
@@ -75,6 +78,10 @@ def add_sync_subparsers(sub) -> dict:
     p.add_argument("-t", "--threshold", type=float, default=0.1, help="Distance threshold in km (default: 0.1 = 100m)")
     p.add_argument("--fuzzy", type=float, default=90, help="Fuzzy match threshold for label similarity (default: 90)")
     handlers["merge-duplicate-venues"] = _merge_duplicate_venues
+
+    p = sub.add_parser("sync-mirror", help="Update the local SQLite mirror of DanceDB")
+    p.add_argument("--full", action="store_true", help="Reload all items instead of applying recent changes")
+    handlers["sync-mirror"] = _sync_mirror
     
     p = sub.add_parser("scrape-folketshus", help="Fetch folketshus och parker venues")
     p.add_argument("-d", "--date", default=None, help="Date for output (YYYY-MM-DD, default: today)")
@@ -156,21 +163,22 @@ def _scrape_bygdegardarna(args) -> None:
 
 
 def _scrape_dancedb_venues(args) -> None:
-    from src.models.dancedb.venue_ops import scrape_dancedb_venues
+    from src.models.dancedb.scrape import scrape_dancedb_venues
     date_str = get_date_str(args.date)
     scrape_dancedb_venues(date_str)
 
 
 def _scrape_dancedb_events(args) -> None:
-    from src.models.dancedb.ensure_events import fetch_events_from_dancedb
+    from src.models.dancedb.ensure_events import default_event_window, fetch_events_from_dancedb
     date_str = get_date_str(args.date)
-    fetch_events_from_dancedb(date_str, save=True)
+    window = None if args.all else default_event_window()
+    fetch_events_from_dancedb(date_str, save=True, window=window, incremental=not args.full)
 
 
 def _match_bygdegardarna_venues(args) -> None:
     from src.models.dancedb.venue_ops import match_venues
     date_str = get_date_str(args.date)
-    match_venues(date_str, skip_prompts=args.skip_prompts)
+    match_venues(date_str, skip_prompts=args.skip_prompts, match_coordinates=args.coordinates)
 
 
 def _scrape_folketshus(args) -> None:
@@ -197,50 +205,29 @@ def _sync_wikidata_artists(args) -> None:
 
 
 def _find_duplicate_venues(args) -> None:
-    from src.models.dancedb.client import DancedbClient
-    from src.utils.distance import haversine_distance
+    from src.models.dancedb.query import get_query_client
+    from src.utils.distance import pairs_within
     import config
 
     threshold_km = args.threshold
     print(f"\n=== Finding duplicate venues (within {threshold_km*1000:.0f}m) ===")
 
-    client = DancedbClient()
+    client = get_query_client()
     venues = client.fetch_venues_from_dancedb()
 
-    venues_with_coords = []
-    seen_qids = set()
-    for v in venues:
-        if v["qid"] in seen_qids:
-            continue
-        p4 = v.get("p4", "")
-        if p4:
-            try:
-                coords = p4.replace("Point(", "").replace(")", "").split(" ")
-                lng, lat = float(coords[0]), float(coords[1])
-                venues_with_coords.append({
-                    "qid": v["qid"],
-                    "label": v["label"],
-                    "lat": lat,
-                    "lng": lng,
-                })
-                seen_qids.add(v["qid"])
-            except Exception:
-                continue
+    venues_with_coords = [
+        {"qid": v["qid"], "label": v["label"], "lat": v["lat"], "lng": v["lng"]}
+        for v in venues
+        if v["lat"] is not None
+    ]
 
     print(f"Found {len(venues_with_coords)} venues with unique coordinates")
 
-    duplicates = []
-    for i, v1 in enumerate(venues_with_coords):
-        for v2 in venues_with_coords[i+1:]:
-            dist = haversine_distance(v1["lat"], v1["lng"], v2["lat"], v2["lng"])
-            if dist <= threshold_km:
-                duplicates.append({
-                    "v1": v1,
-                    "v2": v2,
-                    "distance_km": dist,
-                })
-
-    duplicates.sort(key=lambda x: x["distance_km"])
+    coords = [(v["lat"], v["lng"]) for v in venues_with_coords]
+    duplicates = [
+        {"v1": venues_with_coords[i], "v2": venues_with_coords[j], "distance_km": dist}
+        for i, j, dist in pairs_within(coords, threshold_km)
+    ]
 
     print(f"Found {len(duplicates)} potential duplicate pairs:\n")
     for i, dup in enumerate(duplicates, 1):
@@ -256,11 +243,11 @@ def _find_duplicate_venues(args) -> None:
 
 
 def _find_venues_without_coordinates(args) -> None:
-    from src.models.dancedb.client import DancedbClient
+    from src.models.dancedb.query import get_query_client
 
     print("\n=== Finding venues without coordinates ===")
 
-    client = DancedbClient()
+    client = get_query_client()
     venues = client.fetch_venues_from_dancedb()
 
     base_url = "https://dance.wikibase.cloud/wiki/Item:"
@@ -274,12 +261,12 @@ def _find_venues_without_coordinates(args) -> None:
 
 
 def _list_venues_with_too_little_information(args) -> None:
-    from src.models.dancedb.client import DancedbClient
+    from src.models.dancedb.query import get_query_client
 
     print("\n=== Listing venues with too little information ===")
     print("Criteria: has P1=Q20 (venue) + P4 (coordinates) but missing ALL of P3/P42/P44/P46/P12\n")
 
-    client = DancedbClient()
+    client = get_query_client()
     venues = client.fetch_venues_with_external_ids()
 
     base_url = "https://dance.wikibase.cloud/wiki/Item:"
@@ -308,13 +295,25 @@ def _list_venues_with_too_little_information(args) -> None:
     print(f"\nTotal: {len(results)} venues with too little information")
 
 
+def _sync_mirror(args) -> None:
+    from src.models.dancedb.ensure_events import configure_wbi
+    from src.models.dancedb.mirror import DanceMirror
+    import config
+
+    configure_wbi()
+    mirror = DanceMirror(config.mirror_db_path)
+    mirror.sync(full=args.full)
+    print(f"Mirror {config.mirror_db_path} has {len(mirror)} items")
+    mirror.close()
+
+
 def _check_dancedb(args) -> None:
-    from src.models.dancedb.client import DancedbClient
-    from src.utils.distance import haversine_distance
+    from src.models.dancedb.query import get_query_client
+    from src.utils.distance import pairs_within
 
     print("\n=== Checking DanceDB ===\n")
 
-    client = DancedbClient()
+    client = get_query_client()
     venues = client.fetch_venues_with_external_ids()
 
     base_url = "https://dance.wikibase.cloud/wiki/Item:"
@@ -345,28 +344,18 @@ def _check_dancedb(args) -> None:
         if len(venues_with_little_info) > 10:
             print(f"  ... and {len(venues_with_little_info) - 10} more")
 
-    venues_with_coords = []
-    seen_qids = set()
-    for v in venues:
-        if v["qid"] in seen_qids:
-            continue
-        p4 = v.get("p4", "")
-        if p4:
-            try:
-                coords = p4.replace("Point(", "").replace(")", "").split(" ")
-                lng, lat = float(coords[0]), float(coords[1])
-                venues_with_coords.append({"qid": v["qid"], "label": v["label"], "lat": lat, "lng": lng})
-                seen_qids.add(v["qid"])
-            except Exception:
-                continue
+    venues_with_coords = [
+        {"qid": v["qid"], "label": v["label"], "lat": v["lat"], "lng": v["lng"]}
+        for v in venues
+        if v["lat"] is not None
+    ]
 
     threshold_km = 0.1
-    duplicates = []
-    for i, v1 in enumerate(venues_with_coords):
-        for v2 in venues_with_coords[i+1:]:
-            dist = haversine_distance(v1["lat"], v1["lng"], v2["lat"], v2["lng"])
-            if dist <= threshold_km:
-                duplicates.append({"v1": v1, "v2": v2, "distance_km": dist})
+    coords = [(v["lat"], v["lng"]) for v in venues_with_coords]
+    duplicates = [
+        {"v1": venues_with_coords[i], "v2": venues_with_coords[j], "distance_km": dist}
+        for i, j, dist in pairs_within(coords, threshold_km)
+    ]
 
     print(f"\nDuplicate venues (within {threshold_km*1000:.0f}m): {len(duplicates)}")
     if duplicates:
@@ -380,8 +369,8 @@ def _check_dancedb(args) -> None:
 
 
 def _ensure_venue_coordinates(args) -> None:
-    from src.models.dancedb.client import DancedbClient
-    from src.utils.geodb import ensure_db, get_ship_coordinates
+    from src.models.dancedb.client import get_client
+    from src.utils.geodb import get_connection, get_ship_coordinates
     from src.utils.fuzzy import normalize_for_fuzzy
     from src.utils.google_maps import GoogleMaps
     from rapidfuzz import fuzz
@@ -389,7 +378,7 @@ def _ensure_venue_coordinates(args) -> None:
 
     print("\n=== Ensuring venue coordinates ===\n")
 
-    client = DancedbClient()
+    client = get_client()
     venues = client.fetch_venues_from_dancedb()
 
     venues_without_coords = [v for v in venues if not v.get("p4")]
@@ -399,98 +388,99 @@ def _ensure_venue_coordinates(args) -> None:
         print("All venues already have coordinates!")
         return
 
-    conn = ensure_db()
-    cursor = conn.execute("SELECT name, source, lat, lng FROM venues WHERE lat IS NOT NULL AND lng IS NOT NULL")
+    cursor = get_connection().execute("SELECT name, source, lat, lng FROM venues WHERE lat IS NOT NULL AND lng IS NOT NULL")
     geodb_venues = {row["name"].lower(): row for row in cursor}
-    conn.close()
 
     updated_count = 0
     skipped_count = 0
 
-    for i, venue in enumerate(venues_without_coords, 1):
-        qid = venue["qid"]
-        label = venue.get("label", "Unknown")
-        print(f"{i}. {label} ({qid})")
+    # Coordinates are written in batches when the loop ends (or aborts)
+    with client.coalesced_edits():
+        for i, venue in enumerate(venues_without_coords, 1):
+            qid = venue["qid"]
+            label = venue.get("label", "Unknown")
+            print(f"{i}. {label} ({qid})")
 
-        normalized_label = normalize_for_fuzzy(label.lower(), [])
-        best_match = None
-        best_score = 0
+            normalized_label = normalize_for_fuzzy(label.lower(), [])
+            best_match = None
+            best_score = 0
 
-        for geodb_name, geodb_row in geodb_venues.items():
-            normalized_geodb = normalize_for_fuzzy(geodb_name, [])
-            score = fuzz.ratio(normalized_label, normalized_geodb)
-            if score >= 80 and score > best_score:
-                best_match = geodb_row
-                best_score = score
-
-        ship_coords = get_ship_coordinates(label)
-
-        if best_match:
-            print(f"   geodb: {best_match['name']} ({best_match['source']}, {best_match['lat']:.3f}, {best_match['lng']:.3f}) [Y]es/[S]kip/[A]bort: ", end="")
-            choice = questionary.select(
-                "Choose action",
-                choices=["Yes", "Skip", "Abort"]
-            ).ask()
-            if choice == "Yes":
-                if client.set_coordinates(qid, best_match["lat"], best_match["lng"]):
-                    print(f"   ✓ Updated {qid}")
-                    updated_count += 1
-                else:
-                    print(f"   ✗ Failed to update {qid}")
+            for geodb_name, geodb_row in geodb_venues.items():
+                normalized_geodb = normalize_for_fuzzy(geodb_name, [])
+                score = fuzz.ratio(normalized_label, normalized_geodb)
+                if score >= 80 and score > best_score:
+                    best_match = geodb_row
+                    best_score = score
+
+            ship_coords = get_ship_coordinates(label)
+
+            if best_match:
+                position = f"{best_match['lat']:.3f}, {best_match['lng']:.3f}"
+                print(f"   geodb: {best_match['name']} ({best_match['source']}, {position}) [Y]es/[S]kip/[A]bort: ", end="")
+                choice = questionary.select(
+                    "Choose action",
+                    choices=["Yes", "Skip", "Abort"]
+                ).ask()
+                if choice == "Yes":
+                    if client.set_coordinates(qid, best_match["lat"], best_match["lng"]):
+                        print(f"   ✓ Queued {qid}")
+                        updated_count += 1
+                    else:
+                        print(f"   ✗ Failed to update {qid}")
+                        skipped_count += 1
+                elif choice == "Skip":
                     skipped_count += 1
-            elif choice == "Skip":
-                skipped_count += 1
-            else:
-                print("Aborted.")
-                return
-        elif ship_coords:
-            print(f"   ship: {ship_coords['lat']:.3f}, {ship_coords['lng']:.3f} [Y]es/[S]kip/[A]bort: ", end="")
-            choice = questionary.select(
-                "Choose action",
-                choices=["Yes", "Skip", "Abort"]
-            ).ask()
-            if choice == "Yes":
-                if client.set_coordinates(qid, ship_coords["lat"], ship_coords["lng"]):
-                    print(f"   ✓ Updated {qid}")
-                    updated_count += 1
                 else:
-                    print(f"   ✗ Failed to update {qid}")
-                    skipped_count += 1
-            elif choice == "Skip":
-                skipped_count += 1
-            else:
-                print("Aborted.")
-                return
-        else:
-            gmaps_url = GoogleMaps(address=label).url
-            print("   No match in geodb or ship patterns")
-            print(f"   Google Maps: {gmaps_url}")
-            coords_input = questionary.text(
-                "Enter coords (lat,lng) or press Enter to skip",
-            ).ask()
-            if coords_input and "," in coords_input:
-                try:
-                    lat_str, lng_str = coords_input.split(",")
-                    lat, lng = float(lat_str.strip()), float(lng_str.strip())
-                    if client.set_coordinates(qid, lat, lng):
-                        print(f"   ✓ Updated {qid}")
+                    print("Aborted.")
+                    return
+            elif ship_coords:
+                print(f"   ship: {ship_coords['lat']:.3f}, {ship_coords['lng']:.3f} [Y]es/[S]kip/[A]bort: ", end="")
+                choice = questionary.select(
+                    "Choose action",
+                    choices=["Yes", "Skip", "Abort"]
+                ).ask()
+                if choice == "Yes":
+                    if client.set_coordinates(qid, ship_coords["lat"], ship_coords["lng"]):
+                        print(f"   ✓ Queued {qid}")
                         updated_count += 1
                     else:
                         print(f"   ✗ Failed to update {qid}")
                         skipped_count += 1
-                except ValueError:
-                    print("   Invalid coordinates, skipping")
+                elif choice == "Skip":
                     skipped_count += 1
+                else:
+                    print("Aborted.")
+                    return
             else:
-                skipped_count += 1
-        print()
+                gmaps_url = GoogleMaps(address=label).url
+                print("   No match in geodb or ship patterns")
+                print(f"   Google Maps: {gmaps_url}")
+                coords_input = questionary.text(
+                    "Enter coords (lat,lng) or press Enter to skip",
+                ).ask()
+                if coords_input and "," in coords_input:
+                    try:
+                        lat_str, lng_str = coords_input.split(",")
+                        lat, lng = float(lat_str.strip()), float(lng_str.strip())
+                        if client.set_coordinates(qid, lat, lng):
+                            print(f"   ✓ Queued {qid}")
+                            updated_count += 1
+                        else:
+                            print(f"   ✗ Failed to update {qid}")
+                            skipped_count += 1
+                    except ValueError:
+                        print("   Invalid coordinates, skipping")
+                        skipped_count += 1
+                else:
+                    skipped_count += 1
+            print()
 
     print(f"Summary: {len(venues_without_coords)} checked, {updated_count} updated, {skipped_count} skipped")
 
 
 def _merge_duplicate_venues(args) -> None:
-    from src.models.dancedb.client import DancedbClient
-    from src.utils.distance import haversine_distance
+    from src.models.dancedb.client import get_client
+    from src.utils.distance import pairs_within
     from src.utils.fuzzy import normalize_for_fuzzy
     from rapidfuzz import fuzz
     import questionary
@@ -501,62 +491,56 @@ def _merge_duplicate_venues(args) -> None:
 
     print(f"\n=== Finding merge candidates (distance <{threshold_km*1000:.0f}m, fuzzy >={fuzzy_threshold}%) ===")
 
-    client = DancedbClient()
+    client = get_client()
     venues = client.fetch_venues_from_dancedb()
 
-    venues_with_coords = []
-    for v in venues:
-        p4 = v.get("p4", "")
-        if p4:
-            try:
-                coords = p4.replace("Point(", "").replace(")", "").split(" ")
-                lng, lat = float(coords[0]), float(coords[1])
-                venues_with_coords.append({
-                    "qid": v["qid"],
-                    "label": v["label"],
-                    "aliases": v.get("aliases", []),
-                    "lat": lat,
-                    "lng": lng,
-                })
-            except Exception:
-                continue
+    venues_with_coords = [
+        {"qid": v["qid"], "label": v["label"], "aliases": v.get("aliases", []), "lat": v["lat"], "lng": v["lng"]}
+        for v in venues
+        if v["lat"] is not None
+    ]
 
     print(f"Found {len(venues_with_coords)} venues with coordinates")
 
     candidates = []
-    for i, v1 in enumerate(venues_with_coords):
-        for v2 in venues_with_coords[i+1:]:
-            dist = haversine_distance(v1["lat"], v1["lng"], v2["lat"], v2["lng"])
-            if dist > threshold_km:
-                continue
+    coords = [(v["lat"], v["lng"]) for v in venues_with_coords]
+    for i, j, dist in pairs_within(coords, threshold_km):
+        v1, v2 = venues_with_coords[i], venues_with_coords[j]
+        v1_names = [v1["label"]] + v1.get("aliases", [])
+        v2_names = [v2["label"]] + v2.get("aliases", [])
 
-            v1_names = [v1["label"]] + v1.get("aliases", [])
-            v2_names = [v2["label"]] + v2.get("aliases", [])
-
-            best_score = 0
-            for n1 in v1_names:
-                for n2 in v2_names:
-                    n1_norm = normalize_for_fuzzy(n1.lower(), [])
-                    n2_norm = normalize_for_fuzzy(n2.lower(), [])
-                    score = fuzz.ratio(n1_norm, n2_norm)
-                    best_score = max(best_score, score)
-
-            if best_score >= fuzzy_threshold:
-                if v1["qid"] == v2["qid"]:
-                    continue
-                candidates.append({
-                    "v1": v1,
-                    "v2": v2,
-                    "distance_km": dist,
-                    "fuzzy_score": best_score,
-                })
+        best_score = 0
+        for n1 in v1_names:
+            for n2 in v2_names:
+                n1_norm = normalize_for_fuzzy(n1.lower(), [])
+                n2_norm = normalize_for_fuzzy(n2.lower(), [])
+                score = fuzz.ratio(n1_norm, n2_norm)
+                best_score = max(best_score, score)
+
+        if best_score >= fuzzy_threshold:
+            if v1["qid"] == v2["qid"]:
+                continue
+            candidates.append({
+                "v1": v1,
+                "v2": v2,
+                "distance_km": dist,
+                "fuzzy_score": best_score,
+            })
 
     candidates.sort(key=lambda x: (x["fuzzy_score"], -x["distance_km"]))
 
     print(f"Found {len(candidates)} merge candidates\n")
 
+    # Verify against the live items, the SPARQL results may be cached or lag behind
+    entities = client.get_entities(qid for c in candidates for qid in (c["v1"]["qid"], c["v2"]["qid"])) if candidates else {}
+    merged = set()
+
     for i, c in enumerate(candidates, 1):
         v1, v2 = c["v1"], c["v2"]
+        stale = [qid for qid in (v1["qid"], v2["qid"]) if qid in merged or qid not in entities or entities[qid].get("id") != qid]
+        if stale:
+            print(f"{i}. Skipping {v1['qid']} <-> {v2['qid']}: {', '.join(stale)} no longer exists or was merged\n")
+            continue
         dist_m = c["distance_km"] * 1000
         url1 = f"https://dance.wikibase.cloud/wiki/Item:{v1['qid']}"
         url2 = f"https://dance.wikibase.cloud/wiki/Item:{v2['qid']}"
@@ -565,6 +549,8 @@ def _merge_duplicate_venues(args) -> None:
         print(f"   Distance: {dist_m:.0f}m | Fuzzy: {c['fuzzy_score']:.0f}%")
         print(f"   {url1}")
         print(f"   {url2}")
+        print(f"   Statements: {sum(len(v) for v in entities[v1['qid']].get('claims', {}).values())} <-> "
+              f"{sum(len(v) for v in entities[v2['qid']].get('claims', {}).values())}")
 
         qid1_num = int(v1["qid"].replace("Q", ""))
         qid2_num = int(v2["qid"].replace("Q", ""))
@@ -588,6 +574,10 @@ def _merge_duplicate_venues(args) -> None:
             try:
                 from wikibaseintegrator.wbi_helpers import merge_items
                 merge_items(from_id=from_qid, to_id=to_qid, login=client.login, is_bot=True, ignore_conflicts=["description"])
+                from src.utils.sparql import invalidate_cache
+                invalidate_cache()
+                client.entity_cache.discard([from_qid, to_qid])
+                merged.add(from_qid)
                 print(f"  Merged {from_qid} into {to_qid}")
             except Exception as e:
                 print(f"  ERROR: {e}")
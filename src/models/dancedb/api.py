@@ -0,0 +1,79 @@
+"""DanceDB endpoint settings and anonymous MediaWiki API reads, without wikibaseintegrator.
+
+Importing wikibaseintegrator takes a quarter of a second, so the read paths
+(SPARQL, wbgetentities, the local mirror) use this module instead and leave it
+to the write client to load it. configure_endpoints() copies the endpoints into
+the wikibaseintegrator config when that is loaded; from then on setting()
+answers from there, so code that points wikibaseintegrator elsewhere (tests,
+the local stand-in server) is followed by the reads as well.
+"""
+import logging
+import sys
+from typing import Any
+
+import config
+from src.utils import http
+
+logger = logging.getLogger(__name__)
+
+_wbi_configured = False
+
+
+class ReadApiError(Exception):
+    """An error answered by the MediaWiki API to a read request."""
+
+
+def _endpoints() -> dict[str, str]:
+    if config.LOCAL_WIKIBASE_URL:
+        base_url = config.LOCAL_WIKIBASE_URL.rstrip("/")
+        endpoints = {
+            "WIKIBASE_URL": base_url,
+            "MEDIAWIKI_API_URL": f"{base_url}/w/api.php",
+            "SPARQL_ENDPOINT_URL": f"{base_url}/query/sparql",
+        }
+    else:
+        endpoints = {
+            "WIKIBASE_URL": config.WIKIBASE_URL,
+            "MEDIAWIKI_API_URL": config.MEDIAWIKI_API_URL,
+            "SPARQL_ENDPOINT_URL": config.SPARQL_ENDPOINT_URL,
+        }
+    return {**endpoints, "USER_AGENT": config.user_agent}
+
+
+def configure_endpoints() -> None:
+    """Point wikibaseintegrator at DanceDB, or at the local stand-in server if config.LOCAL_WIKIBASE_URL is set.
+
+    Does nothing until wikibaseintegrator is loaded; the write client calls this on import.
+    """
+    global _wbi_configured
+    wbi_config = sys.modules.get("wikibaseintegrator.wbi_config")
+    if wbi_config is None:
+        return
+    wbi_config.config.update(_endpoints())
+    _wbi_configured = True
+
+
+def setting(key: str) -> Any:
+    """An endpoint setting (WIKIBASE_URL, MEDIAWIKI_API_URL, SPARQL_ENDPOINT_URL or USER_AGENT)."""
+    if _wbi_configured:
+        return sys.modules["wikibaseintegrator.wbi_config"].config[key]
+    return _endpoints()[key]
+
+
+def read_api(params: dict[str, str]) -> dict:
+    """Make an anonymous GET request to the MediaWiki API and return the decoded response.
+
+    Raises ReadApiError when the API answers with an error, and
+    src.utils.http.EndpointUnavailable when it cannot be reached.
+    """
+    response = http.request(
+        "GET",
+        setting("MEDIAWIKI_API_URL"),
+        params={**params, "format": "json"},
+        headers={"User-Agent": setting("USER_AGENT")},
+        timeout=config.API_READ_TIMEOUT_SECONDS,
+    )
+    data = response.json()
+    if "error" in data:
+        raise ReadApiError(f"{data['error'].get('code')}: {data['error'].get('info')}")
+    return data
@@ -0,0 +1,36 @@
+"""Decode SPARQL result bindings from the DanceDB query service."""
+from typing import Optional
+
+ALIAS_SEPARATOR = "|"
+
+
+def binding_value(binding: dict, var: str, default: str = "") -> str:
+    """Return the value of ?var in a result row, or default if unbound."""
+    return binding.get(var, {}).get("value", default)
+
+
+def qid_from_uri(uri: str) -> str:
+    """Return the QID of an entity URI, e.g. https://dance.wikibase.cloud/entity/Q20 -> Q20."""
+    return uri.rsplit("/", 1)[-1] if uri else ""
+
+
+def parse_point(wkt: str) -> tuple[Optional[float], Optional[float]]:
+    """Parse a WKT literal "Point(lng lat)" into (lat, lng).
+
+    Returns (None, None) for empty or malformed input.
+    """
+    if not wkt:
+        return None, None
+    try:
+        lng_str, lat_str = wkt.strip().removeprefix("Point(").removesuffix(")").split()
+        return float(lat_str), float(lng_str)
+    except ValueError:
+        return None, None
+
+
+def split_aliases(alias_str: str, lower: bool = True) -> list[str]:
+    """Split a GROUP_CONCAT alias list joined with ALIAS_SEPARATOR."""
+    if not alias_str:
+        return []
+    aliases = [a for a in alias_str.split(ALIAS_SEPARATOR) if a]
+    return [a.lower() for a in aliases] if lower else aliases
@@ -1,85 +1,119 @@
 import logging
-import math
 import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional
 
 import questionary
 import rich
-from wikibaseintegrator import WikibaseIntegrator, datatypes
+from wikibaseintegrator import WikibaseIntegrator
 from wikibaseintegrator.wbi_config import config as wbi_config
-from wikibaseintegrator.wbi_helpers import execute_sparql_query
-from wikibaseintegrator.wbi_login import Login
+from wikibaseintegrator.wbi_login import Login, _Login
 
 import config
-
-DUPLICATE_CHECK_FILTER = " || ".join([
-    f"EXISTS {{ ?item ddt:{getattr(config, prop)} ?v }}"
-    for prop in config.DUPLICATE_CHECK_PROPERTIES
-])
-
-wbi_config["MEDIAWIKI_API_URL"] = "https://dance.wikibase.cloud/w/api.php"
-wbi_config["SPARQL_ENDPOINT_URL"] = "https://dance.wikibase.cloud/query/sparql"
-wbi_config["WIKIBASE_URL"] = "https://dance.wikibase.cloud"
-wbi_config["USER_AGENT"] = config.user_agent
+from src.models.dancedb.api import configure_endpoints
+from src.models.dancedb.edits import ClaimSpec, EntityEdit, band_edit, event_edit, venue_edit
+from src.models.dancedb.labels import get_label_index, record_label
+from src.models.dancedb.plan import active_plan
+from src.models.dancedb.query import (  # noqa: F401 (re-exported)
+    ALL_VENUES_QUERY,
+    ARTISTS_QUERY,
+    DUPLICATE_CHECK_FILTER,
+    DUPLICATE_CHECK_PROPS,
+    VENUES_QUERY,
+    VENUES_WITH_EXTERNAL_IDS_QUERY,
+    DancedbQuery,
+)
+from src.models.dancedb.session import restore_session, save_session
+from src.models.dancedb.statements import StatementIndex
+from src.models.dancedb.writer import BatchWriter, WriteResult
+from src.utils.sparql import invalidate_cache
+
+configure_endpoints()
 
 logger = logging.getLogger(__name__)
 
 
-class DancedbClient:
-    def __init__(self):
-        self.login = Login(user=config.username, password=config.password)
-        self.wbi = WikibaseIntegrator(login=self.login)
-        self.base_url = wbi_config["WIKIBASE_URL"]
+class DancedbClient(DancedbQuery):
+    """DancedbQuery plus the writes. Logs in on the first write, see login."""
+
+    def __init__(self, login: Optional[_Login] = None, use_stored_session: bool = False):
+        super().__init__()
+        self._login = login
+        self._login_lock = threading.Lock()
+        self._use_stored_session = use_stored_session
+        self._wbi: Optional[WikibaseIntegrator] = None
+        self._pending_edits: dict[str, EntityEdit] = {}
+        self._coalesce_depth = 0
+        self.statements = StatementIndex()
+
+    @property
+    def login(self) -> _Login:
+        """The login, created on first use so that runs without writes never log in."""
+        with self._login_lock:
+            if self._login is None:
+                self._login = restore_session() if self._use_stored_session else None
+                if self._login is None:
+                    self._login = Login(user=config.username, password=config.password)
+                    if self._use_stored_session:
+                        save_session(self._login)
+            return self._login
+
+    @property
+    def wbi(self) -> WikibaseIntegrator:
+        if self._wbi is None:
+            self._wbi = WikibaseIntegrator(login=self.login)
+        return self._wbi
+
+    @wbi.setter
+    def wbi(self, wbi: WikibaseIntegrator) -> None:
+        self._wbi = wbi
+
+    @staticmethod
+    def _plan(edit: EntityEdit, source: str) -> bool:
+        """Add edit to the active plan instead of writing it. Returns False when no plan is active."""
+        plan = active_plan()
+        if plan is None:
+            return False
+        plan.add(edit, source=source)
+        return True
 
-    def search_band(self, band_name: str) -> Optional[str]:
-        sparql = f"""
-        PREFIX dd: <https://dance.wikibase.cloud/entity/>
-        PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    @staticmethod
+    def _confirm_create(kind: str, label: str, check_label: bool = True) -> None:
+        """Ask before creating an item, defaulting to No when check_label is set and the label is already taken.
 
-        SELECT ?item WHERE {{
-          ?item rdfs:label "{band_name}"@sv .
-          {{ ?item ddt:P1 dd:Q225 }}
-        }}
+        Raises when the user declines and exits on Abort.
         """
-        try:
-            results = execute_sparql_query(query=sparql)
-            items = results["results"]["bindings"]
-            if len(items) == 1:
-                qid = items[0]["item"]["value"].rsplit("/", 1)[-1]
-                logger.info(f"Found band '{band_name}' on DanceDB: {self.base_url}/wiki/Item:{qid}")
-                return qid
-            elif len(items) > 1:
-                logger.warning(f"Multiple matches for '{band_name}': {[i['item']['value'] for i in items]}")
-            return None
-        except Exception as e:
-            logger.error(f"Error searching for '{band_name}': {e}")
-            return None
-
-    def create_band(self, band_name: str, spelplan_id: str = "") -> str:
-        confirm = questionary.select(
-            f"Create new band '{band_name}' on DanceDB?", choices=["Yes (Recommended)", "No", "Abort"]
-        ).ask()
-        if confirm == "No":
-            raise Exception(f"User declined to create band: {band_name}")
+        existing = get_label_index().lookup(label) if check_label else []
+        question, choices = f"Create new {kind} '{label}' on DanceDB?", ["Yes (Recommended)", "No", "Abort"]
+        if existing:
+            logger.warning(f"Label '{label}' is already used by {', '.join(existing)}")
+            question, choices = f"'{label}' already exists as {', '.join(existing)}. Create another {kind} anyway?", ["No (Recommended)", "Yes", "Abort"]
+        confirm = questionary.select(question, choices=choices).ask()
+        if confirm in ("No", "No (Recommended)"):
+            raise Exception(f"User declined to create {kind}: {label}")
         elif confirm == "Abort":
             print("Aborting...")
             sys.exit(0)
 
+    def create_band(self, band_name: str, spelplan_id: str = "") -> Optional[str]:
+        """Create a new artist on DanceDB, or add it to the active plan (returns None then)."""
+        if self._plan(band_edit(band_name, spelplan_id), "create_band"):
+            return None
+        self._confirm_create("band", band_name)
+
         try:
             new_item = self.wbi.item.new()
-            new_item.labels.set("sv", band_name)
-            new_item.labels.set("en", band_name)
-            new_item.descriptions.set("sv", "artist")
-            new_item.claims.add(datatypes.Item(prop_nr=config.DANCE_PROP_INSTANCE_OF, value=config.DANCE_INSTANCE_ARTIST))
+            band_edit(band_name, spelplan_id).apply_to(new_item)
             if spelplan_id:
-                new_item.claims.add(datatypes.String(prop_nr=config.DANCE_PROP_SPELPLAN_ID, value=spelplan_id))
                 logger.info(f"Band '{band_name}' P46: %s", spelplan_id)
             else:
                 logger.warning(f"Band '{band_name}' created WITHOUT spelplan_id (P46)")
             new_item.write(login=self.wbi.login)
+            invalidate_cache(wbi_config["SPARQL_ENDPOINT_URL"])
             qid = new_item.id
+            record_label(qid, band_name)
             url = f"{self.base_url}/wiki/Item:{qid}"
             logger.info(f"Created band '{band_name}' on DanceDB: %s", url)
             return qid
@@ -93,253 +127,22 @@ class DancedbClient:
             return qid
         return self.create_band(band_name, spelplan_id)
 
-    def fetch_artists_from_dancedb(self) -> list[dict]:
-        """Fetch all artist items from DanceDB (instance of Q225).
+    def create_venue(self, venue_name: str, latitude: float = 0.0, longitude: float = 0.0, external_ids: dict[str, str] | None = None) -> Optional[str]:
+        """Create a new venue on DanceDB with optional coordinates.
 
-        Returns list of {qid, label, aliases, p3, p46}.
+        With an active plan the venue is added to the plan and None is returned.
         """
-        sparql = """
-PREFIX dd: <https://dance.wikibase.cloud/entity/>
-PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-
-SELECT ?item ?label ?altLabel ?p3 ?p46 WHERE {
-    ?item ddt:P1 dd:Q225 .
-    OPTIONAL { ?item rdfs:label ?label FILTER(LANG(?label) = "sv") }
-    OPTIONAL { ?item skos:altLabel ?altLabel FILTER(LANG(?altLabel) = "sv") }
-    OPTIONAL { ?item ddt:P3 ?p3 }
-    OPTIONAL { ?item ddt:P46 ?p46 }
-}
-"""
-        try:
-            results = execute_sparql_query(sparql)
-            items_dict = {}
-            for row in results.get("results", {}).get("bindings", []):
-                qid = row["item"]["value"].rsplit("/", 1)[-1]
-                label = row.get("label", {}).get("value", "")
-                alt_label = row.get("altLabel", {}).get("value", "")
-                p3 = row.get("p3", {}).get("value", "")
-                p46 = row.get("p46", {}).get("value", "")
-                if qid not in items_dict:
-                    items_dict[qid] = {"qid": qid, "label": label, "aliases": [], "p3": p3, "p46": p46}
-                if alt_label:
-                    items_dict[qid]["aliases"].append(alt_label.lower())
-            items = list(items_dict.values())
-            logger.info(f"Fetched {len(items)} artists from DanceDB")
-            return items
-        except Exception as e:
-            logger.error(f"Error fetching artists: {e}")
-            return []
-
-    def fetch_venues_from_dancedb(self) -> list[dict]:
-        """Fetch all venue items from DanceDB (instance of Q20).
-
-        Returns list of {qid, label, aliases, p4 (coordinates)}.
-        """
-        sparql = """
-PREFIX dd: <https://dance.wikibase.cloud/entity/>
-PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-
-SELECT ?item ?label ?altLabel ?p4 WHERE {
-    ?item ddt:P1 dd:Q20 .
-    OPTIONAL { ?item rdfs:label ?label FILTER(LANG(?label) = "sv") }
-    OPTIONAL { ?item skos:altLabel ?altLabel FILTER(LANG(?altLabel) = "sv") }
-    OPTIONAL { ?item ddt:P4 ?p4 }
-    FILTER (""" + DUPLICATE_CHECK_FILTER + """)
-}
-"""
-        try:
-            results = execute_sparql_query(sparql)
-            venues = []
-            for row in results.get("results", {}).get("bindings", []):
-                qid = row["item"]["value"].rsplit("/", 1)[-1]
-                label = row.get("label", {}).get("value", "")
-                alt_labels = row.get("altLabel", {}).get("value", "").split(",") if "altLabel" in row else []
-                p4 = row.get("p4", {}).get("value", "")
-                venues.append({"qid": qid, "label": label, "aliases": alt_labels, "p4": p4})
-            logger.info(f"Fetched {len(venues)} venues from DanceDB")
-            return venues
-        except Exception as e:
-            logger.error(f"Error fetching venues: {e}")
-            return []
-
-    def fetch_venues_with_external_ids(self) -> list[dict]:
-        """Fetch all venue items from DanceDB with external IDs and website.
-
-        Returns list of {qid, label, p4, p3, p42, p44, p46, p12}.
-        Only returns venues that have P4 (coordinates).
-        """
-        sparql = """
-PREFIX dd: <https://dance.wikibase.cloud/entity/>
-PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-
-SELECT ?item ?label ?p4 ?p3 ?p42 ?p44 ?p46 ?p12 WHERE {
-    ?item ddt:P1 dd:Q20 .
-    ?item ddt:P4 ?p4 .
-    OPTIONAL { ?item rdfs:label ?label FILTER(LANG(?label) = "sv") }
-    OPTIONAL { ?item ddt:P3 ?p3 }
-    OPTIONAL { ?item ddt:P42 ?p42 }
-    OPTIONAL { ?item ddt:P44 ?p44 }
-    OPTIONAL { ?item ddt:P46 ?p46 }
-    OPTIONAL { ?item ddt:P12 ?p12 }
-    FILTER (""" + DUPLICATE_CHECK_FILTER + """)
-}
-"""
-        try:
-            results = execute_sparql_query(sparql)
-            venues = []
-            for row in results.get("results", {}).get("bindings", []):
-                qid = row["item"]["value"].rsplit("/", 1)[-1]
-                label = row.get("label", {}).get("value", "")
-                p4 = row.get("p4", {}).get("value", "")
-                p3 = row.get("p3", {}).get("value", "")
-                p42 = row.get("p42", {}).get("value", "")
-                p44 = row.get("p44", {}).get("value", "")
-                p46 = row.get("p46", {}).get("value", "")
-                p12 = row.get("p12", {}).get("value", "")
-                venues.append({
-                    "qid": qid,
-                    "label": label,
-                    "p4": p4,
-                    "p3": p3,
-                    "p42": p42,
-                    "p44": p44,
-                    "p46": p46,
-                    "p12": p12,
-                })
-            logger.info(f"Fetched {len(venues)} venues with coordinates from DanceDB")
-            return venues
-        except Exception as e:
-            logger.error(f"Error fetching venues with external IDs: {e}")
-            return []
-
-    def search_venue(self, venue_name: str) -> Optional[str]:
-        """Search for venue by exact label match."""
-        sparql = f"""
-        PREFIX dd: <https://dance.wikibase.cloud/entity/>
-        PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-
-        SELECT ?item WHERE {{
-          ?item rdfs:label "{venue_name}"@sv .
-          ?item ddt:P1 dd:Q20 .
-        }}
-        """
-        try:
-            results = execute_sparql_query(query=sparql)
-            items = results["results"]["bindings"]
-            if len(items) == 1:
-                qid = items[0]["item"]["value"].rsplit("/", 1)[-1]
-                logger.info(f"Found venue '{venue_name}' on DanceDB: {self.base_url}/wiki/Item:{qid}")
-                return qid
-            elif len(items) > 1:
-                logger.warning(f"Multiple matches for '{venue_name}': {[i['item']['value'] for i in items]}")
-            return None
-        except Exception as e:
-            logger.error(f"Error searching for '{venue_name}': {e}")
+        if self._plan(venue_edit(venue_name, latitude, longitude, external_ids), "create_venue"):
             return None
-
-    def find_venues_by_coordinates(self, lat: float, lng: float, threshold_km: float = 0.1) -> list[dict]:
-        """Query DanceDB for venues within distance threshold.
-
-        Uses wikibase:box for bounding box query, then filters by exact haversine distance.
-        Returns list of {qid, label, lat, lng, distance_km}.
-        """
-        from src.utils.distance import haversine_distance
-
-        lat_delta = threshold_km / 111
-        lng_delta = threshold_km / (111 * math.cos(math.radians(lat)))
-
-        lng_min = lng - lng_delta
-        lng_max = lng + lng_delta
-        lat_min = lat - lat_delta
-        lat_max = lat + lat_delta
-
-        sparql = f"""
-        PREFIX dd: <https://dance.wikibase.cloud/entity/>
-        PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
-        PREFIX geo: <http://www.opengis.net/ont/geosparql#>
-        PREFIX bd: <http://www.bigdata.com/rdf#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-
-        SELECT ?item ?itemLabel (GROUP_CONCAT(?svAlias; SEPARATOR = "|") AS ?aliasStr) ?location WHERE {{
-          SERVICE wikibase:box {{
-            ?item ddt:P4 ?location .
-            bd:serviceParam wikibase:cornerWest "Point({lng_min} {lat_min})"^^geo:wktLiteral .
-            bd:serviceParam wikibase:cornerEast "Point({lng_max} {lat_max})"^^geo:wktLiteral .
-          }}
-          ?item ddt:P1 dd:Q20 .
-          OPTIONAL {{ ?item rdfs:label ?itemLabel FILTER(LANG(?itemLabel) = "sv") }}
-          OPTIONAL {{ ?item skos:altLabel ?svAlias FILTER(LANG(?svAlias) = "sv") }}
-        }}
-        GROUP BY ?item ?itemLabel ?location
-        """
-        try:
-            results = execute_sparql_query(query=sparql)
-        except Exception as e:
-            logger.warning(f"SPARQL error: {e}")
-            return []
-
-        matches = []
-        for binding in results.get("results", {}).get("bindings", []):
-            qid = binding.get("item", {}).get("value", "").rsplit("/", 1)[-1]
-            label = binding.get("itemLabel", {}).get("value", "")
-            alias_str = binding.get("aliasStr", {}).get("value", "")
-            aliases = [a.lower() for a in alias_str.split("|") if a] if alias_str else []
-            geo_str = binding.get("location", {}).get("value", "")
-            if not qid or not geo_str:
-                continue
-            try:
-                coords = geo_str.replace("Point(", "").replace(")", "").split(" ")
-                venue_lng, venue_lat = float(coords[0]), float(coords[1])
-                dist = haversine_distance(lat, lng, venue_lat, venue_lng)
-                if dist <= threshold_km:
-                    matches.append({
-                        "qid": qid,
-                        "label": label or qid,
-                        "lat": venue_lat,
-                        "lng": venue_lng,
-                        "distance_km": dist,
-                        "aliases": aliases,
-                    })
-            except Exception as e:
-                logger.warning(f"Parse error for {geo_str}: {e}")
-
-        matches.sort(key=lambda x: x["distance_km"])
-        return matches
-
-    def create_venue(self, venue_name: str, latitude: float = 0.0, longitude: float = 0.0, external_ids: dict[str, str] | None = None) -> str:
-        """Create a new venue on DanceDB with optional coordinates."""
-        confirm = questionary.select(
-            f"Create new venue '{venue_name}' on DanceDB?", choices=["Yes (Recommended)", "No", "Abort"]
-        ).ask()
-        if confirm == "No":
-            raise Exception(f"User declined to create venue: {venue_name}")
-        elif confirm == "Abort":
-            print("Aborting...")
-            sys.exit(0)
+        self._confirm_create("venue", venue_name)
 
         try:
             new_item = self.wbi.item.new()
-            new_item.labels.set("sv", venue_name)
-            new_item.labels.set("en", venue_name)
-            new_item.descriptions.set("sv", "dansställe")
-            new_item.claims.add(datatypes.Item(prop_nr=config.DANCE_PROP_INSTANCE_OF, value=config.DANCE_INSTANCE_VENUE))
-            if latitude and longitude:
-                new_item.claims.add(
-                    datatypes.GlobeCoordinate(prop_nr=config.DANCE_PROP_COORDINATES, latitude=latitude, longitude=longitude, precision=0.0001, globe="http://www.wikidata.org/entity/Q2")
-                )
-            if external_ids:
-                for prop, value in external_ids.items():
-                    new_item.claims.add(datatypes.String(prop_nr=prop, value=value))
+            venue_edit(venue_name, latitude, longitude, external_ids).apply_to(new_item)
             new_item.write(login=self.wbi.login)
+            invalidate_cache(wbi_config["SPARQL_ENDPOINT_URL"])
             qid = new_item.id
+            record_label(qid, venue_name)
             url = f"{self.base_url}/wiki/Item:{qid}"
             logger.info(f"Created venue '{venue_name}' on DanceDB: %s", url)
             rich.print(f"[green]Created venue: {url}[/green]")
@@ -348,56 +151,91 @@ SELECT ?item ?label ?p4 ?p3 ?p42 ?p44 ?p46 ?p12 WHERE {
             logger.error(f"Error creating venue '{venue_name}': %s", e)
             raise
 
-    def get_or_create_venue(self, venue_name: str, latitude: float = 0.0, longitude: float = 0.0) -> str:
+    def get_or_create_venue(self, venue_name: str, latitude: float = 0.0, longitude: float = 0.0) -> Optional[str]:
         """Get existing venue or create new one with optional coordinates."""
         qid = self.search_venue(venue_name)
         if qid:
             return qid
         return self.create_venue(venue_name, latitude, longitude)
 
-    def set_property(self, qid: str, property_id: str, value: str) -> bool:
-        """Set a property on an existing item. Returns True on success."""
+    @contextmanager
+    def coalesced_edits(self) -> Iterator["DancedbClient"]:
+        """Buffer claim additions per item and write each item once when the block ends.
+
+        Inside the block set_property, set_coordinates, set_artist_spelplan and add_claims
+        only queue their claims; they are flushed as one wbeditentity call per item on exit,
+        or earlier when config.EDIT_FLUSH_ITEMS items are pending.
+        """
+        self._coalesce_depth += 1
         try:
-            item = self.wbi.item.get(qid)
-            item.claims.add(datatypes.Item(prop_nr=property_id, value=value))
-            item.write(login=self.wbi.login)
-            logger.info(f"Set {property_id}={value} on {qid}")
+            yield self
+        finally:
+            self._coalesce_depth -= 1
+            if self._coalesce_depth == 0:
+                self.flush_edits()
+
+    def add_claims(self, qid: str, claims: list[ClaimSpec], summary: str = "", skip_existing: bool = True) -> bool:
+        """Add claims to an existing item without fetching it first.
+
+        Outside coalesced_edits() the claims are written right away and the return value
+        tells whether the write succeeded. Inside, they are queued and True is returned.
+        With skip_existing (the default) claims whose value the item already has
+        (according to the statement index) or that are already queued are dropped, so
+        rerunning a sync does not add duplicate statements.
+        """
+        edit = self._pending_edits.get(qid)
+        if skip_existing:
+            existing = [c for c in claims if self.statements.has(qid, c) or (edit is not None and c in edit.claims)]
+            for claim in existing:
+                logger.info(f"{qid} already has {claim.prop_nr}={claim.display_value()}, skipping")
+            claims = [c for c in claims if c not in existing]
+            if not claims:
+                return True
+        edit = self._pending_edits.setdefault(qid, EntityEdit(qid=qid))
+        edit.claims.extend(claims)
+        if summary and summary not in edit.summary:
+            edit.summary = f"{edit.summary}; {summary}" if edit.summary else summary
+        if self._coalesce_depth and len(self._pending_edits) < config.EDIT_FLUSH_ITEMS:
             return True
-        except Exception as e:
-            logger.error(f"Error setting property on '{qid}': {e}")
-            return False
+        results = self.flush_edits()
+        return all(r.ok for r in results if r.edit.qid == qid)
+
+    def flush_edits(self) -> list[WriteResult]:
+        """Write all queued claim additions, one edit per item (or add them to the active plan)."""
+        edits, self._pending_edits = list(self._pending_edits.values()), {}
+        if not edits:
+            return []
+        plan = active_plan()
+        if plan is not None:
+            for edit in edits:
+                plan.add(edit, source="flush_edits")
+            return []
+        logger.info(f"Writing queued claims for {len(edits)} items")
+        writer = BatchWriter(self.login)
+        for edit in edits:
+            writer.submit(edit)
+        results = writer.run()
+        for result in results:
+            if result.ok:
+                logger.info(f"Updated {result.edit.describe()}")
+                self.entity_cache.discard([result.qid])
+                for claim in result.edit.claims:
+                    self.statements.add(result.qid, claim)
+            else:
+                logger.error(f"Error updating {result.edit.qid}: {result.error}")
+        return results
+
+    def set_property(self, qid: str, property_id: str, value: str) -> bool:
+        """Set an item property on an existing item. Returns True on success (or when queued)."""
+        return self.add_claims(qid, [ClaimSpec.item(property_id, value)])
 
     def set_coordinates(self, qid: str, latitude: float, longitude: float) -> bool:
-        """Set P4 (coordinates) on an existing venue. Returns True on success."""
-        try:
-            item = self.wbi.item.get(qid)
-            item.claims.add(
-                datatypes.GlobeCoordinate(
-                    prop_nr=config.DANCE_PROP_COORDINATES,
-                    latitude=latitude,
-                    longitude=longitude,
-                    precision=0.0001,
-                    globe="http://www.wikidata.org/entity/Q2"
-                )
-            )
-            item.write(login=self.wbi.login)
-            logger.info(f"Set coordinates ({latitude}, {longitude}) on {qid}")
-            return True
-        except Exception as e:
-            logger.error(f"Error setting coordinates on '{qid}': {e}")
-            return False
+        """Set P4 (coordinates) on an existing venue. Returns True on success (or when queued)."""
+        return self.add_claims(qid, [ClaimSpec.coordinate(config.DANCE_PROP_COORDINATES, latitude, longitude)])
 
     def set_artist_spelplan(self, qid: str, spelplan_id: str) -> bool:
-        """Set P46 (spelplan ID) on existing artist item. Returns True on success."""
-        try:
-            item = self.wbi.item.get(qid)
-            item.claims.add(datatypes.String(prop_nr=config.DANCE_PROP_SPELPLAN_ID, value=spelplan_id))
-            item.write(login=self.wbi.login)
-            logger.info(f"Added P46 to artist {qid}: {spelplan_id}")
-            return True
-        except Exception as e:
-            logger.error(f"Error setting P46 on '{qid}': {e}")
-            return False
+        """Set P46 (spelplan ID) on existing artist item. Returns True on success (or when queued)."""
+        return self.add_claims(qid, [ClaimSpec.string(config.DANCE_PROP_SPELPLAN_ID, spelplan_id)])
 
     def create_event(
         self,
@@ -409,7 +247,7 @@ SELECT ?item ?label ?p4 ?p3 ?p42 ?p44 ?p46 ?p12 WHERE {
         instance_of: str = config.DANCE_INSTANCE_EVENT,
         artist_qid: str | None = None,
         dance_styles: list[str] | None = None,
-    ) -> str:
+    ) -> Optional[str]:
         """Create a new event on DanceDB.
 
         Args:
@@ -422,40 +260,20 @@ SELECT ?item ?label ?p4 ?p3 ?p42 ?p44 ?p46 ?p12 WHERE {
             artist_qid: Artist QID (optional)
             dance_styles: List of dance style QIDs (e.g., Q4 for bugg och fox)
 
-        Returns the created event QID or None on failure.
+        Returns the created event QID, or None when the event was added to the active plan.
         """
-        confirm = questionary.select(
-            f"Create new event '{label_sv}' on DanceDB?", choices=["Yes (Recommended)", "No", "Abort"]
-        ).ask()
-        if confirm == "No":
-            raise Exception(f"User declined to create event: {label_sv}")
-        elif confirm == "Abort":
-            print("Aborting...")
-            sys.exit(0)
+        if self._plan(event_edit(label_sv, venue_qid, start_timestamp, end_timestamp, status_qid, instance_of, artist_qid, dance_styles), "create_event"):
+            return None
+        # Event labels ("{band} på {venue}") repeat by design
+        self._confirm_create("event", label_sv, check_label=False)
 
         try:
             event = self.wbi.item.new()
-            event.labels.set("sv", label_sv)
-            event.labels.set("en", label_sv)
-            event.claims.add(datatypes.Item(prop_nr=config.DANCE_PROP_INSTANCE_OF, value=instance_of))
-            event.claims.add(datatypes.Item(prop_nr=config.DANCE_PROP_VENUE, value=venue_qid))
-
-            start_dt = start_timestamp if start_timestamp.tzinfo else start_timestamp.replace(tzinfo=config.CET)
-            start_str = start_dt.strftime("+%Y-%m-%dT%H:%M:00Z")
-            event.claims.add(datatypes.String(prop_nr=config.DANCE_PROP_START, value=start_str))
-            if end_timestamp:
-                end_dt = end_timestamp if end_timestamp.tzinfo else end_timestamp.replace(tzinfo=config.CET)
-                end_str = end_dt.strftime("+%Y-%m-%dT%H:%M:00Z")
-                event.claims.add(datatypes.String(prop_nr=config.DANCE_PROP_END, value=end_str))
-            event.claims.add(datatypes.Item(prop_nr=config.DANCE_PROP_STATUS, value=status_qid))
-            if artist_qid:
-                event.claims.add(datatypes.Item(prop_nr=config.DANCE_PROP_ARTIST, value=artist_qid))
-            else:
+            event_edit(label_sv, venue_qid, start_timestamp, end_timestamp, status_qid, instance_of, artist_qid, dance_styles).apply_to(event)
+            if not artist_qid:
                 logger.warning("No artist QID for event")
-            if dance_styles:
-                for ds in dance_styles:
-                    event.claims.add(datatypes.Item(prop_nr=config.DANCE_PROP_DANCE_STYLE, value=ds))
             event.write(login=self.wbi.login)
+            invalidate_cache(wbi_config["SPARQL_ENDPOINT_URL"])
             item_qid = event.id
             url = f"{self.base_url}/wiki/Item:{item_qid}"
             logger.info(f"Created event '{label_sv}' on DanceDB: {url}")
@@ -464,3 +282,16 @@ SELECT ?item ?label ?p4 ?p3 ?p42 ?p44 ?p46 ?p12 WHERE {
         except Exception as e:
             logger.error(f"Error creating event '{label_sv}': %s", e)
             raise
+
+
+_shared_client: Optional[DancedbClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_client() -> DancedbClient:
+    """Return the process-wide DancedbClient. It restores the stored session (or logs in) on its first write."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = DancedbClient(use_stored_session=True)
+        return _shared_client
@@ -0,0 +1,152 @@
+"""Pending DanceDB edits as plain data.
+
+An EntityEdit describes a new item or additional claims on an existing item
+without touching the network, so edits can be queued for the BatchWriter or
+applied to a wikibaseintegrator item for a single synchronous write.
+"""
+from datetime import datetime
+from typing import Any, Literal, Optional
+
+from wikibaseintegrator import datatypes
+from wikibaseintegrator.datatypes import BaseDataType
+
+import config
+from src.models.base import DanceBaseModel
+
+GLOBE_EARTH = "http://www.wikidata.org/entity/Q2"
+COORDINATE_PRECISION = 0.0001
+
+
+def format_timestamp(timestamp: datetime) -> str:
+    """Format a datetime as the string value used by P32/P33, assuming CET for naive datetimes."""
+    dt = timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=config.CET)
+    return dt.strftime("+%Y-%m-%dT%H:%M:00Z")
+
+
+class ClaimSpec(DanceBaseModel):
+    """A single statement to add to an item."""
+
+    prop_nr: str
+    datatype: Literal["wikibase-item", "string", "globe-coordinate"]
+    value: str = ""
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+    @classmethod
+    def item(cls, prop_nr: str, qid: str) -> "ClaimSpec":
+        return cls(prop_nr=prop_nr, datatype="wikibase-item", value=qid)
+
+    @classmethod
+    def string(cls, prop_nr: str, value: str) -> "ClaimSpec":
+        return cls(prop_nr=prop_nr, datatype="string", value=value)
+
+    @classmethod
+    def coordinate(cls, prop_nr: str, latitude: float, longitude: float) -> "ClaimSpec":
+        return cls(prop_nr=prop_nr, datatype="globe-coordinate", latitude=latitude, longitude=longitude)
+
+    def to_datatype(self) -> BaseDataType:
+        if self.datatype == "wikibase-item":
+            return datatypes.Item(prop_nr=self.prop_nr, value=self.value)
+        if self.datatype == "string":
+            return datatypes.String(prop_nr=self.prop_nr, value=self.value)
+        return datatypes.GlobeCoordinate(
+            prop_nr=self.prop_nr, latitude=self.latitude, longitude=self.longitude, precision=COORDINATE_PRECISION, globe=GLOBE_EARTH
+        )
+
+    def display_value(self) -> str:
+        if self.datatype == "globe-coordinate":
+            return f"({self.latitude}, {self.longitude})"
+        return self.value
+
+
+class EntityEdit(DanceBaseModel):
+    """Labels, descriptions and claims to write to one item (qid=None creates a new item)."""
+
+    qid: Optional[str] = None
+    labels: dict[str, str] = {}
+    descriptions: dict[str, str] = {}
+    claims: list[ClaimSpec] = []
+    summary: str = ""
+
+    @property
+    def is_new(self) -> bool:
+        return self.qid is None
+
+    @property
+    def is_single_claim(self) -> bool:
+        """True for an edit that only appends one statement to an existing item."""
+        return not self.is_new and not self.labels and not self.descriptions and len(self.claims) == 1
+
+    @property
+    def label(self) -> str:
+        return self.labels.get("sv") or self.labels.get("en") or self.qid or ""
+
+    def to_json(self) -> dict[str, Any]:
+        """Return the data parameter for a wbeditentity call."""
+        data: dict[str, Any] = {}
+        if self.labels:
+            data["labels"] = {lang: {"language": lang, "value": value} for lang, value in self.labels.items()}
+        if self.descriptions:
+            data["descriptions"] = {lang: {"language": lang, "value": value} for lang, value in self.descriptions.items()}
+        if self.claims:
+            data["claims"] = [claim.to_datatype().get_json() for claim in self.claims]
+        return data
+
+    def apply_to(self, item: Any) -> None:
+        """Set labels, descriptions and claims on a wikibaseintegrator item."""
+        for lang, value in self.labels.items():
+            item.labels.set(lang, value)
+        for lang, value in self.descriptions.items():
+            item.descriptions.set(lang, value)
+        for claim in self.claims:
+            item.claims.add(claim.to_datatype())
+
+    def describe(self) -> str:
+        """One line summary for logs and confirmation prompts."""
+        claims = ", ".join(f"{c.prop_nr}={c.display_value()}" for c in self.claims)
+        target = f"new item '{self.label}'" if self.is_new else self.qid
+        return f"{target}: {claims}" if claims else str(target)
+
+
+def band_edit(band_name: str, spelplan_id: str = "") -> EntityEdit:
+    """Edit creating an artist item."""
+    claims = [ClaimSpec.item(config.DANCE_PROP_INSTANCE_OF, config.DANCE_INSTANCE_ARTIST)]
+    if spelplan_id:
+        claims.append(ClaimSpec.string(config.DANCE_PROP_SPELPLAN_ID, spelplan_id))
+    return EntityEdit(labels={"sv": band_name, "en": band_name}, descriptions={"sv": "artist"}, claims=claims)
+
+
+def venue_edit(venue_name: str, latitude: float = 0.0, longitude: float = 0.0, external_ids: dict[str, str] | None = None) -> EntityEdit:
+    """Edit creating a venue item with optional coordinates and external IDs."""
+    claims = [ClaimSpec.item(config.DANCE_PROP_INSTANCE_OF, config.DANCE_INSTANCE_VENUE)]
+    if latitude and longitude:
+        claims.append(ClaimSpec.coordinate(config.DANCE_PROP_COORDINATES, latitude, longitude))
+    for prop, value in (external_ids or {}).items():
+        claims.append(ClaimSpec.string(prop, value))
+    return EntityEdit(labels={"sv": venue_name, "en": venue_name}, descriptions={"sv": "dansställe"}, claims=claims)
+
+
+def event_edit(
+    label_sv: str,
+    venue_qid: str,
+    start_timestamp: datetime,
+    end_timestamp: datetime | None = None,
+    status_qid: str = config.DANCE_STATUS_PLANNED,
+    instance_of: str = config.DANCE_INSTANCE_EVENT,
+    artist_qid: str | None = None,
+    dance_styles: list[str] | None = None,
+) -> EntityEdit:
+    """Edit creating an event item, see DancedbClient.create_event."""
+    claims = [
+        ClaimSpec.item(config.DANCE_PROP_INSTANCE_OF, instance_of),
+        ClaimSpec.item(config.DANCE_PROP_VENUE, venue_qid),
+        ClaimSpec.string(config.DANCE_PROP_START, format_timestamp(start_timestamp)),
+    ]
+    if end_timestamp:
+        claims.append(ClaimSpec.string(config.DANCE_PROP_END, format_timestamp(end_timestamp)))
+    claims.append(ClaimSpec.item(config.DANCE_PROP_STATUS, status_qid))
+    if artist_qid:
+        claims.append(ClaimSpec.item(config.DANCE_PROP_ARTIST, artist_qid))
+    for ds in dance_styles or []:
+        claims.append(ClaimSpec.item(config.DANCE_PROP_DANCE_STYLE, ds))
+    return EntityEdit(labels={"sv": label_sv, "en": label_sv}, claims=claims)
@@ -8,48 +8,39 @@ import logging
 from datetime import date
 
 from wikibaseintegrator.wbi_config import config as wbi_config
-from wikibaseintegrator.wbi_helpers import execute_sparql_query
 
 import config
 from src.models.dancedb.ensure_venues_loader import load_bygdegardarna_venues, load_folketshus_venues, load_bygdegardarna_addresses
 from src.models.dancedb.ensure_venue_matcher import match_venue
 from src.models.dancedb.ensure_venue_creator import create_venue_interactive
-from src.models.dancedb.client import DancedbClient
+from src.models.dancedb.bindings import binding_value, parse_point, qid_from_uri, split_aliases
+from src.models.dancedb.client import ALL_VENUES_QUERY, get_client
+from src.models.dancedb.mirror import first_value, get_mirror
+from src.models.dancedb.reference import reference_data
+from src.utils.sparql import iter_sparql_bindings
 
 logger = logging.getLogger(__name__)
 
 
 def load_existing_venues() -> dict:
-    """Load existing venues from DanceDB via SPARQL."""
+    """Load existing venues from DanceDB via the local mirror or SPARQL."""
     wbi_config["User-Agent"] = "DanceDB/1.0 (User:So9q)"
 
-    sparql = """
-    PREFIX dd: <https://dance.wikibase.cloud/entity/>
-    PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-
-    SELECT ?item ?itemLabel (GROUP_CONCAT(?svAlias; SEPARATOR = "|") AS ?aliasStr) ?geo WHERE {
-      ?item ddt:P1 dd:Q20 .
-      OPTIONAL { ?item rdfs:label ?itemLabel FILTER(LANG(?itemLabel) = "sv") }
-      OPTIONAL { ?item skos:altLabel ?svAlias FILTER(LANG(?svAlias) = "sv") }
-      OPTIONAL { ?item ddt:P4 ?geo }
-    }
-    GROUP BY ?item ?itemLabel ?geo
-    ORDER BY ?itemLabel
-    """
-    results = execute_sparql_query(query=sparql)
+    mirror = get_mirror()
+    if mirror is not None:
+        rows = [
+            (qid, item["label"], [a.lower() for a in dict.fromkeys(item["aliases"])], first_value(item, config.DANCE_PROP_COORDINATES))
+            for qid, item in mirror.items(config.DANCE_INSTANCE_VENUE).items()
+        ]
+    else:
+        rows = [
+            (qid_from_uri(binding_value(b, "item")), binding_value(b, "itemLabel"), split_aliases(binding_value(b, "aliasStr")), binding_value(b, "geo"))
+            for b in iter_sparql_bindings(ALL_VENUES_QUERY)
+        ]
+
     venues = {}
-    for binding in results["results"]["bindings"]:
-        qid = binding["item"]["value"].rsplit("/", 1)[-1]
-        label = binding.get("itemLabel", {}).get("value", "")
-        alias_str = binding.get("aliasStr", {}).get("value", "")
-        aliases = [a.lower() for a in alias_str.split("|") if a] if alias_str else []
-        geo = binding.get("geo", {}).get("value", "")
-        lat, lng = None, None
-        if geo:
-            coords = geo.replace("Point(", "").replace(")", "").split(" ")
-            lng, lat = float(coords[0]), float(coords[1])
+    for qid, label, aliases, geo in rows:
+        lat, lng = parse_point(geo)
         label_lower = label.lower()
         if label_lower not in venues:
             venues[label_lower] = {"qid": qid, "lat": lat, "lng": lng, "aliases": aliases}
@@ -111,7 +102,7 @@ def ensure_venues(date_str: str | None = None) -> None:
     bygdegardarna_addresses = load_bygdegardarna_addresses()
 
     # Load existing DanceDB venues
-    existing_venues = load_existing_venues()
+    existing_venues = dict(reference_data().get("existing_venues"))
     existing_venues.update(load_venue_mappings())
 
     # Process each venue
@@ -156,7 +147,7 @@ def ensure_venues(date_str: str | None = None) -> None:
 
     # Login to DanceDB
     print("Logging in to DanceDB...")
-    db_client = DancedbClient()
+    db_client = get_client()
     print("Logged in.")
 
     # Create new venues
@@ -2,6 +2,7 @@
 import logging
 import math
 
+from src.models.dancedb.bindings import binding_value, parse_point, qid_from_uri
 from src.utils.distance import haversine_distance
 
 logger = logging.getLogger(__name__)
@@ -13,7 +14,7 @@ def find_dancedb_venues_by_coords(lat: float, lng: float, threshold_km: float =
     Uses wikibase:box for bounding box query, then filters by exact haversine distance.
     Returns list of {qid, label, lat, lng, distance_km}.
     """
-    from wikibaseintegrator.wbi_helpers import execute_sparql_query
+    from src.utils.sparql import execute_sparql_query
 
     lat_delta = threshold_km / 111
     lng_delta = threshold_km / (111 * math.cos(math.radians(lat)))
@@ -39,33 +40,26 @@ def find_dancedb_venues_by_coords(lat: float, lng: float, threshold_km: float =
       OPTIONAL {{ ?item rdfs:label ?itemLabel FILTER(LANG(?itemLabel) = "sv") }}
     }}
     """
-    try:
-        results = execute_sparql_query(query=sparql)
-    except Exception as e:
-        logger.warning(f"SPARQL error: {e}")
-        return []
+    results = execute_sparql_query(query=sparql)
 
     matches = []
     for binding in results.get("results", {}).get("bindings", []):
-        qid = binding.get("item", {}).get("value", "").rsplit("/", 1)[-1]
-        label = binding.get("itemLabel", {}).get("value", "")
-        geo_str = binding.get("location", {}).get("value", "")
-        if not qid or not geo_str:
+        qid = qid_from_uri(binding_value(binding, "item"))
+        geo_str = binding_value(binding, "location")
+        venue_lat, venue_lng = parse_point(geo_str)
+        if not qid or venue_lat is None:
+            if geo_str:
+                logger.warning(f"Parse error for {geo_str}")
             continue
-        try:
-            coords = geo_str.replace("Point(", "").replace(")", "").split(" ")
-            venue_lng, venue_lat = float(coords[0]), float(coords[1])
-            dist = haversine_distance(lat, lng, venue_lat, venue_lng)
-            if dist <= threshold_km:
-                matches.append({
-                    "qid": qid,
-                    "label": label or qid,
-                    "lat": venue_lat,
-                    "lng": venue_lng,
-                    "distance_km": dist,
-                })
-        except Exception as e:
-            logger.warning(f"Parse error for {geo_str}: {e}")
+        dist = haversine_distance(lat, lng, venue_lat, venue_lng)
+        if dist <= threshold_km:
+            matches.append({
+                "qid": qid,
+                "label": binding_value(binding, "itemLabel") or qid,
+                "lat": venue_lat,
+                "lng": venue_lng,
+                "distance_km": dist,
+            })
 
     matches.sort(key=lambda x: x["distance_km"])
     return matches
@@ -2,143 +2,250 @@
 
 import json
 import logging
-from datetime import date
+import time
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
+from typing import Optional
 
 import config
+from src.models.dancedb.bindings import binding_value, qid_from_uri, split_aliases
+from src.utils.sparql import KEYSET_FILTER
 
 logger = logging.getLogger(__name__)
 
+EVENTS_DIR = config.dancedb_events_dir
+ARTISTS_DIR = config.dancedb_artists_dir
+ENTITY_URI = "https://dance.wikibase.cloud/entity/"
+
+# Placeholder inside EVENTS_QUERY, replaced by the date window and modified-since filters
+EVENT_FILTER = "#EVENT_FILTER"
+
+# One row per event; the venue label and aliases are collapsed on the server
+EVENTS_QUERY = f"""
+PREFIX dd: <https://dance.wikibase.cloud/entity/>
+PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+PREFIX schema: <http://schema.org/>
+PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+
+SELECT ?event (SAMPLE(?anyLabel) AS ?eventLabel) (SAMPLE(?anyStart) AS ?start) (SAMPLE(?anyEnd) AS ?end)
+       (SAMPLE(?anyVenue) AS ?venue) (COALESCE(SAMPLE(?svVenueLabel), "") AS ?venueLabel)
+       (GROUP_CONCAT(DISTINCT ?svVenueAlias; SEPARATOR = "|") AS ?venueAliasStr) WHERE {{
+    ?event ddt:{config.DANCE_PROP_INSTANCE_OF} dd:{config.DANCE_INSTANCE_EVENT} .
+    {EVENT_FILTER}
+
+    OPTIONAL {{ ?event ddt:{config.DANCE_PROP_START} ?anyStart . }}
+    OPTIONAL {{ ?event ddt:{config.DANCE_PROP_END} ?anyEnd . }}
+
+    OPTIONAL {{ ?event rdfs:label ?svLabel FILTER(LANG(?svLabel)="sv") }}
+    OPTIONAL {{ ?event rdfs:label ?enLabel FILTER(LANG(?enLabel)="en") }}
+    BIND(COALESCE(?svLabel, ?enLabel, STR(?event)) AS ?anyLabel)
+
+    OPTIONAL {{
+        ?event ddt:{config.DANCE_PROP_VENUE} ?anyVenue .
+        OPTIONAL {{ ?anyVenue rdfs:label ?svVenueLabel FILTER(LANG(?svVenueLabel)="sv") }}
+        OPTIONAL {{ ?anyVenue skos:altLabel ?svVenueAlias FILTER(LANG(?svVenueAlias)="sv") }}
+    }}
+    {KEYSET_FILTER}
+}}
+GROUP BY ?event
+"""
+
+
+def events_query(start: Optional[date] = None, end: Optional[date] = None, modified_since: Optional[datetime] = None) -> str:
+    """EVENTS_QUERY limited to events starting in [start, end) and/or edited at or after modified_since.
+
+    Start values are compared as text with the leading "+" of the P32 strings removed.
+    """
+    filters = []
+    if start or end:
+        filters.append(f"?event ddt:{config.DANCE_PROP_START} ?windowStart .")
+        filters.append('BIND(REPLACE(STR(?windowStart), "^[+]", "") AS ?windowDate)')
+        if start:
+            filters.append(f'FILTER(?windowDate >= "{start.isoformat()}")')
+        if end:
+            filters.append(f'FILTER(?windowDate < "{end.isoformat()}")')
+    if modified_since:
+        filters.append("?event schema:dateModified ?modified .")
+        filters.append(f'FILTER(?modified >= "{modified_since.strftime("%Y-%m-%dT%H:%M:%SZ")}"^^xsd:dateTime)')
+    return EVENTS_QUERY.replace(EVENT_FILTER, "\n    ".join(filters))
+
+
+def default_event_window(today: Optional[date] = None) -> tuple[date, date]:
+    """The dates whose events are needed for deduplication of new uploads."""
+    today = today or date.today()
+    return today - timedelta(days=config.EVENTS_WINDOW_DAYS_BEFORE), today + timedelta(days=config.EVENTS_WINDOW_DAYS)
+
+
+def _start_day(event: dict) -> str:
+    return event.get("start_date", "").lstrip("+")[:10]
+
+
+def _in_window(event: dict, window: tuple[date, date]) -> bool:
+    return window[0].isoformat() <= _start_day(event) < window[1].isoformat()
+
 
 def configure_wbi():
     """Configure wikibase-integrator."""
-    from wikibaseintegrator.wbi_config import config as wbi_config
+    from src.models.dancedb.api import configure_endpoints
 
-    wbi_config["WIKIBASE_URL"] = "https://dance.wikibase.cloud"
-    wbi_config["MEDIAWIKI_API_URL"] = "https://dance.wikibase.cloud/w/api.php"
-    wbi_config["SPARQL_ENDPOINT_URL"] = "https://dance.wikibase.cloud/query/sparql"
-    wbi_config["USER_AGENT"] = config.user_agent
+    configure_endpoints()
 
 
-def fetch_events_from_dancedb(date_str: str | None = None, save: bool = True) -> list[dict]:
-    """Fetch all events from DanceDB via SPARQL.
+def fetch_events_from_dancedb(
+    date_str: str | None = None, save: bool = True, window: Optional[tuple[date, date]] = None, incremental: bool = False
+) -> list[dict]:
+    """Fetch events from DanceDB via the local mirror or SPARQL.
     
     Args:
         date_str: Date string for output file (YYYY-MM-DD, default: today)
         save: Whether to save events to JSON file (default: True)
+        window: Only events starting in [start, end), see default_event_window() (default: all events)
+        incremental: Update the last windowed snapshot with the events edited since it was
+            taken instead of fetching the whole window again
     
     Returns:
         List of event dicts with qid, label, start_date, venue info
     """
     configure_wbi()
-    from wikibaseintegrator.wbi_helpers import execute_sparql_query
+    from src.models.dancedb.mirror import get_mirror
 
-    sparql = f"""
-PREFIX dd: <https://dance.wikibase.cloud/entity/>
-PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    mirror = get_mirror()
+    if mirror is not None:
+        events = _events_from_mirror(mirror)
+        if window:
+            events = [e for e in events if _in_window(e, window)]
+    elif window and incremental:
+        events = _update_snapshot(window)
+    else:
+        events = _events_from_sparql(events_query(*window) if window else EVENTS_QUERY)
+        if window:
+            _save_snapshot(events, window, time.time())
 
-SELECT ?event ?eventLabel ?start ?end ?venue ?venueLabel WHERE {{
-    ?event ddt:{config.DANCE_PROP_INSTANCE_OF} dd:{config.DANCE_INSTANCE_EVENT} .
+    logger.info(f"Fetched {len(events)} events from DanceDB")
+    
+    if save and date_str:
+        output_file = config.dancedb_events_dir / f"{date_str}.json"
+        config.dancedb_events_dir.mkdir(parents=True, exist_ok=True)
+        
+        output_file.write_text(json.dumps(events, indent=2, ensure_ascii=False))
+        logger.info(f"Saved {len(events)} events to {output_file}")
+    
+    return events
 
-    OPTIONAL {{ ?event ddt:{config.DANCE_PROP_START} ?start . }}
-    OPTIONAL {{ ?event ddt:{config.DANCE_PROP_END} ?end . }}
 
-    OPTIONAL {{ ?event rdfs:label ?svLabel FILTER(LANG(?svLabel)="sv") }}
-    OPTIONAL {{ ?event rdfs:label ?enLabel FILTER(LANG(?enLabel)="en") }}
-    BIND(COALESCE(?svLabel, ?enLabel, STR(?event)) AS ?eventLabel)
+def _save_snapshot(events: list[dict], window: tuple[date, date], fetched_at: float) -> None:
+    path = config.events_snapshot_file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"fetched_at": fetched_at, "window": [window[0].isoformat(), window[1].isoformat()], "events": events}
+    path.write_text(json.dumps(data, ensure_ascii=False))
 
-    OPTIONAL {{ ?event ddt:{config.DANCE_PROP_VENUE} ?venue }}
-    OPTIONAL {{ ?venue rdfs:label ?svVenueLabel FILTER(LANG(?svVenueLabel)="sv") }}
-    BIND(COALESCE(?svVenueLabel, "") AS ?venueLabel)
-}}
+
+def _load_snapshot() -> Optional[dict]:
+    try:
+        return json.loads(config.events_snapshot_file.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _update_snapshot(window: tuple[date, date]) -> list[dict]:
+    """Bring the stored snapshot up to date with the events edited since it was taken.
+
+    Events edited since the snapshot (minus config.EVENTS_INCREMENTAL_OVERLAP_SECONDS
+    for query service lag) replace their old versions, and days added at the end of
+    the window are fetched. Deleted events are only dropped by a full fetch, which is
+    done when there is no snapshot, it does not cover the start of the window, or it
+    is older than config.EVENTS_FULL_REFRESH_DAYS.
     """
-    results = execute_sparql_query(query=sparql)
-    events = []
+    started = time.time()
+    snapshot = _load_snapshot()
+    if (
+        snapshot is None
+        or date.fromisoformat(snapshot["window"][0]) > window[0]
+        or started - snapshot["fetched_at"] > config.EVENTS_FULL_REFRESH_DAYS * 86400
+    ):
+        logger.info("Fetching all events in the window")
+        events = _events_from_sparql(events_query(*window))
+        _save_snapshot(events, window, started)
+        return events
+
+    since = datetime.fromtimestamp(snapshot["fetched_at"] - config.EVENTS_INCREMENTAL_OVERLAP_SECONDS, tz=timezone.utc)
+    changed = _events_from_sparql(events_query(modified_since=since))
+    previous_end = date.fromisoformat(snapshot["window"][1])
+    if previous_end < window[1]:
+        changed += _events_from_sparql(events_query(previous_end, window[1]))
+    logger.info(f"Merging {len(changed)} edited or new events into the snapshot of {len(snapshot['events'])}")
+
+    events = {e["event_qid"]: e for e in snapshot["events"]}
+    events.update((e["event_qid"], e) for e in changed)
+    merged = [e for e in events.values() if _in_window(e, window)]
+    _save_snapshot(merged, window, started)
+    return merged
+
+
+def event_from_binding(binding: dict) -> dict:
+    """Decode one row of EVENTS_QUERY into an event dict."""
+    venue_qid = qid_from_uri(binding_value(binding, "venue")) or None
+    return {
+        "event_qid": qid_from_uri(binding_value(binding, "event")),
+        "event_label": binding_value(binding, "eventLabel"),
+        "start_date": binding_value(binding, "start"),
+        "end_date": binding_value(binding, "end"),
+        "venue_qid": venue_qid,
+        "venue_label": binding_value(binding, "venueLabel") if venue_qid else "",
+        "venue_aliases": split_aliases(binding_value(binding, "venueAliasStr")) if venue_qid else [],
+    }
+
+
+def _events_from_sparql(query: str) -> list[dict]:
+    from src.utils.sparql import iter_sparql_bindings
 
-    for binding in results["results"]["bindings"]:
-        event_uri = binding.get("event", {}).get("value", "")
-        event_label = binding.get("eventLabel", {}).get("value", "")
-        start_date = binding.get("start", {}).get("value", "")
-        end_date = binding.get("end", {}).get("value", "")
-
-        venue_qid = None
-        venue_label = ""
-        venue_aliases = []
-        venue_binding = binding.get("venue")
-        if venue_binding:
-            venue_url = venue_binding.get("value", "")
-            if venue_url:
-                venue_qid = venue_url.rsplit("/", 1)[-1]
-                venue_label = binding.get("venueLabel", {}).get("value", "")
-                alias_data = binding.get("venueAlias")
-                if alias_data:
-                    if isinstance(alias_data, list):
-                        venue_aliases = [a.get("value", "").lower() for a in alias_data if a.get("value")]
-                    else:
-                        val = alias_data.get("value", "")
-                        if val:
-                            venue_aliases = [val.lower()]
+    return [event_from_binding(binding) for binding in iter_sparql_bindings(query, key_var="event")]
 
+
+def _events_from_mirror(mirror) -> list[dict]:
+    """The event dicts of fetch_events_from_dancedb, read from the local mirror."""
+    from src.models.dancedb.mirror import first_value
+
+    venues = mirror.items(config.DANCE_INSTANCE_VENUE)
+    items = mirror.items(config.DANCE_INSTANCE_EVENT)
+    english = mirror.labels([qid for qid, item in items.items() if not item["label"]], "en")
+    events = []
+    for qid, item in items.items():
+        venue_qid = first_value(item, config.DANCE_PROP_VENUE) or None
+        venue = venues.get(venue_qid, {"label": "", "aliases": []}) if venue_qid else None
         events.append(
             {
-                "event_qid": event_uri.rsplit("/", 1)[-1] if event_uri else "",
-                "event_label": event_label,
-                "start_date": start_date,
-                "end_date": end_date,
+                "event_qid": qid,
+                "event_label": item["label"] or english.get(qid) or f"{ENTITY_URI}{qid}",
+                "start_date": first_value(item, config.DANCE_PROP_START),
+                "end_date": first_value(item, config.DANCE_PROP_END),
                 "venue_qid": venue_qid,
-                "venue_label": venue_label,
-                "venue_aliases": venue_aliases,
+                "venue_label": venue["label"] if venue else "",
+                "venue_aliases": [a.lower() for a in dict.fromkeys(venue["aliases"])] if venue else [],
             }
         )
-
-    logger.info(f"Fetched {len(events)} events from DanceDB")
-    
-    if save and date_str:
-        output_file = config.dancedb_events_dir / f"{date_str}.json"
-        config.dancedb_events_dir.mkdir(parents=True, exist_ok=True)
-        
-        unique_events = {}
-        for e in events:
-            qid = e.get("event_qid")
-            if qid and qid not in unique_events:
-                unique_events[qid] = e
-        
-        output = list(unique_events.values())
-        output_file.write_text(json.dumps(output, indent=2, ensure_ascii=False))
-        logger.info(f"Saved {len(output)} unique events to {output_file}")
-    
     return events
 
 
 def fetch_existing_venues() -> dict:
-    """Fetch existing venues from DanceDB via SPARQL."""
-    from wikibaseintegrator.wbi_helpers import execute_sparql_query
-
-    sparql = """
-    PREFIX dd: <https://dance.wikibase.cloud/entity/>
-    PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-
-    SELECT ?item ?itemLabel (GROUP_CONCAT(?svAlias; SEPARATOR = "|") AS ?aliasStr) WHERE {
-      ?item ddt:P1 dd:Q20 .
-      OPTIONAL { ?item rdfs:label ?svItemLabel FILTER(LANG(?svItemLabel)="sv") }
-      OPTIONAL { ?item skos:altLabel ?svAlias FILTER(LANG(?svAlias)="sv") }
-      BIND(COALESCE(?svItemLabel, "") AS ?itemLabel)
-    }
-    GROUP BY ?item ?itemLabel
-    """
-    results = execute_sparql_query(query=sparql)
-    existing_venues = {}
+    """Fetch existing venues from DanceDB via the local mirror or SPARQL."""
+    from src.models.dancedb.query import ALL_VENUES_QUERY
+    from src.models.dancedb.mirror import get_mirror
+    from src.utils.sparql import iter_sparql_bindings
 
-    for binding in results["results"]["bindings"]:
-        qid = binding.get("item", {}).get("value", "").rsplit("/", 1)[-1]
-        label = binding.get("itemLabel", {}).get("value", "")
-
-        alias_str = binding.get("aliasStr", {}).get("value", "")
-        aliases = [a.lower() for a in alias_str.split("|") if a] if alias_str else []
+    mirror = get_mirror()
+    if mirror is not None:
+        rows = [(qid, item["label"], [a.lower() for a in dict.fromkeys(item["aliases"])]) for qid, item in mirror.items(config.DANCE_INSTANCE_VENUE).items()]
+    else:
+        rows = [
+            (qid_from_uri(binding_value(b, "item")), binding_value(b, "itemLabel"), split_aliases(binding_value(b, "aliasStr")))
+            for b in iter_sparql_bindings(ALL_VENUES_QUERY)
+        ]
 
+    existing_venues = {}
+    for qid, label, aliases in rows:
         label_lower = label.lower()
         if label_lower not in existing_venues:
             existing_venues[label_lower] = {"qid": qid, "aliases": aliases}
@@ -127,7 +127,14 @@ def onbeat_ensure_venues(date_str: str | None = None, dry_run: bool = False) ->
         print("All venues resolved!")
         return
 
-    from src.models.dancedb.client import DancedbClient
+    from src.models.dancedb.client import get_client
+
+    db_client = None if dry_run else get_client()
+    if db_client:
+        for venue_name, qid in db_client.search_venues(list(venues_to_create)).items():
+            if qid:
+                print(f"  {venue_name} -> DanceDB: {qid}")
+                venues_to_create.pop(venue_name)
 
     for venue_name, info in venues_to_create.items():
         print(f"\n--- {venue_name} ---")
@@ -179,7 +186,6 @@ def onbeat_ensure_venues(date_str: str | None = None, dry_run: bool = False) ->
                 print(f"  External IDs: {external_ids}")
             continue
 
-        db_client = DancedbClient()
         qid = create_venue(venue_name, coords["lat"], coords["lng"], external_ids=external_ids, client=db_client)
         if qid:
             print(f"Created: https://dance.wikibase.cloud/wiki/Item:{qid}")
@@ -7,7 +7,8 @@ from typing import Any
 import questionary
 
 import config
-from src.models.dancedb.client import DancedbClient
+from src.models.dancedb.client import DancedbClient, get_client
+from src.models.dancedb.plan import active_plan
 from src.utils.fuzzy import normalize_for_fuzzy
 from src.utils.geodb import get_ship_coordinates
 from src.utils.coords import parse_coords
@@ -19,7 +20,7 @@ logger = logging.getLogger(__name__)
 def create_venue(venue_name: str, lat: float, lng: float, external_ids: dict | None = None, client=None) -> str | None:
     """Create a new venue in DanceDB."""
     if client is None:
-        client = DancedbClient()
+        client = get_client()
     return client.create_venue(venue_name=venue_name, latitude=lat, longitude=lng, external_ids=external_ids)
 
 
@@ -127,7 +128,7 @@ def create_new_venue(venue_name: str, coords: dict, folketshus_match: dict | Non
     if qid:
         print(f"Created: https://dance.wikibase.cloud/wiki/Item:{qid}")
         save_venue_mapping(venue_name, qid, coords["lat"], coords["lng"], date_str)
-    else:
+    elif active_plan() is None:
         print("Failed to create venue")
     
     return qid
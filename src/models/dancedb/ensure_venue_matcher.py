@@ -11,7 +11,7 @@ from rapidfuzz import fuzz, process as fuzz_process
 import config
 from src.utils.fuzzy import normalize_for_fuzzy
 from src.utils.google_maps import GoogleMaps
-from src.utils.distance import haversine_distance
+from src.utils.distance import nearest_neighbours
 from src.utils import geodb
 
 logger = logging.getLogger(__name__)
@@ -61,12 +61,9 @@ def match_fuzzy(venue_lower: str, candidates: dict, threshold: float, remove_ter
 
 
 def match_by_coords(venue_lat: float, venue_lng: float, candidate_coords: dict, threshold_km: float) -> tuple | None:
-    """Match by coordinate proximity."""
-    for qid, (lat2, lng2) in candidate_coords.items():
-        dist = haversine_distance(venue_lat, venue_lng, lat2, lng2)
-        if dist <= threshold_km:
-            return qid, dist
-    return None
+    """Match by coordinate proximity: the nearest candidate within threshold_km as (qid, distance)."""
+    nearest = nearest_neighbours([(venue_lat, venue_lng)], candidate_coords, threshold_km, k=1)[0]
+    return nearest[0] if nearest else None
 
 
 def prompt_match(venue_name: str, matched_name: str, score: float, gmaps_url: str, source: str) -> bool:
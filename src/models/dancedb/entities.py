@@ -0,0 +1,100 @@
+"""Entity JSON from wbgetentities: batched fetching, an LRU cache and small accessors."""
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+import config
+from src.models.dancedb.api import read_api
+
+logger = logging.getLogger(__name__)
+
+
+class EntityCache:
+    """Thread-safe least recently used cache of entity JSON by QID."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entities: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def get(self, qid: str) -> Optional[dict]:
+        with self._lock:
+            entity = self._entities.get(qid)
+            if entity is not None:
+                self._entities.move_to_end(qid)
+            return entity
+
+    def put(self, qid: str, entity: dict) -> None:
+        with self._lock:
+            self._entities[qid] = entity
+            self._entities.move_to_end(qid)
+            while len(self._entities) > self.max_size:
+                self._entities.popitem(last=False)
+
+    def discard(self, qids: Iterable[str]) -> None:
+        with self._lock:
+            for qid in qids:
+                self._entities.pop(qid, None)
+
+
+def fetch_entities(qids: list[str]) -> dict[str, dict]:
+    """Fetch up to 50 items with one wbgetentities call.
+
+    Missing items are left out; a redirected (merged) item is returned under the
+    requested QID with the id of the item it redirects to.
+    """
+    response = read_api({"action": "wbgetentities", "ids": "|".join(qids), "props": "labels|descriptions|aliases|claims"})
+    result = {}
+    for key, entity in response.get("entities", {}).items():
+        if "missing" in entity:
+            continue
+        # Redirects may be keyed by the target id, with the requested id in "redirects"
+        requested = entity.get("redirects", {}).get("from", key)
+        result[requested if requested in qids else key] = entity
+    return result
+
+
+def fetch_entities_batched(qids: list[str]) -> dict[str, dict]:
+    """Fetch any number of items, ENTITY_BATCH_SIZE per call and ENTITY_FETCH_WORKERS calls in parallel."""
+    if not qids:
+        return {}
+    size = config.ENTITY_BATCH_SIZE
+    batches = [qids[i:i + size] for i in range(0, len(qids), size)]
+    logger.info(f"Fetching {len(qids)} entities in {len(batches)} wbgetentities calls")
+    entities = {}
+    with ThreadPoolExecutor(max_workers=min(config.ENTITY_FETCH_WORKERS, len(batches)), thread_name_prefix="dancedb-entities") as executor:
+        for fetched in executor.map(fetch_entities, batches):
+            entities.update(fetched)
+    return entities
+
+
+def entity_label(entity: dict, lang: str = "sv") -> str:
+    """Label in lang, falling back to English."""
+    labels = entity.get("labels", {})
+    return (labels.get(lang) or labels.get("en") or {}).get("value", "")
+
+
+def claim_values(entity: dict, prop_nr: str) -> list:
+    """Main snak values of a property: QIDs for items, strings, (lat, lng) for coordinates."""
+    values = []
+    for statement in entity.get("claims", {}).get(prop_nr, []):
+        value = statement.get("mainsnak", {}).get("datavalue", {}).get("value")
+        if isinstance(value, dict) and "numeric-id" in value:
+            values.append(value.get("id") or f"Q{value['numeric-id']}")
+        elif isinstance(value, dict) and "latitude" in value:
+            values.append((value["latitude"], value["longitude"]))
+        elif value is not None:
+            values.append(value)
+    return values
+
+
+def entity_summary(entity: dict) -> dict:
+    """The label/lat/lng dict used by display code for an entity."""
+    coordinates = claim_values(entity, config.DANCE_PROP_COORDINATES)
+    lat, lng = coordinates[0] if coordinates else (None, None)
+    return {"qid": entity.get("id", ""), "label": entity_label(entity), "lat": lat, "lng": lng}
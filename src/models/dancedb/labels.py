@@ -0,0 +1,129 @@
+"""Index of normalized DanceDB labels, to spot label clashes without SPARQL joins.
+
+The index maps each normalized Swedish label (NFC, casefolded, whitespace
+collapsed) to the QIDs that carry it. It is built once per process from a
+snapshot of all labels (the local mirror when it is enabled, otherwise one
+paginated scan of the query service) and updated by the client on every
+create, so a create can be checked against it with one dict lookup and the
+clash report is a group-by over the index. Only bands and venues are checked:
+event labels ("{band} på {venue}") repeat by design.
+"""
+import logging
+import re
+import threading
+import unicodedata
+from typing import Iterable, Optional
+
+import config
+from src.models.dancedb.bindings import binding_value, qid_from_uri
+from src.models.dancedb.edits import EntityEdit
+from src.models.dancedb.mirror import get_mirror
+from src.utils.sparql import KEYSET_FILTER, iter_sparql_bindings
+
+logger = logging.getLogger(__name__)
+
+LABELS_QUERY = """
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+SELECT ?item ?label WHERE {
+    ?item rdfs:label ?label .
+    FILTER(LANG(?label) = "%s")
+    """ + KEYSET_FILTER + """
+}
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Items whose labels should not clash
+CHECKED_INSTANCES = (config.DANCE_INSTANCE_ARTIST, config.DANCE_INSTANCE_VENUE)
+
+
+def normalize_label(label: str) -> str:
+    """Key under which labels that only differ in case, whitespace or Unicode form clash."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", label)).strip().casefold()
+
+
+class LabelIndex:
+    """Normalized label -> QIDs, with the label as first seen for reporting."""
+
+    def __init__(self, lang: str = "sv"):
+        self.lang = lang
+        self._qids: dict[str, list[str]] = {}
+        self._labels: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._qids)
+
+    def add(self, qid: str, label: str) -> None:
+        """Record that qid has label (e.g. after creating it)."""
+        key = normalize_label(label)
+        if not key:
+            return
+        with self._lock:
+            qids = self._qids.setdefault(key, [])
+            if qid not in qids:
+                qids.append(qid)
+            self._labels.setdefault(key, label)
+
+    def update(self, pairs: Iterable[tuple[str, str]]) -> None:
+        """Add (qid, label) pairs."""
+        for qid, label in pairs:
+            self.add(qid, label)
+
+    def lookup(self, label: str) -> list[str]:
+        """QIDs that already have label, after normalization."""
+        with self._lock:
+            return list(self._qids.get(normalize_label(label), []))
+
+    def clashes(self) -> dict[str, list[str]]:
+        """Labels carried by more than one item, as {label: [qids]}."""
+        with self._lock:
+            return {self._labels[key]: list(qids) for key, qids in self._qids.items() if len(qids) > 1}
+
+    def load(self) -> "LabelIndex":
+        """Fill the index from the mirror when it is enabled, otherwise from the query service."""
+        mirror = get_mirror()
+        if mirror is not None:
+            self.update(mirror.all_labels(self.lang))
+        else:
+            self.update(
+                (qid_from_uri(binding_value(row, "item")), binding_value(row, "label"))
+                for row in iter_sparql_bindings(LABELS_QUERY % self.lang)
+            )
+        logger.info(f"Indexed {len(self)} distinct {self.lang} labels")
+        return self
+
+
+_index: Optional[LabelIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_label_index() -> LabelIndex:
+    """The process-wide Swedish label index, loaded on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = LabelIndex().load()
+        return _index
+
+
+def record_label(qid: str, label: str) -> None:
+    """Add a created item to the process-wide index, if it has been loaded."""
+    if _index is not None:
+        _index.add(qid, label)
+
+
+def checked_label(edit: EntityEdit) -> Optional[str]:
+    """The label of an edit creating a band or venue, None for other edits."""
+    if not edit.is_new:
+        return None
+    instance_of = next((c.value for c in edit.claims if c.prop_nr == config.DANCE_PROP_INSTANCE_OF), None)
+    return edit.label if instance_of in CHECKED_INSTANCES else None
+
+
+def record_created(edit: EntityEdit, qid: str) -> None:
+    """Add the item created by edit to the process-wide index when it is a band or venue."""
+    label = checked_label(edit)
+    if label:
+        record_label(qid, label)
@@ -0,0 +1,469 @@
+"""Local stand-in for the DanceDB Wikibase, for offline tests and benchmarks.
+
+Serves the parts of the MediaWiki action API the client uses (login, edit
+tokens, wbgetentities, wbeditentity, wbcreateclaim, wbmergeitems, and the
+allpages and recentchanges lists read by the local mirror) under
+/w/api.php and a SPARQL endpoint under /query/sparql, backed by an in-memory
+entity store. The store can be seeded from a snapshot in wbgetentities format
+({"entities": {"Q1": {...}}}).
+
+SPARQL queries are answered by rdflib over the truthy (ddt:) statements,
+labels and aliases of the store, as SPARQL JSON or, when the Accept header asks
+for it, TSV. rdflib is an optional dependency; without it the SPARQL endpoint
+answers 501.
+
+Start it with `cli.py serve-local` and set config.LOCAL_WIKIBASE_URL to its
+URL to point the client at it. latency and maxlag_ratio simulate a slow or
+lagged server for load tests; maxlag errors are drawn from a seeded RNG so
+runs are repeatable.
+"""
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+import config
+from src.utils.sparql_tsv import TSV_CONTENT_TYPE, write_tsv
+
+logger = logging.getLogger(__name__)
+
+CONCEPT_BASE = "https://dance.wikibase.cloud/entity/"
+DIRECT_PROP_BASE = "https://dance.wikibase.cloud/prop/direct/"
+SESSION_COOKIE = "localwikibase_session"
+ANONYMOUS_TOKEN = "+\\"
+
+
+class ApiError(Exception):
+    """An error answered as {"error": {"code": ..., "info": ...}}."""
+
+    def __init__(self, code: str, info: str, **extra: Any):
+        super().__init__(info)
+        self.payload = {"code": code, "info": info, **extra}
+
+
+def _terms(data: dict) -> dict[str, dict]:
+    """Normalize labels/descriptions given as {lang: {...}} or [{...}]."""
+    if isinstance(data, list):
+        return {term["language"]: term for term in data}
+    return data
+
+
+def _claims(data: dict | list) -> list[dict]:
+    """Normalize claims given as {prop: [statement]} or [statement]."""
+    if isinstance(data, dict):
+        return [statement for statements in data.values() for statement in statements]
+    return data
+
+
+class EntityStore:
+    """Thread-safe in-memory items in wbgetentities JSON format."""
+
+    def __init__(self, entities: Optional[dict[str, dict]] = None):
+        self.entities: dict[str, dict] = {}
+        self.redirects: dict[str, str] = {}
+        self.changes: list[dict] = []
+        self.version = 0
+        self._lock = threading.RLock()
+        self._next_id = 1
+        self._revision = 0
+        for entity in (entities or {}).values():
+            self._put(entity)
+
+    @classmethod
+    def from_snapshot(cls, path: Path) -> "EntityStore":
+        return cls(json.loads(path.read_text()).get("entities", {}))
+
+    def save_snapshot(self, path: Path) -> None:
+        with self._lock:
+            path.write_text(json.dumps({"entities": self.entities}, ensure_ascii=False))
+
+    def _put(self, entity: dict) -> None:
+        qid = entity["id"]
+        self._next_id = max(self._next_id, int(qid[1:]) + 1)
+        self._revision += 1
+        entity["lastrevid"] = self._revision
+        entity["modified"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        self._log_change(qid, "edit" if qid in self.entities else "new")
+        self.entities[qid] = entity
+        self.version += 1
+
+    def _log_change(self, qid: str, change_type: str) -> None:
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        self.changes.append({"type": change_type, "ns": config.DANCE_ITEM_NAMESPACE, "title": f"Item:{qid}", "revid": self._revision, "timestamp": timestamp})
+
+    def titles(self) -> list[str]:
+        """Page titles of all items that are not redirects, sorted like list=allpages."""
+        with self._lock:
+            return sorted(f"Item:{qid}" for qid in self.entities)
+
+    def _resolve(self, qid: str) -> str:
+        return self.redirects.get(qid, qid)
+
+    def get(self, qids: list[str]) -> dict[str, dict]:
+        with self._lock:
+            result = {}
+            for qid in qids:
+                entity = self.entities.get(self._resolve(qid))
+                result[qid] = json.loads(json.dumps(entity)) if entity else {"id": qid, "missing": ""}
+            return result
+
+    def edit(self, data: dict, qid: Optional[str] = None, clear: bool = False) -> dict:
+        """Apply wbeditentity data to an existing item, or create one when qid is None."""
+        with self._lock:
+            if qid is None:
+                qid = f"Q{self._next_id}"
+                entity = {"type": "item", "id": qid, "labels": {}, "descriptions": {}, "aliases": {}, "claims": {}, "sitelinks": {}}
+            else:
+                qid = self._resolve(qid)
+                if qid not in self.entities:
+                    raise ApiError("no-such-entity", f"Could not find an entity with the ID \"{qid}\".")
+                entity = json.loads(json.dumps(self.entities[qid]))
+                if clear:
+                    entity.update({"labels": {}, "descriptions": {}, "aliases": {}, "claims": {}})
+            for key in ("labels", "descriptions"):
+                for lang, term in _terms(data.get(key, {})).items():
+                    if "remove" in term:
+                        entity[key].pop(lang, None)
+                    else:
+                        entity[key][lang] = {"language": lang, "value": term["value"]}
+            for lang, aliases in data.get("aliases", {}).items():
+                entity["aliases"][lang] = [{"language": lang, "value": a["value"]} for a in aliases if "remove" not in a]
+            for statement in _claims(data.get("claims", {})):
+                self._set_statement(entity, statement)
+            self._put(entity)
+            return json.loads(json.dumps(entity))
+
+    def create_claim(self, qid: str, prop: str, value: Any) -> dict:
+        with self._lock:
+            qid = self._resolve(qid)
+            if qid not in self.entities:
+                raise ApiError("no-such-entity", f"Could not find an entity with the ID \"{qid}\".")
+            snak = {"snaktype": "value", "property": prop, "datavalue": {"value": value, "type": _value_type(value)}}
+            statement = {"mainsnak": snak, "type": "statement", "rank": "normal"}
+            entity = json.loads(json.dumps(self.entities[qid]))
+            statement = self._set_statement(entity, statement)
+            self._put(entity)
+            return statement
+
+    def merge(self, from_qid: str, to_qid: str) -> None:
+        """Move labels, aliases and statements missing on to_qid over and redirect from_qid."""
+        with self._lock:
+            from_qid, to_qid = self._resolve(from_qid), self._resolve(to_qid)
+            if from_qid not in self.entities or to_qid not in self.entities:
+                raise ApiError("no-such-entity", f"Could not merge {from_qid} into {to_qid}")
+            source = self.entities.pop(from_qid)
+            target = json.loads(json.dumps(self.entities[to_qid]))
+            for key in ("labels", "descriptions"):
+                for lang, term in source[key].items():
+                    target[key].setdefault(lang, term)
+            for lang, aliases in source["aliases"].items():
+                target["aliases"].setdefault(lang, []).extend(a for a in aliases if a not in target["aliases"][lang])
+            for prop, statements in source["claims"].items():
+                existing = [s["mainsnak"].get("datavalue") for s in target["claims"].get(prop, [])]
+                for statement in statements:
+                    if statement["mainsnak"].get("datavalue") not in existing:
+                        self._set_statement(target, {**statement, "id": None})
+            self.redirects[from_qid] = to_qid
+            self._log_change(from_qid, "edit")
+            self._put(target)
+
+    @staticmethod
+    def _set_statement(entity: dict, statement: dict) -> dict:
+        prop = statement["mainsnak"]["property"]
+        statements = entity["claims"].setdefault(prop, [])
+        statement_id = statement.get("id")
+        if statement_id:
+            statements[:] = [s for s in statements if s["id"] != statement_id]
+            if "remove" in statement:
+                return statement
+        else:
+            statement_id = f"{entity['id']}${uuid.uuid4()}"
+        statement = {**statement, "id": statement_id, "type": "statement", "rank": statement.get("rank", "normal")}
+        statements.append(statement)
+        return statement
+
+    def to_graph(self) -> Any:
+        """Build an rdflib Graph with labels, aliases and truthy statements."""
+        from rdflib import Graph, Literal, Namespace, URIRef
+        from rdflib.namespace import RDFS, SKOS, XSD
+
+        dd = Namespace(CONCEPT_BASE)
+        ddt = Namespace(DIRECT_PROP_BASE)
+        geo_wkt = URIRef("http://www.opengis.net/ont/geosparql#wktLiteral")
+        date_modified = URIRef("http://schema.org/dateModified")
+        graph = Graph()
+        with self._lock:
+            for qid, entity in self.entities.items():
+                subject = dd[qid]
+                if "modified" in entity:
+                    graph.add((subject, date_modified, Literal(entity["modified"], datatype=XSD.dateTime)))
+                for term in entity["labels"].values():
+                    graph.add((subject, RDFS.label, Literal(term["value"], lang=term["language"])))
+                for aliases in entity["aliases"].values():
+                    for alias in aliases:
+                        graph.add((subject, SKOS.altLabel, Literal(alias["value"], lang=alias["language"])))
+                for prop, statements in entity["claims"].items():
+                    for statement in statements:
+                        value = statement["mainsnak"].get("datavalue", {}).get("value")
+                        if isinstance(value, dict) and "numeric-id" in value:
+                            obj = dd[value.get("id") or f"Q{value['numeric-id']}"]
+                        elif isinstance(value, dict) and "latitude" in value:
+                            obj = Literal(f"Point({value['longitude']} {value['latitude']})", datatype=geo_wkt)
+                        elif value is not None:
+                            obj = Literal(value)
+                        else:
+                            continue
+                        graph.add((subject, ddt[prop], obj))
+        return graph
+
+
+# Held while rdflib runs with _bound_distinct_aggregates() in effect
+_aggregates_lock = threading.Lock()
+
+
+@contextmanager
+def _bound_distinct_aggregates():
+    """Make DISTINCT aggregates skip unbound values like Blazegraph does, for the duration of a query.
+
+    rdflib raises NotBoundError for e.g. GROUP_CONCAT(DISTINCT ?svAlias) when
+    the OPTIONAL alias is missing on some rows, which the DanceDB queries rely on.
+    The override is restored afterwards, so other rdflib users in the process
+    keep the standard behaviour.
+    """
+    from rdflib.plugins.sparql.aggregates import Accumulator
+    from rdflib.plugins.sparql.sparql import NotBoundError
+
+    with _aggregates_lock:
+        use_row = Accumulator.use_row
+
+        def use_bound_row(self, row):
+            try:
+                return use_row(self, row)
+            except NotBoundError:
+                return False
+
+        Accumulator.use_row = use_bound_row
+        try:
+            yield
+        finally:
+            Accumulator.use_row = use_row
+
+
+def _value_type(value: Any) -> str:
+    if isinstance(value, dict) and "numeric-id" in value:
+        return "wikibase-entityid"
+    if isinstance(value, dict) and "latitude" in value:
+        return "globecoordinate"
+    return "string"
+
+
+class LocalWikibase:
+    """The API and SPARQL behaviour of the stand-in, independent of HTTP."""
+
+    def __init__(self, store: EntityStore, latency: float = 0.0, maxlag_ratio: float = 0.0, seed: int = 0, retry_after: int = 5):
+        self.store = store
+        self.latency = latency
+        self.maxlag_ratio = maxlag_ratio
+        self.retry_after = retry_after
+        self.sessions: dict[str, Optional[str]] = {}
+        self.request_counts: dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._graph: Any = None
+        self._graph_version = -1
+
+    def api(self, params: dict[str, str], session_id: Optional[str]) -> tuple[dict, Optional[str]]:
+        """Handle one action API call. Returns (response, new session id or None)."""
+        action = params.get("action", "")
+        with self._lock:
+            self.request_counts[action] = self.request_counts.get(action, 0) + 1
+            lagged = self.maxlag_ratio and "maxlag" in params and self._random.random() < self.maxlag_ratio
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            if lagged:
+                raise ApiError("maxlag", f"Waiting for a database server: {self.retry_after} seconds lagged.", lag=self.retry_after)
+            if action == "query" and params.get("meta") == "tokens":
+                return self._tokens(params, session_id), None
+            if action == "login":
+                return self._login(params)
+            if action == "query" and params.get("list") == "allpages":
+                return self._allpages(params), None
+            if action == "query" and params.get("list") == "recentchanges":
+                return self._recentchanges(params), None
+            if action == "wbgetentities":
+                return {"entities": self.store.get(params.get("ids", "").split("|")), "success": 1}, None
+            self._check_write(params, session_id)
+            if action == "wbeditentity":
+                data = json.loads(params.get("data", "{}"))
+                qid = None if params.get("new") else params.get("id")
+                return {"entity": self.store.edit(data, qid=qid, clear=bool(params.get("clear"))), "success": 1}, None
+            if action == "wbcreateclaim":
+                claim = self.store.create_claim(params["entity"], params["property"], json.loads(params["value"]))
+                return {"claim": claim, "success": 1}, None
+            if action == "wbmergeitems":
+                self.store.merge(params["fromid"], params["toid"])
+                return {"success": 1, "redirected": 1, "from": {"id": params["fromid"]}, "to": {"id": params["toid"]}}, None
+            raise ApiError("badvalue", f"Unrecognized value for parameter \"action\": {action}.")
+        except ApiError as e:
+            return {"error": e.payload}, None
+
+    def _tokens(self, params: dict[str, str], session_id: Optional[str]) -> dict:
+        if params.get("type") == "login":
+            return {"query": {"tokens": {"logintoken": secrets.token_hex(8) + ANONYMOUS_TOKEN}}}
+        user = self.sessions.get(session_id) if session_id else None
+        return {"query": {"tokens": {"csrftoken": f"{session_id}{ANONYMOUS_TOKEN}" if user else ANONYMOUS_TOKEN}}}
+
+    @staticmethod
+    def _limit(params: dict[str, str], key: str) -> int:
+        limit = params.get(key, "10")
+        return 500 if limit == "max" else min(int(limit), 500)
+
+    def _allpages(self, params: dict[str, str]) -> dict:
+        titles = self.store.titles() if params.get("apnamespace", str(config.DANCE_ITEM_NAMESPACE)) == str(config.DANCE_ITEM_NAMESPACE) else []
+        start = params.get("apcontinue", "")
+        titles = [t for t in titles if t >= start]
+        limit = self._limit(params, "aplimit")
+        response: dict = {"query": {"allpages": [{"ns": config.DANCE_ITEM_NAMESPACE, "title": t} for t in titles[:limit]]}}
+        if len(titles) > limit:
+            response["continue"] = {"apcontinue": titles[limit], "continue": "-||"}
+        return response
+
+    def _recentchanges(self, params: dict[str, str]) -> dict:
+        with self.store._lock:
+            changes = list(enumerate(self.store.changes))
+        start = params.get("rcstart", "")
+        offset = int(params.get("rccontinue", "0"))
+        changes = [(i, c) for i, c in changes if i >= offset and c["timestamp"] >= start]
+        limit = self._limit(params, "rclimit")
+        response: dict = {"query": {"recentchanges": [c for _, c in changes[:limit]]}}
+        if len(changes) > limit:
+            response["continue"] = {"rccontinue": str(changes[limit][0]), "continue": "-||"}
+        return response
+
+    def _login(self, params: dict[str, str]) -> tuple[dict, str]:
+        session_id = secrets.token_hex(16)
+        user = params.get("lgname", "") or "LocalUser"
+        self.sessions[session_id] = user
+        return {"login": {"result": "Success", "lgusername": user}}, session_id
+
+    def _check_write(self, params: dict[str, str], session_id: Optional[str]) -> None:
+        if params.get("token") == ANONYMOUS_TOKEN or not session_id or session_id not in self.sessions:
+            if params.get("assert") in ("user", "bot"):
+                raise ApiError("assertuserfailed", "You are no longer logged in.")
+        elif params.get("token") != f"{session_id}{ANONYMOUS_TOKEN}":
+            raise ApiError("badtoken", "Invalid CSRF token.")
+
+    def sparql(self, query: str) -> dict:
+        """Run a SPARQL query against the store and return SPARQL JSON results."""
+        with self._lock:
+            self.request_counts["sparql"] = self.request_counts.get("sparql", 0) + 1
+            if self._graph is None or self._graph_version != self.store.version:
+                self._graph_version = self.store.version
+                self._graph = self.store.to_graph()
+            graph = self._graph
+        if self.latency:
+            time.sleep(self.latency)
+        with _bound_distinct_aggregates():
+            return json.loads(graph.query(query).serialize(format="json"))
+
+
+class LocalWikibaseHandler(BaseHTTPRequestHandler):
+    server: "LocalWikibaseServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format % args)
+
+    def _params(self) -> dict[str, str]:
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode()
+            params.update({k: v[-1] for k, v in parse_qs(body, keep_blank_values=True).items()})
+        return params
+
+    def _send(self, status: int, payload: dict, session_id: Optional[str] = None, content_type: str = "application/json") -> None:
+        self._send_body(status, json.dumps(payload).encode(), content_type, payload, session_id)
+
+    def _send_body(self, status: int, body: bytes, content_type: str, payload: Optional[dict] = None, session_id: Optional[str] = None) -> None:
+        payload = payload or {}
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        error = payload.get("error")
+        if isinstance(error, dict) and error.get("code") == "maxlag":
+            self.send_header("Retry-After", str(self.server.wikibase.retry_after))
+        if session_id:
+            self.send_header("Set-Cookie", f"{SESSION_COOKIE}={session_id}; Path=/; HttpOnly")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        path = urlparse(self.path).path
+        params = self._params()
+        if path == "/w/api.php":
+            cookie = SimpleCookie(self.headers.get("Cookie", ""))
+            session_id = cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+            response, new_session = self.server.wikibase.api(params, session_id)
+            self._send(200, response, new_session)
+        elif path == "/query/sparql":
+            try:
+                results = self.server.wikibase.sparql(params.get("query", ""))
+            except ImportError:
+                self._send(501, {"error": "The local SPARQL endpoint needs rdflib (pip install rdflib)"})
+                return
+            except Exception as e:
+                self._send(400, {"error": f"Query failed: {e}"})
+                return
+            if TSV_CONTENT_TYPE in self.headers.get("Accept", ""):
+                lines = write_tsv(results["head"]["vars"], results["results"]["bindings"])
+                self._send_body(200, "".join(f"{line}\n" for line in lines).encode(), TSV_CONTENT_TYPE)
+            else:
+                self._send(200, results, content_type="application/sparql-results+json")
+        else:
+            self._send(404, {"error": f"Unknown path {path}"})
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+class LocalWikibaseServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, wikibase: LocalWikibase, host: str = "127.0.0.1", port: int = 8181):
+        super().__init__((host, port), LocalWikibaseHandler)
+        self.wikibase = wikibase
+        self.serve_thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(
+    snapshot: Optional[Path] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    maxlag_ratio: float = 0.0,
+    seed: int = 0,
+    retry_after: int = 5,
+) -> LocalWikibaseServer:
+    """Start a stand-in server in a background thread (port 0 picks a free port). Stop it with shutdown()."""
+    store = EntityStore.from_snapshot(snapshot) if snapshot else EntityStore()
+    server = LocalWikibaseServer(LocalWikibase(store, latency=latency, maxlag_ratio=maxlag_ratio, seed=seed, retry_after=retry_after), host=host, port=port)
+    server.serve_thread = threading.Thread(target=server.serve_forever, name="local-wikibase", daemon=True)
+    server.serve_thread.start()
+    logger.info(f"Local Wikibase serving {len(store.entities)} items at {server.url}")
+    return server
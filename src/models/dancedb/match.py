@@ -11,8 +11,13 @@ from src.utils.google_maps import GoogleMaps
 logger = logging.getLogger(__name__)
 
 
-def match_venues(date_str: str | None = None, skip_prompts: bool = False) -> None:
-    """Match bygdegardarna venues to DanceDB."""
+def match_venues(date_str: str | None = None, skip_prompts: bool = False, match_coordinates: bool = False) -> None:
+    """Match bygdegardarna venues to DanceDB.
+
+    With match_coordinates, venues left unmatched by name are offered the DanceDB
+    venues within COORD_MATCH_THRESHOLD_KM to confirm, as different venues often
+    share a park or building. This needs prompts, so skip_prompts turns it off.
+    """
     date_str = date_str or date.today().strftime("%Y-%m-%d")
     print("\n=== Match venues to DanceDB ===")
 
@@ -55,6 +60,17 @@ def match_venues(date_str: str | None = None, skip_prompts: bool = False) -> Non
             else:
                 unmatched.append(venue)
 
+    by_coordinates = []
+    if match_coordinates and skip_prompts:
+        logger.info("Coordinate matches need confirmation, skipping them with --skip-prompts")
+    elif match_coordinates:
+        by_coordinates = _match_by_coordinates(unmatched, db_path, db_venues)
+    if by_coordinates:
+        enriched.extend(by_coordinates)
+        matched_count += len(by_coordinates)
+        matched_ids = {id(venue) for venue in by_coordinates}
+        unmatched = [venue for venue in unmatched if id(venue) not in matched_ids]
+
     print(f"Matched: {matched_count} venues")
     print(f"Unmatched: {len(unmatched)} venues")
 
@@ -69,3 +85,35 @@ def match_venues(date_str: str | None = None, skip_prompts: bool = False) -> Non
         json.dump(unmatched, f, ensure_ascii=False, indent=2)
 
     print(f"Saved to {enriched_file}")
+
+
+def _match_by_coordinates(venues: list[dict], db_path, db_venues: dict) -> list[dict]:
+    """The venues the user matched to a DanceDB venue within COORD_MATCH_THRESHOLD_KM, with its qid set.
+
+    Uses the coordinate store of the DanceDB snapshot, which is saved beside it
+    and reused until the snapshot changes. Skipped when NumPy is not installed.
+    """
+    try:
+        from src.utils.coord_store import CoordStore, venue_coordinates
+    except ImportError:
+        logger.info("NumPy not installed, skipping coordinate matching of venues")
+        return []
+    from src.models.dancedb.ensure_venue_creator import prompt_for_dancedb_match
+
+    located = [(venue, venue_coordinates("bygdegardarna", venue)) for venue in venues]
+    located = [(venue, (lat, lng)) for venue, (lat, lng) in located if lat is not None and lng is not None]
+    if not located:
+        return []
+    store = CoordStore.for_snapshot(db_path, "dancedb")
+    matched = []
+    nearest = store.nearest([point for _, point in located], config.COORD_MATCH_THRESHOLD_KM, k=5)
+    for (venue, (lat, lng)), hits in zip(located, nearest):
+        candidates = [
+            {"qid": str(store.qid[row]), "label": db_venues.get(str(store.qid[row]), {}).get("label", ""), "distance_km": km} for row, km in hits
+        ]
+        qid = prompt_for_dancedb_match(venue.get("title", ""), {"lat": lat, "lng": lng}, candidates)
+        if qid:
+            venue["qid"] = qid
+            matched.append(venue)
+            logger.info(f"Coordinate matched '{venue.get('title', '')}' to {qid}")
+    return matched
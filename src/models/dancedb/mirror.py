@@ -0,0 +1,358 @@
+"""Local SQLite mirror of the DanceDB items, for reads without SPARQL.
+
+The first sync lists all items (list=allpages) and fetches them with
+wbgetentities. Later syncs only fetch the items that appear in
+list=recentchanges since the previous sync, so a typical run costs one API
+call. Labels, aliases, truthy statements and coordinates are kept in indexed
+tables that DancedbClient and the bulk loaders read instead of the query
+service.
+
+The mirror is disabled until configure_mirror() is called (the CLI does this
+unless --no-mirror is given), so library use and tests go to the endpoint.
+Writes through the client call invalidate_cache(), which marks the mirror
+stale; the next read then picks up the written items from recentchanges.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import config
+from src.models.dancedb.api import read_api, setting
+from src.models.dancedb.entities import fetch_entities_batched
+from src.utils.sparql import add_invalidation_listener
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = "1"
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS items (qid TEXT PRIMARY KEY, lastrevid INTEGER);
+CREATE TABLE IF NOT EXISTS labels (qid TEXT NOT NULL, lang TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (qid, lang));
+CREATE INDEX IF NOT EXISTS labels_value ON labels (lang, value);
+CREATE TABLE IF NOT EXISTS aliases (qid TEXT NOT NULL, lang TEXT NOT NULL, value TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS aliases_qid ON aliases (qid);
+CREATE INDEX IF NOT EXISTS aliases_value ON aliases (lang, value);
+CREATE TABLE IF NOT EXISTS claims (qid TEXT NOT NULL, prop TEXT NOT NULL, value TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS claims_qid ON claims (qid, prop);
+CREATE INDEX IF NOT EXISTS claims_value ON claims (prop, value);
+CREATE TABLE IF NOT EXISTS coordinates (qid TEXT NOT NULL, lat REAL NOT NULL, lng REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS coordinates_qid ON coordinates (qid);
+CREATE INDEX IF NOT EXISTS coordinates_lat ON coordinates (lat, lng);
+"""
+
+DATA_TABLES = ("items", "labels", "aliases", "claims", "coordinates")
+
+
+def _qid_order(column: str = "qid") -> str:
+    """ORDER BY expression for numeric QID order."""
+    return f"CAST(SUBSTR({column}, 2) AS INTEGER)"
+
+
+def _truthy(statements: list[dict]) -> list[dict]:
+    """Statements of the best rank, like the ddt: truthy triples of the query service."""
+    preferred = [s for s in statements if s.get("rank") == "preferred"]
+    return preferred or [s for s in statements if s.get("rank", "normal") == "normal"]
+
+
+def claim_value(datavalue: dict) -> Optional[str]:
+    """The value of a statement as the query service renders it.
+
+    Items become QIDs, coordinates WKT "Point(lng lat)" and times xsd:dateTime text.
+    """
+    value = datavalue.get("value")
+    if isinstance(value, dict):
+        if "numeric-id" in value:
+            return value.get("id") or f"Q{value['numeric-id']}"
+        if "latitude" in value:
+            return f"Point({value['longitude']} {value['latitude']})"
+        if "time" in value:
+            return value["time"].lstrip("+")
+        if "amount" in value:
+            return value["amount"].lstrip("+")
+        if "text" in value:
+            return value["text"]
+        return None
+    return value
+
+
+def first_value(item: dict, prop_nr: str) -> str:
+    """First value of a property of an item from DanceMirror.items(), or ""."""
+    return item["claims"].get(prop_nr, [""])[0]
+
+
+class DanceMirror:
+    """SQLite copy of DanceDB items, kept current from recentchanges."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.RLock()
+        self._stale = True
+        self._checked_at = 0.0
+        with self._lock, self._conn:
+            if self._meta("schema") not in (None, SCHEMA_VERSION):
+                for table in DATA_TABLES + ("meta",):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._conn.executescript(SCHEMA)
+            self._set_meta("schema", SCHEMA_VERSION)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _meta(self, key: str) -> Optional[str]:
+        try:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    # Updating
+
+    def mark_stale(self) -> None:
+        """Check recentchanges before the next read, e.g. after a write."""
+        self._stale = True
+
+    def ensure_current(self) -> None:
+        """Sync if marked stale or not checked for config.MIRROR_SYNC_INTERVAL_SECONDS."""
+        if self._stale or time.time() - self._checked_at > config.MIRROR_SYNC_INTERVAL_SECONDS:
+            self.sync()
+
+    def sync(self, full: bool = False) -> None:
+        """Reload everything, or apply the changes since the last sync.
+
+        A full load is also done when the mirror is empty, belongs to another
+        wiki, or was last synced longer ago than recentchanges reaches back.
+        """
+        with self._lock:
+            api_url = setting("MEDIAWIKI_API_URL")
+            last_change = self._meta("rc_timestamp")
+            too_old = last_change and datetime.strptime(last_change, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc) < (
+                datetime.now(timezone.utc) - timedelta(days=config.MIRROR_RC_MAX_AGE_DAYS)
+            )
+            if full or not last_change or too_old or self._meta("api_url") != api_url:
+                self._full_load(api_url)
+            else:
+                self._apply_recent_changes(last_change)
+            self._stale = False
+            self._checked_at = time.time()
+
+    def _full_load(self, api_url: str) -> None:
+        # Changes made while loading are picked up by the next incremental sync
+        started = datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+        qids = [title.rsplit(":", 1)[-1] for title in self._list_item_titles()]
+        logger.info(f"Loading {len(qids)} DanceDB items into the mirror")
+        entities = fetch_entities_batched(qids)
+        with self._conn:
+            for table in DATA_TABLES:
+                self._conn.execute(f"DELETE FROM {table}")
+            for qid, entity in entities.items():
+                if entity.get("id") == qid:
+                    self._store(entity)
+            self._set_meta("rc_timestamp", started)
+            self._set_meta("api_url", api_url)
+        logger.info(f"Mirrored {len(self)} DanceDB items to {self.path}")
+
+    def _apply_recent_changes(self, since: str) -> None:
+        titles, newest = self._recent_changes(since)
+        if titles:
+            self.refresh(title.rsplit(":", 1)[-1] for title in titles)
+        with self._conn:
+            self._set_meta("rc_timestamp", newest or since)
+        logger.info(f"Applied {len(titles)} changed DanceDB items to the mirror")
+
+    def refresh(self, qids: Iterable[str]) -> None:
+        """Re-fetch items; deleted and redirected (merged) items are removed."""
+        qids = list(dict.fromkeys(qids))
+        entities = fetch_entities_batched(qids)
+        with self._lock, self._conn:
+            for qid in qids:
+                entity = entities.get(qid)
+                self._delete(qid)
+                if entity is not None:
+                    self._delete(entity["id"])
+                    self._store(entity)
+
+    def _delete(self, qid: str) -> None:
+        for table in DATA_TABLES:
+            self._conn.execute(f"DELETE FROM {table} WHERE qid = ?", (qid,))
+
+    def _store(self, entity: dict) -> None:
+        qid = entity["id"]
+        self._conn.execute("INSERT OR REPLACE INTO items (qid, lastrevid) VALUES (?, ?)", (qid, entity.get("lastrevid")))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO labels (qid, lang, value) VALUES (?, ?, ?)",
+            [(qid, lang, term["value"]) for lang, term in entity.get("labels", {}).items()],
+        )
+        self._conn.executemany(
+            "INSERT INTO aliases (qid, lang, value) VALUES (?, ?, ?)",
+            [(qid, lang, alias["value"]) for lang, aliases in entity.get("aliases", {}).items() for alias in aliases],
+        )
+        for prop, statements in entity.get("claims", {}).items():
+            for statement in _truthy(statements):
+                datavalue = statement.get("mainsnak", {}).get("datavalue")
+                value = claim_value(datavalue) if datavalue else None
+                if value is None:
+                    continue
+                self._conn.execute("INSERT INTO claims (qid, prop, value) VALUES (?, ?, ?)", (qid, prop, value))
+                if prop == config.DANCE_PROP_COORDINATES:
+                    coordinate = datavalue["value"]
+                    self._conn.execute(
+                        "INSERT INTO coordinates (qid, lat, lng) VALUES (?, ?, ?)", (qid, coordinate["latitude"], coordinate["longitude"])
+                    )
+
+    @staticmethod
+    def _query_pages(data: dict, list_name: str) -> Iterator[dict]:
+        """Yield the rows of a list query, following continuation."""
+        params = dict(data)
+        while True:
+            response = read_api(params)
+            yield from response.get("query", {}).get(list_name, [])
+            if "continue" not in response:
+                return
+            params = {**data, **response["continue"]}
+
+    def _list_item_titles(self) -> list[str]:
+        data = {
+            "action": "query", "list": "allpages", "apnamespace": str(config.DANCE_ITEM_NAMESPACE),
+            "apfilterredir": "nonredirects", "aplimit": "max",
+        }
+        return [page["title"] for page in self._query_pages(data, "allpages")]
+
+    def _recent_changes(self, since: str) -> tuple[set[str], Optional[str]]:
+        """Titles of items changed at or after since, and the newest change timestamp."""
+        data = {
+            "action": "query", "list": "recentchanges", "rcnamespace": str(config.DANCE_ITEM_NAMESPACE),
+            "rcstart": since, "rcdir": "newer", "rcprop": "title|timestamp", "rclimit": "max",
+        }
+        titles, newest = set(), None
+        for change in self._query_pages(data, "recentchanges"):
+            titles.add(change["title"])
+            newest = max(newest or change["timestamp"], change["timestamp"])
+        return titles, newest
+
+    # Reading
+
+    def find_by_label(self, labels: list[str], instance_qid: str, lang: str = "sv") -> dict[str, list[str]]:
+        """QIDs of instance_qid items per exact label in lang."""
+        self.ensure_current()
+        matches: dict[str, list[str]] = {label: [] for label in labels}
+        with self._lock:
+            for start in range(0, len(labels), 500):
+                chunk = labels[start:start + 500]
+                rows = self._conn.execute(
+                    f"""SELECT l.value, l.qid FROM labels l JOIN claims c ON c.qid = l.qid
+                    WHERE l.lang = ? AND l.value IN ({",".join("?" * len(chunk))}) AND c.prop = ? AND c.value = ?
+                    ORDER BY {_qid_order("l.qid")}""",
+                    (lang, *chunk, config.DANCE_PROP_INSTANCE_OF, instance_qid),
+                )
+                for label, qid in rows:
+                    matches[label].append(qid)
+        return matches
+
+    def items(self, instance_qid: str, lang: str = "sv") -> dict[str, dict]:
+        """All instance_qid items as {qid: {"label", "aliases", "claims": {prop: [values]}}}.
+
+        label and aliases are in lang, label is "" when missing.
+        """
+        self.ensure_current()
+        members = "SELECT qid FROM claims WHERE prop = ? AND value = ?"
+        instance = (config.DANCE_PROP_INSTANCE_OF, instance_qid)
+        with self._lock:
+            rows = self._conn.execute(f"{members} ORDER BY {_qid_order()}", instance)
+            items = {qid: {"label": "", "aliases": [], "claims": {}} for (qid,) in rows}
+            for qid, value in self._conn.execute(f"SELECT qid, value FROM labels WHERE lang = ? AND qid IN ({members})", (lang, *instance)):
+                items[qid]["label"] = value
+            for qid, value in self._conn.execute(f"SELECT qid, value FROM aliases WHERE lang = ? AND qid IN ({members})", (lang, *instance)):
+                items[qid]["aliases"].append(value)
+            for qid, prop, value in self._conn.execute(f"SELECT qid, prop, value FROM claims WHERE qid IN ({members})", instance):
+                items[qid]["claims"].setdefault(prop, []).append(value)
+        return items
+
+    def labels(self, qids: Iterable[str], lang: str) -> dict[str, str]:
+        """Labels in lang of the given items that have one."""
+        qids = list(qids)
+        result = {}
+        with self._lock:
+            for start in range(0, len(qids), 500):
+                chunk = qids[start:start + 500]
+                rows = self._conn.execute(f"SELECT qid, value FROM labels WHERE lang = ? AND qid IN ({','.join('?' * len(chunk))})", (lang, *chunk))
+                result.update(rows)
+        return result
+
+    def all_labels(self, lang: str) -> Iterator[tuple[str, str]]:
+        """(qid, label) of all items with a label in lang."""
+        self.ensure_current()
+        with self._lock:
+            rows = self._conn.execute("SELECT qid, value FROM labels WHERE lang = ?", (lang,)).fetchall()
+        return iter(rows)
+
+    def property_values(self, prop_nr: str) -> Iterator[tuple[str, str]]:
+        """(qid, value) of all truthy prop_nr statements."""
+        self.ensure_current()
+        with self._lock:
+            rows = self._conn.execute("SELECT qid, value FROM claims WHERE prop = ?", (prop_nr,)).fetchall()
+        return iter(rows)
+
+    def venues_in_box(self, lat_min: float, lat_max: float, lng_min: float, lng_max: float) -> list[dict]:
+        """Venues with a coordinate inside the box, as {qid, label, lat, lng, aliases} (sv)."""
+        self.ensure_current()
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT p.qid, p.lat, p.lng, COALESCE(l.value, '') FROM coordinates p
+                JOIN claims c ON c.qid = p.qid AND c.prop = ? AND c.value = ?
+                LEFT JOIN labels l ON l.qid = p.qid AND l.lang = 'sv'
+                WHERE p.lat BETWEEN ? AND ? AND p.lng BETWEEN ? AND ?
+                ORDER BY {_qid_order("p.qid")}""",
+                (config.DANCE_PROP_INSTANCE_OF, config.DANCE_INSTANCE_VENUE, lat_min, lat_max, lng_min, lng_max),
+            ).fetchall()
+            venues = []
+            for qid, lat, lng, label in rows:
+                aliases = [a for (a,) in self._conn.execute("SELECT value FROM aliases WHERE qid = ? AND lang = 'sv'", (qid,))]
+                venues.append({"qid": qid, "label": label, "lat": lat, "lng": lng, "aliases": aliases})
+        return venues
+
+
+_mirror: Optional[DanceMirror] = None
+_enabled = False
+_mirror_lock = threading.Lock()
+
+
+def configure_mirror(enabled: bool = True) -> None:
+    """Enable or disable reading from the local mirror for this process."""
+    global _enabled
+    _enabled = enabled
+
+
+def get_mirror() -> Optional[DanceMirror]:
+    """The process-wide mirror, or None when it is disabled."""
+    global _mirror
+    if not _enabled:
+        return None
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = DanceMirror(config.mirror_db_path)
+        return _mirror
+
+
+def mark_mirror_stale() -> None:
+    """Make the next read check recentchanges (called after writes)."""
+    if _mirror is not None:
+        _mirror.mark_stale()
+
+
+add_invalidation_listener(mark_mirror_stale)
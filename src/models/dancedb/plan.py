@@ -0,0 +1,188 @@
+"""Plan files: collect intended DanceDB edits, approve them, apply them later.
+
+With the global --plan flag the CLI starts a plan before running a command.
+Code paths that would create or edit items then record an EntityEdit on the
+active plan instead of asking for confirmation and writing. The plan is saved
+as JSON under config.plans_dir, where it can be edited by hand, approved with
+approve-plan and written in one batched pass with apply-plan.
+"""
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import questionary
+from pydantic import PrivateAttr
+
+import config
+from src.models.base import DanceBaseModel
+from src.models.dancedb.edits import EntityEdit
+from src.models.dancedb.labels import checked_label, get_label_index
+
+logger = logging.getLogger(__name__)
+
+
+class PlannedEdit(DanceBaseModel):
+    """An edit in a plan, with its approval and apply status."""
+
+    edit: EntityEdit
+    source: str = ""
+    approved: bool = False
+    qid: Optional[str] = None
+    error: str = ""
+    # Items that already have the label of a new band or venue, when it was planned
+    clashes: list[str] = []
+
+    @property
+    def applied(self) -> bool:
+        return self.qid is not None and not self.error
+
+
+class Plan(DanceBaseModel):
+    """A list of planned edits produced by one command run."""
+
+    name: str
+    created_at: datetime
+    edits: list[PlannedEdit] = []
+    # JSON of the planned edits, built on first add(); planned creates return no QID, so callers repeat them
+    _planned: Optional[set[str]] = PrivateAttr(default=None)
+
+    def add(self, edit: EntityEdit, source: str = "") -> bool:
+        """Plan edit unless the same edit is already planned (e.g. creating one new band for every row it plays).
+
+        Returns whether the edit was added.
+        """
+        if self._planned is None:
+            self._planned = {planned.edit.model_dump_json() for planned in self.edits}
+        key = edit.model_dump_json()
+        if key in self._planned:
+            logger.debug(f"Already planned {edit.describe()}")
+            return False
+        self._planned.add(key)
+        label = checked_label(edit)
+        clashes = get_label_index().lookup(label) if label else []
+        if clashes:
+            logger.warning(f"Label '{label}' is already used by {', '.join(clashes)}")
+        self.edits.append(PlannedEdit(edit=edit, source=source or self.name, clashes=clashes))
+        logger.info(f"Planned {edit.describe()}")
+        print(f"  Planned: {edit.describe()}")
+        return True
+
+    def pending(self) -> list[PlannedEdit]:
+        """Approved edits that have not been applied yet."""
+        return [p for p in self.edits if p.approved and not p.applied]
+
+    def default_path(self) -> Path:
+        return config.plans_dir / f"{self.created_at.strftime('%Y-%m-%d-%H%M%S')}-{self.name}.json"
+
+    def save(self, path: Path | None = None) -> Path:
+        path = path or self.default_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.model_dump_json(indent=2))
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "Plan":
+        return cls.model_validate_json(path.read_text())
+
+
+_active_plan: Optional[Plan] = None
+
+
+def start_plan(name: str) -> Plan:
+    """Start collecting edits instead of writing them."""
+    global _active_plan
+    _active_plan = Plan(name=name, created_at=datetime.now().replace(microsecond=0))
+    return _active_plan
+
+
+def active_plan() -> Optional[Plan]:
+    """Return the plan being collected, or None when edits should be written directly."""
+    return _active_plan
+
+
+def finish_plan() -> Optional[Path]:
+    """Save and stop the active plan. Returns the plan file, or None if nothing was planned."""
+    global _active_plan
+    plan, _active_plan = _active_plan, None
+    if plan is None or not plan.edits:
+        return None
+    return plan.save()
+
+
+def approve_plan(path: Path, approve_all: bool = False) -> None:
+    """Approve the edits of a plan file in bulk or one by one."""
+    plan = Plan.load(path)
+    unapproved = [p for p in plan.edits if not p.approved and not p.applied]
+    print(f"\n=== Approve plan {path.name} ===")
+    print(f"{len(plan.edits)} edits, {len(unapproved)} awaiting approval")
+    if not unapproved:
+        return
+
+    for planned in unapproved:
+        print(f"  [{planned.source}] {planned.edit.describe()}{_clash_note(planned)}")
+
+    if not approve_all:
+        choice = questionary.select("Approve edits?", choices=["Approve all", "Review one by one", "Abort"]).ask()
+        if choice == "Abort" or choice is None:
+            print("Aborting...")
+            return
+        approve_all = choice == "Approve all"
+
+    for planned in unapproved:
+        if approve_all and not planned.clashes:
+            planned.approved = True
+            continue
+        if approve_all:
+            # Like a direct create, a label clash is never approved in bulk
+            print(f"  Not approved: {planned.edit.describe()}{_clash_note(planned)}")
+            continue
+        response = questionary.select(
+            f"{planned.edit.describe()}{_clash_note(planned)}", choices=["Approve", "Skip", "Approve remaining", "Stop"]
+        ).ask()
+        if response == "Approve":
+            planned.approved = True
+        elif response == "Approve remaining":
+            approve_all = True
+            planned.approved = True
+        elif response == "Stop":
+            break
+
+    plan.save(path)
+    print(f"Approved {sum(1 for p in plan.edits if p.approved)}/{len(plan.edits)} edits in {path}")
+
+
+def _clash_note(planned: PlannedEdit) -> str:
+    return f" (label already used by {', '.join(planned.clashes)})" if planned.clashes else ""
+
+
+def apply_plan(path: Path, max_workers: int = config.WRITE_MAX_WORKERS) -> None:
+    """Write the approved, not yet applied edits of a plan file through the BatchWriter.
+
+    Results are written back to the plan file, so a partially failed run can be re-applied.
+    """
+    from src.models.dancedb.client import get_client
+    from src.models.dancedb.writer import BatchWriter, WriteResult
+
+    plan = Plan.load(path)
+    pending = plan.pending()
+    print(f"\n=== Apply plan {path.name} ===")
+    print(f"{len(pending)} approved edits to apply")
+    if not pending:
+        return
+
+    client = get_client()
+    writer = BatchWriter(client.login, max_workers=max_workers)
+    for planned in pending:
+        def record(result: WriteResult, planned: PlannedEdit = planned) -> None:
+            planned.qid = result.qid
+            planned.error = result.error
+            if result.ok:
+                print(f"  Applied: {client.base_url}/wiki/Item:{result.qid} ({result.edit.label})")
+            else:
+                print(f"  FAILED: {result.edit.describe()}: {result.error}")
+        writer.submit(planned.edit, on_done=record)
+
+    results = writer.run()
+    plan.save(path)
+    print(f"\nDone! Applied {sum(1 for r in results if r.ok)}/{len(results)} edits, results saved to {path}")
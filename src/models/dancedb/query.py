@@ -0,0 +1,436 @@
+"""Read-only access to DanceDB: label searches, bulk reads and entity lookups.
+
+Reads go to the local mirror when it is enabled and otherwise to the query
+service and wbgetentities, over shared HTTP sessions. Nothing here imports
+wikibaseintegrator, questionary or rich or logs in, so read-only commands use
+get_query_client() and start fast; DancedbClient extends DancedbQuery with the
+writes and logs in on its first write.
+"""
+import logging
+import math
+import threading
+from typing import Iterable, Optional
+
+import config
+from src.models.dancedb.api import setting
+from src.models.dancedb.bindings import binding_value, parse_point, qid_from_uri, split_aliases
+from src.models.dancedb.entities import EntityCache, fetch_entities_batched
+from src.models.dancedb.mirror import first_value, get_mirror
+from src.utils.sparql import KEYSET_FILTER, execute_sparql_query, iter_sparql_bindings
+
+DUPLICATE_CHECK_PROPS = [getattr(config, prop) for prop in config.DUPLICATE_CHECK_PROPERTIES]
+DUPLICATE_CHECK_FILTER = " || ".join([f"EXISTS {{ ?item ddt:{prop} ?v }}" for prop in DUPLICATE_CHECK_PROPS])
+
+SEARCH_BATCH_SIZE = 100
+
+# Bulk queries return one row per item: multi-valued OPTIONALs are collapsed
+# with SAMPLE/GROUP_CONCAT on the server instead of in Python.
+ARTISTS_QUERY = """
+PREFIX dd: <https://dance.wikibase.cloud/entity/>
+PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+
+SELECT ?item (SAMPLE(?svLabel) AS ?label) (GROUP_CONCAT(DISTINCT ?svAlias; SEPARATOR = "|") AS ?aliasStr)
+       (SAMPLE(?anyP3) AS ?p3) (SAMPLE(?anyP46) AS ?p46) WHERE {
+    ?item ddt:P1 dd:Q225 .
+    OPTIONAL { ?item rdfs:label ?svLabel FILTER(LANG(?svLabel) = "sv") }
+    OPTIONAL { ?item skos:altLabel ?svAlias FILTER(LANG(?svAlias) = "sv") }
+    OPTIONAL { ?item ddt:P3 ?anyP3 }
+    OPTIONAL { ?item ddt:P46 ?anyP46 }
+    """ + KEYSET_FILTER + """
+}
+GROUP BY ?item
+"""
+
+VENUES_QUERY = """
+PREFIX dd: <https://dance.wikibase.cloud/entity/>
+PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+
+SELECT ?item (SAMPLE(?svLabel) AS ?label) (GROUP_CONCAT(DISTINCT ?svAlias; SEPARATOR = "|") AS ?aliasStr)
+       (SAMPLE(?anyP4) AS ?p4) WHERE {
+    ?item ddt:P1 dd:Q20 .
+    OPTIONAL { ?item rdfs:label ?svLabel FILTER(LANG(?svLabel) = "sv") }
+    OPTIONAL { ?item skos:altLabel ?svAlias FILTER(LANG(?svAlias) = "sv") }
+    OPTIONAL { ?item ddt:P4 ?anyP4 }
+    FILTER (""" + DUPLICATE_CHECK_FILTER + """)
+    """ + KEYSET_FILTER + """
+}
+GROUP BY ?item
+"""
+
+ALL_VENUES_QUERY = """
+PREFIX dd: <https://dance.wikibase.cloud/entity/>
+PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+
+SELECT ?item (COALESCE(SAMPLE(?svLabel), "") AS ?itemLabel) (GROUP_CONCAT(DISTINCT ?svAlias; SEPARATOR = "|") AS ?aliasStr)
+       (SAMPLE(?anyGeo) AS ?geo) WHERE {
+    ?item ddt:P1 dd:Q20 .
+    OPTIONAL { ?item rdfs:label ?svLabel FILTER(LANG(?svLabel) = "sv") }
+    OPTIONAL { ?item skos:altLabel ?svAlias FILTER(LANG(?svAlias) = "sv") }
+    OPTIONAL { ?item ddt:P4 ?anyGeo }
+    """ + KEYSET_FILTER + """
+}
+GROUP BY ?item
+"""
+
+VENUES_WITH_EXTERNAL_IDS_QUERY = """
+PREFIX dd: <https://dance.wikibase.cloud/entity/>
+PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+SELECT ?item (SAMPLE(?svLabel) AS ?label) (SAMPLE(?anyP4) AS ?p4) (SAMPLE(?anyP3) AS ?p3) (SAMPLE(?anyP42) AS ?p42)
+       (SAMPLE(?anyP44) AS ?p44) (SAMPLE(?anyP46) AS ?p46) (SAMPLE(?anyP12) AS ?p12) WHERE {
+    ?item ddt:P1 dd:Q20 .
+    ?item ddt:P4 ?anyP4 .
+    OPTIONAL { ?item rdfs:label ?svLabel FILTER(LANG(?svLabel) = "sv") }
+    OPTIONAL { ?item ddt:P3 ?anyP3 }
+    OPTIONAL { ?item ddt:P42 ?anyP42 }
+    OPTIONAL { ?item ddt:P44 ?anyP44 }
+    OPTIONAL { ?item ddt:P46 ?anyP46 }
+    OPTIONAL { ?item ddt:P12 ?anyP12 }
+    FILTER (""" + DUPLICATE_CHECK_FILTER + """)
+    """ + KEYSET_FILTER + """
+}
+GROUP BY ?item
+"""
+
+
+logger = logging.getLogger(__name__)
+
+
+def _sparql_string(value: str) -> str:
+    """Escape a Python string for use as a SPARQL string literal."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class DancedbQuery:
+    """Read methods shared by the query client and DancedbClient.
+
+    Failed reads raise (src.utils.http.EndpointUnavailable once retries are
+    exhausted) instead of returning empty results that would look like "not found".
+    """
+
+    def __init__(self):
+        self.base_url = setting("WIKIBASE_URL")
+        self.entity_cache = EntityCache(config.ENTITY_CACHE_SIZE)
+
+    def _unique_match(self, name: str, qids: list[str], kind: str) -> Optional[str]:
+        if len(qids) == 1:
+            logger.info(f"Found {kind} '{name}' on DanceDB: {self.base_url}/wiki/Item:{qids[0]}")
+            return qids[0]
+        if len(qids) > 1:
+            logger.warning(f"Multiple matches for '{name}': {qids}")
+        return None
+
+    def search_band(self, band_name: str) -> Optional[str]:
+        mirror = get_mirror()
+        if mirror is not None:
+            return self._unique_match(band_name, mirror.find_by_label([band_name], config.DANCE_INSTANCE_ARTIST)[band_name], "band")
+        sparql = f"""
+        PREFIX dd: <https://dance.wikibase.cloud/entity/>
+        PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
+        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+        SELECT ?item WHERE {{
+          ?item rdfs:label "{band_name}"@sv .
+          {{ ?item ddt:P1 dd:Q225 }}
+        }}
+        """
+        results = execute_sparql_query(query=sparql)
+        items = results["results"]["bindings"]
+        if len(items) == 1:
+            qid = items[0]["item"]["value"].rsplit("/", 1)[-1]
+            logger.info(f"Found band '{band_name}' on DanceDB: {self.base_url}/wiki/Item:{qid}")
+            return qid
+        elif len(items) > 1:
+            logger.warning(f"Multiple matches for '{band_name}': {[i['item']['value'] for i in items]}")
+        return None
+
+    def search_bands(self, band_names: list[str]) -> dict[str, Optional[str]]:
+        """Search for many bands by exact Swedish label using batched VALUES queries.
+
+        Returns dict mapping each input name to its QID, or None when there is no
+        unique match.
+        """
+        return self._search_labels(band_names, config.DANCE_INSTANCE_ARTIST, "band")
+
+    def search_venues(self, venue_names: list[str]) -> dict[str, Optional[str]]:
+        """Search for many venues by exact Swedish label using batched VALUES queries.
+
+        Returns dict mapping each input name to its QID, or None when there is no
+        unique match.
+        """
+        return self._search_labels(venue_names, config.DANCE_INSTANCE_VENUE, "venue")
+
+    def _search_labels(self, names: list[str], instance_qid: str, kind: str) -> dict[str, Optional[str]]:
+        unique_names = list(dict.fromkeys(n for n in names if n))
+        results: dict[str, Optional[str]] = {}
+        mirror = get_mirror()
+        if mirror is not None:
+            for name, qids in mirror.find_by_label(unique_names, instance_qid).items():
+                if len(qids) > 1:
+                    logger.warning(f"Multiple matches for '{name}': {qids}")
+                results[name] = qids[0] if len(qids) == 1 else None
+            return results
+        for start in range(0, len(unique_names), SEARCH_BATCH_SIZE):
+            chunk = unique_names[start:start + SEARCH_BATCH_SIZE]
+            values = " ".join(f'"{_sparql_string(name)}"@sv' for name in chunk)
+            sparql = f"""
+        PREFIX dd: <https://dance.wikibase.cloud/entity/>
+        PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
+        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+        SELECT ?item ?label WHERE {{
+          VALUES ?label {{ {values} }}
+          ?item rdfs:label ?label .
+          ?item ddt:{config.DANCE_PROP_INSTANCE_OF} dd:{instance_qid} .
+        }}
+        """
+            bindings = execute_sparql_query(query=sparql)["results"]["bindings"]
+
+            matches: dict[str, list[str]] = {name: [] for name in chunk}
+            for binding in bindings:
+                label = binding["label"]["value"]
+                if label in matches:
+                    matches[label].append(binding["item"]["value"].rsplit("/", 1)[-1])
+            for name, qids in matches.items():
+                if len(qids) > 1:
+                    logger.warning(f"Multiple matches for '{name}': {qids}")
+                results[name] = qids[0] if len(qids) == 1 else None
+            logger.info(f"Searched {len(chunk)} {kind}s on DanceDB, found {sum(1 for n in chunk if results[n])}")
+        return results
+
+    def fetch_artists_from_dancedb(self) -> list[dict]:
+        """Fetch all artist items from DanceDB (instance of Q225).
+
+        Returns list of {qid, label, aliases, p3, p46}.
+        """
+        mirror = get_mirror()
+        if mirror is not None:
+            return [
+                {
+                    "qid": qid,
+                    "label": item["label"],
+                    "aliases": [a.lower() for a in dict.fromkeys(item["aliases"])],
+                    "p3": first_value(item, config.DANCE_PROP_WIKIDATA),
+                    "p46": first_value(item, config.DANCE_PROP_SPELPLAN_ID),
+                }
+                for qid, item in mirror.items(config.DANCE_INSTANCE_ARTIST).items()
+            ]
+        items = []
+        for row in iter_sparql_bindings(ARTISTS_QUERY):
+            items.append({
+                "qid": qid_from_uri(binding_value(row, "item")),
+                "label": binding_value(row, "label"),
+                "aliases": split_aliases(binding_value(row, "aliasStr")),
+                "p3": binding_value(row, "p3"),
+                "p46": binding_value(row, "p46"),
+            })
+        logger.info(f"Fetched {len(items)} artists from DanceDB")
+        return items
+
+    def fetch_venues_from_dancedb(self) -> list[dict]:
+        """Fetch all venue items from DanceDB (instance of Q20).
+
+        Returns list of {qid, label, aliases, p4 (coordinates), lat, lng}.
+        """
+        mirror = get_mirror()
+        if mirror is not None:
+            venues = []
+            for qid, item in mirror.items(config.DANCE_INSTANCE_VENUE).items():
+                if not any(prop in item["claims"] for prop in DUPLICATE_CHECK_PROPS):
+                    continue
+                p4 = first_value(item, config.DANCE_PROP_COORDINATES)
+                lat, lng = parse_point(p4)
+                venues.append({"qid": qid, "label": item["label"], "aliases": list(dict.fromkeys(item["aliases"])), "p4": p4, "lat": lat, "lng": lng})
+            return venues
+        venues = []
+        for row in iter_sparql_bindings(VENUES_QUERY):
+            p4 = binding_value(row, "p4")
+            lat, lng = parse_point(p4)
+            venues.append({
+                "qid": qid_from_uri(binding_value(row, "item")),
+                "label": binding_value(row, "label"),
+                "aliases": split_aliases(binding_value(row, "aliasStr"), lower=False),
+                "p4": p4,
+                "lat": lat,
+                "lng": lng,
+            })
+        logger.info(f"Fetched {len(venues)} venues from DanceDB")
+        return venues
+
+    def fetch_venues_with_external_ids(self) -> list[dict]:
+        """Fetch all venue items from DanceDB with external IDs and website.
+
+        Returns list of {qid, label, p4, lat, lng, p3, p42, p44, p46, p12}.
+        Only returns venues that have P4 (coordinates).
+        """
+        mirror = get_mirror()
+        if mirror is not None:
+            venues = []
+            for qid, item in mirror.items(config.DANCE_INSTANCE_VENUE).items():
+                p4 = first_value(item, config.DANCE_PROP_COORDINATES)
+                if not p4 or not any(prop in item["claims"] for prop in DUPLICATE_CHECK_PROPS):
+                    continue
+                lat, lng = parse_point(p4)
+                venues.append({
+                    "qid": qid,
+                    "label": item["label"],
+                    "p4": p4,
+                    "lat": lat,
+                    "lng": lng,
+                    **{prop: first_value(item, prop.upper()) for prop in ("p3", "p42", "p44", "p46", "p12")},
+                })
+            return venues
+        venues = []
+        for row in iter_sparql_bindings(VENUES_WITH_EXTERNAL_IDS_QUERY):
+            p4 = binding_value(row, "p4")
+            lat, lng = parse_point(p4)
+            venues.append({
+                "qid": qid_from_uri(binding_value(row, "item")),
+                "label": binding_value(row, "label"),
+                "p4": p4,
+                "lat": lat,
+                "lng": lng,
+                **{prop: binding_value(row, prop) for prop in ("p3", "p42", "p44", "p46", "p12")},
+            })
+        logger.info(f"Fetched {len(venues)} venues with coordinates from DanceDB")
+        return venues
+
+    def search_venue(self, venue_name: str) -> Optional[str]:
+        """Search for venue by exact label match."""
+        mirror = get_mirror()
+        if mirror is not None:
+            return self._unique_match(venue_name, mirror.find_by_label([venue_name], config.DANCE_INSTANCE_VENUE)[venue_name], "venue")
+        sparql = f"""
+        PREFIX dd: <https://dance.wikibase.cloud/entity/>
+        PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
+        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+        PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+
+        SELECT ?item WHERE {{
+          ?item rdfs:label "{venue_name}"@sv .
+          ?item ddt:P1 dd:Q20 .
+        }}
+        """
+        results = execute_sparql_query(query=sparql)
+        items = results["results"]["bindings"]
+        if len(items) == 1:
+            qid = items[0]["item"]["value"].rsplit("/", 1)[-1]
+            logger.info(f"Found venue '{venue_name}' on DanceDB: {self.base_url}/wiki/Item:{qid}")
+            return qid
+        elif len(items) > 1:
+            logger.warning(f"Multiple matches for '{venue_name}': {[i['item']['value'] for i in items]}")
+        return None
+
+    def find_venues_by_coordinates(self, lat: float, lng: float, threshold_km: float = 0.1) -> list[dict]:
+        """Query DanceDB for venues within distance threshold.
+
+        Uses wikibase:box for bounding box query, then filters by exact haversine distance.
+        Returns list of {qid, label, lat, lng, distance_km}.
+        """
+        from src.utils.distance import haversine_distance
+
+        lat_delta = threshold_km / 111
+        lng_delta = threshold_km / (111 * math.cos(math.radians(lat)))
+
+        lng_min = lng - lng_delta
+        lng_max = lng + lng_delta
+        lat_min = lat - lat_delta
+        lat_max = lat + lat_delta
+
+        mirror = get_mirror()
+        if mirror is not None:
+            matches = []
+            for venue in mirror.venues_in_box(lat_min, lat_max, lng_min, lng_max):
+                dist = haversine_distance(lat, lng, venue["lat"], venue["lng"])
+                if dist <= threshold_km:
+                    matches.append({**venue, "label": venue["label"] or venue["qid"], "distance_km": dist, "aliases": [a.lower() for a in venue["aliases"]]})
+            matches.sort(key=lambda x: x["distance_km"])
+            return matches
+
+        sparql = f"""
+        PREFIX dd: <https://dance.wikibase.cloud/entity/>
+        PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
+        PREFIX geo: <http://www.opengis.net/ont/geosparql#>
+        PREFIX bd: <http://www.bigdata.com/rdf#>
+        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+        PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+
+        SELECT ?item ?itemLabel (GROUP_CONCAT(?svAlias; SEPARATOR = "|") AS ?aliasStr) ?location WHERE {{
+          SERVICE wikibase:box {{
+            ?item ddt:P4 ?location .
+            bd:serviceParam wikibase:cornerWest "Point({lng_min} {lat_min})"^^geo:wktLiteral .
+            bd:serviceParam wikibase:cornerEast "Point({lng_max} {lat_max})"^^geo:wktLiteral .
+          }}
+          ?item ddt:P1 dd:Q20 .
+          OPTIONAL {{ ?item rdfs:label ?itemLabel FILTER(LANG(?itemLabel) = "sv") }}
+          OPTIONAL {{ ?item skos:altLabel ?svAlias FILTER(LANG(?svAlias) = "sv") }}
+        }}
+        GROUP BY ?item ?itemLabel ?location
+        """
+        results = execute_sparql_query(query=sparql)
+
+        matches = []
+        for binding in results.get("results", {}).get("bindings", []):
+            qid = qid_from_uri(binding_value(binding, "item"))
+            geo_str = binding_value(binding, "location")
+            venue_lat, venue_lng = parse_point(geo_str)
+            if not qid or venue_lat is None:
+                if geo_str:
+                    logger.warning(f"Parse error for {geo_str}")
+                continue
+            dist = haversine_distance(lat, lng, venue_lat, venue_lng)
+            if dist <= threshold_km:
+                matches.append({
+                    "qid": qid,
+                    "label": binding_value(binding, "itemLabel") or qid,
+                    "lat": venue_lat,
+                    "lng": venue_lng,
+                    "distance_km": dist,
+                    "aliases": split_aliases(binding_value(binding, "aliasStr")),
+                })
+
+        matches.sort(key=lambda x: x["distance_km"])
+        return matches
+
+    def get_entities(self, qids: Iterable[str], refresh: bool = False) -> dict[str, dict]:
+        """Return entity JSON (labels, descriptions, aliases, claims) for known QIDs.
+
+        Uncached QIDs are fetched with wbgetentities, ENTITY_BATCH_SIZE (the API maximum
+        of 50) per request and ENTITY_FETCH_WORKERS requests in parallel. Results are kept
+        in an LRU cache that edits through this client invalidate. Missing items are left
+        out; a redirected (merged) item is returned under the requested QID with the id of
+        the item it redirects to.
+        """
+        qids = list(dict.fromkeys(qids))
+        entities = {}
+        to_fetch = []
+        for qid in qids:
+            entity = None if refresh else self.entity_cache.get(qid)
+            if entity is None:
+                to_fetch.append(qid)
+            else:
+                entities[qid] = entity
+        for qid, entity in fetch_entities_batched(to_fetch).items():
+            self.entity_cache.put(qid, entity)
+            entities[qid] = entity
+        return {qid: entities[qid] for qid in qids if qid in entities}
+
+
+_shared_query_client: Optional[DancedbQuery] = None
+_shared_query_client_lock = threading.Lock()
+
+
+def get_query_client() -> DancedbQuery:
+    """Return the process-wide read-only client."""
+    global _shared_query_client
+    with _shared_query_client_lock:
+        if _shared_query_client is None:
+            _shared_query_client = DancedbQuery()
+        return _shared_query_client
@@ -0,0 +1,108 @@
+"""DanceDB reference data (artists, venues, events) loaded concurrently.
+
+Sync workflows need several independent datasets that each take one or more
+slow SPARQL queries. prefetch() starts them all on a thread pool at the start
+of a run; get() blocks only until the requested dataset is there. Loaded data
+is dropped after every write (see invalidate_cache()), so a later step loads
+it again and sees the items created in between.
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+import config
+from src.utils.sparql import add_invalidation_listener
+
+logger = logging.getLogger(__name__)
+
+
+def _artists() -> list[dict]:
+    from src.models.dancedb.query import get_query_client
+
+    return get_query_client().fetch_artists_from_dancedb()
+
+
+def _venues() -> list[dict]:
+    from src.models.dancedb.query import get_query_client
+
+    return get_query_client().fetch_venues_from_dancedb()
+
+
+def _venues_with_external_ids() -> list[dict]:
+    from src.models.dancedb.query import get_query_client
+
+    return get_query_client().fetch_venues_with_external_ids()
+
+
+def _existing_venues() -> dict:
+    from src.models.dancedb.ensure import load_existing_venues
+
+    return load_existing_venues()
+
+
+def _events() -> list[dict]:
+    from src.models.dancedb.ensure_events import default_event_window, fetch_events_from_dancedb
+
+    return fetch_events_from_dancedb(window=default_event_window(), incremental=True)
+
+
+# Dataset name -> loader
+DATASETS: dict[str, Callable[[], Any]] = {
+    "artists": _artists,
+    "venues": _venues,
+    "venues_with_external_ids": _venues_with_external_ids,
+    "existing_venues": _existing_venues,
+    "events": _events,
+}
+
+
+class ReferenceData:
+    """Futures of the datasets in DATASETS, each loaded at most once until invalidated."""
+
+    def __init__(self, max_workers: int | None = None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or config.REFERENCE_FETCH_WORKERS, thread_name_prefix="dancedb-reference")
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, *names: str) -> None:
+        """Start loading the named datasets (all when none are given) in the background."""
+        for name in names or DATASETS:
+            self.future(name)
+
+    def future(self, name: str) -> Future:
+        """The future of a dataset, starting its load if needed."""
+        if name not in DATASETS:
+            raise ValueError(f"Unknown reference dataset: {name}")
+        with self._lock:
+            if name not in self._futures:
+                logger.debug(f"Loading reference data: {name}")
+                self._futures[name] = self._executor.submit(DATASETS[name])
+            return self._futures[name]
+
+    def get(self, name: str) -> Any:
+        """The loaded dataset, waiting for it if needed. Failed loads are retried on the next call."""
+        future = self.future(name)
+        try:
+            return future.result()
+        except Exception:
+            with self._lock:
+                if self._futures.get(name) is future:
+                    del self._futures[name]
+            raise
+
+    def invalidate(self) -> None:
+        """Forget all loaded and pending datasets."""
+        with self._lock:
+            self._futures.clear()
+
+
+_reference = ReferenceData()
+
+
+def reference_data() -> ReferenceData:
+    """The process-wide reference data loader."""
+    return _reference
+
+
+add_invalidation_listener(_reference.invalidate)
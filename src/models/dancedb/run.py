@@ -5,8 +5,9 @@ from datetime import date
 
 from rapidfuzz import process as fuzz_process
 
-from src.models.dancedb.client import DancedbClient
-from src.models.dancedb.ensure_events import ARTISTS_DIR, EVENTS_DIR, configure_wbi, fetch_events_from_dancedb, fetch_existing_venues
+from src.models.dancedb.client import get_client
+from src.models.dancedb.ensure_events import ARTISTS_DIR, EVENTS_DIR, configure_wbi, fetch_existing_venues
+from src.models.dancedb.reference import reference_data
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +20,7 @@ def sync_artist_spelplan(dry_run: bool = False) -> None:
     from src.models.danslogen.data import load_danslogen_artists
 
     configure_wbi()
-    client = DancedbClient()
+    client = get_client()
 
     danslogen_artists = load_danslogen_artists()
     if not danslogen_artists:
@@ -35,32 +36,33 @@ def sync_artist_spelplan(dry_run: bool = False) -> None:
     updated = 0
     skipped = 0
 
-    for artist in db_artists:
-        qid = artist.get("qid", "")
-        label = artist.get("label", "")
-        existing_p46 = artist.get("p46", "")
+    with client.coalesced_edits():
+        for artist in db_artists:
+            qid = artist.get("qid", "")
+            label = artist.get("label", "")
+            existing_p46 = artist.get("p46", "")
 
-        if not label:
-            continue
+            if not label:
+                continue
 
-        danslogen = danslogen_artists.get(label.lower(), {})
-        spelplan_id = danslogen.get("spelplan_id", "")
+            danslogen = danslogen_artists.get(label.lower(), {})
+            spelplan_id = danslogen.get("spelplan_id", "")
 
-        if not spelplan_id:
-            continue
+            if not spelplan_id:
+                continue
 
-        if existing_p46:
-            skipped += 1
-            continue
+            if existing_p46:
+                skipped += 1
+                continue
 
-        print(f"\n[{qid}] {label}")
-        print(f"  Adding P46: {spelplan_id}")
+            print(f"\n[{qid}] {label}")
+            print(f"  Adding P46: {spelplan_id}")
 
-        if not dry_run:
-            client.set_artist_spelplan(qid, spelplan_id)
-            updated += 1
-        else:
-            print("  (dry run - would add)")
+            if not dry_run:
+                client.set_artist_spelplan(qid, spelplan_id)
+                updated += 1
+            else:
+                print("  (dry run - would add)")
 
     print("\n=== Summary ===")
     print(f"Updated: {updated}")
@@ -77,7 +79,9 @@ def run(month: str = "april", year: int = 2026, dry_run: bool = False, save: boo
 
     print(f"\n=== Ensuring event venues exist for {month} {year} ===")
 
-    events = fetch_events_from_dancedb()
+    reference = reference_data()
+    reference.prefetch("events", "artists")
+    events = reference.get("events")
     print(f"Found {len(events)} events in DanceDB")
 
     EVENTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -86,8 +90,7 @@ def run(month: str = "april", year: int = 2026, dry_run: bool = False, save: boo
     output_file.write_text(json.dumps(events, indent=2, ensure_ascii=False) + "\n")
     print(f"Saved to {output_file}")
 
-    client = DancedbClient()
-    artists = client.fetch_artists_from_dancedb()
+    artists = reference.get("artists")
     print(f"Found {len(artists)} artists in DanceDB")
 
     ARTISTS_DIR.mkdir(parents=True, exist_ok=True)
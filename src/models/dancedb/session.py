@@ -0,0 +1,77 @@
+"""Persist the DanceDB login session between CLI invocations.
+
+After a successful login the session cookies are written to
+config.session_file. The next run restores them and only asks the API for a
+fresh edit token, skipping the login token and login requests. A stored
+session is discarded when it is older than config.SESSION_MAX_AGE_SECONDS,
+belongs to another user, or the API no longer accepts it.
+"""
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from requests import Session
+from wikibaseintegrator.wbi_config import config as wbi_config
+from wikibaseintegrator.wbi_login import LoginError, _Login
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def save_session(login: _Login, path: Path | None = None) -> None:
+    """Store the cookies of a logged in session, readable only by the current user."""
+    path = path or config.session_file
+    cookies = [
+        {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path, "expires": c.expires, "secure": c.secure}
+        for c in login.session.cookies
+    ]
+    data = {"user": config.username, "api_url": login.mediawiki_api_url, "saved_at": time.time(), "cookies": cookies}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f)
+
+
+def restore_session(path: Path | None = None) -> Optional[_Login]:
+    """Return a login built from stored cookies, or None if there is no usable session."""
+    path = path or config.session_file
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read stored session {path}: {e}")
+        return None
+
+    api_url = wbi_config["MEDIAWIKI_API_URL"]
+    if data.get("user") != config.username or data.get("api_url") != api_url:
+        return None
+    if time.time() - data.get("saved_at", 0) > config.SESSION_MAX_AGE_SECONDS:
+        logger.info("Stored session expired")
+        return None
+
+    session = Session()
+    now = time.time()
+    for cookie in data.get("cookies", []):
+        if cookie.get("expires") and cookie["expires"] < now:
+            continue
+        session.cookies.set(
+            cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie["path"], expires=cookie.get("expires"), secure=cookie.get("secure", False)
+        )
+    try:
+        # Fetches an edit token, which fails with an anonymous token if the session is gone
+        login = _Login(session=session, mediawiki_api_url=api_url)
+    except LoginError as e:
+        logger.info(f"Stored session rejected: {e}")
+        return None
+    logger.info("Reusing stored DanceDB session")
+    return login
+
+
+def clear_session(path: Path | None = None) -> None:
+    """Forget the stored session."""
+    (path or config.session_file).unlink(missing_ok=True)
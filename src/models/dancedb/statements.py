@@ -0,0 +1,80 @@
+"""Index of existing statement values, used to skip duplicate claim additions.
+
+Values are loaded one property at a time from the local mirror, or with a
+single (cached, paginated) SPARQL query, the first time a claim for that
+property is checked, and kept up to date with the claims written through
+DancedbClient afterwards.
+"""
+import logging
+import threading
+
+from src.models.dancedb.bindings import binding_value, parse_point, qid_from_uri
+from src.models.dancedb.edits import ClaimSpec
+from src.models.dancedb.mirror import get_mirror
+from src.utils.sparql import KEYSET_FILTER, iter_sparql_bindings
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_VALUES_QUERY = """
+PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
+
+SELECT ?item ?value WHERE {{
+    ?item ddt:{prop} ?value .
+    """ + KEYSET_FILTER + """
+}}
+"""
+
+
+def _coordinate_key(latitude: float, longitude: float) -> str:
+    return f"{latitude:.4f},{longitude:.4f}"
+
+
+def claim_key(claim: ClaimSpec) -> str:
+    """Comparable value of a claim."""
+    if claim.datatype == "globe-coordinate":
+        return _coordinate_key(claim.latitude, claim.longitude)
+    return claim.value
+
+
+def binding_key(datatype: str, value: str) -> str:
+    """Comparable value of a ?value binding from STATEMENT_VALUES_QUERY."""
+    if datatype == "wikibase-item":
+        return qid_from_uri(value)
+    if datatype == "globe-coordinate":
+        lat, lng = parse_point(value)
+        return _coordinate_key(lat, lng) if lat is not None else value
+    return value
+
+
+class StatementIndex:
+    """Existing (item, property, value) triples, loaded lazily per property."""
+
+    def __init__(self):
+        self._values: dict[str, dict[str, set[str]]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, claim: ClaimSpec) -> dict[str, set[str]]:
+        with self._lock:
+            if claim.prop_nr not in self._values:
+                values: dict[str, set[str]] = {}
+                mirror = get_mirror()
+                if mirror is not None:
+                    rows = mirror.property_values(claim.prop_nr)
+                else:
+                    query = STATEMENT_VALUES_QUERY.format(prop=claim.prop_nr)
+                    rows = ((qid_from_uri(binding_value(b, "item")), binding_value(b, "value")) for b in iter_sparql_bindings(query))
+                for qid, value in rows:
+                    values.setdefault(qid, set()).add(binding_key(claim.datatype, value))
+                logger.info(f"Indexed {claim.prop_nr} values on {len(values)} items")
+                self._values[claim.prop_nr] = values
+            return self._values[claim.prop_nr]
+
+    def has(self, qid: str, claim: ClaimSpec) -> bool:
+        """True if the item already has this property with this value."""
+        return claim_key(claim) in self._load(claim).get(qid, set())
+
+    def add(self, qid: str, claim: ClaimSpec) -> None:
+        """Record a written claim (only for properties that have been loaded)."""
+        with self._lock:
+            if claim.prop_nr in self._values:
+                self._values[claim.prop_nr].setdefault(qid, set()).add(claim_key(claim))
@@ -3,8 +3,8 @@ from datetime import date
 from pathlib import Path
 
 from src.models.pipeline import Pipeline
-from src.models.dancedb.client import DancedbClient
-from src.models.dancedb.ensure_events import EVENTS_DIR, configure_wbi, fetch_events_from_dancedb
+from src.models.dancedb.ensure_events import EVENTS_DIR, configure_wbi
+from src.models.dancedb.reference import reference_data
 from src.models.danslogen.artists.scrape import scrape_artists
 from src.models.danslogen.data import DANCEDB_ARTISTS_DIR
 from src.models.dancedb.venue_ops import (
@@ -23,8 +23,7 @@ def fetch_dancedb_artists(date_str: str) -> None:
     """Fetch artists from DanceDB with QIDs."""
     import json
 
-    client = DancedbClient()
-    artists = client.fetch_artists_from_dancedb()
+    artists = reference_data().get("artists")
     output_file = DANCEDB_ARTISTS_DIR / f"{date_str}.json"
     DANCEDB_ARTISTS_DIR.mkdir(parents=True, exist_ok=True)
     with open(output_file, "w") as f:
@@ -38,7 +37,7 @@ def fetch_dancedb_events(date_str: str) -> None:
     import json
 
     configure_wbi()
-    events = fetch_events_from_dancedb()
+    events = reference_data().get("events")
     output_file = EVENTS_DIR / f"{date_str}.json"
     EVENTS_DIR.mkdir(parents=True, exist_ok=True)
     with open(output_file, "w") as f:
@@ -90,6 +89,9 @@ def sync_danslogen(
     print(f"SYNC DANSLOGEN: {month} {year}")
     print("=" * 50)
 
+    # Load the DanceDB datasets the steps below need in parallel while scraping
+    reference_data().prefetch("artists", "existing_venues", "events")
+
     pipeline = Pipeline(name="danslogen")
     pipeline.add_step(
         "0. Fetch DanceDB artists",
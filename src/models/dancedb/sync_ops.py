@@ -21,8 +21,8 @@ def get_data_dir() -> Path:
 from pathlib import Path
 import logging
 
-from src.models.dancedb.client import DancedbClient
-from src.models.dancedb.ensure_events import EVENTS_DIR, configure_wbi, fetch_events_from_dancedb
+from src.models.dancedb.ensure_events import EVENTS_DIR, configure_wbi
+from src.models.dancedb.reference import reference_data
 from src.models.danslogen.artists.scrape import scrape_artists
 from src.models.danslogen.data import DANCEDB_ARTISTS_DIR
 from src.models.pipeline import Pipeline
@@ -44,8 +44,7 @@ def fetch_dancedb_artists(date_str: str) -> None:
     """Fetch artists from DanceDB with QIDs."""
     import json
 
-    client = DancedbClient()
-    artists = client.fetch_artists_from_dancedb()
+    artists = reference_data().get("artists")
     output_file = DANCEDB_ARTISTS_DIR / f"{date_str}.json"
     DANCEDB_ARTISTS_DIR.mkdir(parents=True, exist_ok=True)
     with open(output_file, "w") as f:
@@ -59,7 +58,7 @@ def fetch_dancedb_events(date_str: str) -> None:
     import json
 
     configure_wbi()
-    events = fetch_events_from_dancedb()
+    events = reference_data().get("events")
     output_file = EVENTS_DIR / f"{date_str}.json"
     EVENTS_DIR.mkdir(parents=True, exist_ok=True)
     with open(output_file, "w") as f:
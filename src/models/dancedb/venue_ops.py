@@ -11,7 +11,9 @@ from src.models.dancedb.scrape import scrape_bygdegardarna, scrape_dancedb_venue
 from src.models.dancedb.match import match_venues
 from src.models.dancedb.ensure import ensure_venues, create_venue
 from src.models.dancedb.ensure_onbeat import onbeat_ensure_venues
-from src.models.dancedb.client import DancedbClient
+from src.models.dancedb.client import get_client
+from src.models.dancedb.plan import active_plan
+from src.models.dancedb.reference import reference_data
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +29,8 @@ def ensure_artists(date_str: str | None = None, dry_run: bool = False) -> None:
         print(f"Error: danslogen data not found: {dansevents_file}")
         return
 
-    client = DancedbClient()
-    existing_artists = client.fetch_artists_from_dancedb()
+    client = get_client()
+    existing_artists = reference_data().get("artists")
     existing_labels = {a.get("label", "").lower(): a for a in existing_artists if a.get("label")}
     print(f"Found {len(existing_artists)} artists in DanceDB")
 
@@ -80,6 +82,13 @@ def ensure_artists(date_str: str | None = None, dry_run: bool = False) -> None:
             print(f"[DRY RUN] Would create: {artist_name}")
         return
 
+    found = client.search_bands(new_artists)
+    for artist_name, qid in found.items():
+        if qid:
+            print(f"Found on DanceDB: {artist_name} -> {qid}")
+            existing_labels[artist_name.lower()] = {"qid": qid, "label": artist_name}
+    new_artists = [a for a in new_artists if not found.get(a)]
+
     for artist_name in new_artists[:10]:
         print(f"\n--- Creating artist: {artist_name} ---")
         print("Enter spelplan_id or press Enter to skip:")
@@ -94,7 +103,7 @@ def ensure_artists(date_str: str | None = None, dry_run: bool = False) -> None:
             if qid:
                 print(f"Created: https://dance.wikibase.cloud/wiki/Item:{qid}")
                 existing_labels[artist_name.lower()] = {"qid": qid, "label": artist_name}
-            else:
+            elif active_plan() is None:
                 print("Failed to create artist")
         except Exception as e:
             print(f"Error creating artist: {e}")
@@ -0,0 +1,229 @@
+"""Concurrent writer for queued DanceDB edits.
+
+BatchWriter posts EntityEdits as wbeditentity calls from a thread pool. The
+number of edits in flight adapts to the server: it grows by one slot per
+window of successful edits and is halved when MediaWiki answers with maxlag,
+a rate limit or HTTP 429/503, after which all workers pause for the
+Retry-After (or reported lag) before continuing. Edits that only add one
+statement to an existing item are posted as wbcreateclaim instead.
+"""
+import json
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Optional
+
+from wikibaseintegrator.wbi_config import config as wbi_config
+from wikibaseintegrator.wbi_exceptions import MWApiError
+from wikibaseintegrator.wbi_login import _Login
+
+import config
+from src.models.base import DanceBaseModel
+from src.models.dancedb.edits import EntityEdit
+from src.models.dancedb.labels import record_created
+from src.utils.http import retry_after_seconds
+from src.utils.sparql import invalidate_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottledError(Exception):
+    """The API asked us to slow down (maxlag, rate limit, 429/503)."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"{reason}, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class WriteResult(DanceBaseModel):
+    """Outcome of one queued edit."""
+
+    edit: EntityEdit
+    qid: Optional[str] = None
+    error: str = ""
+    attempts: int = 0
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.qid is not None and not self.error
+
+
+class BatchWriter:
+    """Queue EntityEdits and write them with bounded, adaptive concurrency.
+
+    Usage:
+        writer = BatchWriter(client.login)
+        writer.submit(edit, on_done=callback)
+        results = writer.run()
+    """
+
+    def __init__(
+        self,
+        login: _Login,
+        max_workers: int = config.WRITE_MAX_WORKERS,
+        maxlag: int = config.WRITE_MAXLAG,
+        max_attempts: int = config.WRITE_MAX_ATTEMPTS,
+        is_bot: bool = False,
+    ):
+        self.login = login
+        self.max_workers = max(1, max_workers)
+        self.maxlag = maxlag
+        self.max_attempts = max_attempts
+        self.is_bot = is_bot
+        self.mediawiki_api_url = wbi_config["MEDIAWIKI_API_URL"]
+        self._queue: list[tuple[EntityEdit, Optional[Callable[[WriteResult], None]]]] = []
+        self._cond = threading.Condition()
+        self._limit = 1.0
+        self._active = 0
+        self._paused_until = 0.0
+        self.throttle_events = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def concurrency(self) -> int:
+        return int(self._limit)
+
+    def submit(self, edit: EntityEdit, on_done: Optional[Callable[[WriteResult], None]] = None) -> None:
+        """Queue an edit. on_done is called with the WriteResult from a worker thread."""
+        self._queue.append((edit, on_done))
+
+    def run(self) -> list[WriteResult]:
+        """Write all queued edits and return their results in completion order."""
+        queue, self._queue = self._queue, []
+        if not queue:
+            return []
+        logger.info(f"Writing {len(queue)} edits with up to {self.max_workers} workers")
+        start = time.perf_counter()
+        results = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(queue)), thread_name_prefix="dancedb-writer") as executor:
+            futures = [executor.submit(self._execute, edit, on_done) for edit, on_done in queue]
+            for future in as_completed(futures):
+                results.append(future.result())
+        elapsed = time.perf_counter() - start
+        if any(r.ok for r in results):
+            invalidate_cache(wbi_config["SPARQL_ENDPOINT_URL"])
+        logger.info(self.summary(results, elapsed))
+        return results
+
+    def summary(self, results: list[WriteResult], elapsed: float) -> str:
+        """Throughput and latency statistics for a run."""
+        ok = [r for r in results if r.ok]
+        latencies = sorted(r.latency for r in ok)
+        text = f"Wrote {len(ok)}/{len(results)} edits in {elapsed:.1f}s ({len(ok) / elapsed if elapsed else 0:.2f} edits/s)"
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            text += f", latency median {statistics.median(latencies):.2f}s p95 {p95:.2f}s"
+        return text + f", throttled {self.throttle_events} times, final concurrency {self.concurrency}"
+
+    def _execute(self, edit: EntityEdit, on_done: Optional[Callable[[WriteResult], None]]) -> WriteResult:
+        start = time.perf_counter()
+        result = WriteResult(edit=edit)
+        for attempt in range(1, self.max_attempts + 1):
+            result.attempts = attempt
+            self._acquire()
+            try:
+                result.qid = self._write(edit)
+                result.error = ""
+                self._release(success=True)
+                record_created(edit, result.qid)
+                break
+            except ThrottledError as e:
+                logger.warning(f"Throttled writing {edit.label}: {e}")
+                result.error = str(e)
+                self._release(success=False, retry_after=e.retry_after)
+            except Exception as e:
+                logger.error(f"Error writing {edit.describe()}: {e}")
+                result.error = str(e)
+                self._release(success=False)
+                break
+        result.latency = time.perf_counter() - start
+        if on_done:
+            on_done(result)
+        return result
+
+    def _acquire(self) -> None:
+        with self._cond:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                elif self._active >= int(self._limit):
+                    self._cond.wait()
+                else:
+                    break
+            self._active += 1
+
+    def _release(self, success: bool, retry_after: Optional[float] = None) -> None:
+        with self._cond:
+            self._active -= 1
+            if retry_after is not None:
+                self.throttle_events += 1
+                self._limit = max(1.0, self._limit / 2)
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            elif success:
+                self._limit = min(float(self.max_workers), self._limit + 1 / self._limit)
+            self._cond.notify_all()
+
+    def _write(self, edit: EntityEdit) -> str:
+        if edit.is_single_claim:
+            return self._create_claim(edit)
+        data = {"action": "wbeditentity", "data": json.dumps(edit.to_json())}
+        if edit.is_new:
+            data["new"] = "item"
+        else:
+            data["id"] = edit.qid
+        if edit.summary:
+            data["summary"] = edit.summary
+        response = self.post(data)
+        return response["entity"]["id"]
+
+    def _create_claim(self, edit: EntityEdit) -> str:
+        """Append one statement with wbcreateclaim, which unlike wbeditentity does not send the whole entity back."""
+        snak = edit.claims[0].to_datatype().get_json()["mainsnak"]
+        data = {
+            "action": "wbcreateclaim",
+            "entity": edit.qid,
+            "property": snak["property"],
+            "snaktype": "value",
+            "value": json.dumps(snak["datavalue"]["value"]),
+        }
+        if edit.summary:
+            data["summary"] = edit.summary
+        self.post(data)
+        return edit.qid
+
+    def post(self, data: dict[str, Any]) -> dict:
+        """POST an authenticated write to the MediaWiki API, raising ThrottledError when asked to back off."""
+        data = {
+            **data,
+            "format": "json",
+            "token": self.login.get_edit_token(),
+            "assert": "bot" if self.is_bot else "user",
+            "maxlag": self.maxlag,
+        }
+        if self.is_bot:
+            data["bot"] = 1
+        response = self.login.get_session().post(
+            self.mediawiki_api_url, data=data, headers={"User-Agent": wbi_config["USER_AGENT"]}, timeout=config.WRITE_TIMEOUT_SECONDS
+        )
+        retry_after = retry_after_seconds(response)
+        if retry_after is None:
+            retry_after = config.WRITE_RETRY_AFTER_SECONDS
+        if response.status_code in (429, 503):
+            raise ThrottledError(f"HTTP {response.status_code}", retry_after)
+        response.raise_for_status()
+        payload = response.json()
+        error = payload.get("error")
+        if error:
+            if error.get("code") == "maxlag":
+                raise ThrottledError(f"maxlag {error.get('lag', '?')}s", max(retry_after, float(error.get("lag", 0))))
+            messages = [m.get("name") for m in error.get("messages", [])]
+            if error.get("code") == "ratelimited" or "actionthrottledtext" in messages:
+                raise ThrottledError("rate limited", retry_after)
+            raise MWApiError(error)
+        return payload
@@ -2,6 +2,7 @@ from typing import Optional
 
 import config
 from src.models.dancedb.client import DancedbClient
+from src.models.dancedb.plan import active_plan
 from src.models.danslogen.data import load_band_map, load_danslogen_artists
 from src.models.danslogen.fuzzy import fuzzy_match_qid
 
@@ -13,6 +14,9 @@ class BandMapper:
         self.client = client
         self._band_map: Optional[dict[str, str]] = None
         self._danslogen_artists: Optional[dict[str, dict]] = None
+        self._searched: dict[str, Optional[str]] = {}
+        # Bands whose create is on the active plan: they have no QID yet and must not be planned again
+        self._planned: set[str] = set()
 
     def _get_band_map(self) -> dict[str, str]:
         """Get band map, loading from JSON if not cached."""
@@ -26,6 +30,25 @@ class BandMapper:
             self._danslogen_artists = load_danslogen_artists()
         return self._danslogen_artists
 
+    def prefetch(self, band_names: list[str]) -> None:
+        """Look up all bands without a local match in DanceDB with batched queries.
+
+        Results are remembered so resolve() does not search DanceDB once per row.
+        """
+        if self.client is None:
+            return
+
+        band_map = self._get_band_map()
+        known = {key.lower() for key in band_map}
+        pending = [name for name in dict.fromkeys(band_names) if name and name.lower() not in known and name.lower() not in self._searched]
+        if not pending:
+            return
+
+        for name, qid in self.client.search_bands(pending).items():
+            self._searched[name.lower()] = qid
+            if qid:
+                band_map[name.lower()] = qid
+
     def resolve(self, band_name: str) -> Optional[str]:
         """Resolve band name to QID.
 
@@ -50,16 +73,21 @@ class BandMapper:
             self._band_map[fuzzy.matched_label.lower()] = fuzzy.qid
             return fuzzy.qid
 
-        if self.client is None:
+        if self.client is None or band_name.lower() in self._planned:
             return None
 
         danslogen_artists = self._get_danslogen_artists()
         spelplan_id = danslogen_artists.get(band_name.lower(), {}).get("spelplan_id", "")
 
         try:
-            qid = self.client.get_or_create_band(band_name, spelplan_id=spelplan_id)
+            if band_name.lower() in self._searched:
+                qid = self._searched[band_name.lower()] or self.client.create_band(band_name, spelplan_id)
+            else:
+                qid = self.client.get_or_create_band(band_name, spelplan_id=spelplan_id)
             if qid:
                 self._band_map[band_name.lower()] = qid
+            elif active_plan() is not None:
+                self._planned.add(band_name.lower())
             return qid
         except Exception:
             return None
@@ -12,8 +12,12 @@ from rapidfuzz import fuzz
 
 import config
 from config import CET
-from src.models.dancedb.client import DancedbClient
+from src.models.dancedb.client import get_client
+from src.models.dancedb.edits import event_edit
+from src.models.dancedb.entities import entity_summary
+from src.models.dancedb.plan import active_plan
 from src.models.dancedb.status import detect_event_status
+from src.models.dancedb.writer import BatchWriter, WriteResult
 from src.models.export.dance_event import DanceEvent
 
 logger = logging.getLogger(__name__)
@@ -55,39 +59,27 @@ def _load_existing_events(date_str: str) -> dict[str, dict]:
     return lookup
 
 
-def _load_artists_lookup(date_str: str) -> dict[str, dict]:
-    """Load artists from JSON for display."""
-    artists_file = config.dancedb_artists_dir / f"{date_str}.json"
-    if not artists_file.exists():
+def _hydrate_lookup(client, events_data: list[dict], venue_mappings: dict[str, str]) -> dict[str, dict]:
+    """Fetch current labels and coordinates of the venues and artists referenced by the events."""
+    qids = []
+    for event_dict in events_data:
+        try:
+            event = DanceEvent.model_validate(event_dict)
+        except Exception:
+            continue
+        qids.append(_resolve_venue_qid(event, venue_mappings))
+        if event.identifiers and event.identifiers.dancedatabase.artist:
+            qids.append(event.identifiers.dancedatabase.artist)
+    qids = [qid for qid in qids if qid]
+    if not qids:
         return {}
-
-    artists_data = json.loads(artists_file.read_text())
-    lookup = {a.get("qid", ""): a for a in artists_data}
-    print(f"Loaded {len(lookup)} artists for display")
-    return lookup
-
-
-def _load_venues_lookup(date_str: str) -> dict[str, dict]:
-    """Load venues from JSON for display."""
-    venues_dir = config.dancedb_venues_dir
-    venues_file = venues_dir / f"{date_str}.json"
-    if not venues_file.exists():
-        venues_files = sorted(venues_dir.glob("*.json"), reverse=True)
-        venues_file = venues_files[0] if venues_files else None
-
-    if not venues_file or not venues_file.exists():
+    try:
+        entities = client.get_entities(qids)
+    except Exception as e:
+        logger.warning(f"Could not fetch venue and artist details for display: {e}")
         return {}
-
-    venues_data = json.loads(venues_file.read_text())
-    lookup = {}
-    for qid, v in venues_data.items():
-        if isinstance(v, dict):
-            lookup[qid] = v
-        else:
-            lookup[qid] = {"label": v, "qid": qid}
-
-    print(f"Loaded {len(lookup)} venues from {venues_file.name}")
-    return lookup
+    print(f"Fetched {len(entities)} venues and artists for display")
+    return {qid: entity_summary(entity) for qid, entity in entities.items()}
 
 
 def _load_venue_mappings() -> dict[str, str]:
@@ -252,75 +244,85 @@ def upload_events(
     except MissingEventsFileError as e:
         print(str(e))
         return
-    artists_lookup = _load_artists_lookup(date_str)
-    venues_lookup = _load_venues_lookup(date_str)
     venue_mappings = _load_venue_mappings()
 
-    client = DancedbClient()
-    uploaded = 0
+    client = get_client()
+    entities_lookup = _hydrate_lookup(client, events_data, venue_mappings)
+    # Created on the first confirmed event, so plan runs and runs that skip everything never log in
+    writer: BatchWriter | None = None
+    plan = active_plan()
     skip_count = 0
+    aborted = False
 
-    for i, event_dict in enumerate(events_data, start=1):
-        try:
-            event = DanceEvent.model_validate(event_dict)
-        except Exception as e:
-            logger.warning("Failed to parse event %d: %s", i, e)
-            skip_count += 1
-            continue
-
-        label = event.label.get("sv", "Untitled") if event.label else "Untitled"
-        venue_qid = _resolve_venue_qid(event, venue_mappings)
-
-        if not venue_qid:
-            raise ValueError(
-                f"Event {i} has no venue QID: {label} (location: {event.location}). "
-                "Ensure venue is mapped in DanceDB first."
-            )
-
-        artist_qid = event.identifiers.dancedatabase.artist if event.identifiers else None
-        start_ts, end_ts = _convert_timestamps(event.start_timestamp, event.end_timestamp)
-
-        if start_ts is None:
-            print(f"[{i}/{len(events_data)}] {label}")
-            print(f"  SKIP (already started)")
-            skip_count += 1
-            continue
-
-        start_ts_str = start_ts.strftime("+%Y-%m-%dT%H:%M:00Z")
-        is_dup, dup_info = _check_duplicate(existing_lookup, venue_qid, start_ts_str, label)
-        if is_dup:
-            print(f"[{i}/{len(events_data)}] {label}")
-            print(f"  SKIP (already exists: {dup_info})")
-            skip_count += 1
-            continue
-
-        rich.print(event_dict)
-
-        venue_info = venues_lookup.get(venue_qid, {})
-        artist_info = artists_lookup.get(artist_qid, {}) if artist_qid else {}
-        _display_event(i, len(events_data), label, venue_qid, start_ts, end_ts, venue_info, artist_qid, artist_info)
-
-        confirm = questionary.select("Upload to DanceDB?", choices=["Yes (Recommended)", "Skip", "Skip all", "Abort"]).ask()
-
-        if confirm == "Skip":
-            skip_count += 1
-            continue
-        elif confirm == "Skip all":
-            print(f"Skipping remaining {len(events_data) - i} events...")
-            skip_count = len(events_data) - i
-            break
-        elif confirm == "Abort":
-            print("Aborting...")
-            sys.exit(0)
+    # Confirmed events are written even when a later event stops the run
+    try:
+        for i, event_dict in enumerate(events_data, start=1):
+            try:
+                event = DanceEvent.model_validate(event_dict)
+            except Exception as e:
+                logger.warning("Failed to parse event %d: %s", i, e)
+                skip_count += 1
+                continue
+
+            label = event.label.get("sv", "Untitled") if event.label else "Untitled"
+            venue_qid = _resolve_venue_qid(event, venue_mappings)
+
+            if not venue_qid:
+                raise ValueError(
+                    f"Event {i} has no venue QID: {label} (location: {event.location}). "
+                    "Ensure venue is mapped in DanceDB first."
+                )
+
+            artist_qid = event.identifiers.dancedatabase.artist if event.identifiers else None
+            start_ts, end_ts = _convert_timestamps(event.start_timestamp, event.end_timestamp)
+
+            if start_ts is None:
+                print(f"[{i}/{len(events_data)}] {label}")
+                print(f"  SKIP (already started)")
+                skip_count += 1
+                continue
+
+            start_ts_str = start_ts.strftime("+%Y-%m-%dT%H:%M:00Z")
+            is_dup, dup_info = _check_duplicate(existing_lookup, venue_qid, start_ts_str, label)
+            if is_dup:
+                print(f"[{i}/{len(events_data)}] {label}")
+                print(f"  SKIP (already exists: {dup_info})")
+                skip_count += 1
+                continue
+
+            rich.print(event_dict)
+
+            venue_info = entities_lookup.get(venue_qid, {})
+            artist_info = entities_lookup.get(artist_qid, {}) if artist_qid else {}
+            _display_event(i, len(events_data), label, venue_qid, start_ts, end_ts, venue_info, artist_qid, artist_info)
+
+            # In plan mode every event is planned and approved later with approve-plan
+            if plan is not None:
+                confirm = "Yes (Recommended)"
+            else:
+                confirm = questionary.select("Upload to DanceDB?", choices=["Yes (Recommended)", "Skip", "Skip all", "Abort"]).ask()
+
+            if confirm == "Skip":
+                skip_count += 1
+                continue
+            elif confirm == "Skip all":
+                print(f"Skipping remaining {len(events_data) - i} events...")
+                skip_count = len(events_data) - i
+                break
+            elif confirm == "Abort":
+                print("Aborting...")
+                aborted = True
+                break
 
-        try:
             desc = event.description.get("sv", "") if event.description else ""
             search_text = f"{label} {desc}"
             status_qid, _ = detect_event_status(search_text)
             instance_of = event.instance_of or config.DANCE_INSTANCE_EVENT
             dance_styles = event.identifiers.dancedatabase.dance_styles if event.identifiers else []
+            if not artist_qid:
+                logger.warning("No artist QID for event")
 
-            qid = client.create_event(
+            edit = event_edit(
                 label_sv=label,
                 venue_qid=venue_qid,
                 start_timestamp=start_ts,
@@ -330,11 +332,29 @@ def upload_events(
                 artist_qid=artist_qid,
                 dance_styles=dance_styles,
             )
-            if qid:
-                print(f"  Uploaded: https://dance.wikibase.cloud/wiki/Item:{qid}")
-                uploaded += 1
-        except Exception as e:
-            logger.error("Error uploading event: %s", e)
-            skip_count += 1
+            if plan is not None:
+                plan.add(edit, source="upload-danslogen-events")
+            else:
+                if writer is None:
+                    writer = BatchWriter(client.login)
+                writer.submit(edit, on_done=_report_upload)
+                print(f"  Queued ({len(writer)} pending)")
+    finally:
+        results: list[WriteResult] = []
+        if writer is not None:
+            print(f"\nUploading {len(writer)} confirmed events...")
+            results = writer.run()
+
+    uploaded = sum(1 for r in results if r.ok)
+    skip_count += len(results) - uploaded
 
     print(f"\nDone! Uploaded {uploaded} events, {skip_count} skipped.")
+    if aborted:
+        sys.exit(0)
+
+
+def _report_upload(result: WriteResult) -> None:
+    if result.ok:
+        print(f"  Uploaded: https://dance.wikibase.cloud/wiki/Item:{result.qid} ({result.edit.label})")
+    else:
+        logger.error("Error uploading event '%s': %s", result.edit.label, result.error)
@@ -10,7 +10,7 @@ from pydantic import AnyUrl
 
 from config import CET
 from src.models._utils.datetime_utils import MONTH_NUM_TO_NAME, combine_date_and_time, parse_date, parse_time_range
-from src.models.dancedb.client import DancedbClient
+from src.models.dancedb.client import get_client
 from src.models.danslogen.artists.row import DanslogenArtistRow
 from src.models.danslogen.band_mapper import BandMapper
 from src.models.danslogen.events.event import DanslogenEvent
@@ -34,7 +34,7 @@ class Danslogen:
             self.month = month.lower()
         self.year = now.year
         self.events: List[DanceEvent] = []
-        self.dancedb_client = DancedbClient()
+        self.dancedb_client = get_client()
         self.band_mapper = BandMapper(client=self.dancedb_client)
         self.venue_mapper = VenueMapper(client=self.dancedb_client)
         self.interactive = interactive
@@ -172,6 +172,7 @@ class Danslogen:
 
         rows = table.select("tr[class^='r']")
         logger.info("Found %d rows for month %s", len(rows), month)
+        self._prefetch_bands(rows)
 
         for row in rows:
             try:
@@ -185,6 +186,21 @@ class Danslogen:
         logger.info("Parsed %d events for %s", len(events), month)
         return events
 
+    def _prefetch_bands(self, rows: list[Tag]) -> None:
+        """Resolve all band names of the month against DanceDB in a few batched queries."""
+        band_names = []
+        for row in rows:
+            try:
+                table_row = DanslogenTableRow.from_row(row)
+            except (ValueError, InvalidRowError):
+                continue
+            if table_row:
+                band_names.append(table_row.band)
+        try:
+            self.band_mapper.prefetch(band_names)
+        except Exception as e:
+            logger.warning("Could not prefetch bands: %s", e)
+
     def scrape_month(self, month: str = "april") -> List[DanceEvent]:
         self.events = self.parse_month(month)
         return self.events
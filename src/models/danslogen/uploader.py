@@ -4,7 +4,7 @@ from datetime import date
 from pathlib import Path
 from typing import Optional
 
-from src.models.dancedb.client import DancedbClient
+from src.models.dancedb.client import DancedbClient, get_client
 from src.models.danslogen.band_mapper import BandMapper
 from src.models.danslogen.data import DanslogenData
 from src.models.danslogen.events.row_parser import RowParser
@@ -49,7 +49,7 @@ class DanslogenUploader:
         print(f"Loaded {len(byg_venues)} bygdegardarna venues, {len(folketshus_venues)} folketshus venues, {len(db_venues)} DanceDB venues")
 
         if not dry_run:
-            self.client = DancedbClient()
+            self.client = get_client()
 
         venue_matcher = VenueMatcher(
             client=self.client,
@@ -72,6 +72,9 @@ class DanslogenUploader:
             rows = rows[: self.limit]
             print(f"(Limited to {self.limit} rows)")
 
+        if self.client is not None:
+            band_mapper.prefetch([row.get("band", "") for row in rows])
+
         events = []
         skipped = 0
 
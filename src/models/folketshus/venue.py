@@ -12,8 +12,8 @@ from wikibaseintegrator import WikibaseIntegrator
 
 import config
 from src.models.base import DanceBaseModel
-from src.models.dancedb.client import DancedbClient
-from src.utils.distance import haversine_distance
+from src.models.dancedb.client import get_client
+from src.utils.distance import nearest_neighbours
 
 
 def require_tty():
@@ -152,35 +152,14 @@ def parse_venue(html: str) -> FolketshusVenue | None:
 
 def fetch_existing_venues() -> dict[str, dict]:
     """Fetch existing venues from DanceDB via SPARQL."""
-    from wikibaseintegrator.wbi_config import config as wbi_config
-    from wikibaseintegrator.wbi_helpers import execute_sparql_query
-
-    wbi_config["USER_AGENT"] = config.user_agent
-
-    sparql = """
-    PREFIX dd: <https://dance.wikibase.cloud/entity/>
-    PREFIX ddt: <https://dance.wikibase.cloud/prop/direct/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-
-    SELECT ?item ?itemLabel ?geo WHERE {
-      ?item ddt:P1 dd:Q20 .
-      OPTIONAL { ?item rdfs:label ?itemLabel FILTER(LANG(?itemLabel) = "sv") }
-      OPTIONAL { ?item ddt:P4 ?geo }
-    }
-    ORDER BY ?itemLabel
-    LIMIT 2000
-    """
-    results = execute_sparql_query(query=sparql)
+    from src.models.dancedb.bindings import binding_value, parse_point, qid_from_uri
+    from src.models.dancedb.query import ALL_VENUES_QUERY
+    from src.utils.sparql import iter_sparql_bindings
+
     venues = {}
-    for binding in results["results"]["bindings"]:
-        qid = binding["item"]["value"].rsplit("/", 1)[-1]
-        label = binding.get("itemLabel", {}).get("value", "")
-        geo = binding.get("geo", {}).get("value", "")
-        lat, lng = None, None
-        if geo:
-            coords = geo.replace("Point(", "").replace(")", "").split(" ")
-            lng, lat = float(coords[0]), float(coords[1])
-        venues[qid] = {"label": label, "lat": lat, "lng": lng}
+    for binding in iter_sparql_bindings(ALL_VENUES_QUERY):
+        lat, lng = parse_point(binding_value(binding, "geo"))
+        venues[qid_from_uri(binding_value(binding, "item"))] = {"label": binding_value(binding, "itemLabel"), "lat": lat, "lng": lng}
 
     logger.info(f"Fetched {len(venues)} existing venues from DanceDB")
     return venues
@@ -198,6 +177,8 @@ def match_venues(venues: list[FolketshusVenue]) -> tuple[list[dict], list[Folket
     unmatched = []
     total = len(venues)
     print(f"\nMatching {total} folketshus venues...")
+    # Nearest DanceDB venue within reach of every folketshus venue, computed in one go
+    nearest = nearest_neighbours([(v.lat, v.lng) for v in venues], db_coords, COORD_DISTANCE_KM, k=1)
 
     for i, venue in enumerate(venues, 1):
         name_lower = venue.name.lower()
@@ -207,15 +188,10 @@ def match_venues(venues: list[FolketshusVenue]) -> tuple[list[dict], list[Folket
             matched_qid = db_labels[name_lower]
             print(f"[{i}/{total}] Exact match: {venue.name} -> {matched_qid}")
         else:
-            coord_match = None
-            for qid, (lat2, lng2) in db_coords.items():
-                dist = haversine_distance(venue.lat, venue.lng, lat2, lng2)
-                if dist <= COORD_DISTANCE_KM:
-                    coord_match = (qid, dist)
-                    break
+            coord_match = nearest[i - 1][0] if nearest[i - 1] else None
             if coord_match:
                 matched_qid = coord_match[0]
-                print(f"[{i}/{total}] Coord match: {venue.name} -> {qid} ({coord_match[1]:.1f}km)")
+                print(f"[{i}/{total}] Coord match: {venue.name} -> {matched_qid} ({coord_match[1]:.1f}km)")
             else:
                 fuzzy = fuzzy_match(venue.name, db_labels, remove_terms=config.FUZZY_REMOVE_TERMS_FOLKETSHUS)
                 if fuzzy:
@@ -264,7 +240,7 @@ def create_venue_with_p44(venue: FolketshusVenue) -> str | None:
     external_id = venue.external_id or extract_external_id(venue.url)
     label = venue.name
 
-    wbi = WikibaseIntegrator(login=DancedbClient().wbi.login)
+    wbi = WikibaseIntegrator(login=get_client().wbi.login)
     new_item = wbi.item.new()
     new_item.labels.set("sv", label)
     new_item.descriptions.set("sv", "dansställe")
@@ -2,7 +2,7 @@ import logging
 from pathlib import Path
 from typing import Optional
 
-from src.utils.venue_resolver import UnifiedVenueResolver, VenueSourceData
+from src.utils.venue_resolver import UnifiedVenueResolver
 
 logger = logging.getLogger(__name__)
 
@@ -33,22 +33,17 @@ class VenueResolver:
         resolver = self._get_resolver()
         data = resolver._ensure_data_loaded()
 
-        for qid, v in data.dancedb.items():
-            label = v.get("label", "").lower()
-            if venue_name.lower() == label:
-                return qid, None
-            for alias in v.get("aliases", []):
-                if venue_name.lower() == alias.lower():
-                    return qid, None
-
-        for v in data.folketshus:
-            if venue_name.lower() == v.get("name", "").lower():
-                return v.get("qid"), v.get("external_id")
-
-        for v in data.bygdegardarna:
-            if venue_name.lower() == v.get("title", "").lower():
-                external_id = f"bygdegardarna:{v['meta'].get('permalink', '')}"
-                return None, external_id
+        venues = data.find("dancedb", venue_name)
+        if venues:
+            return venues[0]["qid"], None
+
+        venues = data.find("folketshus", venue_name)
+        if venues:
+            return venues[0]["qid"], venues[0]["external_id"]
+
+        venues = data.find("bygdegardarna", venue_name)
+        if venues:
+            return None, f"bygdegardarna:{venues[0]['permalink'] or ''}"
 
         return None, None
 
@@ -7,14 +7,17 @@ from datetime import date
 import questionary
 
 import config as root_config
-from src.models.dancedb.client import DancedbClient, wbi_config
+from src.models.dancedb.client import get_client, wbi_config
+from src.models.dancedb.edits import ClaimSpec, EntityEdit
+from src.models.dancedb.plan import active_plan
+from src.utils.sparql import invalidate_cache
 
 logger = logging.getLogger(__name__)
 
 
 def scrape_wikidata_artists(date_str: str | None = None) -> None:
     """Fetch all known Swedish folk dance artists from Wikidata."""
-    from wikibaseintegrator.wbi_helpers import execute_sparql_query
+    from src.utils.sparql import WIKIDATA_TTL_SECONDS, execute_sparql_query
 
     date_str = date_str or date.today().strftime("%Y-%m-%d")
     print("\n=== Scrape Wikidata artists ===")
@@ -39,7 +42,7 @@ def scrape_wikidata_artists(date_str: str | None = None) -> None:
     """
 
     endpoint = "https://query.wikidata.org/sparql"
-    results = execute_sparql_query(query=sparql, endpoint=endpoint)
+    results = execute_sparql_query(query=sparql, endpoint=endpoint, ttl=WIKIDATA_TTL_SECONDS)
 
     artists = {}
     for binding in results["results"]["bindings"]:
@@ -75,7 +78,7 @@ def match_wikidata_artists(date_str: str | None = None, dry_run: bool = False) -
     wikidata_labels = {v["label"].lower(): qid for qid, v in wikidata_artists.items()}
     wikidata_label_list = list(wikidata_labels.keys())
 
-    client = DancedbClient()
+    client = get_client()
     dancedb_artists = client.fetch_artists_from_dancedb()
     print(f"Found {len(dancedb_artists)} artists in DanceDB")
 
@@ -107,21 +110,17 @@ def match_wikidata_artists(date_str: str | None = None, dry_run: bool = False) -
         return
 
     print("\n--- Uploading P3 (Wikidata ID) to DanceDB ---")
-    from wikibaseintegrator import datatypes
-
-    for artist, wd_qid in matched:
-        db_qid = artist.get("qid")
-        db_label = artist.get("label")
+    with client.coalesced_edits():
+        for artist, wd_qid in matched:
+            db_qid = artist.get("qid")
+            db_label = artist.get("label")
 
-        if dry_run:
-            print(f"[DRY RUN] Would add P3 (Wikidata ID)={wd_qid} to {db_label} ({db_qid})")
-            continue
+            if dry_run:
+                print(f"[DRY RUN] Would add P3 (Wikidata ID)={wd_qid} to {db_label} ({db_qid})")
+                continue
 
-        print(f"Adding P3 (Wikidata ID)={wd_qid} to {db_label} ({db_qid})...")
-        item = client.wbi.item.get(entity_id=db_qid)
-        item.claims.add(datatypes.String(prop_nr="P3", value=wd_qid))
-        item.write(login=client.wbi.login, summary="Add Wikidata QID from matching")
-        print(f"  Updated: {client.base_url}/wiki/Item:{db_qid}")
+            print(f"Adding P3 (Wikidata ID)={wd_qid} to {db_label} ({db_qid})...")
+            client.add_claims(db_qid, [ClaimSpec.string("P3", wd_qid)], summary="Add Wikidata QID from matching", skip_existing=True)
 
 
 def sync_wikidata_artists(
@@ -148,7 +147,7 @@ def sync_wikidata_artists(
     wikidata_labels = {v["label"].lower(): qid for qid, v in wikidata_artists.items()}
     wikidata_label_list = list(wikidata_labels.keys())
 
-    client = DancedbClient()
+    client = get_client()
     dancedb_artists = client.fetch_artists_from_dancedb()
     dancedb_labels = {a.get("label", "").lower(): a for a in dancedb_artists}
     artists_with_p3 = {a.get("qid") for a in dancedb_artists if a.get("p3")}
@@ -209,44 +208,48 @@ def sync_wikidata_artists(
 
     skip_all = False
     abort = False
+    plan = active_plan()
 
     if needs_p3:
         print("\n--- Adding P3 (Wikidata ID) to existing artists ---")
-        for band_data in needs_p3:
-            band_name = band_data["name"]
-            db_qid = band_data["db_qid"]
-            wd_qid = band_data["wd_qid"]
-
-            print(f"\n{band_name} ({db_qid}) -> Wikidata {wd_qid}")
-
-            if dry_run:
-                print(f"[DRY RUN] Would add P3 (Wikidata ID)={wd_qid}")
-                continue
-
-            if skip_all:
-                print("Skipping (skip all)")
-                continue
-
-            response = questionary.select(
-                f"Add P3 (Wikidata ID)={wd_qid} to {band_name}?",
-                choices=["Yes", "Skip", "Skip all", "Abort"],
-            ).ask()
-
-            if response == "Yes":
-                print(f"Adding P3 (Wikidata ID)={wd_qid} to {band_name} ({db_qid})...")
-                item = client.wbi.item.get(entity_id=db_qid)
-                item.claims.add(datatypes.String(prop_nr="P3", value=wd_qid))
-                item.write(login=client.wbi.login, summary="Add Wikidata QID from sync")
-                print(f"  Updated: {client.base_url}/wiki/Item:{db_qid}")
-            elif response == "Skip":
-                print("Skipped")
-            elif response == "Skip all":
-                print("Skipping all remaining")
-                skip_all = True
-            elif response == "Abort":
-                print("Aborting")
-                abort = True
-                break
+        with client.coalesced_edits():
+            for band_data in needs_p3:
+                band_name = band_data["name"]
+                db_qid = band_data["db_qid"]
+                wd_qid = band_data["wd_qid"]
+
+                print(f"\n{band_name} ({db_qid}) -> Wikidata {wd_qid}")
+
+                if dry_run:
+                    print(f"[DRY RUN] Would add P3 (Wikidata ID)={wd_qid}")
+                    continue
+
+                if skip_all:
+                    print("Skipping (skip all)")
+                    continue
+
+                if plan is not None:
+                    # Queued claims go to the plan when the block is flushed
+                    client.add_claims(db_qid, [ClaimSpec.string("P3", wd_qid)], summary="Add Wikidata QID from sync")
+                    continue
+
+                response = questionary.select(
+                    f"Add P3 (Wikidata ID)={wd_qid} to {band_name}?",
+                    choices=["Yes", "Skip", "Skip all", "Abort"],
+                ).ask()
+
+                if response == "Yes":
+                    print(f"Adding P3 (Wikidata ID)={wd_qid} to {band_name} ({db_qid})...")
+                    client.add_claims(db_qid, [ClaimSpec.string("P3", wd_qid)], summary="Add Wikidata QID from sync")
+                elif response == "Skip":
+                    print("Skipped")
+                elif response == "Skip all":
+                    print("Skipping all remaining")
+                    skip_all = True
+                elif response == "Abort":
+                    print("Aborting")
+                    abort = True
+                    break
 
     if abort:
         print("\nAborted by user")
@@ -275,6 +278,12 @@ def sync_wikidata_artists(
                 print("Skipping (skip all)")
                 continue
 
+            if plan is not None:
+                claims = [ClaimSpec.item("P1", "Q225")] + ([ClaimSpec.string("P3", wd_qid)] if wd_qid else [])
+                summary = "Create artist from danslogen sync" + (f" with Wikidata {wd_qid}" if wd_qid else "")
+                plan.add(EntityEdit(labels={"sv": band_name, "en": band_name}, claims=claims, summary=summary), source="sync-wikidata-artists")
+                continue
+
             response = questionary.select(
                 f"Create artist '{band_name}' in DanceDB?",
                 choices=choices,
@@ -300,6 +309,7 @@ def sync_wikidata_artists(
                     login=client.wbi.login,
                     summary=summary,
                 )
+                invalidate_cache(wbi_config["SPARQL_ENDPOINT_URL"])
                 qid = new_item.id
                 print(f"  Created: {client.base_url}/wiki/Item:{qid}")
 
@@ -28,14 +28,14 @@ LIMIT 5000
 
 def scrape_wikidata_urban_areas(date_str: str | None = None) -> dict[str, str]:
     """Fetch Swedish urban areas (tatort) from Wikidata."""
-    from wikibaseintegrator.wbi_helpers import execute_sparql_query
+    from src.utils.sparql import WIKIDATA_TTL_SECONDS, execute_sparql_query
 
     _get_wbi_config()
 
     date_str = date_str or date.today().strftime("%Y-%m-%d")
     print("\n=== Scrape Wikidata urban areas ===")
 
-    results = execute_sparql_query(query=SPARQL_URBAN_AREAS, endpoint=WIKIDATA_SPARQL_ENDPOINT)
+    results = execute_sparql_query(query=SPARQL_URBAN_AREAS, endpoint=WIKIDATA_SPARQL_ENDPOINT, ttl=WIKIDATA_TTL_SECONDS)
 
     urban_areas = {}
     for binding in results["results"]["bindings"]:
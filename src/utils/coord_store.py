@@ -0,0 +1,123 @@
+"""Columnar store of venue coordinates, for vectorized matching and duplicate detection.
+
+Snapshots keep the coordinates inside each venue (bygdegardarna position.lat/lng,
+folketshus lat/lng, DanceDB lat/lng or a P4 WKT point), so every consumer parses
+them again in a Python loop. A CoordStore holds them as contiguous float64 lat
+and lng arrays plus qid, source and external_id arrays, one row per venue with
+coordinates. It is saved as one .npy file per column in a <snapshot>.coords
+directory beside the snapshot and memory-mapped when loaded, so opening it
+reads almost nothing.
+
+Requires NumPy, the optional "coords" extra (see pyproject.toml).
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from src.utils import distance
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("lat", "lng", "qid", "source", "external_id")
+
+
+def venue_coordinates(source: str, venue: dict) -> tuple[Optional[float], Optional[float]]:
+    """(lat, lng) of a venue as it is stored in the snapshots of source, or (None, None)."""
+    if source == "bygdegardarna":
+        position = venue.get("position") or {}
+        return position.get("lat"), position.get("lng")
+    lat, lng = venue.get("lat"), venue.get("lng")
+    if (lat is None or lng is None) and venue.get("p4"):
+        from src.models.dancedb.bindings import parse_point
+
+        return parse_point(venue["p4"])
+    return lat, lng
+
+
+def _external_id(source: str, venue: dict) -> str:
+    if source == "dancedb":
+        return venue.get("qid") or ""
+    if source == "bygdegardarna" and not venue.get("external_id"):
+        permalink = (venue.get("meta") or {}).get("permalink", "")
+        return permalink.rstrip("/").split("/")[-1]
+    return venue.get("external_id") or ""
+
+
+class CoordStore:
+    """Venue coordinates as columns: row i of lat, lng, qid, source and external_id is one venue."""
+
+    def __init__(self, lat: np.ndarray, lng: np.ndarray, qid: np.ndarray, source: np.ndarray, external_id: np.ndarray):
+        self.lat = lat
+        self.lng = lng
+        self.qid = qid
+        self.source = source
+        self.external_id = external_id
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @classmethod
+    def from_venues(cls, source: str, venues: Iterable[dict]) -> "CoordStore":
+        """Store of the venues (as in the snapshots of source) that have coordinates."""
+        rows = []
+        for venue in venues:
+            lat, lng = venue_coordinates(source, venue)
+            if lat is None or lng is None:
+                continue
+            rows.append((float(lat), float(lng), venue.get("qid") or "", source, _external_id(source, venue)))
+        lat, lng, qid, sources, external_id = zip(*rows) if rows else ((), (), (), (), ())
+        # Fixed-width strings rather than objects, so the columns can be saved without pickle and memory-mapped
+        return cls(
+            np.array(lat, dtype=np.float64), np.array(lng, dtype=np.float64),
+            np.array(qid, dtype=str), np.array(sources, dtype=str), np.array(external_id, dtype=str),
+        )
+
+    @classmethod
+    def from_snapshot(cls, path: Path, source: str) -> "CoordStore":
+        """Store of a snapshot file: a list of venues, or DanceDB's {qid: venue}."""
+        data = json.loads(path.read_text())
+        venues = ({"qid": qid, **venue} for qid, venue in data.items()) if isinstance(data, dict) else data
+        return cls.from_venues(source, venues)
+
+    @classmethod
+    def concat(cls, stores: Sequence["CoordStore"]) -> "CoordStore":
+        """One store with the rows of stores in order, e.g. to match across sources."""
+        return cls(*(np.concatenate([getattr(store, column) for store in stores]) for column in COLUMNS))
+
+    def save(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        for column in COLUMNS:
+            np.save(directory / f"{column}.npy", getattr(self, column), allow_pickle=False)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "CoordStore":
+        return cls(*(np.load(directory / f"{column}.npy", mmap_mode="r" if mmap else None, allow_pickle=False) for column in COLUMNS))
+
+    @classmethod
+    def for_snapshot(cls, path: Path, source: str) -> "CoordStore":
+        """The saved store of a snapshot, (re)built first when it is missing or older than the snapshot."""
+        directory = path.with_suffix(".coords")
+        files = [directory / f"{column}.npy" for column in COLUMNS]
+        if all(file.exists() for file in files) and min(file.stat().st_mtime_ns for file in files) >= path.stat().st_mtime_ns:
+            return cls.load(directory)
+        store = cls.from_snapshot(path, source)
+        store.save(directory)
+        logger.info(f"Saved {len(store)} {source} venue coordinates to {directory}")
+        return store
+
+    def row(self, i: int) -> dict:
+        return {
+            "lat": float(self.lat[i]), "lng": float(self.lng[i]), "qid": str(self.qid[i]) or None,
+            "source": str(self.source[i]), "external_id": str(self.external_id[i]) or None,
+        }
+
+    def nearest(self, points: Sequence[tuple[float, float]], threshold_km: float, k: int = 1) -> list[list[tuple[int, float]]]:
+        """The k nearest rows within threshold_km of each (lat, lng) point as (row, distance in km), nearest first."""
+        return distance.nearest_rows(points, self.lat, self.lng, threshold_km, k)
+
+    def pairs_within(self, threshold_km: float) -> list[tuple[int, int, float]]:
+        """Row pairs within threshold_km of each other (possible duplicates) as (i, j, distance in km), closest first."""
+        return distance.pairs_within(np.column_stack((self.lat, self.lng)), threshold_km)
@@ -1,4 +1,19 @@
+import heapq
 import math
+from itertools import chain
+from typing import Hashable, Mapping, Optional, Sequence, TypeVar
+
+try:
+    import numpy as np
+except ImportError:  # optional, nearest_neighbours() falls back to plain Python
+    np = None
+
+K = TypeVar("K", bound=Hashable)
+
+# Candidates per grid neighbourhood above which nearest_neighbours() uses NumPy (when installed)
+DENSE_NEIGHBOURHOOD = 500
+# Max point-candidate distances the NumPy path computes at once
+NEIGHBOUR_BLOCK_SIZE = 1_000_000
 
 
 def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
@@ -19,4 +34,160 @@ def coordinate_bounding_box(lat: float, lng: float, threshold_km: float) -> tupl
     """
     lat_delta = threshold_km / 111
     lng_delta = threshold_km / (111 * math.cos(math.radians(lat)))
-    return lng - lng_delta, lng + lng_delta, lat - lat_delta, lat + lat_delta
\ No newline at end of file
+    return lng - lng_delta, lng + lng_delta, lat - lat_delta, lat + lat_delta
+
+
+def nearest_neighbours(
+    points: Sequence[tuple[float, float]], candidates: Mapping[K, tuple[float, float]], threshold_km: float, k: int = 1
+) -> list[list[tuple[K, float]]]:
+    """The k nearest candidates within threshold_km of each (lat, lng) point, nearest first.
+
+    Returns one list of (candidate key, distance in km) per point. Candidates
+    are bucketed in a grid of threshold-sized cells and each point is only
+    compared with the candidates in its own and the neighbouring cells. When
+    those neighbourhoods are crowded (a large threshold, or none) and NumPy is
+    installed, all distances are computed as arrays instead, a block of points
+    at a time.
+    """
+    keys = list(candidates)
+    if not keys or k < 1:
+        return [[] for _ in points]
+    coords = [candidates[key] for key in keys]
+    grid = _grid(points, coords, threshold_km)
+    crowded = grid is None or 9 * len(coords) / len(grid[0]) > DENSE_NEIGHBOURHOOD
+    if np is not None and crowded:
+        return _nearest_numpy(points, keys, coords, threshold_km, k)
+    if grid is None:
+        return [
+            [(keys[i], d) for d, i in heapq.nsmallest(k, ((haversine_distance(lat, lng, *coord), i) for i, coord in enumerate(coords)))]
+            for lat, lng in points
+        ]
+    return _nearest_grid(points, keys, coords, threshold_km, k, grid)
+
+
+def nearest_rows(
+    points: Sequence[tuple[float, float]], lat: Sequence[float], lng: Sequence[float], threshold_km: float, k: int = 1
+) -> list[list[tuple[int, float]]]:
+    """The k nearest of the candidates given as lat and lng columns, like nearest_neighbours() keyed by row.
+
+    With NumPy installed the columns (e.g. memory-mapped arrays) are used as
+    they are and all distances are computed as arrays; without it this is
+    nearest_neighbours() over a {row: (lat, lng)} mapping.
+    """
+    if not len(lat) or k < 1:
+        return [[] for _ in points]
+    if np is None:
+        return nearest_neighbours(points, dict(enumerate(zip(lat, lng))), threshold_km, k)
+    return _nearest_numpy(points, range(len(lat)), np.column_stack((lat, lng)), threshold_km, k)
+
+
+def pairs_within(coords: Sequence[tuple[float, float]], threshold_km: float) -> list[tuple[int, int, float]]:
+    """Index pairs (i, j), i < j, of the (lat, lng) coords within threshold_km of each other, closest first.
+
+    Returns (i, j, distance in km) per pair, e.g. to find duplicate venues.
+    Without NumPy only coords in the same or neighbouring grid cells (see
+    nearest_neighbours()) are compared; with NumPy the coords are sorted by
+    latitude and compared as arrays, one offset in that order at a time.
+    """
+    if len(coords) < 2:
+        return []
+    if np is not None:
+        pairs = _pairs_numpy(np.asarray(coords, dtype=float).reshape(-1, 2), threshold_km)
+    else:
+        pairs = _pairs_grid(coords, threshold_km)
+    pairs.sort(key=lambda pair: (pair[2], pair[0], pair[1]))
+    return pairs
+
+
+def _grid(points, coords: list, threshold_km: float) -> Optional[tuple[dict[tuple[int, int], list[int]], float, float]]:
+    """(cell -> candidate indices, cell height, cell width) in degrees, or None without a finite threshold.
+
+    A cell is at least threshold_km wide everywhere (111 km per degree is a slight
+    underestimate), so all candidates within reach of a point are in its cell or
+    the eight around it. Longitudes are not wrapped at 180 degrees.
+    """
+    if not math.isfinite(threshold_km):
+        return None
+    cell_km = max(threshold_km, 1e-6)
+    max_lat = min(89.0, max(abs(lat) for lat, _ in chain(coords, points)))
+    lat_cell = cell_km / 111
+    lng_cell = cell_km / (111 * math.cos(math.radians(max_lat)))
+    cells: dict[tuple[int, int], list[int]] = {}
+    for i, (lat, lng) in enumerate(coords):
+        cells.setdefault((math.floor(lat / lat_cell), math.floor(lng / lng_cell)), []).append(i)
+    return cells, lat_cell, lng_cell
+
+
+def _nearest_grid(points, keys: list, coords: list, threshold_km: float, k: int, grid: tuple) -> list[list[tuple]]:
+    cells, lat_cell, lng_cell = grid
+    results = []
+    for lat, lng in points:
+        row, col = math.floor(lat / lat_cell), math.floor(lng / lng_cell)
+        hits = []
+        for cell in ((row + dr, col + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)):
+            for i in cells.get(cell, ()):
+                distance = haversine_distance(lat, lng, *coords[i])
+                if distance <= threshold_km:
+                    hits.append((distance, i))
+        results.append([(keys[i], d) for d, i in heapq.nsmallest(k, hits)])
+    return results
+
+
+def _pairs_grid(coords, threshold_km: float) -> list[tuple[int, int, float]]:
+    grid = _grid([], coords, threshold_km)
+    if grid is None:
+        pairs = ((i, j, haversine_distance(*coords[i], *coords[j])) for i in range(len(coords)) for j in range(i + 1, len(coords)))
+        return [pair for pair in pairs if pair[2] <= threshold_km]
+    cells, _, _ = grid
+    pairs = []
+    for (row, col), members in cells.items():
+        # Each pair of neighbouring cells once: the cell itself, then the ones to its east and north
+        for dr, dc in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+            for i in members:
+                for j in cells.get((row + dr, col + dc), ()):
+                    if dr == dc == 0 and j <= i:
+                        continue
+                    distance = haversine_distance(*coords[i], *coords[j])
+                    if distance <= threshold_km:
+                        pairs.append((min(i, j), max(i, j), distance))
+    return pairs
+
+
+def _pairs_numpy(coords, threshold_km: float) -> list[tuple[int, int, float]]:
+    order = np.argsort(coords[:, 0], kind="stable")
+    lat_deg = coords[order, 0]
+    lat, lng = np.radians(lat_deg), np.radians(coords[order, 1])
+    cos_lat = np.cos(lat)
+    # Sorted rows past reach[i] are too far north of row i (111 km per degree is a slight underestimate)
+    reach = np.searchsorted(lat_deg, lat_deg + threshold_km / 111, side="right")
+    rows = np.arange(len(coords))
+    pairs = []
+    for offset in range(1, int((reach - rows).max())):
+        i = np.nonzero(rows[:-offset] + offset < reach[:-offset])[0]
+        j = i + offset
+        a = np.sin((lat[j] - lat[i]) / 2) ** 2 + cos_lat[i] * cos_lat[j] * np.sin((lng[j] - lng[i]) / 2) ** 2
+        a = np.clip(a, 0.0, 1.0)
+        distances = 2 * 6371 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        hit = distances <= threshold_km
+        for first, second, distance in zip(order[i[hit]].tolist(), order[j[hit]].tolist(), distances[hit].tolist()):
+            pairs.append((min(first, second), max(first, second), distance))
+    return pairs
+
+
+def _nearest_numpy(points, keys: list, coords: list, threshold_km: float, k: int) -> list[list[tuple]]:
+    candidate_lat, candidate_lng = np.radians(np.asarray(coords, dtype=float)).T
+    cos_candidate_lat = np.cos(candidate_lat)
+    k = min(k, len(keys))
+    rows = max(1, NEIGHBOUR_BLOCK_SIZE // len(keys))
+    results = []
+    for start in range(0, len(points), rows):
+        block = np.radians(np.asarray(points[start:start + rows], dtype=float))
+        lat, lng = block[:, 0:1], block[:, 1:2]
+        a = np.sin((candidate_lat - lat) / 2) ** 2 + np.cos(lat) * cos_candidate_lat * np.sin((candidate_lng - lng) / 2) ** 2
+        a = np.clip(a, 0.0, 1.0)
+        distances = 2 * 6371 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k] if k < len(keys) else np.tile(np.arange(len(keys)), (len(block), 1))
+        for row, indices in zip(distances, nearest):
+            indices = indices[np.argsort(row[indices], kind="stable")]
+            results.append([(keys[i], float(row[i])) for i in indices if row[i] <= threshold_km])
+    return results
@@ -1,12 +1,14 @@
+import hashlib
 import json
 import math
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, Sequence
 
 import config
-from src.utils.distance import haversine_distance
+from src.utils.distance import haversine_distance, nearest_neighbours
 
 
 def get_db_path() -> Path:
@@ -14,29 +16,9 @@ def get_db_path() -> Path:
 
 
 def init_db() -> sqlite3.Connection:
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS venues (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            source TEXT NOT NULL,
-            lat REAL NOT NULL,
-            lng REAL NOT NULL,
-            external_id TEXT,
-            qid TEXT,
-            address TEXT,
-            city TEXT,
-            phone TEXT,
-            email TEXT,
-            permalink TEXT,
-            created_at TEXT NOT NULL,
-            UNIQUE(source, external_id)
-        )
-    """)
-    
+    conn = _connect(get_db_path())
+    new = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'venues'").fetchone() is None
+
     conn.execute("""
         CREATE VIRTUAL TABLE IF NOT EXISTS venues_geom USING rtree(
             id,
@@ -44,20 +26,182 @@ def init_db() -> sqlite3.Connection:
             min_lng, max_lng
         )
     """)
-    
+
+    if new:
+        # A new database gets the current schema directly; _migrate() is for existing files
+        conn.execute(VENUES_TABLE.format(table="venues"))
+        conn.executescript(GEOM_TRIGGERS + LOAD_TABLES + NAME_INDEX + NAME_LOOKUP)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    else:
+        _migrate(conn)
     conn.commit()
     return conn
 
 
+# venues_geom holds one point box per venue with coordinates and is kept in sync by triggers,
+# so every loader (and INSERT OR REPLACE, with recursive_triggers on) updates it.
+GEOM_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS venues_geom_insert AFTER INSERT ON venues WHEN new.lat IS NOT NULL AND new.lng IS NOT NULL BEGIN
+    INSERT OR REPLACE INTO venues_geom (id, min_lat, max_lat, min_lng, max_lng) VALUES (new.id, new.lat, new.lat, new.lng, new.lng);
+END;
+CREATE TRIGGER IF NOT EXISTS venues_geom_update AFTER UPDATE OF lat, lng ON venues BEGIN
+    DELETE FROM venues_geom WHERE id = old.id;
+    INSERT INTO venues_geom (id, min_lat, max_lat, min_lng, max_lng)
+        SELECT new.id, new.lat, new.lat, new.lng, new.lng WHERE new.lat IS NOT NULL AND new.lng IS NOT NULL;
+END;
+CREATE TRIGGER IF NOT EXISTS venues_geom_delete AFTER DELETE ON venues BEGIN
+    DELETE FROM venues_geom WHERE id = old.id;
+END;
+"""
+
+# Source files already loaded, so unchanged files are skipped, and the last load of each source
+LOAD_TABLES = """
+CREATE TABLE IF NOT EXISTS source_files (
+    path TEXT PRIMARY KEY, source TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS source_loads (
+    source TEXT PRIMARY KEY, loaded_at TEXT NOT NULL, files INTEGER NOT NULL, venues INTEGER NOT NULL
+);
+"""
+
+# Case-insensitive trigram index over venue names (external content: venues), kept in sync by triggers
+NAME_INDEX = """
+CREATE VIRTUAL TABLE IF NOT EXISTS venues_fts USING fts5(name, content='venues', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS venues_fts_insert AFTER INSERT ON venues BEGIN
+    INSERT INTO venues_fts (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS venues_fts_update AFTER UPDATE OF name ON venues BEGIN
+    INSERT INTO venues_fts (venues_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO venues_fts (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS venues_fts_delete AFTER DELETE ON venues BEGIN
+    INSERT INTO venues_fts (venues_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+"""
+
+# Venues as of schema 4: coordinates are optional (DanceDB venues without any)
+# and name_lower holds str.lower() of the name, which SQLite's lower() does not match outside ASCII
+VENUES_TABLE = """
+CREATE TABLE {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    name_lower TEXT,
+    source TEXT NOT NULL,
+    lat REAL,
+    lng REAL,
+    external_id TEXT,
+    qid TEXT,
+    address TEXT,
+    city TEXT,
+    phone TEXT,
+    email TEXT,
+    permalink TEXT,
+    created_at TEXT NOT NULL,
+    source_rank TEXT,
+    updated_at TEXT,
+    UNIQUE(source, external_id)
+)
+"""
+
+# Exact name lookups, and the DanceDB aliases of venues (dropped with their venue)
+NAME_LOOKUP = """
+CREATE INDEX IF NOT EXISTS venues_name_lower ON venues (name_lower, source);
+CREATE TABLE IF NOT EXISTS venue_aliases (venue_id INTEGER NOT NULL, alias TEXT NOT NULL, alias_lower TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS venue_aliases_lower ON venue_aliases (alias_lower);
+CREATE INDEX IF NOT EXISTS venue_aliases_venue ON venue_aliases (venue_id);
+CREATE TRIGGER IF NOT EXISTS venue_aliases_delete AFTER DELETE ON venues BEGIN
+    DELETE FROM venue_aliases WHERE venue_id = old.id;
+END;
+"""
+
+SCHEMA_VERSION = 4
+
+
+def _migrate(conn: sqlite3.Connection):
+    """Bring an existing database up to SCHEMA_VERSION (tracked in PRAGMA user_version)."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < 1:
+        conn.executescript(GEOM_TRIGGERS)
+        # Databases from before the triggers have an empty venues_geom
+        conn.execute("DELETE FROM venues_geom")
+        conn.execute("INSERT INTO venues_geom (id, min_lat, max_lat, min_lng, max_lng) SELECT id, lat, lat, lng, lng FROM venues WHERE lat IS NOT NULL")
+    if version < 2:
+        # source_rank orders the files a venue came from, see _upsert_venues()
+        conn.execute("ALTER TABLE venues ADD COLUMN source_rank TEXT")
+        conn.execute("ALTER TABLE venues ADD COLUMN updated_at TEXT")
+        conn.executescript(LOAD_TABLES)
+        # DanceDB venues used to be stored without external_id, once per load
+        conn.execute("DELETE FROM venues WHERE source = 'dancedb' AND id NOT IN (SELECT MAX(id) FROM venues WHERE source = 'dancedb' GROUP BY qid)")
+        conn.execute("UPDATE venues SET external_id = qid WHERE source = 'dancedb'")
+    if version < 3:
+        conn.executescript(NAME_INDEX)
+        conn.execute("INSERT INTO venues_fts (venues_fts) VALUES ('rebuild')")
+    if version < 4:
+        # SQLite cannot drop NOT NULL, so the table is copied; its triggers go with the old one
+        columns = "id, name, source, lat, lng, external_id, qid, address, city, phone, email, permalink, created_at, source_rank, updated_at"
+        conn.execute(VENUES_TABLE.format(table="venues_v4"))
+        conn.execute(f"INSERT INTO venues_v4 ({columns}) SELECT {columns} FROM venues")
+        conn.execute("DROP TABLE venues")
+        conn.execute("ALTER TABLE venues_v4 RENAME TO venues")
+        conn.executescript(GEOM_TRIGGERS + NAME_INDEX + NAME_LOOKUP)
+        rows = conn.execute("SELECT id, name FROM venues").fetchall()
+        conn.executemany("UPDATE venues SET name_lower = ? WHERE id = ?", ((row["name"].lower(), row["id"]) for row in rows))
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    # check_same_thread is off only so close_connections() can close every thread's connection
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA recursive_triggers = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA mmap_size = {int(config.GEODB_MMAP_BYTES)}")
+    conn.execute(f"PRAGMA cache_size = -{int(config.GEODB_CACHE_KIB)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
 def ensure_db():
     db_path = get_db_path()
     if not db_path.exists():
         return init_db()
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    conn = _connect(db_path)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        conn.close()
+        return init_db()
+    return conn
+
+
+# (thread id, database path) -> the long-lived connection of that thread
+_connections: dict[tuple[int, Path], sqlite3.Connection] = {}
+_connections_lock = threading.Lock()
+
+
+def get_connection() -> sqlite3.Connection:
+    """The geodb connection of the current thread, opened (and migrated) on first use.
+
+    The connection stays open, so repeated lookups reuse its page cache and the
+    statements sqlite3 has already prepared. Do not close it; writers commit.
+    """
+    key = (threading.get_ident(), get_db_path())
+    with _connections_lock:
+        conn = _connections.get(key)
+    if conn is None:
+        conn = ensure_db()
+        with _connections_lock:
+            _connections[key] = conn
     return conn
 
 
+def close_connections():
+    """Close the connections of all threads, e.g. before the database file is removed."""
+    with _connections_lock:
+        for conn in _connections.values():
+            conn.close()
+        _connections.clear()
+
+
 def _bbox_from_point(lat: float, lng: float, threshold_km: float) -> tuple:
     lat_delta = threshold_km / 111.0
     cos_lat = math.cos(math.radians(lat)) if abs(lat) > 0.001 else 1.0
@@ -65,267 +209,369 @@ def _bbox_from_point(lat: float, lng: float, threshold_km: float) -> tuple:
     return (lat - lat_delta, lat + lat_delta, lng - lng_delta, lng + lng_delta)
 
 
-def load_bygdegardarna():
-    conn = ensure_db()
-    
+# Columns written by the loaders; created_at is only set when a venue is first inserted
+VENUE_COLUMNS = ("name", "name_lower", "source", "lat", "lng", "external_id", "qid", "address", "city", "phone", "email", "permalink", "source_rank")
+
+# Columns the upsert leaves out when checking whether a row changed (a new qid is checked on its own)
+_UNCOMPARED_COLUMNS = ("source", "external_id", "qid", "source_rank")
+UPSERT_VENUE = f"""
+    INSERT INTO venues ({", ".join(VENUE_COLUMNS)}, created_at, updated_at)
+    VALUES ({", ".join("?" * (len(VENUE_COLUMNS) + 2))})
+    ON CONFLICT (source, external_id) DO UPDATE SET
+        {", ".join(f"{column} = excluded.{column}" for column in VENUE_COLUMNS if column not in ("source", "external_id", "qid"))},
+        qid = COALESCE(NULLIF(excluded.qid, ''), venues.qid),
+        updated_at = excluded.updated_at
+    WHERE excluded.source_rank >= COALESCE(venues.source_rank, '')
+        AND ({" OR ".join(f"venues.{column} IS NOT excluded.{column}" for column in VENUE_COLUMNS if column not in _UNCOMPARED_COLUMNS)}
+            OR (NULLIF(excluded.qid, '') IS NOT NULL AND venues.qid IS NOT excluded.qid))
+"""
+
+
+def _file_rank(path: Path, priority: int) -> str:
+    """Rank of the venues of a file: higher priority (enriched over raw) first, then the later file name (date)."""
+    return f"{priority}:{path.name}"
+
+
+def _changed_files(conn: sqlite3.Connection, source: str, paths: list[Path]) -> list[tuple[Path, bytes]]:
+    """Files whose content differs from when they were last loaded, with their content.
+
+    Size and modification time are compared first, so unchanged files are not read.
+    Fingerprints are stored in the current transaction.
+    """
+    known = {row["path"]: row for row in conn.execute("SELECT path, size, mtime_ns, sha256 FROM source_files WHERE source = ?", (source,))}
+    changed = []
+    for path in paths:
+        stat = path.stat()
+        row = known.get(str(path))
+        if row is not None and row["size"] == stat.st_size and row["mtime_ns"] == stat.st_mtime_ns:
+            continue
+        content = path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        conn.execute(
+            "INSERT OR REPLACE INTO source_files (path, source, size, mtime_ns, sha256) VALUES (?, ?, ?, ?, ?)",
+            (str(path), source, stat.st_size, stat.st_mtime_ns, digest),
+        )
+        if row is None or row["sha256"] != digest:
+            changed.append((path, content))
+    return changed
+
+
+def _upsert_venues(conn: sqlite3.Connection, source: str, venues: dict, files: int) -> int:
+    """Insert new venues and update changed ones, then record the load. Returns the venues written.
+
+    venues maps external_id to a dict of VENUE_COLUMNS. A stored venue is only
+    overwritten from a file of equal or higher source_rank, so the newest
+    (enriched) data wins whatever order files change in.
+    """
+    now = datetime.now().isoformat()
+    for venue in venues.values():
+        venue["name_lower"] = venue["name"].lower()
+    cursor = conn.executemany(UPSERT_VENUE, ([*(venue.get(column) for column in VENUE_COLUMNS), now, now] for venue in venues.values()))
+    written = max(cursor.rowcount, 0)
+    conn.execute(
+        "INSERT OR REPLACE INTO source_loads (source, loaded_at, files, venues) VALUES (?, ?, ?, ?)",
+        (source, now, files, written),
+    )
+    return written
+
+
+def _load_files(source: str, files: list[tuple[Path, int]], parse) -> int:
+    """Load the changed files of a source in one transaction; parse(data, rank) yields venue dicts."""
+    conn = get_connection()
+    priorities = {path: priority for path, priority in files}
+    with conn:
+        changed = _changed_files(conn, source, list(priorities))
+        # Highest rank first: the first row seen for a venue wins within this load
+        changed.sort(key=lambda item: _file_rank(item[0], priorities[item[0]]), reverse=True)
+        venues = {}
+        for path, content in changed:
+            for venue in parse(json.loads(content), _file_rank(path, priorities[path])):
+                venues.setdefault(venue["external_id"], venue)
+        written = _upsert_venues(conn, source, venues, len(changed))
+    print(f"Loaded {written} changed {source} venues from {len(changed)} changed files into geodb")
+    return written
+
+
+def _parse_bygdegardarna(data: list, rank: str):
+    for v in data:
+        name = v.get("title", "").strip()
+        meta = v.get("meta", {})
+        position = v.get("position", {})
+        lat, lng = position.get("lat"), position.get("lng")
+        permalink = meta.get("permalink", "")
+        if not name or not lat or not lng or not permalink:
+            continue
+        parts = permalink.rstrip("/").split("/")
+        external_id = v.get("external_id") or (parts[-1] if parts else None)
+        if not external_id:
+            continue
+        yield {
+            "name": name, "source": "bygdegardarna", "lat": lat, "lng": lng, "external_id": external_id,
+            "address": meta.get("address", ""), "city": meta.get("city", ""), "phone": meta.get("phone", ""),
+            "email": meta.get("email", ""), "permalink": permalink, "source_rank": rank,
+        }
+
+
+def _parse_folketshus(data: list, rank: str):
+    for v in data:
+        name = v.get("name", "").strip()
+        external_id = v.get("external_id", "")
+        lat, lng = v.get("lat"), v.get("lng")
+        if not name or not lat or not lng or not external_id:
+            continue
+        yield {
+            "name": name, "source": "folketshus", "lat": lat, "lng": lng, "external_id": external_id, "qid": v.get("qid", ""),
+            "address": v.get("address", ""), "city": v.get("region", ""), "permalink": v.get("url", ""), "source_rank": rank,
+        }
+
+
+def load_bygdegardarna() -> int:
     enriched_dir = config.bygdegardarna_dir / "enriched"
     raw_dir = config.bygdegardarna_dir
-    
-    files_to_check = []
+    files = [(path, 0) for path in sorted(raw_dir.glob("*.json"))] if raw_dir.exists() else []
     if enriched_dir.exists():
-        files_to_check.extend(sorted(enriched_dir.glob("*.json"), reverse=True))
-    if raw_dir.exists():
-        files_to_check.extend(sorted(raw_dir.glob("*.json"), reverse=True))
-    
-    seen = set()
-    count = 0
-    
-    for byg_file in files_to_check:
-        data = json.loads(byg_file.read_text())
-        for v in data:
-            name = v.get("title", "").strip()
-            meta = v.get("meta", {})
-            position = v.get("position", {})
-            
-            if not name:
-                continue
-            
-            lat = position.get("lat")
-            lng = position.get("lng")
-            if not lat or not lng:
-                continue
-            
-            permalink = meta.get("permalink", "")
-            if not permalink:
-                continue
-            parts = permalink.rstrip("/").split("/")
-            external_id = v.get("external_id") or (parts[-1] if parts else None)
-            if not external_id:
-                continue
-            
-            key = ("bygdegardarna", external_id)
-            if key in seen:
-                continue
-            seen.add(key)
-            
-            try:
-                conn.execute("""
-                    INSERT OR IGNORE INTO venues 
-                    (name, source, lat, lng, external_id, address, city, phone, email, permalink, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    name, "bygdegardarna", lat, lng, external_id,
-                    meta.get("address", ""), meta.get("city", ""),
-                    meta.get("phone", ""), meta.get("email", ""),
-                    meta.get("permalink", ""),
-                    datetime.now().isoformat()
-                ))
-                count += 1
-            except sqlite3.IntegrityError:
-                pass
-    
-    conn.commit()
-    conn.close()
-    print(f"Loaded {count} bygdegardarna venues into geodb")
+        files.extend((path, 1) for path in sorted(enriched_dir.glob("*.json")))
+    return _load_files("bygdegardarna", files, _parse_bygdegardarna)
 
 
-def load_folketshus():
-    conn = ensure_db()
-    
+def load_folketshus() -> int:
     enriched_dir = config.data_dir / "folketshus" / "enriched"
-    
     if not enriched_dir.exists():
         print("No folketshus enriched directory found")
-        return
-    
-    files = sorted(enriched_dir.glob("*.json"), reverse=True)
-    
-    seen = set()
-    count = 0
-    
-    for folk_file in files:
-        data = json.loads(folk_file.read_text())
-        for v in data:
-            name = v.get("name", "").strip()
-            external_id = v.get("external_id", "")
-            
-            if not name:
-                continue
-            
-            lat = v.get("lat")
-            lng = v.get("lng")
-            if not lat or not lng:
-                continue
-            
-            if not external_id:
-                continue
-            
-            key = ("folketshus", external_id)
-            if key in seen:
-                continue
-            seen.add(key)
-            
-            try:
-                conn.execute("""
-                    INSERT OR IGNORE INTO venues 
-                    (name, source, lat, lng, external_id, qid, address, city, permalink, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    name, "folketshus", lat, lng, external_id, v.get("qid", ""),
-                    v.get("address", ""), v.get("region", ""),
-                    v.get("url", ""),
-                    datetime.now().isoformat()
-                ))
-                count += 1
-            except sqlite3.IntegrityError:
-                pass
-    
-    conn.commit()
-    conn.close()
-    print(f"Loaded {count} folketshus venues into geodb")
+        return 0
+    return _load_files("folketshus", [(path, 1) for path in sorted(enriched_dir.glob("*.json"))], _parse_folketshus)
+
+
+VENUE_FIELDS = ("id", "name", "source", "lat", "lng", "external_id", "qid", "address", "city", "phone", "email", "permalink")
+
+
+def _venue_dict(row: sqlite3.Row, distance_km: Optional[float]) -> dict:
+    return {**{field: row[field] for field in VENUE_FIELDS}, "distance_km": distance_km}
 
 
 def find_nearby(lat: float, lng: float, threshold_km: float = 0.1, limit: int = 10) -> list:
-    conn = ensure_db()
+    conn = get_connection()
     
     lat_min, lat_max, lng_min, lng_max = _bbox_from_point(lat, lng, threshold_km)
     
-    cursor = conn.execute("""
-        SELECT id, name, source, lat, lng, external_id, qid, address, city, phone, email, permalink
-        FROM venues
-        WHERE lat BETWEEN ? AND ? AND lng BETWEEN ? AND ?
+    # The R-tree narrows the candidates to the bounding box, haversine does the rest
+    cursor = conn.execute(f"""
+        SELECT {", ".join(f"v.{field}" for field in VENUE_FIELDS)}
+        FROM venues_geom g JOIN venues v ON v.id = g.id
+        WHERE g.max_lat >= ? AND g.min_lat <= ? AND g.max_lng >= ? AND g.min_lng <= ?
     """, (lat_min, lat_max, lng_min, lng_max))
     
     results = []
     for row in cursor:
         dist = haversine_distance(lat, lng, row["lat"], row["lng"])
         if dist <= threshold_km:
-            results.append({
-                "id": row["id"],
-                "name": row["name"],
-                "source": row["source"],
-                "lat": row["lat"],
-                "lng": row["lng"],
-                "external_id": row["external_id"],
-                "qid": row["qid"],
-                "address": row["address"],
-                "city": row["city"],
-                "phone": row["phone"],
-                "email": row["email"],
-                "permalink": row["permalink"],
-                "distance_km": dist,
-            })
+            results.append(_venue_dict(row, dist))
     
     results.sort(key=lambda x: x["distance_km"])
-    conn.close()
     return results[:limit]
 
 
-def find_nearby_by_name(name: str, threshold_km: float = 0.1) -> list:
-    conn = ensure_db()
-    
-    cursor = conn.execute("""
-        SELECT id, name, source, lat, lng, external_id, qid, address, city, phone, email, permalink
-        FROM venues
-        WHERE LOWER(name) LIKE LOWER(?)
-    """, (f"%{name}%",))
-    
+def find_nearby_many(points: Sequence[tuple[float, float]], threshold_km: float = 0.1, k: int = 10) -> list:
+    """find_nearby() for many (lat, lng) points at once: one list of venues, nearest first, per point.
+
+    All venue coordinates are read once and matched with nearest_neighbours(),
+    then only the venues found are read in full.
+    """
+    conn = get_connection()
+    coords = {row["id"]: (row["lat"], row["lng"]) for row in conn.execute("SELECT id, lat, lng FROM venues WHERE lat IS NOT NULL AND lng IS NOT NULL")}
+    neighbours = nearest_neighbours(points, coords, threshold_km, k)
+    ids = list({venue_id for hits in neighbours for venue_id, _ in hits})
+    rows = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        rows.update((row["id"], row) for row in conn.execute(f"SELECT {', '.join(VENUE_FIELDS)} FROM venues WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+    return [[_venue_dict(rows[venue_id], distance) for venue_id, distance in hits] for hits in neighbours]
+
+
+def _normalize_name(name: str) -> str:
+    return " ".join(name.split())
+
+
+def _fts_phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _search_names(match: str, lat: Optional[float], lng: Optional[float], threshold_km: float, limit: Optional[int]) -> list:
+    """Venues whose name matches the FTS5 query match, best ranked first, optionally within threshold_km of (lat, lng)."""
+    conn = get_connection()
+    sql = f"""
+        SELECT {", ".join(f"v.{field}" for field in VENUE_FIELDS)}
+        FROM venues_fts f JOIN venues v ON v.id = f.rowid
+        WHERE venues_fts MATCH ?
+    """
+    params: list = [match]
+    near = lat is not None and lng is not None
+    if near:
+        lat_min, lat_max, lng_min, lng_max = _bbox_from_point(lat, lng, threshold_km)
+        sql += " AND v.lat BETWEEN ? AND ? AND v.lng BETWEEN ? AND ?"
+        params += [lat_min, lat_max, lng_min, lng_max]
+    sql += " ORDER BY f.rank"
     results = []
-    for row in cursor:
-        lat, lng = row["lat"], row["lng"]
-        dist = haversine_distance(0, 0, 0, 0)
-        
-        results.append({
-            "id": row["id"],
-            "name": row["name"],
-            "source": row["source"],
-            "lat": lat,
-            "lng": lng,
-            "external_id": row["external_id"],
-            "qid": row["qid"],
-            "address": row["address"],
-            "city": row["city"],
-            "phone": row["phone"],
-            "email": row["email"],
-            "permalink": row["permalink"],
-            "distance_km": dist,
-        })
-    
-    conn.close()
+    for row in conn.execute(sql, params):
+        dist = haversine_distance(lat, lng, row["lat"], row["lng"]) if near else None
+        if dist is None or dist <= threshold_km:
+            results.append(_venue_dict(row, dist))
+            if limit is not None and len(results) >= limit:
+                break
     return results
 
 
+def find_nearby_by_name(name: str, threshold_km: float = 0.1, lat: Optional[float] = None, lng: Optional[float] = None, limit: Optional[int] = None) -> list:
+    """Venues whose name contains name (case-insensitive), best ranked first.
+
+    With lat and lng only venues within threshold_km are returned and distance_km
+    is set; otherwise distance_km is None.
+    """
+    name = _normalize_name(name)
+    if len(name) < 3:
+        # Trigrams need three characters; short names fall back to a scan
+        conn = get_connection()
+        rows = conn.execute(f"SELECT {', '.join(VENUE_FIELDS)} FROM venues WHERE name LIKE ?", (f"%{name}%",)).fetchall()
+        if lat is None or lng is None:
+            results = [_venue_dict(row, None) for row in rows]
+        else:
+            rows = [row for row in rows if row["lat"] is not None and row["lng"] is not None]
+            results = [_venue_dict(row, haversine_distance(lat, lng, row["lat"], row["lng"])) for row in rows]
+            results = [r for r in results if r["distance_km"] <= threshold_km]
+        return results[:limit] if limit is not None else results
+    return _search_names(_fts_phrase(name), lat, lng, threshold_km, limit)
+
+
+def find_by_name(name: str, source: Optional[str] = None) -> list:
+    """Venues named name, compared as str.lower(), then DanceDB venues with it as an alias; optionally of one source only.
+
+    Both are index lookups (name_lower, venue_aliases), so nothing is scanned.
+    """
+    conn = get_connection()
+    source_filter = "" if source is None else " AND v.source = ?"
+    params = (name.lower(),) if source is None else (name.lower(), source)
+    fields = ", ".join(f"v.{field}" for field in VENUE_FIELDS)
+    rows = conn.execute(f"SELECT {fields} FROM venues v WHERE v.name_lower = ?{source_filter} ORDER BY v.id", params).fetchall()
+    rows += conn.execute(f"""
+        SELECT {fields} FROM venue_aliases a JOIN venues v ON v.id = a.venue_id
+        WHERE a.alias_lower = ?{source_filter} ORDER BY v.id
+    """, params).fetchall()
+    venues = {}
+    for row in rows:
+        venues.setdefault(row["id"], _venue_dict(row, None))
+    return list(venues.values())
+
+
+def name_qids(source: str) -> dict:
+    """{name: qid} of the venues of source that have a QID, e.g. to fuzzy match names against."""
+    rows = get_connection().execute("SELECT name, qid FROM venues WHERE source = ? AND qid IS NOT NULL AND qid != '' ORDER BY id", (source,))
+    return {row["name"]: row["qid"] for row in rows}
+
+
 def update_qid(external_id: str, source: str, qid: str):
-    conn = ensure_db()
-    conn.execute("""
-        UPDATE venues SET qid = ? WHERE source = ? AND external_id = ?
-    """, (qid, source, external_id))
-    conn.commit()
-    conn.close()
+    update_qids([(external_id, source, qid)])
+
+
+def update_qids(rows: Iterable[tuple[str, str, str]]) -> int:
+    """Set the QID of many venues in one transaction. rows are (external_id, source, qid); returns the rows updated."""
+    conn = get_connection()
+    with conn:
+        cursor = conn.executemany("""
+            UPDATE venues SET qid = ? WHERE source = ? AND external_id = ?
+        """, ((qid, source, external_id) for external_id, source, qid in rows))
+    return cursor.rowcount
 
 
 def get_stats() -> dict:
-    conn = ensure_db()
+    conn = get_connection()
     cursor = conn.execute("""
         SELECT source, COUNT(*) as count FROM venues GROUP BY source
     """)
     stats = {row["source"]: row["count"] for row in cursor}
-    conn.close()
     return stats
 
 
-def load_dancedb():
-    from src.models.dancedb.client import DancedbClient
-    
-    conn = ensure_db()
-    
-    print("Fetching venues from DanceDB...")
-    client = DancedbClient()
-    venues = client.fetch_venues_from_dancedb()
-    print(f"Found {len(venues)} venues on DanceDB")
-    
-    count = 0
+def _dancedb_rows(venues: Iterable[dict]) -> dict:
+    """DanceDB venues ({qid, label, aliases, lat, lng}) as venue rows by QID; coordinates are optional."""
+    rows = {}
     for v in venues:
-        name = v.get("label", "").strip()
+        name = (v.get("label") or "").strip()
         qid = v.get("qid", "")
-        p4 = v.get("p4", "")
-        
-        lat, lng = None, None
-        if p4:
-            try:
-                coords = p4.replace("Point(", "").replace(")", "").split(" ")
-                lng, lat = float(coords[0]), float(coords[1])
-            except Exception:
-                pass
-        
-        if not name or not qid or not lat or not lng:
-            continue
-        
-        try:
-            conn.execute("""
-                INSERT OR REPLACE INTO venues 
-                (name, source, lat, lng, qid, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (name, "dancedb", lat, lng, qid, datetime.now().isoformat()))
-            count += 1
-        except sqlite3.IntegrityError:
-            pass
-    
-    conn.commit()
-    conn.close()
-    print(f"Loaded {count} dancedb venues into geodb")
+        if name and qid:
+            rows[qid] = {
+                "name": name, "source": "dancedb", "lat": v.get("lat") or None, "lng": v.get("lng") or None,
+                "external_id": qid, "qid": qid, "source_rank": "", "aliases": v.get("aliases") or [],
+            }
+    return rows
+
+
+def _sync_dancedb(conn: sqlite3.Connection, rows: dict, files: int) -> int:
+    """Make the stored DanceDB venues and aliases those of rows, dropping the ones no longer there (merged or deleted)."""
+    written = _upsert_venues(conn, "dancedb", rows, files)
+    ids = {row["external_id"]: row["id"] for row in conn.execute("SELECT id, external_id FROM venues WHERE source = 'dancedb'")}
+    conn.executemany("DELETE FROM venues WHERE id = ?", ((venue_id,) for qid, venue_id in ids.items() if qid not in rows))
+    conn.execute("DELETE FROM venue_aliases WHERE venue_id IN (SELECT id FROM venues WHERE source = 'dancedb')")
+    conn.executemany(
+        "INSERT INTO venue_aliases (venue_id, alias, alias_lower) VALUES (?, ?, ?)",
+        ((ids[qid], alias, alias.lower()) for qid, row in rows.items() for alias in row["aliases"]),
+    )
+    return written
+
+
+def load_dancedb() -> int:
+    """Upsert the venues from DanceDB and drop the ones no longer there (merged or deleted)."""
+    from src.models.dancedb.query import get_query_client
+
+    print("Fetching venues from DanceDB...")
+    venues = get_query_client().fetch_venues_from_dancedb()
+    print(f"Found {len(venues)} venues on DanceDB")
+
+    conn = get_connection()
+    with conn:
+        written = _sync_dancedb(conn, _dancedb_rows(venues), 0)
+    print(f"Loaded {written} changed dancedb venues into geodb")
+    return written
+
+
+def load_dancedb_snapshot() -> int:
+    """Load the newest DanceDB venue snapshot (see scrape_dancedb_venues) if it changed since it was last loaded."""
+    snapshots = sorted((config.data_dir / "dancedb" / "venues").glob("*.json"))
+    conn = get_connection()
+    with conn:
+        changed = _changed_files(conn, "dancedb", snapshots[-1:])
+        written = 0
+        if changed:
+            venues = json.loads(changed[0][1])
+            written = _sync_dancedb(conn, _dancedb_rows({"qid": qid, **v} for qid, v in venues.items()), 1)
+    print(f"Loaded {written} changed dancedb venues from {len(changed)} changed snapshots into geodb")
+    return written
+
+
+def refresh(dancedb: bool = False) -> dict:
+    """Load what changed in the scraped source files and snapshots (and DanceDB itself if asked) and return the stats."""
+    load_bygdegardarna()
+    load_folketshus()
+    load_dancedb_snapshot()
+    if dancedb:
+        load_dancedb()
+    return get_stats()
+
+
+def last_loaded(source: str) -> Optional[str]:
+    """When source was last loaded (ISO timestamp), if ever."""
+    row = get_connection().execute("SELECT loaded_at FROM source_loads WHERE source = ?", (source,)).fetchone()
+    return row["loaded_at"] if row else None
 
 
 def rebuild():
     import os
     db_path = get_db_path()
-    if db_path.exists():
-        os.remove(db_path)
-    init_db()
-    load_bygdegardarna()
-    load_folketshus()
-    load_dancedb()
-    print(f"Geodb rebuilt. Stats: {get_stats()}")
+    close_connections()
+    for path in (db_path, db_path.with_name(f"{db_path.name}-wal"), db_path.with_name(f"{db_path.name}-shm")):
+        if path.exists():
+            os.remove(path)
+    init_db().close()
+    print(f"Geodb rebuilt. Stats: {refresh(dancedb=True)}")
 
 
 def get_ship_coordinates(venue_name: str) -> Optional[dict]:
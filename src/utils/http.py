@@ -0,0 +1,174 @@
+"""Shared HTTP request policy for the DanceDB and Wikidata endpoints.
+
+Each thread gets one requests.Session, so repeated SPARQL and API reads reuse
+their TCP/TLS connections instead of opening a new one per request.
+
+request() retries connection errors, timeouts, 429 and 5xx answers with
+exponential backoff and full jitter, waiting at least as long as a Retry-After
+header asks. Per host it caps the requests in flight and keeps a circuit
+breaker: after config.HTTP_CIRCUIT_FAILURES failed attempts in a row the host
+is considered down and requests fail at once with EndpointUnavailable, until
+config.HTTP_CIRCUIT_RESET_SECONDS have passed and one trial request is let
+through. A long batch run thus stops early instead of hammering an endpoint
+that is struggling.
+"""
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import requests
+
+import config
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_local = threading.local()
+
+
+class EndpointUnavailable(Exception):
+    """An endpoint kept failing, or its circuit breaker is open."""
+
+
+def get_session() -> requests.Session:
+    """The requests session of the current thread."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold failed attempts in a row, and lets one trial through after reset_seconds."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def check(self) -> None:
+        """Raise EndpointUnavailable unless a request may be made now."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.reset_seconds - time.monotonic()
+            if remaining > 0 or self._trial_running:
+                raise EndpointUnavailable(f"{self.name} is unavailable after {self.failures} failed attempts, not retrying for {max(remaining, 0):.0f}s")
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"{self.name} is answering again")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.error(f"{self.name} failed {self.failures} times in a row, failing further requests for {self.reset_seconds:.0f}s")
+                self.opened_at = time.monotonic()
+
+
+class HostPolicy:
+    """Circuit breaker and concurrency cap of one host."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.breaker = CircuitBreaker(host, config.HTTP_CIRCUIT_FAILURES, config.HTTP_CIRCUIT_RESET_SECONDS)
+        self.slots = threading.BoundedSemaphore(config.HTTP_MAX_CONCURRENCY_PER_HOST)
+
+
+_policies: dict[str, HostPolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def host_policy(url: str) -> HostPolicy:
+    """The shared policy of the host of url."""
+    host = urlparse(url).netloc
+    with _policies_lock:
+        if host not in _policies:
+            _policies[host] = HostPolicy(host)
+        return _policies[host]
+
+
+def reset_policies() -> None:
+    """Forget all circuit breaker state."""
+    with _policies_lock:
+        _policies.clear()
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Full jitter exponential backoff before retry number attempt (1-based)."""
+    return random.uniform(0, min(config.HTTP_BACKOFF_MAX_SECONDS, config.HTTP_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Seconds asked for by a Retry-After header (delta seconds or HTTP date), if any."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def request(method: str, url: str, timeout: Optional[float] = None, **kwargs: Any) -> requests.Response:
+    """Make a request under the retry, circuit breaker and concurrency policy of its host.
+
+    Returns the response of the first attempt that is not retryable; other HTTP
+    errors (e.g. 400 for a malformed query) are raised with raise_for_status(), and
+    other request errors (e.g. TooManyRedirects) are counted as a failure and raised.
+    Raises EndpointUnavailable when the host's circuit is open or every attempt failed.
+    """
+    policy = host_policy(url)
+    last_error = ""
+    for attempt in range(1, config.HTTP_MAX_ATTEMPTS + 1):
+        policy.breaker.check()
+        wait = None
+        with policy.slots:
+            try:
+                response = get_session().request(method, url, timeout=timeout or config.HTTP_TIMEOUT_SECONDS, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = f"{type(e).__name__}: {e}"
+            except requests.RequestException:
+                # Not retried, but the failure must end a half-open trial or the host stays blocked
+                policy.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    policy.breaker.record_success()
+                    response.raise_for_status()
+                    return response
+                last_error = f"HTTP {response.status_code}"
+                wait = retry_after_seconds(response)
+                response.close()
+        policy.breaker.record_failure()
+        if attempt == config.HTTP_MAX_ATTEMPTS or policy.breaker.is_open:
+            break
+        wait = max(wait or 0.0, backoff_seconds(attempt))
+        logger.warning(f"{policy.host} answered {last_error}, retrying in {wait:.1f}s (attempt {attempt}/{config.HTTP_MAX_ATTEMPTS})")
+        time.sleep(wait)
+    raise EndpointUnavailable(f"{method} {url} failed: {last_error}")
@@ -0,0 +1,255 @@
+"""SPARQL query execution with an on-disk result cache.
+
+All SPARQL callers go through execute_sparql_query() in this module. Results are
+cached under config.sparql_cache_dir, keyed on a hash of the endpoint and the
+normalized query text. The cache is disabled until configure_cache() is called
+(the CLI does this), so library use and tests always hit the endpoint.
+
+Paginated bulk queries request config.SPARQL_RESULT_FORMAT ("tsv" by default),
+which is streamed and decoded row by row by stream_sparql_bindings() instead of
+being parsed as one SPARQL JSON document. Requests go over the per-thread
+session of src.utils.http, which reuses connections and retries, backs off
+and stops calling an endpoint that is down.
+"""
+import hashlib
+import json
+import logging
+import shutil
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import requests
+
+import config
+from src.models.dancedb.api import setting
+from src.utils import http
+from src.utils.sparql_tsv import TSV_CONTENT_TYPE, iter_lines, read_tsv
+
+logger = logging.getLogger(__name__)
+
+# Placeholder inside the WHERE clause of paginated queries, replaced by the keyset FILTER
+KEYSET_FILTER = "#KEYSET_FILTER"
+
+JSON_CONTENT_TYPE = "application/sparql-results+json"
+
+# Wikidata reference data changes slowly and is never written by us
+WIKIDATA_TTL_SECONDS = config.SPARQL_CACHE_TTL_WIKIDATA_SECONDS
+
+
+def normalize_query(query: str) -> str:
+    """Strip indentation and blank lines so formatting does not change the cache key."""
+    return "\n".join(line.strip() for line in query.strip().splitlines() if line.strip())
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SparqlCache:
+    """File based SPARQL result cache with per-query TTLs.
+
+    Files are stored as <cache_dir>/<endpoint hash>/<query hash>.json so all
+    results of one endpoint can be dropped at once after a write.
+    """
+
+    def __init__(self, cache_dir: Path, default_ttl: int, enabled: bool = False, refresh: bool = False):
+        self.cache_dir = cache_dir
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self.refresh = refresh
+
+    def _path(self, query: str, endpoint: str) -> Path:
+        return self.cache_dir / _hash(endpoint)[:16] / f"{_hash(normalize_query(query))}.json"
+
+    def get(self, query: str, endpoint: str, ttl: Optional[int] = None) -> Optional[dict]:
+        """Return a cached result younger than ttl seconds, or None."""
+        ttl = self.default_ttl if ttl is None else ttl
+        if not self.enabled or self.refresh or ttl <= 0:
+            return None
+        path = self._path(query, endpoint)
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+        age = time.time() - entry.get("created", 0)
+        if age > ttl:
+            return None
+        logger.debug(f"SPARQL cache hit ({age:.0f}s old): {path.name}")
+        return entry["result"]
+
+    def set(self, query: str, endpoint: str, result: dict) -> None:
+        if not self.enabled:
+            return
+        path = self._path(query, endpoint)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"endpoint": endpoint, "created": time.time(), "query": normalize_query(query), "result": result}
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(entry, ensure_ascii=False))
+        tmp_path.replace(path)
+
+    def invalidate(self, endpoint: Optional[str] = None) -> None:
+        """Drop cached results for one endpoint, or everything if endpoint is None."""
+        target = self.cache_dir / _hash(endpoint)[:16] if endpoint else self.cache_dir
+        if target.exists():
+            shutil.rmtree(target, ignore_errors=True)
+            logger.debug(f"Invalidated SPARQL cache: {target}")
+
+
+_cache = SparqlCache(cache_dir=config.sparql_cache_dir, default_ttl=config.SPARQL_CACHE_TTL_SECONDS)
+
+
+def configure_cache(enabled: bool = True, refresh: bool = False) -> None:
+    """Enable or disable the SPARQL cache for this process.
+
+    With refresh=True cached results are ignored but fresh results are still stored.
+    """
+    _cache.enabled = enabled
+    _cache.refresh = refresh
+
+
+_invalidation_listeners: list[Callable[[], None]] = []
+
+
+def add_invalidation_listener(listener: Callable[[], None]) -> None:
+    """Call listener on every invalidate_cache(), to drop other data read before a write."""
+    _invalidation_listeners.append(listener)
+
+
+def invalidate_cache(endpoint: Optional[str] = None) -> None:
+    """Drop cached results, e.g. after writing to the wikibase behind endpoint."""
+    _cache.invalidate(endpoint)
+    for listener in _invalidation_listeners:
+        listener()
+
+
+def _post_query(query: str, endpoint: str, accept: str) -> requests.Response:
+    """POST a query and return the streamed response, see src.utils.http.request() for retries."""
+    headers = {"Accept": accept, "User-Agent": setting("USER_AGENT")}
+    return http.request("POST", endpoint, data={"query": query}, headers=headers, stream=True, timeout=config.SPARQL_TIMEOUT_SECONDS)
+
+
+def stream_sparql_bindings(query: str, endpoint: Optional[str] = None) -> tuple[list[str], Iterator[dict]]:
+    """Run a query requesting TSV results and return (variables, bindings).
+
+    Rows are decoded while the response is read, so only the current row is held
+    in memory. Results are not cached; consume the iterator to release the connection.
+    """
+    endpoint = endpoint or setting("SPARQL_ENDPOINT_URL")
+    response = _post_query(query, endpoint, TSV_CONTENT_TYPE)
+    variables, bindings = read_tsv(iter_lines(response.iter_content(chunk_size=64 * 1024)))
+
+    def rows() -> Iterator[dict]:
+        with response:
+            yield from bindings
+
+    return variables, rows()
+
+
+def _query_json(query: str, endpoint: str) -> dict:
+    with _post_query(query, endpoint, JSON_CONTENT_TYPE) as response:
+        return response.json()
+
+
+def execute_sparql_query(
+    query: str,
+    endpoint: Optional[str] = None,
+    ttl: Optional[int] = None,
+    result_format: str = "json",
+) -> dict:
+    """Run a SPARQL query, answering from the cache when a fresh result exists.
+
+    Args:
+        query: SPARQL query text
+        endpoint: SPARQL endpoint URL (default: the DanceDB query service)
+        ttl: Max age in seconds of a cached result (default: config.SPARQL_CACHE_TTL_SECONDS, 0 disables caching)
+        result_format: "json" or "tsv", the format requested from the endpoint. Either way
+            the result is returned in the SPARQL JSON shape.
+    """
+    endpoint = endpoint or setting("SPARQL_ENDPOINT_URL")
+    cached = _cache.get(query, endpoint, ttl)
+    if cached is not None:
+        return cached
+    if result_format == "tsv":
+        variables, bindings = stream_sparql_bindings(query, endpoint)
+        result = {"head": {"vars": variables}, "results": {"bindings": list(bindings)}}
+    elif result_format == "json":
+        result = _query_json(query=query, endpoint=endpoint)
+    else:
+        raise ValueError(f"Unknown SPARQL result format: {result_format}")
+    if ttl is None or ttl > 0:
+        _cache.set(query, endpoint, result)
+    return result
+
+
+def _page_query(query: str, key_var: str, after: Optional[str], page_size: int) -> str:
+    keyset = f'FILTER(STR(?{key_var}) > "{after}")' if after else ""
+    return f"{query.replace(KEYSET_FILTER, keyset).rstrip()}\nORDER BY ?{key_var}\nLIMIT {page_size}\n"
+
+
+def paginate_sparql(
+    query: str,
+    key_var: str = "item",
+    page_size: Optional[int] = None,
+    endpoint: Optional[str] = None,
+    ttl: Optional[int] = None,
+    prefetch: bool = True,
+) -> Iterator[list[dict]]:
+    """Yield result bindings page by page using keyset pagination on ?key_var.
+
+    The query must contain KEYSET_FILTER inside its WHERE clause and must not
+    have its own ORDER BY or LIMIT. Pages are ordered by the key IRI and each
+    page continues after the last key of the previous one, so no page needs an
+    OFFSET scan. Rows of the last key in a full page are held back to the next
+    page, so a key never has its rows split between pages.
+
+    With prefetch=True the next page is fetched in the background while the
+    caller processes the current one. Pages are requested in
+    config.SPARQL_RESULT_FORMAT.
+    """
+    if KEYSET_FILTER not in query:
+        raise ValueError(f"Paginated query must contain {KEYSET_FILTER} in its WHERE clause")
+    page_size = page_size or config.SPARQL_PAGE_SIZE
+
+    def fetch(after: Optional[str]) -> list[dict]:
+        page_query = _page_query(query, key_var, after, page_size)
+        results = execute_sparql_query(page_query, endpoint=endpoint, ttl=ttl, result_format=config.SPARQL_RESULT_FORMAT)
+        return results.get("results", {}).get("bindings", [])
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sparql-prefetch") if prefetch else None
+    pending: Optional[Future] = None
+    after: Optional[str] = None
+    page_number = 0
+    try:
+        while True:
+            bindings = pending.result() if pending else fetch(after)
+            pending = None
+            page_number += 1
+            if len(bindings) < page_size:
+                logger.debug(f"SPARQL page {page_number}: {len(bindings)} rows (last page)")
+                if bindings:
+                    yield bindings
+                return
+
+            last_key = bindings[-1][key_var]["value"]
+            page = [b for b in bindings if b[key_var]["value"] != last_key]
+            if page:
+                after = page[-1][key_var]["value"]
+            else:
+                logger.warning(f"More than {page_size} rows for ?{key_var} {last_key}, increase the page size")
+                page = bindings
+                after = last_key
+            logger.debug(f"SPARQL page {page_number}: {len(page)} rows, next after {after}")
+            if executor:
+                pending = executor.submit(fetch, after)
+            yield page
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_sparql_bindings(query: str, key_var: str = "item", **kwargs: Any) -> Iterator[dict]:
+    """Yield all bindings of a paginated query, see paginate_sparql()."""
+    for page in paginate_sparql(query, key_var=key_var, **kwargs):
+        yield from page
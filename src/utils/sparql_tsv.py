@@ -0,0 +1,153 @@
+"""Decode and encode SPARQL results in the TSV format (text/tab-separated-values).
+
+TSV is the most compact result format of the query service: one line per row,
+terms written as in Turtle (<iri>, "text"@sv, "2026-05-01"^^<...#date>, 42)
+and unbound variables left empty. Decoding it line by line keeps only the
+current row in memory, while the SPARQL JSON format has to be read and parsed
+as one document before the first row can be used.
+
+Decoded rows have the same shape as SPARQL JSON bindings
+({"var": {"type": "literal", "value": ..., "xml:lang": ...}}), so everything
+that reads bindings works unchanged.
+"""
+from typing import Iterable, Iterator
+
+TSV_CONTENT_TYPE = "text/tab-separated-values"
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+# Max decoded terms remembered by read_tsv() for reuse in later rows
+TERM_CACHE_SIZE = 100_000
+
+_UNESCAPES = {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+_ESCAPES = {"\\": "\\\\", '"': '\\"', "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    out = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char != "\\" or i + 1 == len(text):
+            out.append(char)
+            i += 1
+            continue
+        code = text[i + 1]
+        if code in _UNESCAPES:
+            out.append(_UNESCAPES[code])
+            i += 2
+        elif code in "uU":
+            width = 4 if code == "u" else 8
+            out.append(chr(int(text[i + 2:i + 2 + width], 16)))
+            i += 2 + width
+        else:
+            out.append(char)
+            i += 1
+    return "".join(out)
+
+
+def _escape(text: str) -> str:
+    if not any(char in text for char in _ESCAPES):
+        return text
+    return "".join(_ESCAPES.get(char, char) for char in text)
+
+
+def _bare_literal(field: str) -> dict:
+    """A Turtle shorthand literal: an integer, decimal, double or boolean."""
+    if field in ("true", "false"):
+        datatype = "boolean"
+    elif "e" in field or "E" in field:
+        datatype = "double"
+    elif "." in field:
+        datatype = "decimal"
+    else:
+        datatype = "integer"
+    return {"type": "literal", "value": field, "datatype": XSD + datatype}
+
+
+def parse_term(field: str) -> dict:
+    """Decode one TSV field into a SPARQL JSON term."""
+    first = field[0]
+    if first == "<":
+        return {"type": "uri", "value": field[1:-1]}
+    if first == '"':
+        end = field.rindex('"')
+        term = {"type": "literal", "value": _unescape(field[1:end])}
+        suffix = field[end + 1:]
+        if suffix.startswith("@"):
+            term["xml:lang"] = suffix[1:]
+        elif suffix.startswith("^^<"):
+            term["datatype"] = suffix[3:-1]
+        return term
+    if field.startswith("_:"):
+        return {"type": "bnode", "value": field[2:]}
+    return _bare_literal(field)
+
+
+def format_term(term: dict) -> str:
+    """Encode a SPARQL JSON term as a TSV field."""
+    if term["type"] == "uri":
+        return f"<{term['value']}>"
+    if term["type"] == "bnode":
+        return f"_:{term['value']}"
+    text = f'"{_escape(term["value"])}"'
+    if "xml:lang" in term:
+        return f"{text}@{term['xml:lang']}"
+    if "datatype" in term:
+        return f"{text}^^<{term['datatype']}>"
+    return text
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Split a stream of byte chunks into decoded lines.
+
+    Only "\\n" ends a line; str.splitlines() would also split on characters like
+    U+2028 that may appear unescaped inside literals.
+    """
+    rest = b""
+    for chunk in chunks:
+        lines = (rest + chunk).split(b"\n")
+        rest = lines.pop()
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if rest:
+        yield rest.decode("utf-8").rstrip("\r")
+
+
+def read_tsv(lines: Iterable[str]) -> tuple[list[str], Iterator[dict]]:
+    """Read the ?var header of a TSV result and return (variables, bindings).
+
+    Bindings are decoded lazily while the returned iterator is consumed. Terms
+    that repeat (the same venue on many events) are decoded once and the term
+    dict is shared between rows, so bindings must be treated as read-only.
+    """
+    lines = iter(lines)
+    header = next(lines, "")
+    variables = [name.lstrip("?$") for name in header.split("\t")] if header else []
+
+    def bindings() -> Iterator[dict]:
+        terms: dict[str, dict] = {}
+        for line in lines:
+            if not line:
+                continue
+            binding = {}
+            for var, field in zip(variables, line.split("\t")):
+                if field:
+                    term = terms.get(field)
+                    if term is None:
+                        if len(terms) >= TERM_CACHE_SIZE:
+                            terms.clear()
+                        term = terms[field] = parse_term(field)
+                    binding[var] = term
+            yield binding
+
+    return variables, bindings()
+
+
+def write_tsv(variables: list[str], bindings: Iterable[dict]) -> Iterator[str]:
+    """Encode SPARQL JSON bindings as TSV lines (without line endings)."""
+    yield "\t".join(f"?{var}" for var in variables)
+    for binding in bindings:
+        yield "\t".join(format_term(binding[var]) if var in binding else "" for var in variables)
@@ -11,6 +11,7 @@ from src.models.dancedb.client import DancedbClient
 from src.utils.coords import parse_coords
 from src.utils.fuzzy import is_false_fuzzy_match, normalize_for_fuzzy
 from src.utils.fuzzy_models import FuzzyMatchResultQid
+from src.utils import geodb
 from src.utils.geodb import get_ship_coordinates
 from rapidfuzz import fuzz, process
 
@@ -18,7 +19,11 @@ logger = logging.getLogger(__name__)
 
 
 class VenueSourceData:
-    """Container for venue data from different sources."""
+    """Container for venue data from different sources, held in memory.
+
+    Lookups return venues as dicts with name, qid, external_id, lat, lng and
+    permalink, whatever the source's own format.
+    """
 
     def __init__(
         self,
@@ -30,6 +35,59 @@ class VenueSourceData:
         self.bygdegardarna = bygdegardarna or []
         self.folketshus = folketshus or []
 
+    def _venues(self, source: str):
+        if source == "dancedb":
+            for qid, v in self.dancedb.items():
+                yield {"name": v.get("label", ""), "aliases": v.get("aliases", []), "qid": qid, "external_id": qid,
+                       "lat": v.get("lat"), "lng": v.get("lng"), "permalink": None}
+        elif source == "bygdegardarna":
+            for v in self.bygdegardarna:
+                pos = v.get("position", {})
+                yield {"name": v.get("title", ""), "aliases": [], "qid": v.get("qid"), "external_id": v.get("external_id"),
+                       "lat": pos.get("lat"), "lng": pos.get("lng"), "permalink": v.get("meta", {}).get("permalink", "")}
+        elif source == "folketshus":
+            for v in self.folketshus:
+                yield {"name": v.get("name", ""), "aliases": [], "qid": v.get("qid"), "external_id": v.get("external_id"),
+                       "lat": v.get("lat"), "lng": v.get("lng"), "permalink": v.get("url")}
+
+    def find(self, source: str, venue_name: str) -> list[dict]:
+        """Venues of source named venue_name (case-insensitive), DanceDB aliases included."""
+        venue_lower = venue_name.lower()
+        return [
+            v for v in self._venues(source)
+            if v["name"].lower() == venue_lower or any(alias.lower() == venue_lower for alias in v["aliases"])
+        ]
+
+    def qid_map(self, source: str) -> dict[str, str]:
+        """{name: qid} of the venues of source that have a QID, for fuzzy matching."""
+        return {v["name"]: v["qid"] for v in self._venues(source) if v["name"] and v["qid"]}
+
+
+class GeodbVenueSourceData(VenueSourceData):
+    """Venue data read from geodb with indexed queries instead of held in memory.
+
+    The first lookup loads what changed in the source files and snapshots since
+    geodb was last refreshed (see geodb.refresh()), so creating one is free and
+    memory does not grow with the number of venues.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._refreshed = False
+
+    def _ensure_refreshed(self):
+        if not self._refreshed:
+            geodb.refresh()
+            self._refreshed = True
+
+    def find(self, source: str, venue_name: str) -> list[dict]:
+        self._ensure_refreshed()
+        return geodb.find_by_name(venue_name, source)
+
+    def qid_map(self, source: str) -> dict[str, str]:
+        self._ensure_refreshed()
+        return geodb.name_qids(source)
+
 
 class UnifiedVenueResolver:
     """Unified venue resolver combining DanceDB, Bygdegardarna, and Folketshus.
@@ -71,6 +129,11 @@ class UnifiedVenueResolver:
         if self._data is not None:
             return self._data
 
+        # geodb is built from config.data_dir, so a resolver for another directory reads that one's JSON files
+        if config.VENUE_RESOLVER_GEODB and self.data_dir.resolve() == Path(config.data_dir).resolve():
+            self._data = GeodbVenueSourceData()
+            return self._data
+
         self._data = VenueSourceData(
             dancedb=self._load_dancedb_venues(),
             bygdegardarna=self._load_bygdegardarna_venues(),
@@ -162,59 +225,32 @@ class UnifiedVenueResolver:
 
         return self._create_if_needed(venue_name, ort, data)
 
+    def _exact_match(self, source: str, venue_name: str, data: VenueSourceData) -> Optional[str]:
+        """Exact match (label or alias) against the venues of source that have a QID."""
+        for v in data.find(source, venue_name):
+            if v["qid"]:
+                logger.debug("Exact match %s: '%s' -> %s", source, venue_name, v["qid"])
+                return v["qid"]
+        return None
+
     def _exact_match_dancedb(self, venue_name: str, data: VenueSourceData) -> Optional[str]:
         """Exact match against DanceDB venues."""
-        if not data.dancedb:
-            return None
-
-        venue_lower = venue_name.lower()
-        for qid, v in data.dancedb.items():
-            label = v.get("label", "").lower()
-            if venue_lower == label:
-                logger.debug("Exact match DanceDB: '%s' -> %s", venue_name, qid)
-                return qid
-            for alias in v.get("aliases", []):
-                if venue_lower == alias.lower():
-                    logger.debug("Exact match DanceDB alias: '%s' -> %s", venue_name, qid)
-                    return qid
-        return None
+        return self._exact_match("dancedb", venue_name, data)
 
     def _exact_match_bygdegardarna(self, venue_name: str, data: VenueSourceData) -> Optional[str]:
         """Exact match against bygdegardarna venues."""
-        if not data.bygdegardarna:
-            return None
-
-        venue_lower = venue_name.lower()
-        for v in data.bygdegardarna:
-            title = v.get("title", "").lower()
-            if venue_lower == title:
-                qid = v.get("qid")
-                if qid:
-                    logger.debug("Exact match bygdegardarna: '%s' -> %s", venue_name, qid)
-                    return qid
-        return None
+        return self._exact_match("bygdegardarna", venue_name, data)
 
     def _exact_match_folketshus(self, venue_name: str, data: VenueSourceData) -> Optional[str]:
         """Exact match against folketshus venues."""
-        if not data.folketshus:
-            return None
-
-        venue_lower = venue_name.lower()
-        for v in data.folketshus:
-            name = v.get("name", "").lower()
-            if venue_lower == name:
-                qid = v.get("qid")
-                if qid:
-                    logger.debug("Exact match folketshus: '%s' -> %s", venue_name, qid)
-                    return qid
-        return None
+        return self._exact_match("folketshus", venue_name, data)
 
     def _fuzzy_match_dancedb(self, venue_name: str, data: VenueSourceData) -> Optional[str]:
         """Fuzzy match against DanceDB venues."""
-        if not data.dancedb:
+        qid_map = data.qid_map("dancedb")
+        if not qid_map:
             return None
 
-        qid_map = {v.get("label", ""): qid for qid, v in data.dancedb.items() if v.get("label")}
         result = self._do_fuzzy_match(venue_name, qid_map, config.FUZZY_REMOVE_TERMS_DANSLOGEN)
         if result:
             logger.info(
@@ -227,10 +263,10 @@ class UnifiedVenueResolver:
 
     def _fuzzy_match_bygdegardarna(self, venue_name: str, data: VenueSourceData) -> Optional[str]:
         """Fuzzy match against bygdegardarna venues."""
-        if not data.bygdegardarna:
+        qid_map = data.qid_map("bygdegardarna")
+        if not qid_map:
             return None
 
-        qid_map = {v.get("title", ""): v.get("qid", "") for v in data.bygdegardarna if v.get("title") and v.get("qid")}
         result = self._do_fuzzy_match(venue_name, qid_map, config.FUZZY_REMOVE_TERMS_BYGDEGARDARNA)
         if result:
             logger.info(
@@ -243,10 +279,10 @@ class UnifiedVenueResolver:
 
     def _fuzzy_match_folketshus(self, venue_name: str, data: VenueSourceData) -> Optional[str]:
         """Fuzzy match against folketshus venues."""
-        if not data.folketshus:
+        qid_map = data.qid_map("folketshus")
+        if not qid_map:
             return None
 
-        qid_map = {v.get("name", ""): v.get("qid", "") for v in data.folketshus if v.get("name") and v.get("qid")}
         result = self._do_fuzzy_match(venue_name, qid_map, config.FUZZY_REMOVE_TERMS_FOLKETSHUS)
         if result:
             logger.info(
@@ -355,26 +391,14 @@ class UnifiedVenueResolver:
 
     def _get_coords_bygdegardarna(self, venue_name: str, data: VenueSourceData) -> tuple[Optional[float], Optional[float]]:
         """Get coordinates from bygdegardarna for venue."""
-        if not data.bygdegardarna:
-            return None, None
-
-        venue_lower = venue_name.lower()
-        for v in data.bygdegardarna:
-            if v.get("title", "").lower() == venue_lower:
-                pos = v.get("position", {})
-                return pos.get("lat"), pos.get("lng")
+        venues = data.find("bygdegardarna", venue_name)
+        if venues:
+            return venues[0]["lat"], venues[0]["lng"]
         return None, None
 
     def _get_coords_folketshus(self, venue_name: str, data: VenueSourceData) -> tuple[Optional[float], Optional[float]]:
         """Get coordinates from folketshus for venue."""
-        if not data.folketshus:
-            return None, None
-
-        venue_lower = venue_name.lower()
-        for v in data.folketshus:
-            if v.get("name", "").lower() == venue_lower:
-                lat = v.get("lat")
-                lng = v.get("lng")
-                if lat and lng:
-                    return lat, lng
+        for v in data.find("folketshus", venue_name):
+            if v["lat"] and v["lng"]:
+                return v["lat"], v["lng"]
         return None, None
@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.utils.coord_store import CoordStore  # noqa: E402
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    bygdegardarna = tmp_path / "bygdegardarna" / "2026-01-01.json"
+    bygdegardarna.parent.mkdir()
+    bygdegardarna.write_text(json.dumps([
+        {"title": "Logen", "qid": "Q1", "meta": {"permalink": "https://www.bygdegardarna.se/bygdegard/logen/"}, "position": {"lat": 56.46537, "lng": 13.09607}},
+        {"title": "Utan position", "meta": {"permalink": "https://www.bygdegardarna.se/bygdegard/utan/"}, "position": {}},
+    ]))
+    dancedb = tmp_path / "dancedb" / "2026-01-01.json"
+    dancedb.parent.mkdir()
+    dancedb.write_text(json.dumps({
+        "Q2": {"label": "Logen", "lat": 56.465292, "lng": 13.096046},
+        "Q3": {"label": "Parken", "p4": "Point(14.58 56.05)"},
+    }))
+    return bygdegardarna, dancedb
+
+
+class TestCoordStore:
+
+    def test_columns_from_snapshots(self, snapshots):
+        bygdegardarna, dancedb = snapshots
+
+        byg = CoordStore.from_snapshot(bygdegardarna, "bygdegardarna")
+        db = CoordStore.from_snapshot(dancedb, "dancedb")
+
+        assert len(byg) == 1
+        assert byg.row(0) == {"lat": 56.46537, "lng": 13.09607, "qid": "Q1", "source": "bygdegardarna", "external_id": "logen"}
+        assert list(db.qid) == ["Q2", "Q3"]
+        assert db.lat.dtype == "float64"
+        assert (db.lat[1], db.lng[1]) == (56.05, 14.58)
+
+    def test_saved_beside_snapshot_and_memory_mapped(self, snapshots):
+        import numpy as np
+
+        bygdegardarna, _ = snapshots
+
+        built = CoordStore.for_snapshot(bygdegardarna, "bygdegardarna")
+        loaded = CoordStore.for_snapshot(bygdegardarna, "bygdegardarna")
+
+        assert (bygdegardarna.parent / "2026-01-01.coords" / "lat.npy").exists()
+        assert isinstance(loaded.lat, np.memmap)
+        assert loaded.row(0) == built.row(0)
+
+        bygdegardarna.write_text("[]")
+        stat = bygdegardarna.stat()
+        os.utime(bygdegardarna, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert len(CoordStore.for_snapshot(bygdegardarna, "bygdegardarna")) == 0
+
+    def test_nearest_and_duplicates_across_sources(self, snapshots):
+        bygdegardarna, dancedb = snapshots
+        store = CoordStore.concat([CoordStore.from_snapshot(bygdegardarna, "bygdegardarna"), CoordStore.from_snapshot(dancedb, "dancedb")])
+
+        near, far = store.nearest([(56.46537, 13.09607), (60.0, 15.0)], threshold_km=0.1, k=5)
+
+        assert [row for row, _ in near] == [0, 1]
+        assert far == []
+        assert [(store.row(i)["qid"], store.row(j)["qid"]) for i, j, _ in store.pairs_within(0.1)] == [("Q1", "Q2")]
+        assert CoordStore.from_venues("folketshus", []).nearest([(56.0, 13.0)], 1.0) == [[]]
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from src.utils import distance
+from src.utils.distance import haversine_distance, nearest_neighbours, pairs_within
+
+
+def _brute_force(points, candidates, threshold_km, k):
+    results = []
+    for lat, lng in points:
+        hits = sorted((haversine_distance(lat, lng, *coord), key) for key, coord in candidates.items())
+        results.append([key for d, key in hits if d <= threshold_km][:k])
+    return results
+
+
+@pytest.fixture(params=["grid", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "grid":
+        monkeypatch.setattr(distance, "np", None)
+    else:
+        monkeypatch.setattr(distance, "np", pytest.importorskip("numpy"))
+        monkeypatch.setattr(distance, "NEIGHBOUR_BLOCK_SIZE", 1000)
+        monkeypatch.setattr(distance, "DENSE_NEIGHBOURHOOD", 0)
+    return request.param
+
+
+class TestNearestNeighbours:
+
+    def test_matches_brute_force(self, backend):
+        rng = random.Random(1)
+        candidates = {f"Q{i}": (rng.uniform(55.3, 56.3), rng.uniform(12.8, 14.8)) for i in range(500)}
+        points = [(rng.uniform(55.3, 56.3), rng.uniform(12.8, 14.8)) for _ in range(200)]
+
+        for threshold_km, k in [(2.0, 3), (10.0, 1), (0.5, 5)]:
+            results = nearest_neighbours(points, candidates, threshold_km, k)
+            assert [[key for key, _ in hits] for hits in results] == _brute_force(points, candidates, threshold_km, k)
+
+    def test_distances_and_empty_inputs(self, backend):
+        candidates = {"Q1": (56.46537, 13.09607), "Q2": (56.5, 13.2)}
+
+        [hits] = nearest_neighbours([(56.465292, 13.096046)], candidates, 0.1, k=5)
+
+        assert hits == [("Q1", pytest.approx(haversine_distance(56.465292, 13.096046, 56.46537, 13.09607)))]
+        assert nearest_neighbours([(56.0, 13.0)], {}, 1.0) == [[]]
+        assert nearest_neighbours([], candidates, 1.0) == []
+        assert [len(h) for h in nearest_neighbours([(56.0, 13.0)], candidates, float("inf"), k=5)] == [2]
+
+
+class TestPairsWithin:
+
+    def test_matches_brute_force(self, backend):
+        rng = random.Random(2)
+        coords = [(rng.uniform(55.3, 55.6), rng.uniform(12.8, 13.3)) for _ in range(400)]
+
+        for threshold_km in (0.5, 2.0, float("inf")):
+            expected = sorted(
+                (haversine_distance(*coords[i], *coords[j]), i, j)
+                for i in range(len(coords)) for j in range(i + 1, len(coords))
+                if haversine_distance(*coords[i], *coords[j]) <= threshold_km
+            )
+            pairs = pairs_within(coords, threshold_km)
+            assert [(i, j) for i, j, _ in pairs] == [(i, j) for _, i, j in expected]
+            assert [d for _, _, d in pairs] == pytest.approx([d for d, _, _ in expected])
+
+    def test_duplicates_and_small_inputs(self, backend):
+        coords = [(56.5, 13.2), (56.46537, 13.09607), (56.465292, 13.096046), (56.46537, 13.09607)]
+
+        assert [(i, j) for i, j, _ in pairs_within(coords, 0.1)] == [(1, 3), (1, 2), (2, 3)]
+        assert pairs_within(coords[:1], 1.0) == []
+        assert pairs_within([], 1.0) == []
@@ -1,5 +1,6 @@
 import os
 import tempfile
+from unittest.mock import patch
 
 import pytest
 
@@ -162,4 +163,309 @@ class TestGeodb:
             assert stats.get("dancedb") == 1
         finally:
             if temp_db.exists():
-                os.rename(temp_path, original_path)
\ No newline at end of file
+                os.rename(temp_path, original_path)
+
+
+@pytest.fixture
+def geodb_path(tmp_path, monkeypatch):
+    from src.utils import geodb
+
+    monkeypatch.setattr(geodb.config, "data_dir", tmp_path)
+    yield geodb.get_db_path()
+    geodb.close_connections()
+
+
+class TestGeodbRtree:
+
+    def _insert(self, conn, name, lat, lng, external_id=None):
+        conn.execute("""
+            INSERT OR REPLACE INTO venues (name, source, lat, lng, external_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (name, "bygdegardarna", lat, lng, external_id, "2026-01-01"))
+
+    def test_rtree_follows_venues(self, geodb_path):
+        from src.utils.geodb import ensure_db, find_nearby
+
+        conn = ensure_db()
+        self._insert(conn, "Moved Venue", 56.5, 13.2, "1")
+        self._insert(conn, "Gone Venue", 56.465, 13.096, "2")
+        conn.execute("UPDATE venues SET lat = ?, lng = ? WHERE external_id = '1'", (56.46537, 13.09607))
+        conn.execute("DELETE FROM venues WHERE external_id = '2'")
+        self._insert(conn, "Replaced Venue", 56.4653, 13.0961, "1")
+        conn.commit()
+
+        assert conn.execute("SELECT COUNT(*) FROM venues_geom").fetchone()[0] == 1
+        conn.close()
+        assert [r["name"] for r in find_nearby(56.465292, 13.096046, threshold_km=0.1)] == ["Replaced Venue"]
+
+    def test_existing_database_is_backfilled(self, geodb_path):
+        import sqlite3
+
+        from src.utils.geodb import find_by_name, find_nearby, find_nearby_by_name
+
+        conn = sqlite3.connect(geodb_path)
+        conn.execute("""
+            CREATE TABLE venues (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, source TEXT NOT NULL, lat REAL NOT NULL, lng REAL NOT NULL,
+                external_id TEXT, qid TEXT, address TEXT, city TEXT, phone TEXT, email TEXT, permalink TEXT, created_at TEXT NOT NULL,
+                UNIQUE(source, external_id)
+            )
+        """)
+        conn.execute("CREATE VIRTUAL TABLE venues_geom USING rtree(id, min_lat, max_lat, min_lng, max_lng)")
+        self._insert(conn, "Old Venue", 56.46537, 13.09607)
+        conn.commit()
+        conn.close()
+
+        assert [r["name"] for r in find_nearby(56.465292, 13.096046, threshold_km=0.1)] == ["Old Venue"]
+        assert [r["name"] for r in find_nearby_by_name("old ven")] == ["Old Venue"]
+        assert [r["name"] for r in find_by_name("OLD VENUE")] == ["Old Venue"]
+
+    def test_new_database_gets_current_schema(self, geodb_path):
+        from src.utils.geodb import SCHEMA_VERSION, _migrate, init_db
+
+        with patch("src.utils.geodb._migrate", wraps=_migrate) as mock_migrate:
+            conn = init_db()
+
+        mock_migrate.assert_not_called()
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        columns = {row["name"]: row["notnull"] for row in conn.execute("PRAGMA table_info(venues)")}
+        assert columns["lat"] == 0 and "name_lower" in columns and "source_rank" in columns
+        tables = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master")}
+        assert {"venues_geom", "venues_fts", "source_files", "venue_aliases", "venues_geom_insert"} <= tables
+        conn.close()
+
+
+class TestGeodbConnection:
+
+    def test_connection_is_reused_per_thread(self, geodb_path):
+        import threading
+
+        from src.utils.geodb import get_connection
+
+        conn = get_connection()
+        assert get_connection() is conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(get_connection()))
+        thread.start()
+        thread.join()
+        assert other[0] is not conn
+
+    def test_update_qids(self, geodb_path):
+        from src.utils.geodb import get_connection, update_qid, update_qids
+
+        conn = get_connection()
+        conn.executemany("""
+            INSERT INTO venues (name, source, lat, lng, external_id, created_at) VALUES (?, ?, ?, ?, ?, ?)
+        """, [(f"Venue {i}", "folketshus", 56.0, 13.0, str(i), "2026-01-01") for i in range(3)])
+        conn.commit()
+
+        assert update_qids([("0", "folketshus", "Q10"), ("1", "folketshus", "Q11"), ("9", "folketshus", "Q19")]) == 2
+        update_qid("2", "folketshus", "Q12")
+
+        rows = conn.execute("SELECT external_id, qid FROM venues ORDER BY external_id").fetchall()
+        assert [tuple(r) for r in rows] == [("0", "Q10"), ("1", "Q11"), ("2", "Q12")]
+
+
+def _bygdegardarna_venue(external_id, lat, title=None):
+    return {"title": title or f"Bygdegård {external_id}", "meta": {"permalink": f"https://www.bygdegardarna.se/bygdegard/{external_id}/"}, "position": {"lat": lat, "lng": 13.0}}
+
+
+class TestGeodbLoader:
+
+    @pytest.fixture
+    def bygdegardarna_dir(self, geodb_path, tmp_path, monkeypatch):
+        from src.utils import geodb
+
+        directory = tmp_path / "bygdegardarna"
+        (directory / "enriched").mkdir(parents=True)
+        monkeypatch.setattr(geodb.config, "bygdegardarna_dir", directory)
+        return directory
+
+    def test_unchanged_files_are_skipped(self, bygdegardarna_dir):
+        import json
+
+        from src.utils.geodb import last_loaded, load_bygdegardarna
+
+        (bygdegardarna_dir / "2026-01-01.json").write_text(json.dumps([_bygdegardarna_venue("a", 56.0), _bygdegardarna_venue("b", 57.0)]))
+
+        assert load_bygdegardarna() == 2
+        assert load_bygdegardarna() == 0
+        assert last_loaded("bygdegardarna") is not None
+
+    def test_only_changed_venues_are_written(self, bygdegardarna_dir):
+        import json
+
+        from src.utils.geodb import find_nearby, get_connection, load_bygdegardarna
+
+        (bygdegardarna_dir / "2026-01-01.json").write_text(json.dumps([_bygdegardarna_venue("a", 56.0), _bygdegardarna_venue("b", 57.0)]))
+        (bygdegardarna_dir / "enriched" / "2026-01-01.json").write_text(json.dumps([_bygdegardarna_venue("b", 57.5, "Enriched")]))
+        load_bygdegardarna()
+
+        (bygdegardarna_dir / "2026-01-02.json").write_text(json.dumps([_bygdegardarna_venue("a", 58.0), _bygdegardarna_venue("b", 59.0)]))
+
+        # b is kept from the enriched file, a moves
+        assert load_bygdegardarna() == 1
+        assert [r["external_id"] for r in find_nearby(58.0, 13.0)] == ["a"]
+        assert find_nearby(56.0, 13.0) == []
+        rows = get_connection().execute("SELECT external_id, name, lat FROM venues ORDER BY external_id").fetchall()
+        assert [tuple(r) for r in rows] == [("a", "Bygdegård a", 58.0), ("b", "Enriched", 57.5)]
+
+    def test_dancedb_venues_are_upserted_and_pruned(self, geodb_path):
+        from src.utils.geodb import get_stats, load_dancedb
+
+        venues = [{"qid": "Q1", "label": "Folkets park", "lat": 56.0, "lng": 13.0}, {"qid": "Q2", "label": "Logen", "lat": 57.0, "lng": 13.0}]
+        with patch("src.models.dancedb.query.get_query_client") as mock_client:
+            mock_client.return_value.fetch_venues_from_dancedb.return_value = venues
+            assert load_dancedb() == 2
+            assert load_dancedb() == 0
+            mock_client.return_value.fetch_venues_from_dancedb.return_value = venues[:1]
+            load_dancedb()
+
+        assert get_stats() == {"dancedb": 1}
+
+
+class TestGeodbNameSearch:
+
+    @pytest.fixture
+    def conn(self, geodb_path):
+        from src.utils.geodb import get_connection
+
+        conn = get_connection()
+        conn.executemany("""
+            INSERT INTO venues (name, source, lat, lng, external_id, created_at) VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            ("Folkets park Sölvesborg", "folketshus", 56.05, 14.58, "1", "2026-01-01"),
+            ("Gamla Folkets Park", "folketshus", 59.33, 18.07, "2", "2026-01-01"),
+            ("Logen", "bygdegardarna", 56.05, 14.58, "3", "2026-01-01"),
+        ])
+        conn.commit()
+        return conn
+
+    def test_substring_is_case_insensitive(self, conn):
+        from src.utils.geodb import find_nearby_by_name
+
+        results = find_nearby_by_name("folkets  PARK")
+
+        assert sorted(r["external_id"] for r in results) == ["1", "2"]
+        assert all(r["distance_km"] is None for r in results)
+
+    def test_distance_filter(self, conn):
+        from src.utils.geodb import find_nearby_by_name
+
+        results = find_nearby_by_name("folkets park", threshold_km=5, lat=56.05, lng=14.59)
+
+        assert [r["external_id"] for r in results] == ["1"]
+        assert 0 < results[0]["distance_km"] < 1
+
+    def test_index_follows_renames_and_deletes(self, conn):
+        from src.utils.geodb import find_nearby_by_name
+
+        conn.execute("UPDATE venues SET name = 'Dansbanan' WHERE external_id = '3'")
+        conn.execute("DELETE FROM venues WHERE external_id = '2'")
+        conn.commit()
+
+        assert find_nearby_by_name("logen") == []
+        assert [r["external_id"] for r in find_nearby_by_name("dansban")] == ["3"]
+        assert [r["external_id"] for r in find_nearby_by_name("park")] == ["1"]
+
+    def test_short_names_fall_back_to_a_scan(self, conn):
+        from src.utils.geodb import find_nearby_by_name
+
+        assert [r["external_id"] for r in find_nearby_by_name("Lo")] == ["3"]
+
+
+class TestGeodbFindNearbyMany:
+
+    def test_matches_find_nearby(self, geodb_path):
+        import random
+
+        from src.utils.geodb import find_nearby, find_nearby_many, get_connection
+
+        rng = random.Random(2)
+        conn = get_connection()
+        conn.executemany("""
+            INSERT INTO venues (name, source, lat, lng, external_id, created_at) VALUES (?, ?, ?, ?, ?, ?)
+        """, [(f"Venue {i}", "bygdegardarna", rng.uniform(56.0, 56.2), rng.uniform(13.0, 13.3), str(i), "2026-01-01") for i in range(300)])
+        conn.commit()
+        points = [(rng.uniform(56.0, 56.2), rng.uniform(13.0, 13.3)) for _ in range(50)]
+
+        many = find_nearby_many(points, threshold_km=1.0, k=3)
+
+        expected = [find_nearby(lat, lng, threshold_km=1.0, limit=3) for lat, lng in points]
+        assert [[v["id"] for v in hits] for hits in many] == [[v["id"] for v in hits] for hits in expected]
+        assert [v["distance_km"] for hits in many for v in hits] == pytest.approx([v["distance_km"] for hits in expected for v in hits])
+        assert any(many)
+
+
+class TestGeodbVenueLookup:
+
+    @pytest.fixture
+    def snapshot_dir(self, geodb_path, tmp_path):
+        directory = tmp_path / "dancedb" / "venues"
+        directory.mkdir(parents=True)
+        return directory
+
+    @pytest.fixture
+    def snapshot(self, snapshot_dir):
+        import json
+
+        venues = {
+            "Q1": {"label": "Åsens Loge", "lat": None, "lng": None, "aliases": ["Logen i Åsen"]},
+            "Q2": {"label": "Folkets park", "lat": 56.05, "lng": 14.58, "aliases": []},
+        }
+        (snapshot_dir / "2026-01-01.json").write_text(json.dumps(venues))
+        return venues
+
+    def test_snapshot_keeps_aliases_and_venues_without_coordinates(self, snapshot):
+        from src.utils.geodb import find_by_name, find_nearby, load_dancedb_snapshot
+
+        assert load_dancedb_snapshot() == 2
+        assert load_dancedb_snapshot() == 0
+
+        assert [r["qid"] for r in find_by_name("åsens loge")] == ["Q1"]
+        assert [r["qid"] for r in find_by_name("LOGEN I ÅSEN", "dancedb")] == ["Q1"]
+        assert find_by_name("Åsens Loge", "folketshus") == []
+        assert [r["qid"] for r in find_nearby(56.05, 14.58)] == ["Q2"]
+
+    def test_newer_snapshot_prunes_venues_and_aliases(self, snapshot, snapshot_dir):
+        import json
+
+        from src.utils.geodb import find_by_name, get_stats, load_dancedb_snapshot
+
+        load_dancedb_snapshot()
+        (snapshot_dir / "2026-01-02.json").write_text(json.dumps({"Q2": snapshot["Q2"]}))
+        load_dancedb_snapshot()
+
+        assert get_stats() == {"dancedb": 1}
+        assert find_by_name("Logen i Åsen") == []
+
+    def test_resolver_reads_geodb(self, snapshot, monkeypatch):
+        import config
+        from src.models.onbeat.venue_resolver import VenueResolver
+        from src.utils.venue_resolver import GeodbVenueSourceData, UnifiedVenueResolver
+
+        monkeypatch.setattr("config.VENUE_RESOLVER_GEODB", True)
+        resolver = UnifiedVenueResolver(data_dir=str(config.data_dir), client=None, interactive=False)
+
+        assert isinstance(resolver._ensure_data_loaded(), GeodbVenueSourceData)
+        assert resolver.resolve("logen i åsen") == "Q1"
+        assert resolver.resolve("Okänd lokal") is None
+        assert VenueResolver(data_dir=str(config.data_dir)).lookup("Folkets Park") == ("Q2", None)
+        assert resolver._ensure_data_loaded().qid_map("dancedb") == {"Åsens Loge": "Q1", "Folkets park": "Q2"}
+
+    def test_resolver_for_other_data_dir_reads_its_json(self, snapshot, monkeypatch, tmp_path):
+        import json
+
+        from src.utils.venue_resolver import GeodbVenueSourceData, UnifiedVenueResolver
+
+        monkeypatch.setattr("config.VENUE_RESOLVER_GEODB", True)
+        other = tmp_path / "other"
+        (other / "dancedb" / "venues").mkdir(parents=True)
+        (other / "dancedb" / "venues" / "2026-01-01.json").write_text(json.dumps({"Q9": {"label": "Annan Loge", "aliases": []}}))
+        resolver = UnifiedVenueResolver(data_dir=str(other), client=None, interactive=False)
+
+        assert not isinstance(resolver._ensure_data_loaded(), GeodbVenueSourceData)
+        assert resolver.resolve("Annan Loge") == "Q9"
+        assert resolver.resolve("Åsens Loge") is None
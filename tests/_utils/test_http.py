@@ -0,0 +1,107 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from src.utils import http
+
+URL = "https://example.org/sparql"
+
+
+def _response(status: int, headers: dict | None = None) -> MagicMock:
+    response = MagicMock(status_code=status, headers=headers or {})
+    if status >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"HTTP {status}")
+    return response
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(http.config, "HTTP_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(http.config, "HTTP_CIRCUIT_FAILURES", 3)
+    monkeypatch.setattr(http.config, "HTTP_CIRCUIT_RESET_SECONDS", 60)
+    http.reset_policies()
+    session = MagicMock()
+    with patch("src.utils.http.get_session", return_value=session), patch("src.utils.http.time.sleep") as sleep:
+        session.sleep = sleep
+        yield session
+    http.reset_policies()
+
+
+class TestRequest:
+
+    def test_retries_server_errors_and_timeouts(self, session):
+        session.request.side_effect = [_response(503), requests.Timeout("slow"), _response(200)]
+
+        assert http.request("GET", URL).status_code == 200
+        assert session.request.call_count == 3
+        assert session.sleep.call_count == 2
+
+    def test_honors_retry_after(self, session):
+        session.request.side_effect = [_response(429, {"Retry-After": "30"}), _response(200)]
+
+        http.request("GET", URL)
+
+        assert session.sleep.call_args.args[0] >= 30
+
+    def test_client_errors_are_not_retried(self, session):
+        session.request.return_value = _response(400)
+
+        with pytest.raises(requests.HTTPError):
+            http.request("GET", URL)
+        assert session.request.call_count == 1
+
+    def test_circuit_opens_and_fails_fast(self, session):
+        session.request.return_value = _response(502)
+
+        with pytest.raises(http.EndpointUnavailable):
+            http.request("GET", URL)
+        with pytest.raises(http.EndpointUnavailable, match="unavailable"):
+            http.request("GET", f"{URL}?other")
+
+        assert session.request.call_count == 3
+        assert http.host_policy(URL).breaker.is_open
+
+    def test_circuit_lets_a_trial_through_after_reset(self, session):
+        session.request.return_value = _response(502)
+        with pytest.raises(http.EndpointUnavailable):
+            http.request("GET", URL)
+
+        session.request.return_value = _response(200)
+        breaker = http.host_policy(URL).breaker
+        breaker.opened_at -= 61
+
+        assert http.request("GET", URL).status_code == 200
+        assert not breaker.is_open
+
+    def test_failed_trial_with_other_request_error_reopens_circuit(self, session):
+        session.request.return_value = _response(502)
+        with pytest.raises(http.EndpointUnavailable):
+            http.request("GET", URL)
+        breaker = http.host_policy(URL).breaker
+        breaker.opened_at -= 61
+
+        session.request.side_effect = requests.exceptions.ChunkedEncodingError("broken")
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            http.request("GET", URL)
+        assert session.request.call_count == 4
+
+        # The trial is over, so another one is let through after the next reset
+        breaker.opened_at -= 61
+        session.request.side_effect = None
+        session.request.return_value = _response(200)
+        assert http.request("GET", URL).status_code == 200
+        assert not breaker.is_open
+
+
+class TestBackoff:
+
+    def test_full_jitter_is_capped(self, monkeypatch):
+        monkeypatch.setattr(http.config, "HTTP_BACKOFF_BASE_SECONDS", 2)
+        monkeypatch.setattr(http.config, "HTTP_BACKOFF_MAX_SECONDS", 10)
+
+        assert all(0 <= http.backoff_seconds(attempt) <= 10 for attempt in range(1, 10) for _ in range(20))
+
+    def test_retry_after_http_date(self):
+        assert http.retry_after_seconds(_response(503, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0
+        assert http.retry_after_seconds(_response(503)) is None
@@ -0,0 +1,122 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.utils import sparql
+from src.utils.sparql import SparqlCache, normalize_query
+
+ENDPOINT = "https://example.org/sparql"
+RESULT = {"results": {"bindings": [{"item": {"value": "https://example.org/entity/Q1"}}]}}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SparqlCache(cache_dir=tmp_path, default_ttl=3600, enabled=True)
+    with patch.object(sparql, "_cache", cache):
+        yield cache
+
+
+class TestNormalizeQuery:
+
+    def test_ignores_indentation_and_blank_lines(self):
+        assert normalize_query("\n  SELECT ?a WHERE {\n\n    ?a ?b ?c\n  }\n") == normalize_query("SELECT ?a WHERE {\n?a ?b ?c\n}")
+
+
+class TestExecuteSparqlQuery:
+
+    def test_second_call_is_served_from_cache(self, cache):
+        with patch("src.utils.sparql._query_json", return_value=RESULT) as mock_query:
+            assert sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=ENDPOINT) == RESULT
+            assert sparql.execute_sparql_query("  SELECT ?a WHERE {}  ", endpoint=ENDPOINT) == RESULT
+        assert mock_query.call_count == 1
+
+    def test_disabled_cache_always_queries(self, cache):
+        cache.enabled = False
+        with patch("src.utils.sparql._query_json", return_value=RESULT) as mock_query:
+            sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=ENDPOINT)
+            sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=ENDPOINT)
+        assert mock_query.call_count == 2
+        assert not any(cache.cache_dir.iterdir())
+
+    def test_expired_entry_is_refetched(self, cache):
+        with patch("src.utils.sparql._query_json", return_value=RESULT) as mock_query:
+            sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=ENDPOINT, ttl=60)
+            with patch("src.utils.sparql.time.time", return_value=time.time() + 120):
+                sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=ENDPOINT, ttl=60)
+        assert mock_query.call_count == 2
+
+    def test_zero_ttl_bypasses_cache(self, cache):
+        with patch("src.utils.sparql._query_json", return_value=RESULT) as mock_query:
+            sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=ENDPOINT, ttl=0)
+            sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=ENDPOINT, ttl=0)
+        assert mock_query.call_count == 2
+
+    def test_refresh_ignores_cached_results(self, cache):
+        with patch("src.utils.sparql._query_json", return_value=RESULT) as mock_query:
+            sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=ENDPOINT)
+            cache.refresh = True
+            sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=ENDPOINT)
+        assert mock_query.call_count == 2
+
+    def test_invalidate_endpoint(self, cache):
+        other = "https://other.org/sparql"
+        with patch("src.utils.sparql._query_json", return_value=RESULT) as mock_query:
+            sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=ENDPOINT)
+            sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=other)
+            sparql.invalidate_cache(ENDPOINT)
+            sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=ENDPOINT)
+            sparql.execute_sparql_query("SELECT ?a WHERE {}", endpoint=other)
+        assert mock_query.call_count == 3
+
+
+def _row(qid: str, alias: str = "") -> dict:
+    row = {"item": {"value": f"https://example.org/entity/{qid}"}}
+    if alias:
+        row["alias"] = {"value": alias}
+    return row
+
+
+class FakeEndpoint:
+    """Answers paginated queries from a fixed, key ordered list of rows."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.queries = []
+
+    def __call__(self, query, endpoint=None, ttl=None, result_format="json"):
+        self.queries.append(query)
+        limit = int(query.rsplit("LIMIT", 1)[1])
+        after = query.split('STR(?item) > "', 1)[1].split('"', 1)[0] if "STR(?item) >" in query else ""
+        rows = [r for r in self.rows if r["item"]["value"] > after]
+        return {"results": {"bindings": rows[:limit]}}
+
+
+class TestPaginateSparql:
+    QUERY = "SELECT ?item WHERE {\n  ?item ?p ?o .\n  #KEYSET_FILTER\n}"
+
+    def test_yields_all_rows_in_pages(self):
+        rows = [_row(f"Q{i}") for i in range(10, 35)]
+        fake = FakeEndpoint(rows)
+        with patch("src.utils.sparql.execute_sparql_query", side_effect=fake):
+            pages = list(sparql.paginate_sparql(self.QUERY, page_size=10))
+        assert [len(p) for p in pages] == [9, 9, 7]
+        assert [r for p in pages for r in p] == rows
+        assert "FILTER" not in fake.queries[0]
+        assert 'FILTER(STR(?item) > "https://example.org/entity/Q18")' in fake.queries[1]
+        assert fake.queries[0].rstrip().endswith("ORDER BY ?item\nLIMIT 10")
+
+    def test_rows_of_one_key_are_not_split(self):
+        rows = [_row("Q1"), _row("Q2", "a"), _row("Q2", "b"), _row("Q3", "a"), _row("Q3", "b"), _row("Q4")]
+        with patch("src.utils.sparql.execute_sparql_query", side_effect=FakeEndpoint(rows)):
+            pages = list(sparql.paginate_sparql(self.QUERY, page_size=4, prefetch=False))
+        assert pages == [rows[:3], rows[3:]]
+
+    def test_iter_sparql_bindings_flattens_pages(self):
+        rows = [_row(f"Q{i}") for i in range(10, 13)]
+        with patch("src.utils.sparql.execute_sparql_query", side_effect=FakeEndpoint(rows)):
+            assert list(sparql.iter_sparql_bindings(self.QUERY, page_size=2)) == rows
+
+    def test_query_without_keyset_marker_raises(self):
+        with pytest.raises(ValueError):
+            list(sparql.paginate_sparql("SELECT ?item WHERE { ?item ?p ?o }"))
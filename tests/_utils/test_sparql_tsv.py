@@ -0,0 +1,55 @@
+from src.utils.sparql_tsv import XSD, format_term, iter_lines, parse_term, read_tsv, write_tsv
+
+
+class TestParseTerm:
+
+    def test_iri_and_blank_node(self):
+        assert parse_term("<https://dance.wikibase.cloud/entity/Q1>") == {"type": "uri", "value": "https://dance.wikibase.cloud/entity/Q1"}
+        assert parse_term("_:b0") == {"type": "bnode", "value": "b0"}
+
+    def test_literals(self):
+        assert parse_term('"Folkets park"@sv') == {"type": "literal", "value": "Folkets park", "xml:lang": "sv"}
+        assert parse_term('"2026-05-01T00:00:00Z"^^<http://www.w3.org/2001/XMLSchema#dateTime>') == {
+            "type": "literal",
+            "value": "2026-05-01T00:00:00Z",
+            "datatype": XSD + "dateTime",
+        }
+        assert parse_term('"Point(18.1 59.3)"') == {"type": "literal", "value": "Point(18.1 59.3)"}
+
+    def test_bare_numbers_and_booleans(self):
+        assert parse_term("42")["datatype"] == XSD + "integer"
+        assert parse_term("-1.5")["datatype"] == XSD + "decimal"
+        assert parse_term("1.0E3")["datatype"] == XSD + "double"
+        assert parse_term("true") == {"type": "literal", "value": "true", "datatype": XSD + "boolean"}
+
+    def test_escapes(self):
+        assert parse_term(r'"Dans \"på\" logen\tA\\Bå"')["value"] == 'Dans "på" logen\tA\\Bå'
+
+
+class TestRoundTrip:
+
+    def test_write_then_read(self):
+        bindings = [
+            {"item": {"type": "uri", "value": "https://example.org/Q1"}, "label": {"type": "literal", "value": 'a\t"b"\nc', "xml:lang": "sv"}},
+            {"item": {"type": "uri", "value": "https://example.org/Q2"}},
+        ]
+        data = "".join(f"{line}\n" for line in write_tsv(["item", "label"], bindings)).encode()
+
+        # Chunk boundaries inside lines and inside multi-byte characters
+        chunks = [data[i:i + 5] for i in range(0, len(data), 5)]
+        variables, rows = read_tsv(iter_lines(chunks))
+
+        assert variables == ["item", "label"]
+        assert list(rows) == bindings
+
+    def test_line_separator_inside_literal_is_kept(self):
+        term = {"type": "literal", "value": "a\u2028b"}
+        _, rows = read_tsv(iter_lines([f"?x\n{format_term(term)}\n".encode()]))
+
+        assert list(rows) == [{"x": term}]
+
+    def test_empty_response(self):
+        variables, rows = read_tsv(iter_lines([]))
+
+        assert variables == []
+        assert list(rows) == []
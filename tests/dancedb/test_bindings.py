@@ -0,0 +1,26 @@
+from src.models.dancedb.bindings import binding_value, parse_point, qid_from_uri, split_aliases
+
+
+class TestBindings:
+
+    def test_binding_value(self):
+        row = {"item": {"type": "uri", "value": "https://dance.wikibase.cloud/entity/Q20"}}
+        assert binding_value(row, "item") == "https://dance.wikibase.cloud/entity/Q20"
+        assert binding_value(row, "label") == ""
+
+    def test_qid_from_uri(self):
+        assert qid_from_uri("https://dance.wikibase.cloud/entity/Q20") == "Q20"
+        assert qid_from_uri("") == ""
+
+    def test_parse_point(self):
+        assert parse_point("Point(18.0993459 59.355601)") == (59.355601, 18.0993459)
+
+    def test_parse_point_invalid(self):
+        assert parse_point("") == (None, None)
+        assert parse_point("Point(18.0)") == (None, None)
+        assert parse_point("not a point") == (None, None)
+
+    def test_split_aliases(self):
+        assert split_aliases("Folkets Park|Parken||") == ["folkets park", "parken"]
+        assert split_aliases("Folkets Park|Parken", lower=False) == ["Folkets Park", "Parken"]
+        assert split_aliases("") == []
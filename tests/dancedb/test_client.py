@@ -2,7 +2,18 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from src.models.dancedb import labels
 from src.models.dancedb.client import DancedbClient
+from src.models.dancedb.edits import ClaimSpec
+from src.models.dancedb.labels import LabelIndex
+from src.utils.http import EndpointUnavailable
+
+
+@pytest.fixture(autouse=True)
+def label_index(monkeypatch):
+    index = LabelIndex()
+    monkeypatch.setattr(labels, "_index", index)
+    return index
 
 
 class TestDancedbClientSearchBand:
@@ -10,7 +21,7 @@ class TestDancedbClientSearchBand:
     def test_search_band_finds_single_match(self, mock_login):
         mock_login.return_value = MagicMock()
 
-        with patch("src.models.dancedb.client.execute_sparql_query") as mock_sparql:
+        with patch("src.models.dancedb.query.execute_sparql_query") as mock_sparql:
             mock_sparql.return_value = {"results": {"bindings": [{"item": {"value": "https://dance.wikibase.cloud/wiki/Q123"}}]}}
 
             client = DancedbClient()
@@ -23,7 +34,7 @@ class TestDancedbClientSearchBand:
     def test_search_band_returns_none_when_no_match(self, mock_login):
         mock_login.return_value = MagicMock()
 
-        with patch("src.models.dancedb.client.execute_sparql_query") as mock_sparql:
+        with patch("src.models.dancedb.query.execute_sparql_query") as mock_sparql:
             mock_sparql.return_value = {"results": {"bindings": []}}
 
             client = DancedbClient()
@@ -35,7 +46,7 @@ class TestDancedbClientSearchBand:
     def test_search_band_returns_none_when_multiple_matches(self, mock_login):
         mock_login.return_value = MagicMock()
 
-        with patch("src.models.dancedb.client.execute_sparql_query") as mock_sparql:
+        with patch("src.models.dancedb.query.execute_sparql_query") as mock_sparql:
             mock_sparql.return_value = {
                 "results": {
                     "bindings": [
@@ -51,16 +62,76 @@ class TestDancedbClientSearchBand:
             assert result is None
 
     @patch("src.models.dancedb.client.Login")
-    def test_search_band_returns_none_on_exception(self, mock_login):
+    def test_search_band_raises_on_error(self, mock_login):
         mock_login.return_value = MagicMock()
 
-        with patch("src.models.dancedb.client.execute_sparql_query") as mock_sparql:
-            mock_sparql.side_effect = Exception("SPARQL error")
+        with patch("src.models.dancedb.query.execute_sparql_query") as mock_sparql:
+            mock_sparql.side_effect = EndpointUnavailable("SPARQL error")
 
             client = DancedbClient()
-            result = client.search_band("ErrorBand")
+            with pytest.raises(EndpointUnavailable):
+                client.search_band("ErrorBand")
 
-            assert result is None
+
+class TestDancedbClientSearchBands:
+    @patch("src.models.dancedb.client.Login")
+    def test_search_bands_maps_results_to_input_names(self, mock_login):
+        mock_login.return_value = MagicMock()
+
+        with patch("src.models.dancedb.query.execute_sparql_query") as mock_sparql:
+            mock_sparql.return_value = {
+                "results": {
+                    "bindings": [
+                        {"item": {"value": "https://dance.wikibase.cloud/entity/Q1"}, "label": {"value": "Band A"}},
+                        {"item": {"value": "https://dance.wikibase.cloud/entity/Q2"}, "label": {"value": "Band B"}},
+                        {"item": {"value": "https://dance.wikibase.cloud/entity/Q3"}, "label": {"value": "Band B"}},
+                    ]
+                }
+            }
+
+            client = DancedbClient()
+            result = client.search_bands(["Band A", "Band B", "Band C", "Band A"])
+
+            assert result == {"Band A": "Q1", "Band B": None, "Band C": None}
+            mock_sparql.assert_called_once()
+            assert 'VALUES ?label { "Band A"@sv "Band B"@sv "Band C"@sv }' in mock_sparql.call_args.kwargs["query"]
+
+    @patch("src.models.dancedb.client.Login")
+    def test_search_bands_chunks_large_input(self, mock_login):
+        mock_login.return_value = MagicMock()
+
+        with patch("src.models.dancedb.query.SEARCH_BATCH_SIZE", 2):
+            with patch("src.models.dancedb.query.execute_sparql_query") as mock_sparql:
+                mock_sparql.return_value = {"results": {"bindings": []}}
+
+                client = DancedbClient()
+                result = client.search_bands(["A", "B", "C", "D", "E"])
+
+                assert mock_sparql.call_count == 3
+                assert set(result) == {"A", "B", "C", "D", "E"}
+
+    @patch("src.models.dancedb.client.Login")
+    def test_search_bands_escapes_quotes(self, mock_login):
+        mock_login.return_value = MagicMock()
+
+        with patch("src.models.dancedb.query.execute_sparql_query") as mock_sparql:
+            mock_sparql.return_value = {"results": {"bindings": []}}
+
+            client = DancedbClient()
+            client.search_bands(['Band "X"'])
+
+            assert '"Band \\"X\\""@sv' in mock_sparql.call_args.kwargs["query"]
+
+    @patch("src.models.dancedb.client.Login")
+    def test_search_bands_raises_on_error(self, mock_login):
+        mock_login.return_value = MagicMock()
+
+        with patch("src.models.dancedb.query.execute_sparql_query") as mock_sparql:
+            mock_sparql.side_effect = EndpointUnavailable("SPARQL error")
+
+            client = DancedbClient()
+            with pytest.raises(EndpointUnavailable):
+                client.search_bands(["Band A"])
 
 
 class TestDancedbClientCreateBand:
@@ -118,6 +189,32 @@ class TestDancedbClientCreateBand:
         assert "WBI error" in str(exc_info.value)
 
 
+    @patch("src.models.dancedb.client.Login")
+    @patch("src.models.dancedb.client.questionary")
+    def test_create_band_warns_about_existing_label(self, mock_questionary, mock_login, label_index):
+        mock_questionary.select.return_value.ask.return_value = "No (Recommended)"
+        label_index.add("Q5", "Thorleifs")
+
+        with pytest.raises(Exception, match="User declined"):
+            DancedbClient().create_band("thorleifs ")
+
+        question = mock_questionary.select.call_args.args[0]
+        assert "Q5" in question
+        assert mock_questionary.select.call_args.kwargs["choices"][0] == "No (Recommended)"
+
+    @patch("src.models.dancedb.client.Login")
+    @patch("src.models.dancedb.client.questionary")
+    def test_created_band_is_indexed(self, mock_questionary, mock_login, label_index):
+        mock_questionary.select.return_value.ask.return_value = "Yes (Recommended)"
+        client = DancedbClient()
+        client.wbi = MagicMock()
+        client.wbi.item.new.return_value.id = "Q999"
+
+        client.create_band("NewBand")
+
+        assert label_index.lookup("newband") == ["Q999"]
+
+
 class TestDancedbClientGetOrCreateBand:
     @patch("src.models.dancedb.client.Login")
     def test_get_or_create_returns_existing_band(self, mock_login):
@@ -151,7 +248,7 @@ class TestDancedbClientFindVenuesByCoordinates:
     def test_find_venues_by_coordinates_within_threshold(self, mock_login):
         mock_login.return_value = MagicMock()
 
-        with patch("src.models.dancedb.client.execute_sparql_query") as mock_sparql:
+        with patch("src.models.dancedb.query.execute_sparql_query") as mock_sparql:
             mock_sparql.return_value = {
                 "results": {
                     "bindings": [
@@ -176,7 +273,7 @@ class TestDancedbClientFindVenuesByCoordinates:
     def test_find_venues_by_coordinates_outside_threshold(self, mock_login):
         mock_login.return_value = MagicMock()
 
-        with patch("src.models.dancedb.client.execute_sparql_query") as mock_sparql:
+        with patch("src.models.dancedb.query.execute_sparql_query") as mock_sparql:
             mock_sparql.return_value = {"results": {"bindings": []}}
 
             client = DancedbClient()
@@ -189,7 +286,7 @@ class TestDancedbClientFindVenuesByCoordinates:
     def test_find_venues_by_coordinates_parses_geo_correctly(self, mock_login):
         mock_login.return_value = MagicMock()
 
-        with patch("src.models.dancedb.client.execute_sparql_query") as mock_sparql:
+        with patch("src.models.dancedb.query.execute_sparql_query") as mock_sparql:
             mock_sparql.return_value = {
                 "results": {
                     "bindings": [
@@ -208,3 +305,129 @@ class TestDancedbClientFindVenuesByCoordinates:
             assert result[0]["lat"] == 62.390405
             assert result[0]["lng"] == 17.306618
             assert 0 <= result[0]["distance_km"] <= 0.1
+
+
+@patch("src.models.dancedb.client.BatchWriter")
+@patch("src.models.dancedb.client.Login")
+class TestDancedbClientCoalescedEdits:
+    def _results(self, mock_writer_cls):
+        writer = mock_writer_cls.return_value
+        writer.run.side_effect = lambda: [MagicMock(ok=True, edit=edit, qid=edit.qid) for (edit,), _ in writer.submit.call_args_list]
+        return writer
+
+    @pytest.fixture(autouse=True)
+    def no_statements(self):
+        # Properties are indexed as having no values, instead of querying them
+        with patch("src.models.dancedb.statements.get_mirror", return_value=None), \
+                patch("src.models.dancedb.statements.iter_sparql_bindings", return_value=[]):
+            yield
+
+    def test_same_value_twice_writes_one_claim(self, mock_login, mock_writer_cls):
+        writer = self._results(mock_writer_cls)
+        client = DancedbClient()
+
+        with client.coalesced_edits():
+            client.set_coordinates("Q1", 59.3, 18.1)
+            client.set_coordinates("Q1", 59.3, 18.1)
+        client.set_artist_spelplan("Q2", "123")
+        client.set_artist_spelplan("Q2", "123")
+
+        edits = [call.args[0] for call in writer.submit.call_args_list]
+        assert [(e.qid, [c.prop_nr for c in e.claims]) for e in edits] == [("Q1", ["P4"]), ("Q2", ["P46"])]
+
+    def test_claims_for_one_item_become_one_edit(self, mock_login, mock_writer_cls):
+        writer = self._results(mock_writer_cls)
+        client = DancedbClient()
+
+        with client.coalesced_edits():
+            assert client.set_coordinates("Q1", 59.3, 18.1)
+            assert client.set_artist_spelplan("Q1", "123")
+            assert client.set_property("Q2", "P3", "Q5")
+            writer.submit.assert_not_called()
+
+        edits = {call.args[0].qid: call.args[0] for call in writer.submit.call_args_list}
+        assert sorted(edits) == ["Q1", "Q2"]
+        assert [c.prop_nr for c in edits["Q1"].claims] == ["P4", "P46"]
+        writer.run.assert_called_once()
+
+    def test_writes_immediately_outside_block(self, mock_login, mock_writer_cls):
+        writer = self._results(mock_writer_cls)
+        client = DancedbClient()
+
+        assert client.set_coordinates("Q1", 59.3, 18.1) is True
+
+        writer.run.assert_called_once()
+        assert client.flush_edits() == []
+
+    def test_flushes_at_threshold(self, mock_login, mock_writer_cls, monkeypatch):
+        writer = self._results(mock_writer_cls)
+        monkeypatch.setattr("src.models.dancedb.client.config.EDIT_FLUSH_ITEMS", 2)
+        client = DancedbClient()
+
+        with client.coalesced_edits():
+            client.set_artist_spelplan("Q1", "1")
+            writer.run.assert_not_called()
+            client.set_artist_spelplan("Q2", "2")
+            writer.run.assert_called_once()
+
+        writer.run.assert_called_once()
+
+    def test_skip_existing_drops_known_values(self, mock_login, mock_writer_cls):
+        writer = self._results(mock_writer_cls)
+        client = DancedbClient()
+        client.statements = MagicMock()
+        client.statements.has.side_effect = lambda qid, claim: claim.value == "Q100"
+
+        assert client.add_claims("Q1", [ClaimSpec.string("P3", "Q100")], skip_existing=True)
+        writer.submit.assert_not_called()
+
+        client.add_claims("Q1", [ClaimSpec.string("P3", "Q200")], skip_existing=True)
+        writer.submit.assert_called_once()
+        client.statements.add.assert_called_once()
+
+
+@patch("src.models.dancedb.entities.read_api")
+@patch("src.models.dancedb.client.Login")
+class TestDancedbClientGetEntities:
+    def _respond(self, mock_read_api):
+        def call(data):
+            entities = {}
+            for qid in data["ids"].split("|"):
+                if qid == "Q404":
+                    entities[qid] = {"id": qid, "missing": ""}
+                elif qid == "Q7":
+                    entities["Q8"] = {"id": "Q8", "redirects": {"from": "Q7", "to": "Q8"}}
+                else:
+                    entities[qid] = {"id": qid, "labels": {"sv": {"language": "sv", "value": f"Item {qid}"}}}
+            return {"entities": entities}
+        mock_read_api.side_effect = call
+
+    def test_batches_fifty_ids_per_call(self, mock_login, mock_read_api):
+        self._respond(mock_read_api)
+        client = DancedbClient()
+
+        entities = client.get_entities(f"Q{i}" for i in range(100, 220))
+
+        assert len(entities) == 120
+        assert mock_read_api.call_count == 3
+        sizes = sorted(len(c.args[0]["ids"].split("|")) for c in mock_read_api.call_args_list)
+        assert sizes == [20, 50, 50]
+
+    def test_cached_entities_are_not_refetched(self, mock_login, mock_read_api):
+        self._respond(mock_read_api)
+        client = DancedbClient()
+
+        client.get_entities(["Q1", "Q2"])
+        entities = client.get_entities(["Q2", "Q1", "Q3"])
+
+        assert list(entities) == ["Q2", "Q1", "Q3"]
+        assert mock_read_api.call_args_list[1].args[0]["ids"] == "Q3"
+
+    def test_missing_and_redirected_items(self, mock_login, mock_read_api):
+        self._respond(mock_read_api)
+        client = DancedbClient()
+
+        entities = client.get_entities(["Q1", "Q404", "Q7"])
+
+        assert "Q404" not in entities
+        assert entities["Q7"]["id"] == "Q8"
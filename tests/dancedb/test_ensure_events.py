@@ -0,0 +1,76 @@
+from datetime import date, datetime
+
+import pytest
+
+from src.models.dancedb import ensure_events
+from src.models.dancedb.edits import event_edit, venue_edit
+from src.models.dancedb.ensure_events import default_event_window, events_query, fetch_events_from_dancedb
+from src.models.dancedb.local_server import EntityStore, start_server
+
+WINDOW = (date(2026, 5, 1), date(2026, 6, 1))
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    # Every test using the server queries it with SPARQL
+    pytest.importorskip("rdflib")
+    store = EntityStore()
+    store.edit(venue_edit("Folkets park", 59.3, 18.1).to_json())
+    store.edit(event_edit("April", "Q1", datetime(2026, 4, 20, 20)).to_json())
+    store.edit(event_edit("Maj", "Q1", datetime(2026, 5, 10, 20)).to_json())
+    server = start_server(snapshot=None)
+    server.wikibase.store = store
+    monkeypatch.setattr(ensure_events.config, "LOCAL_WIKIBASE_URL", server.url)
+    monkeypatch.setattr(ensure_events.config, "events_snapshot_file", tmp_path / "events_snapshot.json")
+    yield server
+    server.shutdown()
+    monkeypatch.undo()
+    ensure_events.configure_wbi()
+
+
+class TestEventsQuery:
+
+    def test_window_and_modified_filters(self):
+        query = events_query(date(2026, 5, 1), date(2026, 6, 1), modified_since=datetime(2026, 4, 1, 12))
+
+        assert 'FILTER(?windowDate >= "2026-05-01")' in query
+        assert 'FILTER(?windowDate < "2026-06-01")' in query
+        assert '"2026-04-01T12:00:00Z"^^xsd:dateTime' in query
+        assert "#EVENT_FILTER" not in query
+
+    def test_default_window(self, monkeypatch):
+        monkeypatch.setattr(ensure_events.config, "EVENTS_WINDOW_DAYS_BEFORE", 1)
+        monkeypatch.setattr(ensure_events.config, "EVENTS_WINDOW_DAYS", 30)
+
+        assert default_event_window(date(2026, 5, 1)) == (date(2026, 4, 30), date(2026, 5, 31))
+
+
+class TestFetchEvents:
+
+    def test_window_is_applied_on_the_server(self, server):
+        events = fetch_events_from_dancedb(save=False, window=WINDOW)
+
+        assert [e["event_label"] for e in events] == ["Maj"]
+        assert events[0]["venue_label"] == "Folkets park"
+
+    def test_all_events_without_window(self, server):
+        assert len(fetch_events_from_dancedb(save=False)) == 2
+
+    def test_incremental_merges_edited_events(self, server):
+        store = server.wikibase.store
+        fetch_events_from_dancedb(save=False, window=WINDOW, incremental=True)
+
+        store.edit(event_edit("Maj 2", "Q1", datetime(2026, 5, 24, 20)).to_json())
+        store.edit({"labels": {"sv": {"language": "sv", "value": "Maj (flyttad)"}}}, qid="Q3")
+        server.wikibase.request_counts.clear()
+        events = fetch_events_from_dancedb(save=False, window=WINDOW, incremental=True)
+
+        assert sorted(e["event_label"] for e in events) == ["Maj (flyttad)", "Maj 2"]
+        assert server.wikibase.request_counts["sparql"] == 1
+
+    def test_incremental_fetches_days_added_to_the_window(self, server):
+        fetch_events_from_dancedb(save=False, window=(date(2026, 4, 1), date(2026, 5, 1)), incremental=True)
+
+        events = fetch_events_from_dancedb(save=False, window=(date(2026, 4, 1), date(2026, 6, 1)), incremental=True)
+
+        assert sorted(e["event_label"] for e in events) == ["April", "Maj"]
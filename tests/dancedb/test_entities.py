@@ -0,0 +1,50 @@
+from src.models.dancedb.entities import EntityCache, claim_values, entity_label, entity_summary
+
+VENUE = {
+    "id": "Q10",
+    "labels": {"sv": {"language": "sv", "value": "Folkets park"}, "en": {"language": "en", "value": "People's park"}},
+    "claims": {
+        "P1": [{"mainsnak": {"datavalue": {"value": {"entity-type": "item", "numeric-id": 20, "id": "Q20"}}}}],
+        "P4": [{"mainsnak": {"datavalue": {"value": {"latitude": 59.3, "longitude": 18.1, "globe": "http://www.wikidata.org/entity/Q2"}}}}],
+        "P46": [{"mainsnak": {"datavalue": {"value": "123"}}}, {"mainsnak": {"snaktype": "novalue"}}],
+    },
+}
+
+
+class TestEntityCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = EntityCache(max_size=2)
+        cache.put("Q1", {"id": "Q1"})
+        cache.put("Q2", {"id": "Q2"})
+        cache.get("Q1")
+        cache.put("Q3", {"id": "Q3"})
+
+        assert cache.get("Q2") is None
+        assert cache.get("Q1") == {"id": "Q1"}
+        assert len(cache) == 2
+
+    def test_discard(self):
+        cache = EntityCache(max_size=10)
+        cache.put("Q1", {"id": "Q1"})
+
+        cache.discard(["Q1", "Q2"])
+
+        assert cache.get("Q1") is None
+
+
+class TestEntityAccessors:
+
+    def test_label_falls_back_to_english(self):
+        assert entity_label(VENUE) == "Folkets park"
+        assert entity_label(VENUE, lang="de") == "People's park"
+        assert entity_label({}) == ""
+
+    def test_claim_values(self):
+        assert claim_values(VENUE, "P1") == ["Q20"]
+        assert claim_values(VENUE, "P4") == [(59.3, 18.1)]
+        assert claim_values(VENUE, "P46") == ["123"]
+        assert claim_values(VENUE, "P99") == []
+
+    def test_summary(self):
+        assert entity_summary(VENUE) == {"qid": "Q10", "label": "Folkets park", "lat": 59.3, "lng": 18.1}
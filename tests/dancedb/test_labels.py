@@ -0,0 +1,34 @@
+from unittest.mock import patch
+
+from src.models.dancedb.labels import LabelIndex, normalize_label
+
+
+class TestNormalizeLabel:
+
+    def test_case_whitespace_and_unicode_form(self):
+        assert normalize_label("  Folkets  Park\t") == "folkets park"
+        assert normalize_label("Café Dans") == normalize_label("Café dans")
+
+
+class TestLabelIndex:
+
+    def test_lookup_and_clashes(self):
+        index = LabelIndex()
+        index.update([("Q1", "Folkets park"), ("Q2", "folkets  park"), ("Q3", "Dansbanan"), ("Q1", "Folkets park")])
+
+        assert index.lookup("FOLKETS PARK") == ["Q1", "Q2"]
+        assert index.lookup("Logen") == []
+        assert index.clashes() == {"Folkets park": ["Q1", "Q2"]}
+
+    @patch("src.models.dancedb.labels.get_mirror", return_value=None)
+    @patch("src.models.dancedb.labels.iter_sparql_bindings")
+    def test_load_from_query_service(self, mock_bindings, mock_mirror):
+        mock_bindings.return_value = iter([
+            {"item": {"value": "https://dance.wikibase.cloud/entity/Q7"}, "label": {"value": "Thorleifs"}},
+            {"item": {"value": "https://dance.wikibase.cloud/entity/Q8"}, "label": {"value": "Thorleifs"}},
+        ])
+
+        index = LabelIndex().load()
+
+        assert index.clashes() == {"Thorleifs": ["Q7", "Q8"]}
+        assert 'LANG(?label) = "sv"' in mock_bindings.call_args.args[0]
@@ -0,0 +1,66 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.models.dancedb.match import match_venues  # noqa: E402
+
+
+class TestMatchVenues:
+
+    @pytest.fixture
+    def dirs(self, tmp_path):
+        byg_dir, db_dir, enrich_dir = tmp_path / "bygdegardarna", tmp_path / "dancedb", tmp_path / "enrich"
+        (db_dir / "venues").mkdir(parents=True)
+        byg_dir.mkdir()
+        with patch("config.bygdegardarna_dir", byg_dir), patch("config.dancedb_dir", db_dir), patch("config.enrich_dir", enrich_dir):
+            yield byg_dir, db_dir / "venues", enrich_dir
+
+    @pytest.fixture
+    def snapshots(self, dirs):
+        byg_dir, db_dir, enrich_dir = dirs
+        (byg_dir / "2026-01-01.json").write_text(json.dumps([
+            {"title": "Logen", "position": {"lat": 50.0, "lng": 10.0}},
+            {"title": "Bygdegården i Skogen", "position": {"lat": 56.46537, "lng": 13.09607}},
+            {"title": "Okänd", "position": {"lat": 60.0, "lng": 15.0}},
+        ]))
+        (db_dir / "2026-01-01.json").write_text(json.dumps({
+            "Q1": {"label": "Logen"},
+            "Q2": {"label": "Skogslogen Norra", "lat": 56.465292, "lng": 13.096046},
+        }))
+        return dirs
+
+    def _results(self, dirs) -> tuple[list, list]:
+        byg_dir, _, enrich_dir = dirs
+        enriched = json.loads((enrich_dir / "2026-01-01.json").read_text())
+        unmatched = json.loads((byg_dir / "unmatched" / "2026-01-01.json").read_text())
+        return [(v["title"], v["qid"]) for v in enriched], [v["title"] for v in unmatched]
+
+    @patch("src.models.dancedb.ensure_venue_creator.questionary.select")
+    def test_coordinate_matches_are_confirmed(self, mock_select, snapshots):
+        mock_select.return_value.ask.return_value = "Skogslogen Norra (9m, Q2)"
+
+        match_venues("2026-01-01", match_coordinates=True)
+
+        assert self._results(snapshots) == ([("Logen", "Q1"), ("Bygdegården i Skogen", "Q2")], ["Okänd"])
+        assert mock_select.call_count == 1
+        assert (snapshots[1] / "2026-01-01.coords" / "lat.npy").exists()
+
+    @patch("src.models.dancedb.ensure_venue_creator.questionary.select")
+    def test_declined_coordinate_match_stays_unmatched(self, mock_select, snapshots):
+        mock_select.return_value.ask.return_value = "Create new venue (skip DanceDB)"
+
+        match_venues("2026-01-01", match_coordinates=True)
+
+        assert self._results(snapshots) == ([("Logen", "Q1")], ["Bygdegården i Skogen", "Okänd"])
+
+    @patch("src.models.dancedb.ensure_venue_creator.questionary.select")
+    def test_no_coordinate_matching_without_flag_or_prompts(self, mock_select, snapshots):
+        match_venues("2026-01-01")
+        assert self._results(snapshots) == ([("Logen", "Q1")], ["Bygdegården i Skogen", "Okänd"])
+
+        match_venues("2026-01-01", skip_prompts=True, match_coordinates=True)
+        assert self._results(snapshots) == ([("Logen", "Q1")], ["Bygdegården i Skogen", "Okänd"])
+        mock_select.assert_not_called()
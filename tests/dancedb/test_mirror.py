@@ -0,0 +1,129 @@
+from unittest.mock import patch
+
+import pytest
+from wikibaseintegrator.wbi_config import config as wbi_config
+
+from src.models.dancedb import mirror as mirror_module
+from src.models.dancedb.client import DancedbClient
+from src.models.dancedb.edits import band_edit, venue_edit
+from src.models.dancedb.local_server import EntityStore, start_server
+from src.models.dancedb.mirror import DanceMirror, claim_value
+
+
+@pytest.fixture
+def server(monkeypatch):
+    store = EntityStore()
+    store.edit(band_edit("Thorleifs", spelplan_id="12").to_json())
+    store.edit(venue_edit("Folkets park", 59.3, 18.1, external_ids={"P42": "7"}).to_json())
+    server = start_server(snapshot=None)
+    server.wikibase.store = store
+    monkeypatch.setitem(wbi_config, "MEDIAWIKI_API_URL", f"{server.url}/w/api.php")
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def mirror(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(mirror_module.config, "mirror_db_path", tmp_path / "dancedb.sqlite")
+    mirror_module.configure_mirror(enabled=True)
+    yield mirror_module.get_mirror()
+    mirror_module.configure_mirror(enabled=False)
+    mirror_module._mirror.close()
+    mirror_module._mirror = None
+
+
+class TestClaimValue:
+
+    def test_renders_like_the_query_service(self):
+        assert claim_value({"value": {"entity-type": "item", "numeric-id": 20, "id": "Q20"}}) == "Q20"
+        assert claim_value({"value": {"latitude": 59.3, "longitude": 18.1}}) == "Point(18.1 59.3)"
+        assert claim_value({"value": {"time": "+2026-05-01T00:00:00Z", "precision": 11}}) == "2026-05-01T00:00:00Z"
+        assert claim_value({"value": "12"}) == "12"
+
+
+class TestDanceMirror:
+
+    def test_full_load(self, server, tmp_path):
+        mirror = DanceMirror(tmp_path / "dancedb.sqlite")
+
+        mirror.sync()
+
+        assert len(mirror) == 2
+        assert mirror.find_by_label(["Thorleifs", "Okänd"], "Q225") == {"Thorleifs": ["Q1"], "Okänd": []}
+        venue = mirror.items("Q20")["Q2"]
+        assert venue["label"] == "Folkets park"
+        assert venue["claims"]["P4"] == ["Point(18.1 59.3)"]
+        assert server.wikibase.request_counts.get("sparql", 0) == 0
+        assert sorted(mirror.all_labels("sv")) == [("Q1", "Thorleifs"), ("Q2", "Folkets park")]
+
+    def test_incremental_sync_applies_recent_changes(self, server, tmp_path):
+        store = server.wikibase.store
+        mirror = DanceMirror(tmp_path / "dancedb.sqlite")
+        mirror.sync()
+        fetched = server.wikibase.request_counts["wbgetentities"]
+
+        store.edit(band_edit("Sven Ingvars").to_json())
+        store.edit({"labels": {"sv": {"language": "sv", "value": "Thorleifs orkester"}}}, qid="Q1")
+        mirror.sync()
+
+        assert server.wikibase.request_counts["wbgetentities"] == fetched + 1
+        artists = mirror.items("Q225")
+        assert [artists[qid]["label"] for qid in artists] == ["Thorleifs orkester", "Sven Ingvars"]
+
+    def test_merged_items_are_removed(self, server, tmp_path):
+        store = server.wikibase.store
+        store.edit(band_edit("Thorleifs").to_json())
+        mirror = DanceMirror(tmp_path / "dancedb.sqlite")
+        mirror.sync()
+
+        store.merge("Q3", "Q1")
+        mirror.sync()
+
+        assert list(mirror.items("Q225")) == ["Q1"]
+
+    def test_state_survives_reopening(self, server, tmp_path):
+        DanceMirror(tmp_path / "dancedb.sqlite").sync()
+        server.wikibase.request_counts.clear()
+
+        mirror = DanceMirror(tmp_path / "dancedb.sqlite")
+        mirror.sync()
+
+        # One recentchanges call and no allpages listing
+        assert len(mirror) == 2
+        assert server.wikibase.request_counts["query"] == 1
+
+    def test_other_wiki_triggers_full_load(self, server, tmp_path, monkeypatch):
+        mirror = DanceMirror(tmp_path / "dancedb.sqlite")
+        mirror.sync()
+        monkeypatch.setitem(wbi_config, "MEDIAWIKI_API_URL", f"{server.url}/w/api.php?other")
+        server.wikibase.store.entities.pop("Q2")
+
+        mirror.sync()
+
+        assert len(mirror) == 1
+
+
+class TestClientReadsFromMirror:
+
+    @patch("src.models.dancedb.query.execute_sparql_query")
+    @patch("src.models.dancedb.client.Login")
+    def test_reads_do_not_use_sparql(self, mock_login, mock_sparql, mirror):
+        client = DancedbClient()
+
+        assert client.search_band("Thorleifs") == "Q1"
+        assert client.search_venues(["Folkets park", "Okänd"]) == {"Folkets park": "Q2", "Okänd": None}
+        assert client.fetch_artists_from_dancedb() == [{"qid": "Q1", "label": "Thorleifs", "aliases": [], "p3": "", "p46": "12"}]
+        assert client.fetch_venues_from_dancedb()[0]["lat"] == 59.3
+        nearby = client.find_venues_by_coordinates(59.3001, 18.1001)
+        assert [v["qid"] for v in nearby] == ["Q2"]
+        assert nearby[0]["distance_km"] < 0.1
+        mock_sparql.assert_not_called()
+
+    def test_writes_mark_the_mirror_stale(self, mirror, server):
+        mirror.ensure_current()
+        server.wikibase.store.edit(band_edit("Sven Ingvars").to_json())
+
+        from src.utils.sparql import invalidate_cache
+        invalidate_cache(f"{server.url}/query/sparql")
+
+        assert mirror.find_by_label(["Sven Ingvars"], "Q225") == {"Sven Ingvars": ["Q3"]}
@@ -0,0 +1,131 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.models.dancedb import labels
+from src.models.dancedb import plan as plan_module
+from src.models.dancedb.client import DancedbClient
+from src.models.dancedb.edits import band_edit, event_edit
+from src.models.dancedb.labels import LabelIndex
+from src.models.dancedb.plan import Plan, active_plan, approve_plan, finish_plan, start_plan
+
+
+@pytest.fixture
+def plans_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_module.config, "plans_dir", tmp_path)
+    yield tmp_path
+    finish_plan()
+
+
+@pytest.fixture(autouse=True)
+def label_index(monkeypatch):
+    index = LabelIndex()
+    monkeypatch.setattr(labels, "_index", index)
+    return index
+
+
+class TestPlan:
+
+    def test_finish_saves_planned_edits(self, plans_dir):
+        plan = start_plan("upload")
+        plan.add(band_edit("Thorleifs"), source="test")
+
+        path = finish_plan()
+
+        assert active_plan() is None
+        assert path.parent == plans_dir
+        loaded = Plan.load(path)
+        assert loaded.name == "upload"
+        assert loaded.edits[0].edit.label == "Thorleifs"
+        assert loaded.edits[0].approved is False
+
+    def test_same_edit_is_planned_once(self, plans_dir):
+        plan = start_plan("upload")
+
+        assert plan.add(band_edit("Newband")) is True
+        assert plan.add(band_edit("Newband")) is False
+        plan.add(band_edit("Newband", spelplan_id="1"))
+
+        assert [p.edit.describe() for p in plan.edits] == ["new item 'Newband': P1=Q225", "new item 'Newband': P1=Q225, P46=1"]
+
+    def test_label_clash_is_not_approved_in_bulk(self, plans_dir, label_index):
+        from datetime import datetime
+
+        label_index.add("Q5", "Thorleifs")
+        plan = start_plan("upload")
+        plan.add(band_edit("thorleifs"))
+        plan.add(band_edit("Newband"))
+        plan.add(event_edit("Thorleifs på Logen", "Q7", datetime(2026, 1, 1, 20)))
+        label_index.add("Q8", "Thorleifs på Logen")
+        plan.add(event_edit("Thorleifs på Logen", "Q9", datetime(2026, 1, 1, 20)))
+        path = finish_plan()
+
+        approve_plan(path, approve_all=True)
+
+        edits = Plan.load(path).edits
+        assert [p.clashes for p in edits] == [["Q5"], [], [], []]
+        assert [p.approved for p in edits] == [False, True, True, True]
+
+    def test_finish_without_edits_writes_nothing(self, plans_dir):
+        start_plan("upload")
+
+        assert finish_plan() is None
+        assert list(plans_dir.iterdir()) == []
+
+    def test_approve_all(self, plans_dir):
+        plan = start_plan("upload")
+        plan.add(band_edit("A"))
+        plan.add(band_edit("B"))
+        path = finish_plan()
+
+        approve_plan(path, approve_all=True)
+
+        assert [p.approved for p in Plan.load(path).edits] == [True, True]
+        assert len(Plan.load(path).pending()) == 2
+
+    @patch("src.models.dancedb.plan.questionary")
+    def test_review_one_by_one(self, mock_questionary, plans_dir):
+        plan = start_plan("upload")
+        plan.add(band_edit("A"))
+        plan.add(band_edit("B"))
+        path = finish_plan()
+        mock_questionary.select.return_value.ask.side_effect = ["Review one by one", "Skip", "Approve"]
+
+        approve_plan(path)
+
+        assert [p.approved for p in Plan.load(path).edits] == [False, True]
+
+
+class TestClientPlanMode:
+
+    @patch("src.models.dancedb.client.questionary")
+    @patch("src.models.dancedb.client.Login")
+    def test_create_band_is_planned(self, mock_login, mock_questionary, plans_dir):
+        client = DancedbClient()
+        client.wbi = MagicMock()
+        plan = start_plan("test")
+
+        assert client.create_band("Thorleifs", spelplan_id="123") is None
+
+        mock_questionary.select.assert_not_called()
+        client.wbi.item.new.assert_not_called()
+        assert plan.edits[0].edit.describe() == "new item 'Thorleifs': P1=Q225, P46=123"
+
+    @patch("src.models.danslogen.band_mapper.load_danslogen_artists", return_value={})
+    @patch("src.models.danslogen.band_mapper.load_band_map", return_value={})
+    @patch("src.models.dancedb.client.Login")
+    def test_unknown_band_resolved_twice_is_planned_once(self, mock_login, mock_band_map, mock_artists, plans_dir):
+        from src.models.danslogen.band_mapper import BandMapper
+
+        client = DancedbClient()
+        client.wbi = MagicMock()
+        client.search_bands = MagicMock(return_value={"Newband": None})
+        plan = start_plan("test")
+        mapper = BandMapper(client=client)
+        mapper.prefetch(["Newband"])
+
+        assert mapper.resolve("Newband") is None
+        assert mapper.resolve("Newband") is None
+        assert mapper.resolve("newband") is None
+
+        assert [p.edit.label for p in plan.edits] == ["Newband"]
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from src.models.dancedb.client import DancedbClient
+from src.models.dancedb.query import DancedbQuery, get_query_client
+
+ROOT = Path(__file__).parents[2]
+
+
+class TestDancedbQuery:
+
+    def test_read_path_does_not_import_write_dependencies(self):
+        code = (
+            "import sys\n"
+            "import src.cli.sync, src.models.dancedb.query, src.models.dancedb.scrape, src.models.dancedb.reference\n"
+            "print(sorted({'wikibaseintegrator', 'questionary', 'rich'} & set(sys.modules)))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == "[]"
+
+    def test_shared_client(self):
+        assert get_query_client() is get_query_client()
+        assert type(get_query_client()) is DancedbQuery
+
+    @patch("src.models.dancedb.query.execute_sparql_query")
+    @patch("src.models.dancedb.client.Login")
+    def test_write_client_logs_in_on_first_write_only(self, mock_login, mock_sparql):
+        mock_sparql.return_value = {"results": {"bindings": []}}
+        client = DancedbClient()
+
+        assert client.search_band("Thorleifs") is None
+        mock_login.assert_not_called()
+
+        assert client.login is mock_login.return_value
+        mock_login.assert_called_once()
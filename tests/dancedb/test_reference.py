@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from src.models.dancedb import reference
+from src.models.dancedb.reference import ReferenceData
+from src.utils.sparql import invalidate_cache
+
+
+@pytest.fixture
+def datasets(monkeypatch):
+    calls = {"artists": 0, "venues": 0}
+
+    def loader(name, delay=0.2):
+        def load():
+            calls[name] += 1
+            time.sleep(delay)
+            return [f"{name} {calls[name]}"]
+        return load
+
+    monkeypatch.setitem(reference.DATASETS, "artists", loader("artists"))
+    monkeypatch.setitem(reference.DATASETS, "venues", loader("venues"))
+    return calls
+
+
+class TestReferenceData:
+
+    def test_datasets_load_concurrently(self, datasets):
+        data = ReferenceData(max_workers=2)
+
+        started = time.monotonic()
+        data.prefetch("artists", "venues")
+        assert data.get("artists") == ["artists 1"]
+        assert data.get("venues") == ["venues 1"]
+
+        assert time.monotonic() - started < 0.35
+
+    def test_loaded_once_until_invalidated(self, datasets):
+        data = ReferenceData()
+
+        data.get("artists")
+        data.get("artists")
+        assert datasets["artists"] == 1
+
+        data.invalidate()
+        assert data.get("artists") == ["artists 2"]
+
+    def test_writes_invalidate_the_shared_loader(self, datasets):
+        shared = reference.reference_data()
+        shared.get("venues")
+
+        invalidate_cache("http://localhost/unused/sparql")
+
+        assert shared.get("venues") == ["venues 2"]
+        shared.invalidate()
+
+    def test_failed_load_is_retried(self, monkeypatch):
+        attempts = []
+
+        def flaky():
+            attempts.append(threading.current_thread().name)
+            if len(attempts) == 1:
+                raise ConnectionError("timeout")
+            return ["ok"]
+
+        monkeypatch.setitem(reference.DATASETS, "events", flaky)
+        data = ReferenceData()
+
+        with pytest.raises(ConnectionError):
+            data.get("events")
+        assert data.get("events") == ["ok"]
+
+    def test_unknown_dataset(self):
+        with pytest.raises(ValueError):
+            ReferenceData().future("bands")
@@ -0,0 +1,91 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests import Session
+from wikibaseintegrator.wbi_login import LoginError
+
+from src.models.dancedb import client as client_module
+from src.models.dancedb import session as session_module
+from src.models.dancedb.session import restore_session, save_session
+
+
+@pytest.fixture
+def session_file(tmp_path, monkeypatch):
+    path = tmp_path / "session.json"
+    monkeypatch.setattr(session_module.config, "session_file", path)
+    monkeypatch.setattr(session_module.config, "username", "Bot@test")
+    return path
+
+
+def _login() -> MagicMock:
+    login = MagicMock()
+    login.session = Session()
+    login.session.cookies.set("dancedb_session", "abc", domain="dance.wikibase.cloud", path="/")
+    login.mediawiki_api_url = session_module.wbi_config["MEDIAWIKI_API_URL"]
+    return login
+
+
+@patch("src.models.dancedb.session._Login")
+class TestSession:
+
+    def test_round_trip_restores_cookies(self, mock_login_cls, session_file):
+        save_session(_login())
+
+        assert restore_session() is mock_login_cls.return_value
+        session = mock_login_cls.call_args.kwargs["session"]
+        assert session.cookies.get("dancedb_session") == "abc"
+        assert session_file.stat().st_mode & 0o077 == 0
+
+    def test_missing_file(self, mock_login_cls, session_file):
+        assert restore_session() is None
+        mock_login_cls.assert_not_called()
+
+    def test_expired_session_is_ignored(self, mock_login_cls, session_file, monkeypatch):
+        save_session(_login())
+        later = time.time() + session_module.config.SESSION_MAX_AGE_SECONDS + 60
+        monkeypatch.setattr(session_module.time, "time", lambda: later)
+
+        assert restore_session() is None
+        mock_login_cls.assert_not_called()
+
+    def test_other_user_is_ignored(self, mock_login_cls, session_file, monkeypatch):
+        save_session(_login())
+        monkeypatch.setattr(session_module.config, "username", "Other@test")
+
+        assert restore_session() is None
+
+    def test_rejected_session(self, mock_login_cls, session_file):
+        save_session(_login())
+        mock_login_cls.side_effect = LoginError("Login failed. An anonymous token was returned.")
+
+        assert restore_session() is None
+
+
+class TestGetClient:
+
+    @patch("src.models.dancedb.client.save_session")
+    @patch("src.models.dancedb.client.restore_session")
+    @patch("src.models.dancedb.client.Login")
+    def test_logs_in_once_per_process_on_first_use(self, mock_login, mock_restore, mock_save, monkeypatch):
+        monkeypatch.setattr(client_module, "_shared_client", None)
+        mock_restore.return_value = None
+
+        first = client_module.get_client()
+        second = client_module.get_client()
+        mock_login.assert_not_called()
+
+        assert first is second
+        assert first.login is second.login
+        mock_login.assert_called_once()
+        mock_save.assert_called_once_with(mock_login.return_value)
+
+    @patch("src.models.dancedb.client.restore_session")
+    @patch("src.models.dancedb.client.Login")
+    def test_reuses_stored_session(self, mock_login, mock_restore, monkeypatch):
+        monkeypatch.setattr(client_module, "_shared_client", None)
+
+        client = client_module.get_client()
+
+        assert client.login is mock_restore.return_value
+        mock_login.assert_not_called()
@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+from src.models.dancedb.edits import ClaimSpec
+from src.models.dancedb.statements import StatementIndex
+
+P4_ROWS = [
+    {"item": {"value": "https://dance.wikibase.cloud/entity/Q1"}, "value": {"value": "Point(18.07 59.33)"}},
+]
+P3_ROWS = [
+    {"item": {"value": "https://dance.wikibase.cloud/entity/Q1"}, "value": {"value": "Q100"}},
+    {"item": {"value": "https://dance.wikibase.cloud/entity/Q2"}, "value": {"value": "Q200"}},
+]
+
+
+@patch("src.models.dancedb.statements.iter_sparql_bindings")
+class TestStatementIndex:
+
+    def test_has_string_values(self, mock_bindings):
+        mock_bindings.return_value = iter(P3_ROWS)
+        index = StatementIndex()
+
+        assert index.has("Q1", ClaimSpec.string("P3", "Q100"))
+        assert not index.has("Q1", ClaimSpec.string("P3", "Q200"))
+        assert not index.has("Q3", ClaimSpec.string("P3", "Q100"))
+        mock_bindings.assert_called_once()
+        assert "ddt:P3 ?value" in mock_bindings.call_args.args[0]
+
+    def test_coordinates_compare_at_precision(self, mock_bindings):
+        mock_bindings.return_value = iter(P4_ROWS)
+        index = StatementIndex()
+
+        assert index.has("Q1", ClaimSpec.coordinate("P4", 59.33001, 18.07002))
+        assert not index.has("Q1", ClaimSpec.coordinate("P4", 59.4, 18.07))
+
+    def test_add_updates_loaded_property(self, mock_bindings):
+        mock_bindings.return_value = iter(P3_ROWS)
+        index = StatementIndex()
+        claim = ClaimSpec.string("P3", "Q300")
+
+        assert not index.has("Q3", claim)
+        index.add("Q3", claim)
+
+        assert index.has("Q3", claim)
+        mock_bindings.assert_called_once()
@@ -0,0 +1,141 @@
+import json
+import time
+from email.utils import formatdate
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from src.models.dancedb import labels
+from src.models.dancedb.edits import ClaimSpec, EntityEdit, band_edit, event_edit
+from src.models.dancedb.labels import LabelIndex
+from src.models.dancedb.writer import BatchWriter, ThrottledError
+
+
+def _response(payload: dict, status_code: int = 200, headers: dict | None = None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.json.return_value = payload
+    return response
+
+
+def _login(*responses) -> MagicMock:
+    login = MagicMock()
+    login.get_edit_token.return_value = "token+\\"
+    login.get_session.return_value.post.side_effect = list(responses)
+    return login
+
+
+class TestEntityEdit:
+
+    def test_to_json_for_new_item(self):
+        data = band_edit("Thorleifs", spelplan_id="123").to_json()
+
+        assert data["labels"]["sv"] == {"language": "sv", "value": "Thorleifs"}
+        assert data["descriptions"]["sv"]["value"] == "artist"
+        assert [c["mainsnak"]["property"] for c in data["claims"]] == ["P1", "P46"]
+
+    def test_apply_to_item(self):
+        item = MagicMock()
+        EntityEdit(qid="Q1", claims=[ClaimSpec.coordinate("P4", 59.3, 18.1)]).apply_to(item)
+
+        item.labels.set.assert_not_called()
+        item.claims.add.assert_called_once()
+
+
+@patch("src.models.dancedb.writer.invalidate_cache")
+class TestBatchWriter:
+
+    def test_run_writes_all_queued_edits(self, mock_invalidate):
+        login = _login(_response({"entity": {"id": "Q10"}}), _response({"entity": {"id": "Q11"}}))
+        writer = BatchWriter(login, max_workers=1)
+        done = []
+        writer.submit(band_edit("A"), on_done=done.append)
+        writer.submit(EntityEdit(qid="Q5", claims=[ClaimSpec.string("P46", "9"), ClaimSpec.string("P3", "Q1")]), on_done=done.append)
+
+        results = writer.run()
+
+        assert sorted(r.qid for r in results) == ["Q10", "Q11"]
+        assert all(r.ok for r in results)
+        assert len(done) == 2
+        assert len(writer) == 0
+        first, second = [c.kwargs["data"] for c in login.get_session.return_value.post.call_args_list]
+        assert first["new"] == "item" and first["action"] == "wbeditentity"
+        assert second["id"] == "Q5" and "new" not in second
+        mock_invalidate.assert_called_once()
+
+    def test_created_bands_are_indexed_but_not_events(self, mock_invalidate, monkeypatch):
+        from datetime import datetime
+
+        index = LabelIndex()
+        monkeypatch.setattr(labels, "_index", index)
+        writer = BatchWriter(_login(_response({"entity": {"id": "Q10"}}), _response({"entity": {"id": "Q11"}})), max_workers=1)
+        writer.submit(band_edit("Newband"))
+        writer.submit(event_edit("Newband på Logen", "Q7", datetime(2026, 1, 1, 20)))
+
+        writer.run()
+
+        assert index.lookup("newband") == ["Q10"]
+        assert index.lookup("Newband på Logen") == []
+
+    def test_single_claim_uses_wbcreateclaim(self, mock_invalidate):
+        login = _login(_response({"success": 1, "claim": {"id": "Q5$abc"}}))
+        writer = BatchWriter(login)
+        writer.submit(EntityEdit(qid="Q5", claims=[ClaimSpec.coordinate("P4", 59.3, 18.1)], summary="coords"))
+
+        result = writer.run()[0]
+
+        assert result.ok and result.qid == "Q5"
+        data = login.get_session.return_value.post.call_args.kwargs["data"]
+        assert data["action"] == "wbcreateclaim"
+        assert data["entity"] == "Q5" and data["property"] == "P4"
+        assert json.loads(data["value"])["latitude"] == 59.3
+        assert data["summary"] == "coords"
+
+    def test_maxlag_is_retried_and_halves_concurrency(self, mock_invalidate):
+        login = _login(
+            _response({"error": {"code": "maxlag", "lag": 0}}, headers={"retry-after": "0"}),
+            _response({"entity": {"id": "Q10"}}),
+        )
+        writer = BatchWriter(login, max_workers=4)
+        writer._limit = 4.0
+        writer.submit(band_edit("A"))
+
+        results = writer.run()
+
+        assert results[0].ok
+        assert results[0].attempts == 2
+        assert writer.throttle_events == 1
+        assert writer.concurrency == 2
+
+    def test_http_429_is_throttled(self, mock_invalidate):
+        login = _login(_response({}, status_code=429, headers={"retry-after": "0"}), _response({"entity": {"id": "Q10"}}))
+        writer = BatchWriter(login, max_workers=2)
+        writer.submit(band_edit("A"))
+
+        assert writer.run()[0].qid == "Q10"
+        assert writer.throttle_events == 1
+
+    def test_retry_after_http_date(self, mock_invalidate):
+        retry_at = formatdate(time.time() + 120, usegmt=True)
+        writer = BatchWriter(_login(_response({}, status_code=503, headers={"Retry-After": retry_at})))
+
+        with pytest.raises(ThrottledError) as throttled:
+            writer.post({"action": "wbeditentity"})
+        assert 100 < throttled.value.retry_after <= 120
+
+    def test_api_error_is_not_retried(self, mock_invalidate):
+        login = _login(_response({"error": {"code": "modification-failed", "info": "duplicate label"}}))
+        writer = BatchWriter(login, max_workers=2)
+        writer.submit(band_edit("A"))
+
+        result = writer.run()[0]
+
+        assert not result.ok
+        assert result.attempts == 1
+        assert "duplicate label" in result.error
+        mock_invalidate.assert_not_called()
+
+    def test_empty_queue(self, mock_invalidate):
+        assert BatchWriter(MagicMock()).run() == []
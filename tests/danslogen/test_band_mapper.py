@@ -69,3 +69,24 @@ class TestBandMapperWithClient:
 
         assert result == "Q300"
         mock_client.get_or_create_band.assert_called_once_with("NewBand", spelplan_id="kent_henke")
+
+
+class TestBandMapperPrefetch:
+    @patch("src.models.danslogen.band_mapper.load_danslogen_artists")
+    @patch("src.models.danslogen.band_mapper.load_band_map")
+    @patch("src.models.danslogen.band_mapper.fuzzy_match_qid", return_value=None)
+    def test_prefetch_searches_unknown_bands_once(self, mock_fuzzy, mock_load, mock_danslogen):
+        mock_load.return_value = {"known": "Q1"}
+        mock_danslogen.return_value = {}
+        mock_client = MagicMock()
+        mock_client.search_bands.return_value = {"Found": "Q2", "Missing": None}
+        mock_client.create_band.return_value = "Q3"
+        mapper = BandMapper(client=mock_client)
+
+        mapper.prefetch(["Known", "Found", "Missing", "Found"])
+
+        mock_client.search_bands.assert_called_once_with(["Found", "Missing"])
+        assert mapper.resolve("Found") == "Q2"
+        assert mapper.resolve("Missing") == "Q3"
+        mock_client.get_or_create_band.assert_not_called()
+        mock_client.create_band.assert_called_once_with("Missing", "")
@@ -103,7 +103,7 @@ class TestScrapeMonthFunction:
 class TestDanslogenParseRow:
     @patch("src.models.danslogen.band_mapper.load_band_map")
     @patch("src.models.danslogen.venue_mapper.load_venue_map")
-    @patch("src.models.danslogen.main.DancedbClient")
+    @patch("src.models.danslogen.main.get_client")
     def test_parse_row_with_valid_data(self, mock_client, mock_venue_map, mock_band_map):
         mock_band_map.return_value = {"testband": "Q123"}
         mock_venue_map.return_value = {"TestVenue": "Q456"}
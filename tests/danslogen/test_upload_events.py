@@ -0,0 +1,72 @@
+import json
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.models.danslogen.events.scrape import upload_events
+
+
+def _event(i: int, venue: str = "Q100") -> dict:
+    start = datetime.now() + timedelta(days=i)
+    return {
+        "id": str(i),
+        "label": {"sv": f"Dans {i}"},
+        "description": {},
+        "price_normal": 0,
+        "start_timestamp": start.isoformat(),
+        "end_timestamp": (start + timedelta(hours=4)).isoformat(),
+        "identifiers": {"dancedatabase": {"venue": venue}},
+    }
+
+
+@pytest.fixture
+def upload(tmp_path):
+    mock_client = MagicMock()
+    with patch("src.models.danslogen.events.scrape.get_client", return_value=mock_client), \
+            patch("src.models.danslogen.events.scrape._load_existing_events", return_value={}), \
+            patch("src.models.danslogen.events.scrape._load_venue_mappings", return_value={}), \
+            patch("src.models.danslogen.events.scrape._hydrate_lookup", return_value={}), \
+            patch("src.models.danslogen.events.scrape._display_event"), \
+            patch("src.models.danslogen.events.scrape.detect_event_status", return_value=("Q10", "")), \
+            patch("src.models.danslogen.events.scrape.rich.print"), \
+            patch("src.models.danslogen.events.scrape.questionary.select") as mock_select, \
+            patch("src.models.danslogen.events.scrape.BatchWriter") as mock_writer_cls:
+        mock_select.return_value.ask.return_value = "Yes (Recommended)"
+        writer = mock_writer_cls.return_value
+        writer.__len__.side_effect = lambda: writer.submit.call_count
+        writer.run.return_value = []
+
+        def run(events: list[dict]) -> None:
+            input_file = tmp_path / "events.json"
+            input_file.write_text(json.dumps(events))
+            upload_events(input_file=str(input_file), date_str="2026-01-01")
+
+        run.writer = writer
+        run.writer_cls = mock_writer_cls
+        yield run
+
+
+class TestUploadEvents:
+
+    def test_confirmed_events_are_written_when_a_later_event_has_no_venue(self, upload):
+        with pytest.raises(ValueError, match="no venue QID"):
+            upload([_event(1), _event(2, venue=""), _event(3)])
+
+        assert [call.args[0].label for call in upload.writer.submit.call_args_list] == ["Dans 1"]
+        upload.writer.run.assert_called_once()
+
+    def test_nothing_confirmed_never_logs_in(self, upload):
+        with patch("src.models.danslogen.events.scrape.questionary.select") as mock_select:
+            mock_select.return_value.ask.return_value = "Skip"
+            upload([_event(1), _event(2)])
+
+        upload.writer_cls.assert_not_called()
+
+    def test_plan_mode_never_logs_in(self, upload):
+        plan = MagicMock()
+        with patch("src.models.danslogen.events.scrape.active_plan", return_value=plan):
+            upload([_event(1)])
+
+        assert plan.add.call_count == 1
+        upload.writer_cls.assert_not_called()
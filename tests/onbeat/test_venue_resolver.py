@@ -2,10 +2,18 @@ import json
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+import pytest
+
 from src.models.onbeat.venue_resolver import VenueResolver
 from src.utils.venue_resolver import UnifiedVenueResolver, VenueSourceData
 
 
+@pytest.fixture(autouse=True)
+def json_snapshots(monkeypatch):
+    # These tests cover the JSON snapshot loaders; the geodb backing is tested in tests/_utils/test_geodb.py
+    monkeypatch.setattr("config.VENUE_RESOLVER_GEODB", False)
+
+
 class TestVenueResolverInit:
     def test_initializes_with_default_data_dir(self):
         resolver = VenueResolver()
@@ -4,7 +4,7 @@ from unittest.mock import MagicMock, patch
 
 
 class TestScrapeWikidataArtists:
-    @patch("wikibaseintegrator.wbi_helpers.execute_sparql_query")
+    @patch("src.utils.sparql._query_json")
     @patch("src.models.wikidata.operations.root_config")
     def test_scrape_wikidata_artists(self, mock_root_config, mock_execute_sparql_query):
         from src.models.wikidata.operations import scrape_wikidata_artists
@@ -34,7 +34,7 @@ class TestScrapeWikidataArtists:
         assert "Q123" in data
         assert data["Q123"]["label"] == "Test Artist"
 
-    @patch("wikibaseintegrator.wbi_helpers.execute_sparql_query")
+    @patch("src.utils.sparql._query_json")
     @patch("src.models.wikidata.operations.root_config")
     def test_saves_to_correct_path(self, mock_root_config, mock_execute_sparql_query):
         from src.models.wikidata.operations import scrape_wikidata_artists
@@ -51,7 +51,7 @@ class TestScrapeWikidataArtists:
 
 
 class TestMatchWikidataArtists:
-    @patch("src.models.wikidata.operations.DancedbClient")
+    @patch("src.models.wikidata.operations.get_client")
     @patch("src.models.wikidata.operations.root_config")
     def test_match_wikidata_artists_loads_files(self, mock_root_config, MockDancedbClient):
         from src.models.wikidata.operations import match_wikidata_artists
@@ -74,7 +74,7 @@ class TestMatchWikidataArtists:
 
         mock_client.fetch_artists_from_dancedb.assert_called_once()
 
-    @patch("src.models.wikidata.operations.DancedbClient")
+    @patch("src.models.wikidata.operations.get_client")
     @patch("src.models.wikidata.operations.root_config")
     def test_match_wikidata_artists_dry_run(self, mock_root_config, MockDancedbClient):
         from src.models.wikidata.operations import match_wikidata_artists
@@ -99,7 +99,7 @@ class TestMatchWikidataArtists:
 
         mock_client.wbi.item.get.assert_not_called()
 
-    @patch("src.models.wikidata.operations.DancedbClient")
+    @patch("src.models.wikidata.operations.get_client")
     @patch("src.models.wikidata.operations.root_config")
     def test_match_wikidata_artists_no_file(self, mock_root_config, MockDancedbClient):
         from src.models.wikidata.operations import match_wikidata_artists
@@ -113,7 +113,7 @@ class TestMatchWikidataArtists:
 
         mock_client.fetch_artists_from_dancedb.assert_not_called()
 
-    @patch("src.models.wikidata.operations.DancedbClient")
+    @patch("src.models.wikidata.operations.get_client")
     @patch("src.models.wikidata.operations.root_config")
     def test_match_wikidata_artists_no_matches(self, mock_root_config, MockDancedbClient):
         from src.models.wikidata.operations import match_wikidata_artists
@@ -139,7 +139,7 @@ class TestMatchWikidataArtists:
 
         mock_client.wbi.item.get.assert_not_called()
 
-    @patch("src.models.wikidata.operations.DancedbClient")
+    @patch("src.models.wikidata.operations.get_client")
     @patch("src.models.wikidata.operations.root_config")
     def test_match_wikidata_artists_uploads(self, mock_root_config, MockDancedbClient):
         from src.models.wikidata.operations import match_wikidata_artists
@@ -165,13 +165,15 @@ class TestMatchWikidataArtists:
         with patch("rapidfuzz.process.extractOne", return_value=None):
             match_wikidata_artists("2026-01-07", dry_run=False)
 
-        mock_client.wbi.item.get.assert_called_once_with(entity_id="Q227")
-        mock_item.claims.add.assert_called_once()
-        mock_item.write.assert_called_once()
+        mock_client.wbi.item.get.assert_not_called()
+        mock_client.coalesced_edits.assert_called_once()
+        qid, claims = mock_client.add_claims.call_args.args
+        assert qid == "Q227"
+        assert [(c.prop_nr, c.value) for c in claims] == [("P3", "Q999")]
 
 
 class TestSyncWikidataArtists:
-    @patch("src.models.wikidata.operations.DancedbClient")
+    @patch("src.models.wikidata.operations.get_client")
     @patch("src.models.wikidata.operations.root_config")
     def test_sync_wikidata_artists_uses_band_map(self, mock_root_config, MockDancedbClient):
         from src.models.wikidata.operations import sync_wikidata_artists
@@ -196,7 +198,7 @@ class TestSyncWikidataArtists:
 
         mock_client.fetch_artists_from_dancedb.assert_called_once()
 
-    @patch("src.models.wikidata.operations.DancedbClient")
+    @patch("src.models.wikidata.operations.get_client")
     @patch("src.models.wikidata.operations.root_config")
     def test_sync_wikidata_artists_no_missing(self, mock_root_config, MockDancedbClient):
         from src.models.wikidata.operations import sync_wikidata_artists